@@ -0,0 +1,120 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compare fixed and adaptive concurrency limits against a simulated quota-bound backend"""
+
+import sys
+import time
+import logging
+import random
+import argparse
+import threading
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from google.api_core.exceptions import TooManyRequests
+
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent import adaptive_limiter
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.adaptive_limiter import AdaptiveLimiter
+
+
+class QuotaBackend:
+    """Serves ``capacity`` calls at base latency; slows down past it and rejects past 1.5x."""
+
+    def __init__(self, capacity: int, latency: float):
+        self.capacity = capacity
+        self.base_latency = latency
+        self.active = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, contents, stream=False, **kwargs):
+        with self._lock:
+            self.active += 1
+            active = self.active
+        try:
+            if active > self.capacity * 1.5:
+                with self._lock:
+                    self.rejected += 1
+                raise TooManyRequests("Quota exceeded")
+            time.sleep(self.base_latency * max(1.0, active / self.capacity) * random.uniform(0.9, 1.1))
+            return "ok"
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def run(limiter: AdaptiveLimiter, capacity: int, latency: float, callers: int, seconds: float) -> dict:
+    backend = QuotaBackend(capacity, latency)
+    model = limiter.wrap(backend)
+    completed, failed = [0], [0]
+    lock = threading.Lock()
+    deadline = time.time() + seconds
+
+    def caller():
+        while time.time() < deadline:
+            try:
+                model.generate_content("prompt")
+                outcome = completed
+            except TooManyRequests:
+                outcome = failed
+            with lock:
+                outcome[0] += 1
+
+    threads = [threading.Thread(target=caller) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {"throughput": completed[0] / seconds, "failed": failed[0], "rejected": backend.rejected,
+            "limit": limiter.limit}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--capacity", type=int, default=10, help="Calls the simulated quota serves at full speed.")
+    parser.add_argument("--latency", type=float, default=0.02, help="Base call latency in seconds.")
+    parser.add_argument("--callers", type=int, default=48, help="Concurrent callers (e.g. analyses in flight).")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Duration of each run.")
+    parser.add_argument("--min-efficiency", type=float, default=0.8,
+                        help="Fail when adaptive throughput is below this fraction of the quota.")
+    args = parser.parse_args()
+
+    # Retry quickly relative to the simulated latency, without a warning per retry
+    logging.getLogger(adaptive_limiter.__name__).setLevel(logging.ERROR)
+    adaptive_limiter.OVERLOAD_RETRY_SECONDS = args.latency * 2
+    ideal = args.capacity / args.latency
+    configs = [("fixed 2", AdaptiveLimiter("fixed", 2, 2, min_limit=2)),
+               ("fixed 32", AdaptiveLimiter("fixed", 32, 32, min_limit=32)),
+               ("adaptive", AdaptiveLimiter("adaptive", 2, 64))]
+
+    print(f"{'limiter':<10} {'calls/s':>8} {'of quota':>9} {'failed':>7} {'429s':>6} {'limit':>6}")
+    efficiency = 0.0
+    for name, limiter in configs:
+        result = run(limiter, args.capacity, args.latency, args.callers, args.seconds)
+        efficiency = result["throughput"] / ideal
+        print(f"{name:<10} {result['throughput']:>8.0f} {efficiency:>8.0%} {result['failed']:>7} "
+              f"{result['rejected']:>6} {result['limit']:>6}")
+
+    if efficiency < args.min_efficiency:
+        print(f"FAIL: adaptive limiter reached {efficiency:.0%} of the quota (minimum {args.min_efficiency:.0%})")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
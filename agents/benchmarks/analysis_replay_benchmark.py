@@ -0,0 +1,112 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark the analysis pipeline offline: overhead and parse success over recorded Gemini calls"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.agent import DataExtractionAgent
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.blob_cache import BlobCache
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.cpu_stage import CpuStage
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.model_replay import (
+    MODE_RECORD,
+    MODE_REPLAY,
+    MODE_REPLAY_TIMED,
+    ModelCassette,
+)
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.span_index import SpanIndex
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.storage_backend import open_storage
+
+# Analysis methods that mean the model response was parsed.
+PARSED_METHODS = ("gemini_ai", "gemini_summary")
+
+
+def list_companies(storage) -> list:
+    """Company folder names under ``Company Data/``."""
+    names = {info.name.split("/")[1] for info in storage.list(prefix="Company Data/") if info.name.count("/") >= 2}
+    return sorted(name for name in names if name)
+
+
+def run(agent: DataExtractionAgent, company_name: str) -> dict:
+    cassette = agent.model_cassette
+    recorded_before = cassette.stats["recorded"]
+    misses_before = cassette.stats["misses"]
+    start = time.perf_counter()
+    result = agent.extract_company_data(company_name, force_refresh=True)
+    elapsed = time.perf_counter() - start
+    analysis = (result or {}).get("entity_analysis") or {}
+    return {
+        "company": company_name,
+        "ms": elapsed * 1000,
+        "method": analysis.get("analysis_method", "error"),
+        "entities": len(analysis.get("entities") or []),
+        "relationships": len(analysis.get("relationships") or []),
+        "missed": cassette.stats["misses"] > misses_before,
+        "recorded": cassette.stats["recorded"] - recorded_before,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cassette", required=True, type=Path, help="Cassette file of recorded Gemini calls.")
+    parser.add_argument("--storage", default=os.getenv("LVX_STORAGE_URI"),
+                        help="Storage URI holding Company Data/ (defaults to LVX_STORAGE_URI).")
+    parser.add_argument("--companies", help="Comma-separated companies (defaults to every company).")
+    parser.add_argument("--mode", choices=[MODE_REPLAY, MODE_REPLAY_TIMED, MODE_RECORD], default=MODE_REPLAY,
+                        help="Replay (optionally with recorded latency) or record from the live model.")
+    parser.add_argument("--iterations", type=int, default=3)
+    args = parser.parse_args()
+
+    storage = open_storage(args.storage)
+    cache_dir = tempfile.mkdtemp(prefix="lvx-replay-")
+    agent = DataExtractionAgent(
+        storage=storage,
+        cpu_stage=CpuStage(0),
+        blob_cache=BlobCache(storage, cache_dir),
+        span_index=SpanIndex(cache_dir),
+        model_cassette=ModelCassette(str(args.cassette), args.mode),
+    )
+    companies = args.companies.split(",") if args.companies else list_companies(storage)
+    iterations = 1 if args.mode == MODE_RECORD else args.iterations
+
+    print(f"{'company':<28} {'method':<16} {'entities':>8} {'rels':>5} {'ms':>9}")
+    failures = 0
+    for company_name in companies:
+        runs = [run(agent, company_name) for _ in range(iterations)]
+        r = runs[-1]
+        ms = sorted(item["ms"] for item in runs)[len(runs) // 2]
+        note = " (cassette miss)" if r["missed"] else f" (recorded {r['recorded']})" if r["recorded"] else ""
+        print(f"{company_name[:28]:<28} {r['method']:<16} {r['entities']:>8} {r['relationships']:>5} {ms:>9.1f}{note}")
+        if r["missed"] or r["method"] not in PARSED_METHODS or len({item["method"] for item in runs}) > 1:
+            failures += 1
+
+    stats = agent.model_cassette.stats
+    print(f"cassette: {stats['hits']} hits, {stats['misses']} misses, {stats['recorded']} recorded")
+    if failures:
+        print(f"FAIL: {failures} of {len(companies)} companies missed the cassette or did not parse")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
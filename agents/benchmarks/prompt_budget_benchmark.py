@@ -0,0 +1,151 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark prompt compaction: tokens saved versus entity recall"""
+
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.prompt_budget import (
+    CHARS_PER_TOKEN,
+    PromptBudgeter,
+    estimate_tokens,
+)
+
+# Each fact slide appears exactly once, so dropping it costs recall.
+FACT_SLIDES = [
+    ("Founders: Priya Raman (CEO, ex-Amazon Robotics, PhD) and Daniel Okafor (CTO, ex-Tesla).",
+     ["Priya Raman", "Daniel Okafor"]),
+    ("Traction: $1.1M ARR growing 18% MoM with 72% gross margin across 40 customers.",
+     ["$1.1M ARR", "18% MoM", "72% gross margin"]),
+    ("We are raising a $4.2M Series A. Existing investors include Sequoia Surge and Blume Ventures.",
+     ["$4.2M", "Series A", "Sequoia Surge", "Blume Ventures"]),
+    ("Competitors: UiPath and Automation Anywhere focus on software bots; we differentiate with computer vision.",
+     ["UiPath", "Automation Anywhere", "computer vision"]),
+    ("Market: warehouse robotics is a $38B TAM growing 14% annually.",
+     ["warehouse robotics", "$38B"]),
+    ("Burn is $85k per month, giving 14 months runway after this round.",
+     ["$85k per month", "14 months runway"]),
+]
+
+# Ground-truth entities that must survive compaction.
+ENTITIES = [entity for _, entities in FACT_SLIDES for entity in entities]
+
+# Vocabulary for distractor slides: unique prose (so deduplication cannot
+# remove it) with the odd relevance term, but no facts.
+DISTRACTOR_WORDS = (
+    "mission vision delightful experiences empower teams customers journey platform culture values "
+    "innovation collaboration future possibilities brand story community partners workflow seamless "
+    "intuitive trusted scalable world-class passionate people market team"
+).split()
+
+
+def distractor_slide(rng: random.Random, sentences: int = 4) -> str:
+    """Build one slide of unique filler prose."""
+    return " ".join(
+        " ".join(rng.choice(DISTRACTOR_WORDS) for _ in range(rng.randint(10, 16))).capitalize() + "."
+        for _ in range(sentences)
+    )
+
+
+def build_synthetic_deck(slides: int = 40, seed: int = 7) -> str:
+    """Build a deck with per-slide boilerplate and distractor slides, each fact appearing once."""
+    rng = random.Random(seed)
+    fact_at = {slides * (k + 1) // (len(FACT_SLIDES) + 1): fact for k, (fact, _) in enumerate(FACT_SLIDES)}
+    parts = ["PITCH DECK:"]
+    for i in range(slides):
+        parts.append("ACME ROBOTICS | Confidential")
+        parts.append(f"Slide {i + 1} of {slides}")
+        parts.append(fact_at.get(i) or distractor_slide(rng))
+        parts.append("www.acme-robotics.ai   |   hello@acme-robotics.ai")
+        parts.append("")
+    return "\n".join(parts)
+
+
+def entity_recall(text: str) -> float:
+    """Fraction of ground-truth entities present in the text."""
+    return sum(1 for entity in ENTITIES if entity in text) / len(ENTITIES)
+
+
+def fact_tokens(budgeter: PromptBudgeter, text: str) -> int:
+    """Tokens of the pinned passages plus every fact passage, i.e. the smallest budget with full recall."""
+    deduped = budgeter.compact(text)["text"]
+    passages = deduped.split("\n\n")
+    needed = [p for i, p in enumerate(passages) if i == 0 or any(fact in p for fact, _ in FACT_SLIDES)]
+    return sum(estimate_tokens(p + "\n\n") for p in needed)
+
+
+def run(text: str, budget: int, iterations: int) -> dict:
+    budgeter = PromptBudgeter(max_tokens=budget)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        compacted = budgeter.compact(text)
+    elapsed_ms = (time.perf_counter() - start) * 1000 / iterations
+    report = compacted["report"]
+    # Baseline: the same deduplicated text cut at the budget
+    deduped = PromptBudgeter(max_tokens=10 ** 9).compact(text)["text"]
+    return {
+        "budget": budget,
+        "tokens_before": estimate_tokens(text),
+        "tokens_after": report["compacted_tokens"],
+        "reduction_pct": 100.0 * (1 - report["compacted_tokens"] / max(estimate_tokens(text), 1)),
+        "recall_after": entity_recall(compacted["text"]),
+        "recall_truncated": entity_recall(deduped[:budget * CHARS_PER_TOKEN]),
+        "dropped_spans": len(report["dropped_spans"]),
+        "compaction_ms": elapsed_ms,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--input", type=Path, help="Optional text file to compact instead of the synthetic deck.")
+    parser.add_argument("--budgets", default="100000,1500,600,300,150", help="Comma-separated token budgets.")
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    text = args.input.read_text(encoding="utf-8") if args.input else build_synthetic_deck()
+    full_recall_budget = fact_tokens(PromptBudgeter(max_tokens=10 ** 9), text)
+    if not args.input:
+        print(f"Pinned and fact passages need {full_recall_budget} tokens")
+
+    print(f"{'budget':>8} {'tokens':>15} {'saved':>7} {'recall':>7} {'truncate':>9} {'dropped':>8} {'ms':>7}")
+    regressions = 0
+    for budget in (int(b) for b in args.budgets.split(",")):
+        r = run(text, budget, args.iterations)
+        print(
+            f"{r['budget']:>8} {r['tokens_before']:>6} -> {r['tokens_after']:<6} "
+            f"{r['reduction_pct']:>6.1f}% {r['recall_after']:>7.2f} {r['recall_truncated']:>9.2f} "
+            f"{r['dropped_spans']:>8} {r['compaction_ms']:>7.2f}"
+        )
+        if args.input:
+            continue
+        # Ranking must keep every fact when they fit, and never do worse than truncation
+        if (budget >= full_recall_budget and r["recall_after"] < 1.0) or r["recall_after"] < r["recall_truncated"]:
+            regressions += 1
+
+    if regressions:
+        print(f"FAIL: entity recall regressed at {regressions} budget(s)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
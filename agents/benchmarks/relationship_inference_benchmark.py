@@ -0,0 +1,83 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark portfolio-wide relationship inference on a synthetic portfolio"""
+
+import sys
+import random
+import argparse
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.graph_inference import (
+    COMPETES_WITH,
+    RelationshipInference,
+)
+
+
+def build_portfolio(companies: int, seed: int = 7) -> dict:
+    """Synthetic analyses with skewed investor, market and technology popularity."""
+    rng = random.Random(seed)
+    investors = [f"Fund {i}" for i in range(companies // 5 + 10)]
+    markets = [f"Market {i}" for i in range(60)]
+    technologies = [f"Tech {i}" for i in range(companies // 10 + 20)]
+    names = [f"Company {i}" for i in range(companies)]
+
+    def pick(pool, count):
+        # Squared uniform draws favour the head of the pool, like real portfolios
+        return {pool[int(len(pool) * rng.random() ** 2)] for _ in range(count)}
+
+    analyses = {}
+    for name in names:
+        entities = [{"id": "company", "type": "company", "name": name}]
+        for kind, pool, count in (("investor", investors, rng.randint(1, 4)), ("market", markets, rng.randint(1, 2)),
+                                  ("technology", technologies, rng.randint(2, 6))):
+            entities += [{"id": f"{kind}_{i}", "type": kind, "name": value}
+                         for i, value in enumerate(pick(pool, count))]
+        rivals = rng.sample(names, 2)
+        entities += [{"id": f"competitor_{i}", "type": "competitor", "name": rival} for i, rival in enumerate(rivals)]
+        relationships = [{"type": COMPETES_WITH, "source_entity": "company", "target_entity": f"competitor_{i}"}
+                         for i in range(len(rivals))]
+        analyses[name] = {"entities": entities, "relationships": relationships}
+    return analyses
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="500,2000,5000", help="Comma-separated portfolio sizes.")
+    parser.add_argument("--max-seconds", type=float, default=10.0, help="Fail when the largest portfolio is slower.")
+    args = parser.parse_args()
+
+    inference = RelationshipInference()
+    print(f"{'companies':>9} {'edges':>8} {'investor':>9} {'market':>8} {'tech':>8} {'compete':>8} {'seconds':>8}")
+    seconds = 0.0
+    for size in (int(s) for s in args.sizes.split(",")):
+        inferred = inference.infer(build_portfolio(size))
+        counts = inferred["counts"]
+        seconds = inferred["seconds"]
+        print(f"{size:>9} {len(inferred['edges']):>8} {counts.get('shares_investor', 0):>9} "
+              f"{counts.get('shares_market', 0):>8} {counts.get('similar_technology', 0):>8} "
+              f"{counts.get(COMPETES_WITH, 0):>8} {seconds:>8.2f}")
+
+    if seconds > args.max_seconds:
+        print(f"FAIL: inference took {seconds:.2f}s (limit {args.max_seconds:.0f}s)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -18,7 +18,19 @@ from google.adk.agents import LlmAgent
 from google.adk.tools.agent_tool import AgentTool
 
 from . import prompt
-from .sub_agents.data_extraction_agent import DataExtractionAgent
+from .memo import extraction_memo
+from .streaming_agent import StreamingDealNoteAgent
+from .sub_agents.data_extraction_agent import (
+    DataExtractionAgent,
+    analyze_company,
+    company_changes,
+    compare_companies,
+    rank_portfolio,
+    read_company_document,
+    record_session_id,
+    search_portfolio,
+)
+from .sub_agents.data_extraction_agent.prompt import DATA_EXTRACTION_PROMPT
 
 MODEL = "gemini-2.0-flash-exp"
 
@@ -35,25 +47,9 @@ data_extraction_agent = LlmAgent(
         "inferential analysis of business relationships, competitive dynamics, "
         "and market positioning."
     ),
-    instruction="""
-    You are an advanced Data Extraction Agent specialized in:
-    1. Extracting company data from Google Cloud Storage bucket 'lxvquantumleapai'
-    2. Performing deep entity extraction (companies, founders, investors, technologies, markets, metrics)
-    3. Inferring complex business relationships and competitive dynamics
-    4. Constructing knowledge graphs that go beyond simple RAG (Retrieval Augmented Generation)
-    5. Providing investment-relevant insights through sophisticated analysis
-
-    When processing company data:
-    - Extract ALL relevant entities with high precision
-    - Infer relationships that aren't explicitly stated but can be deduced from context
-    - Analyze competitive positioning, market dynamics, and growth indicators
-    - Provide actionable insights for investment decision-making
-    - Maintain high confidence scores for all extractions and inferences
-
-    Focus on creating comprehensive knowledge representations that enable sophisticated investment analysis.
-    """,
+    instruction=DATA_EXTRACTION_PROMPT,
     output_key="data_extraction_output",
-    tools=[],  # Tools will be handled by the DataExtractionAgent class
+    tools=[analyze_company, read_company_document, search_portfolio],
 )
 
 
@@ -70,11 +66,35 @@ lvx_quantum_leap_analyst = LlmAgent(
         "investment through its deep semantic fusion, multi-agent orchestration, and transparent, "
         "auditable recommendations with accuracy."
     ),
-    instruction=prompt.LVX_QUANTUM_LEAP_PROMPT,
+    instruction=prompt.LVX_QUANTUM_LEAP_PROMPT + prompt.COMPARATIVE_ANALYSIS_PROMPT,
     output_key="lvx_quantum_leap_output",
     tools=[
         AgentTool(agent=data_extraction_agent),
+        compare_companies,
+        rank_portfolio,
+        company_changes,
     ],
+    # Sub-agent tool calls are billed to this session rather than the AgentTool's own
+    before_agent_callback=record_session_id,
+    # Follow-up questions about an unchanged company reuse the earlier extraction
+    before_tool_callback=extraction_memo.before_tool,
+    after_tool_callback=extraction_memo.after_tool,
 )
 
-root_agent = lvx_quantum_leap_analyst
\ No newline at end of file
+root_agent = lvx_quantum_leap_analyst
+
+
+# Streaming entry point: emits structured progress, then the deal note
+streaming_lvx_quantum_leap_analyst = StreamingDealNoteAgent(
+    name="streaming_lvx_quantum_leap_analyst",
+    description=(
+        "Streaming variant of the LVX Quantum Leap AI Analyst that reports documents fetched, "
+        "entities, insights and risks as they are extracted before writing the deal note."
+    ),
+    deal_note_writer=LlmAgent(
+        name="deal_note_writer",
+        model=MODEL,
+        instruction=prompt.LVX_QUANTUM_LEAP_PROMPT + prompt.DEAL_NOTE_STREAMING_PROMPT,
+        output_key="lvx_quantum_leap_output",
+    ),
+)
\ No newline at end of file
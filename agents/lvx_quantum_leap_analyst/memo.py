@@ -0,0 +1,161 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Session-scoped memoization of sub-agent tool calls"""
+
+import re
+import logging
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+
+from .sub_agents.data_extraction_agent import get_default_agent
+from .sub_agents.data_extraction_agent.agent import ANALYZED_COMPANIES_STATE_KEY
+from .sub_agents.data_extraction_agent.tenants import DEFAULT_TENANT, TENANT_STATE_KEY
+
+logger = logging.getLogger(__name__)
+
+# Session state key holding memoized outputs per company.
+MEMO_STATE_KEY = "lvx_extraction_memo"
+
+# Capitalised words in a request that do not name a company.
+REQUEST_WORDS = {
+    "analyze", "analyse", "analysis", "extract", "data", "company", "companies", "deal", "note",
+    "please", "the", "for", "of", "and", "provide", "summarize", "summarise", "show", "get", "give",
+    "what", "how", "is", "are", "its", "their", "again", "i", "a", "an", "pitch", "founder",
+    "checklist", "documents", "entities", "relationships", "insights", "risks",
+}
+CAPITALISED_WORD_RE = re.compile(r"(?<![\w&'-])[A-Z][\w&'-]*")
+SENTENCE_START_RE = re.compile(r"(?:^|[.!?:;])\s*$")
+
+
+class SubAgentMemo:
+    """
+    Serves repeat ``AgentTool`` calls for the same company from session state.
+
+    After the data extraction sub-agent answers, its output is stored in
+    session state under the company it analyzed, together with the source
+    fingerprint of the company folder. A later call whose request names a
+    memoized company is answered from state instead of rerunning the
+    sub-agent, as long as the folder's blob generations are unchanged.
+
+    Entries are keyed by tenant and company, and a request only hits the
+    memo when it names exactly one company: any other capitalised word
+    that could be a company (e.g. "compare Acme with NewCo") runs fresh.
+    Likewise, a run is only memoized when the sub-agent called
+    ``analyze_company`` exactly once, so an answer covering several
+    companies is never stored under one of them.
+    """
+
+    def __init__(self, tool_name: str = "data_extraction_agent", output_key: str = "data_extraction_output"):
+        """
+        Initialize the memo.
+
+        Args:
+            tool_name: Name of the AgentTool to memoize
+            output_key: State key the sub-agent writes its output to
+        """
+        self.tool_name = tool_name
+        self.output_key = output_key
+
+    def _requested_company(self, memo: Dict[str, Any], args: Dict[str, Any], tenant: str) -> Optional[str]:
+        request = " ".join(str(value) for value in args.values())
+        patterns = {
+            key: re.compile(rf"(?<!\w){re.escape(entry['company_name'])}(?!\w)", re.IGNORECASE)
+            for key, entry in memo.items() if entry.get("tenant") == tenant
+        }
+        named = [key for key, pattern in patterns.items() if pattern.search(request)]
+        # Requests naming several companies (comparisons) always run fresh
+        if len(named) != 1:
+            return None
+        remainder = patterns[named[0]].sub(" ", request)
+        for word in CAPITALISED_WORD_RE.finditer(remainder):
+            if word.group(0).lower() in REQUEST_WORDS or SENTENCE_START_RE.search(remainder[:word.start()]):
+                continue
+            # Possibly another company the memo does not know about
+            return None
+        return named[0]
+
+    def before_tool(self, tool: BaseTool, args: Dict[str, Any],
+                    tool_context: ToolContext) -> Optional[Dict[str, Any]]:
+        """Return the memoized output when the requested company is unchanged."""
+        if tool.name != self.tool_name:
+            return None
+        memo = tool_context.state.get(MEMO_STATE_KEY) or {}
+        tenant = tool_context.state.get(TENANT_STATE_KEY) or DEFAULT_TENANT
+        key = self._requested_company(memo, args, tenant)
+        if key is None:
+            self._start_run(tool_context)
+            return None
+
+        entry = memo[key]
+        try:
+            agent = get_default_agent(tenant)
+            fingerprint = agent.current_fingerprint(entry["company_name"])
+        except Exception as e:
+            logger.warning(f"Could not check {entry['company_name']} for changes, rerunning: {e}")
+            self._start_run(tool_context)
+            return None
+        if fingerprint != entry["source_fingerprint"]:
+            logger.info(f"Documents changed for {entry['company_name']}, discarding memoized output")
+            memo = dict(memo)
+            del memo[key]
+            tool_context.state[MEMO_STATE_KEY] = memo
+            self._start_run(tool_context)
+            return None
+
+        logger.info(f"Serving memoized {self.tool_name} output for {entry['company_name']}")
+        tool_context.state[self.output_key] = entry["output"]
+        return {"result": entry["output"], "memoized": True}
+
+    @staticmethod
+    def _start_run(tool_context: ToolContext) -> None:
+        # AgentTool copies state into the sub-agent's session, so analyses it
+        # records start from an empty list
+        tool_context.state[ANALYZED_COMPANIES_STATE_KEY] = []
+
+    def after_tool(self, tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext,
+                   tool_response: Any) -> Optional[Dict[str, Any]]:
+        """Store the sub-agent's output under the company it analyzed."""
+        if tool.name != self.tool_name:
+            return None
+        if isinstance(tool_response, dict) and tool_response.get("memoized"):
+            return None
+        analyzed = tool_context.state.get(ANALYZED_COMPANIES_STATE_KEY) or []
+        # Clear the list so a later call without an analysis is not misattributed
+        tool_context.state[ANALYZED_COMPANIES_STATE_KEY] = []
+        output = tool_context.state.get(self.output_key)
+        # Runs that analyzed several companies (comparisons) are not memoized
+        if len(analyzed) != 1 or output is None:
+            return None
+        analyzed = analyzed[0]
+        if not analyzed.get("source_fingerprint"):
+            return None
+
+        memo = dict(tool_context.state.get(MEMO_STATE_KEY) or {})
+        tenant = tool_context.state.get(TENANT_STATE_KEY) or DEFAULT_TENANT
+        memo[f"{tenant}/{analyzed['company_name'].lower()}"] = {
+            "tenant": tenant,
+            "company_name": analyzed["company_name"],
+            "source_fingerprint": analyzed["source_fingerprint"],
+            "output": output,
+            "stored_at": datetime.utcnow().isoformat(),
+        }
+        tool_context.state[MEMO_STATE_KEY] = memo
+        return None
+
+
+extraction_memo = SubAgentMemo()
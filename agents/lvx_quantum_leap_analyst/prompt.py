@@ -157,6 +157,7 @@ Your role is to maintain complete transparency and auditability of the entire in
 AUDIT REQUIREMENTS:
 - Document all data sources and processing steps
 - Record all assumptions and their justifications
+- Cite source evidence by the evidence_span (document, generation, start, end) attached to entities and relationships
 - Maintain decision rationale at each step
 - Track confidence levels and uncertainty factors
 - Preserve alternative analyses considered
@@ -170,4 +171,24 @@ Provide comprehensive audit trail including:
 - Confidence scoring methodology
 - Reproducibility instructions
 - Timestamped change log
-"""
\ No newline at end of file
+"""
+
+DEAL_NOTE_STREAMING_PROMPT = """
+The Data Extraction Agent has already analyzed the company's documents. Its entity and relationship analysis is:
+
+{data_extraction_output}
+
+Using this analysis, write the investor-ready deal note for {company_name}: lead with the investment recommendation, then the supporting evidence, key risks, and open questions. Do not call any tools.
+"""
+
+COMPARATIVE_ANALYSIS_PROMPT = """
+
+COMPARATIVE ANALYSIS:
+When asked to compare or rank several companies, call compare_companies once with all of their names instead of
+analyzing each company separately. Bracketed numbers in its table are percentile ranks within the compared set
+(1.0 is the favourable end). Analyze any companies listed as missing first, then compare again.
+To prioritize the pipeline or find the most investment-ready companies, call rank_portfolio; its scores are
+deterministic and comparable across companies, so cite them rather than re-scoring companies yourself.
+When asked what changed for a company since its last deck or data room update, call company_changes; it answers
+from stored versions, so do not re-analyze older documents.
+"""
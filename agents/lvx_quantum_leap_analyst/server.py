@@ -0,0 +1,439 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Long-running HTTP server with warm worker pools around the analyst agents"""
+
+import os
+import time
+import asyncio
+import logging
+import argparse
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from typing import Dict, List, Any, AsyncIterator, Callable, Optional
+
+import uvicorn
+from fastapi import FastAPI, HTTPException
+from google.adk.agents.run_config import RunConfig, ToolThreadPoolConfig
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+from pydantic import BaseModel
+
+from .agent import root_agent
+from .sub_agents.data_extraction_agent import (
+    analyze_company,
+    company_changes,
+    compare_companies,
+    rank_portfolio,
+    read_company_document,
+    search_portfolio,
+)
+from .sub_agents.data_extraction_agent.adaptive_limiter import limiter_metrics
+from .sub_agents.data_extraction_agent.cost_ledger import get_cost_ledger
+from .sub_agents.data_extraction_agent.cpu_stage import get_cpu_stage
+from .sub_agents.data_extraction_agent.tenants import (
+    DEFAULT_TENANT,
+    TENANT_STATE_KEY,
+    get_tenant_registry,
+)
+
+logger = logging.getLogger(__name__)
+
+APP_NAME = "lvx_quantum_leap_analyst"
+
+# Requests executed at once; each holds one thread of the request pool.
+SERVER_WORKERS = int(os.getenv("LVX_SERVER_WORKERS", "8"))
+
+# Requests allowed to wait for a worker before new ones are rejected with 503.
+SERVER_QUEUE = int(os.getenv("LVX_SERVER_QUEUE", "32"))
+
+# Seconds a shutdown waits for in-flight requests before stopping anyway.
+SERVER_DRAIN_SECONDS = float(os.getenv("LVX_SERVER_DRAIN_SECONDS", "30"))
+
+# Seconds clients are asked to wait before retrying a rejected request.
+RETRY_AFTER_SECONDS = 1
+
+
+class Overloaded(Exception):
+    """Raised when a request cannot be admitted (queue full or draining)."""
+
+
+class AdmissionGate:
+    """
+    Bounds the requests running and waiting at once.
+
+    Up to ``max_inflight`` requests run; up to ``max_queued`` more wait for
+    a slot. Anything beyond that is rejected immediately instead of piling
+    up behind slow analyses, so clients see backpressure as a fast 503
+    rather than a timeout.
+    """
+
+    def __init__(self, max_inflight: int = SERVER_WORKERS, max_queued: int = SERVER_QUEUE):
+        """
+        Initialize the gate.
+
+        Args:
+            max_inflight: Requests allowed to run at once
+            max_queued: Requests allowed to wait for a free slot
+        """
+        self.max_inflight = max(1, max_inflight)
+        self.max_queued = max(0, max_queued)
+        self.inflight = 0
+        self.queued = 0
+        self.draining = False
+        self.stats = {"admitted": 0, "rejected": 0}
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._idle: Optional[asyncio.Event] = None
+
+    def _bind(self) -> None:
+        # Created lazily so they belong to the server's event loop
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_inflight)
+            self._idle = asyncio.Event()
+            self._idle.set()
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        """Hold a request slot, waiting in the bounded queue if all are busy."""
+        self._bind()
+        if self.draining:
+            self.stats["rejected"] += 1
+            raise Overloaded("Server is draining")
+        if self._slots.locked() and self.queued >= self.max_queued:
+            self.stats["rejected"] += 1
+            raise Overloaded("Request queue is full")
+
+        self.queued += 1
+        self._idle.clear()
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+        self.inflight += 1
+        self.stats["admitted"] += 1
+        try:
+            yield
+        finally:
+            self.inflight -= 1
+            self._slots.release()
+            if not self.inflight and not self.queued:
+                self._idle.set()
+
+    async def drain(self, timeout: float = SERVER_DRAIN_SECONDS) -> bool:
+        """
+        Stop admitting requests and wait for the admitted ones to finish.
+
+        Args:
+            timeout: Maximum seconds to wait
+
+        Returns:
+            True if every request finished within the timeout
+        """
+        self._bind()
+        self.draining = True
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def describe(self) -> Dict[str, Any]:
+        """Current load, for health checks."""
+        return {
+            "inflight": self.inflight,
+            "queued": self.queued,
+            "max_inflight": self.max_inflight,
+            "max_queued": self.max_queued,
+            "draining": self.draining,
+            **self.stats,
+        }
+
+
+class _RequestContext:
+    """Minimal tool context so HTTP requests reuse the agent's tool functions."""
+
+    def __init__(self, tenant: Optional[str], session_id: Optional[str] = None):
+        self.state: Dict[str, Any] = {TENANT_STATE_KEY: tenant} if tenant else {}
+        self.session = SimpleNamespace(id=session_id)
+
+
+class AnalystServer:
+    """
+    Keeps the analyst's clients, caches and worker pools warm across requests.
+
+    Tenants, their extraction agents, search indexes and the CPU stage's
+    worker processes are created once at startup. Blocking tool calls run
+    on a fixed thread pool behind an ``AdmissionGate``; conversational
+    requests run the root agent through one ADK runner with in-memory
+    sessions, its synchronous tools on ADK's tool thread pool.
+    """
+
+    def __init__(self, workers: int = SERVER_WORKERS, max_queued: int = SERVER_QUEUE,
+                 drain_seconds: float = SERVER_DRAIN_SECONDS):
+        """
+        Initialize the server for the tenants of the process-wide registry,
+        which the tool functions resolve sessions against.
+
+        Args:
+            workers: Requests executed at once
+            max_queued: Requests allowed to wait for a worker
+            drain_seconds: Seconds a shutdown waits for in-flight requests
+        """
+        self.registry = get_tenant_registry()
+        self.gate = AdmissionGate(workers, max_queued)
+        self.drain_seconds = drain_seconds
+        self.executor = ThreadPoolExecutor(max_workers=self.gate.max_inflight, thread_name_prefix="lvx-request")
+        self.session_service = InMemorySessionService()
+        self.runner = Runner(app_name=APP_NAME, agent=root_agent, session_service=self.session_service)
+        # Tool functions block on storage and Gemini; running them on threads keeps
+        # one agent's analysis from stalling every other request on the event loop.
+        # AgentTool passes the config on to the data extraction sub-agent.
+        self.run_config = RunConfig(
+            tool_thread_pool_config=ToolThreadPoolConfig(max_workers=self.gate.max_inflight))
+        self.started_at: Optional[float] = None
+
+    def warm(self) -> Dict[str, Any]:
+        """
+        Create every tenant's agent and search index and start the CPU workers.
+
+        Returns:
+            Seconds spent warming each component
+        """
+        timings: Dict[str, float] = {}
+        start = time.perf_counter()
+        get_cpu_stage().warm()
+        timings["cpu_stage"] = time.perf_counter() - start
+
+        for name in self.registry.names():
+            start = time.perf_counter()
+            try:
+                tenant = self.registry.get(name)
+                agent = tenant.agent
+                tenant.search_index
+                if agent.analysis_prompt_cache is not None:
+                    # Builds the analysis model once instead of on the first analysis
+                    agent.analysis_prompt_cache.get_model()
+            except Exception as e:
+                logger.error(f"Failed to warm tenant {name}: {e}")
+            timings[f"tenant:{name}"] = time.perf_counter() - start
+
+        get_cost_ledger()
+        logger.info("Warmed " + ", ".join(f"{key} in {seconds:.2f}s" for key, seconds in timings.items()))
+        return {key: round(seconds, 3) for key, seconds in timings.items()}
+
+    async def start(self) -> None:
+        """Warm the pools without blocking the event loop."""
+        await asyncio.get_running_loop().run_in_executor(self.executor, self.warm)
+        self.started_at = time.time()
+
+    async def stop(self) -> None:
+        """Drain in-flight requests, flush the usage ledger and stop the pools."""
+        if not await self.gate.drain(self.drain_seconds):
+            logger.warning(f"Stopping with {self.gate.inflight} requests still running after "
+                           f"{self.drain_seconds:.0f}s")
+        try:
+            get_cost_ledger().flush()
+        except Exception as e:
+            logger.error(f"Failed to flush usage ledger: {e}")
+        self.executor.shutdown(wait=False)
+        get_cpu_stage().shutdown()
+
+    async def call(self, tool: Callable[..., Dict[str, Any]], tenant: Optional[str] = None,
+                   session_id: Optional[str] = None, **kwargs: Any) -> Dict[str, Any]:
+        """
+        Run a tool function on the request pool once admitted.
+
+        Args:
+            tool: One of the agent's tool functions
+            tenant: Tenant name (the default tenant if omitted)
+            session_id: Session the usage is attributed to
+            **kwargs: Tool arguments
+
+        Returns:
+            The tool's result
+        """
+        context = _RequestContext(tenant, session_id)
+        async with self.gate.admit():
+            return await asyncio.get_running_loop().run_in_executor(
+                self.executor, functools.partial(tool, tool_context=context, **kwargs))
+
+    async def run_agent(self, message: str, user_id: str, session_id: Optional[str] = None,
+                        tenant: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Send a message to the root agent and collect its final reply.
+
+        Args:
+            message: User message
+            user_id: User the session belongs to
+            session_id: Existing session to continue (a new one if omitted)
+            tenant: Tenant for a new session
+
+        Returns:
+            Session id, final reply text and the tools the agent called
+        """
+        async with self.gate.admit():
+            session = None
+            if session_id:
+                session = await self.session_service.get_session(
+                    app_name=APP_NAME, user_id=user_id, session_id=session_id)
+            if session is None:
+                session = await self.session_service.create_session(
+                    app_name=APP_NAME, user_id=user_id, session_id=session_id,
+                    state={TENANT_STATE_KEY: tenant} if tenant else None)
+
+            reply: List[str] = []
+            tool_calls: List[str] = []
+            content = types.Content(role="user", parts=[types.Part(text=message)])
+            async for event in self.runner.run_async(user_id=user_id, session_id=session.id, new_message=content,
+                                                     run_config=self.run_config):
+                tool_calls += [call.name for call in event.get_function_calls()]
+                if event.is_final_response() and event.content and event.content.parts:
+                    reply += [part.text for part in event.content.parts if part.text]
+            return {"session_id": session.id, "reply": "\n".join(reply), "tool_calls": tool_calls}
+
+    def describe(self) -> Dict[str, Any]:
+        """Server status for the health endpoint."""
+        return {
+            "status": "draining" if self.gate.draining else ("ok" if self.started_at else "starting"),
+            "uptime_seconds": round(time.time() - self.started_at, 1) if self.started_at else 0,
+            "tenants": self.registry.names(),
+            "cpu_workers": get_cpu_stage().workers,
+            **self.gate.describe(),
+            "concurrency_limits": limiter_metrics(),
+        }
+
+
+class AnalyzeRequest(BaseModel):
+    company_name: str
+    tenant: Optional[str] = None
+    session_id: Optional[str] = None
+
+
+class CompareRequest(BaseModel):
+    company_names: List[str]
+    tenant: Optional[str] = None
+
+
+class RunRequest(BaseModel):
+    message: str
+    user_id: str = "api"
+    session_id: Optional[str] = None
+    tenant: Optional[str] = None
+
+
+def create_app(server: Optional[AnalystServer] = None) -> FastAPI:
+    """
+    Build the HTTP application.
+
+    Args:
+        server: Server holding the warm pools (a new one if omitted)
+
+    Returns:
+        FastAPI application that warms the pools on startup and drains on shutdown
+    """
+    server = server or AnalystServer()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        await server.start()
+        yield
+        await server.stop()
+
+    app = FastAPI(title="LVX Quantum Leap AI Analyst", lifespan=lifespan)
+    app.state.server = server
+
+    def check_tenant(tenant: Optional[str]) -> None:
+        try:
+            server.registry.get(tenant)
+        except KeyError as e:
+            raise HTTPException(404, str(e))
+
+    async def admitted(tool: Callable[..., Dict[str, Any]], tenant: Optional[str], **kwargs: Any) -> Dict[str, Any]:
+        check_tenant(tenant)
+        try:
+            return await server.call(tool, tenant, **kwargs)
+        except Overloaded as e:
+            raise HTTPException(503, str(e), headers={"Retry-After": str(RETRY_AFTER_SECONDS)})
+
+    @app.get("/healthz")
+    async def healthz() -> Dict[str, Any]:
+        return server.describe()
+
+    @app.post("/analyze")
+    async def analyze(request: AnalyzeRequest) -> Dict[str, Any]:
+        return await admitted(analyze_company, request.tenant, session_id=request.session_id,
+                              company_name=request.company_name)
+
+    @app.post("/compare")
+    async def compare(request: CompareRequest) -> Dict[str, Any]:
+        return await admitted(compare_companies, request.tenant, company_names=request.company_names)
+
+    @app.get("/rank")
+    async def rank(limit: int = 20, tenant: Optional[str] = None) -> Dict[str, Any]:
+        return await admitted(rank_portfolio, tenant, limit=limit)
+
+    @app.get("/changes/{company_name}")
+    async def changes(company_name: str, since_version: int = 0, tenant: Optional[str] = None) -> Dict[str, Any]:
+        return await admitted(company_changes, tenant, company_name=company_name, since_version=since_version)
+
+    @app.get("/search")
+    async def search(q: str, limit: int = 10, tenant: Optional[str] = None) -> Dict[str, Any]:
+        return await admitted(search_portfolio, tenant, query=q, limit=limit)
+
+    @app.get("/documents/{company_name}")
+    async def document(company_name: str, document: str = "pitch_deck", start: int = 0,
+                       length: int = 4000, tenant: Optional[str] = None) -> Dict[str, Any]:
+        return await admitted(read_company_document, tenant, company_name=company_name,
+                              document=document, start=start, length=length)
+
+    @app.post("/run")
+    async def run(request: RunRequest) -> Dict[str, Any]:
+        check_tenant(request.tenant)
+        try:
+            return await server.run_agent(request.message, request.user_id, request.session_id, request.tenant)
+        except Overloaded as e:
+            raise HTTPException(503, str(e), headers={"Retry-After": str(RETRY_AFTER_SECONDS)})
+
+    return app
+
+
+def main() -> None:
+    """Serve the analyst over HTTP until interrupted."""
+    parser = argparse.ArgumentParser(description="Serve the analyst agents over HTTP with warm worker pools.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on.")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on.")
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS, help="Requests executed at once.")
+    parser.add_argument("--queue", type=int, default=SERVER_QUEUE, help="Requests allowed to wait for a worker.")
+    parser.add_argument("--drain-seconds", type=float, default=SERVER_DRAIN_SECONDS,
+                        help="Seconds to wait for in-flight requests on shutdown.")
+    parser.add_argument("--storage", help="Serve the default tenant from this storage URI "
+                                          "(a local mirror or memory://) instead of the data bucket.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.storage:
+        get_tenant_registry().register(DEFAULT_TENANT, storage_uri=args.storage)
+
+    server = AnalystServer(args.workers, args.queue, args.drain_seconds)
+    # uvicorn stops accepting connections on SIGTERM and waits for open ones
+    # before the lifespan shutdown drains the gate and stops the pools.
+    uvicorn.run(create_app(server), host=args.host, port=args.port,
+                timeout_graceful_shutdown=int(args.drain_seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Streaming deal-note generation with partial results"""
+
+import re
+import json
+import asyncio
+import logging
+from contextlib import ExitStack
+from typing import AsyncGenerator, Dict, Iterator, List, Any, Optional
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from .sub_agents.data_extraction_agent import get_tenant_registry
+from .sub_agents.data_extraction_agent.cost_ledger import SESSION_STATE_KEY, usage_scope
+from .sub_agents.data_extraction_agent.tenants import TENANT_STATE_KEY
+from .sub_agents.data_extraction_agent import streaming
+
+logger = logging.getLogger(__name__)
+
+COMPANY_DATA_PREFIX = "Company Data/"
+
+
+def resolve_company_name(request: str, companies: List[str], explicit: bool = False) -> Dict[str, Any]:
+    """
+    Match a requested company against the company folders in the data bucket.
+
+    Args:
+        request: Company name from session state, or the user's message
+        companies: Company folder names
+        explicit: ``request`` is a company name rather than free text
+
+    Returns:
+        Dict with the matching folder's ``company_name``, or an ``error``
+    """
+    by_name = {company.lower(): company for company in companies}
+    if explicit:
+        match = by_name.get(request.strip().lower())
+        if match:
+            return {"company_name": match}
+        return {"error": f"No company named '{request}' in the data bucket"}
+
+    matches = [company for company in companies
+               if re.search(rf"(?<!\w){re.escape(company.lower())}(?!\w)", request.lower())]
+    # "Acme Robotics" also contains "Acme"; keep the longest names only
+    matches = [company for company in matches
+               if not any(other != company and company.lower() in other.lower() for other in matches)]
+    if len(matches) == 1:
+        return {"company_name": matches[0]}
+    if matches:
+        return {"error": f"Request names several companies ({', '.join(sorted(matches))}); name one"}
+    return {"error": "No company in the data bucket is named in the request"}
+
+
+class StreamingDealNoteAgent(BaseAgent):
+    """
+    Deal-note agent that streams structured progress while it works.
+
+    The agent drives ``DataExtractionAgent.iter_company_data`` directly and
+    emits a partial event per stage (documents fetched, each entity,
+    relationship, insight and risk as the model produces it), then hands
+    the finished analysis to ``deal_note_writer`` for the final
+    recommendation. Run it with ``StreamingMode.SSE`` to also stream the
+    writer's text.
+    """
+
+    deal_note_writer: LlmAgent
+
+    def __init__(self, name: str, deal_note_writer: LlmAgent, **kwargs: Any):
+        super().__init__(
+            name=name,
+            deal_note_writer=deal_note_writer,
+            sub_agents=[deal_note_writer],
+            **kwargs,
+        )
+
+    def _company_name(self, ctx: InvocationContext, extractor: Any) -> Dict[str, Any]:
+        """Resolve the company from session state or the user's message against the bucket's folders."""
+        company_name = ctx.session.state.get("company_name")
+        request = company_name
+        if not request and ctx.user_content and ctx.user_content.parts:
+            request = " ".join(part.text for part in ctx.user_content.parts if part.text).strip()
+        if not request:
+            return {"error": "No company name provided"}
+
+        try:
+            # Folder names only; a delimiter listing does not touch the documents
+            companies = extractor.storage.list_folders(COMPANY_DATA_PREFIX)
+        except Exception as e:
+            logger.error(f"Error listing companies: {e}")
+            return {"error": f"Failed to list companies: {str(e)}"}
+        return resolve_company_name(request, companies, explicit=bool(company_name))
+
+    @staticmethod
+    def _next_event(progress: Iterator[Dict[str, Any]], session: Optional[str],
+                    tenant: str) -> Optional[Dict[str, Any]]:
+        """Advance the extractor with its model calls billed to the session and tenant."""
+        with usage_scope(session=session, tenant=tenant):
+            return next(progress, None)
+
+    def _event(self, ctx: InvocationContext, payload: Dict[str, Any], partial: bool = True,
+               state_delta: Dict[str, Any] = None) -> Event:
+        return Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            branch=ctx.branch,
+            partial=partial,
+            content=types.Content(role="model", parts=[types.Part(text=json.dumps(payload, default=str))]),
+            actions=EventActions(state_delta=state_delta or {}),
+        )
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        tenant = get_tenant_registry().get(ctx.session.state.get(TENANT_STATE_KEY))
+        extractor = tenant.agent
+        resolved = await asyncio.to_thread(self._company_name, ctx, extractor)
+        if "error" in resolved:
+            yield self._event(ctx, {"stage": streaming.STAGE_ERROR, "error": resolved["error"]}, partial=False)
+            return
+        company_name = resolved["company_name"]
+
+        session = ctx.session.state.get(SESSION_STATE_KEY) or ctx.session.id
+        result = None
+        with ExitStack() as held:
+            # Counts against the tenant's concurrent analyses like analyze_company;
+            # waiting for a slot blocks, so it happens off the event loop
+            await asyncio.to_thread(held.enter_context, tenant.slot())
+
+            # The extractor is synchronous; advance it off the event loop so each
+            # stage is forwarded as soon as it is produced.
+            progress = extractor.iter_company_data(company_name)
+            held.callback(progress.close)
+            while True:
+                event = await asyncio.to_thread(self._next_event, progress, session, tenant.name)
+                if event is None:
+                    break
+                if event["stage"] in (streaming.STAGE_COMPLETED, streaming.STAGE_ERROR):
+                    result = event["result"]
+                    break
+                yield self._event(ctx, event)
+
+        if not result or "error" in result:
+            error = (result or {}).get("error", "Extraction produced no result")
+            yield self._event(ctx, {"stage": streaming.STAGE_ERROR, "error": error}, partial=False)
+            return
+
+        analysis = result.get("entity_analysis") or {}
+        yield self._event(
+            ctx,
+            {"stage": streaming.STAGE_ANALYSIS_COMPLETED, "analysis_method": analysis.get("analysis_method")},
+            partial=False,
+            state_delta={
+                "company_name": company_name,
+                "data_extraction_output": json.dumps(extractor.compact_result(result), default=str),
+            },
+        )
+
+        async for event in self.deal_note_writer.run_async(ctx):
+            yield event
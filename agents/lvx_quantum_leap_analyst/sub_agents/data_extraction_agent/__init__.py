@@ -14,6 +14,40 @@
 
 """Data Extraction Agent for LVX Quantum Leap AI Analyst"""
 
-from .agent import DataExtractionAgent
+from .agent import (
+    DataExtractionAgent,
+    analyze_company,
+    company_changes,
+    compare_companies,
+    get_default_agent,
+    rank_portfolio,
+    read_company_document,
+    record_session_id,
+    search_portfolio,
+)
+from .analysis_history import AnalysisHistory
+from .company_records import CompanyRecordSink, company_record
+from .search_index import PortfolioSearchIndex
+from .result_store import ResultStore
+from .scoring import ReadinessScorer
+from .tenants import TenantRegistry, get_tenant_registry
 
-__all__ = ["DataExtractionAgent"]
\ No newline at end of file
+__all__ = [
+    "AnalysisHistory",
+    "CompanyRecordSink",
+    "DataExtractionAgent",
+    "PortfolioSearchIndex",
+    "ReadinessScorer",
+    "ResultStore",
+    "TenantRegistry",
+    "analyze_company",
+    "company_changes",
+    "company_record",
+    "compare_companies",
+    "get_default_agent",
+    "get_tenant_registry",
+    "rank_portfolio",
+    "read_company_document",
+    "record_session_id",
+    "search_portfolio",
+]
\ No newline at end of file
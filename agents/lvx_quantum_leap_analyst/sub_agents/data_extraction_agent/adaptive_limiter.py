@@ -0,0 +1,338 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Adaptive (AIMD) concurrency limits for GCS and Gemini calls"""
+
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Any, Optional, Tuple
+
+from google.api_core import exceptions as api_exceptions
+
+logger = logging.getLogger(__name__)
+
+GCS = "gcs"
+GEMINI = "gemini"
+
+# Per backend: (initial limit, maximum limit, latency tolerance). A limit
+# shrinks when smoothed latency exceeds tolerance x the no-load baseline.
+DEFAULT_LIMITS = {
+    GCS: (16, 128, 3.0),
+    GEMINI: (4, 32, 2.0),
+}
+
+# Overrides as ``backend=initial:max[:tolerance],...``, e.g. "gemini=8:64".
+CONCURRENCY_LIMITS = os.getenv("LVX_CONCURRENCY_LIMITS", "")
+
+# Times an overloaded Gemini call is retried (at the reduced limit) before
+# the analysis falls back to rule-based extraction.
+OVERLOAD_RETRIES = int(os.getenv("LVX_OVERLOAD_RETRIES", "2"))
+OVERLOAD_RETRY_SECONDS = 1.0
+
+# Factor the limit is multiplied by on overload.
+BACKOFF = 0.7
+
+# Weight of the newest sample in the smoothed latency.
+LATENCY_SMOOTHING = 0.2
+
+# Fraction of the gap a slower sample moves the baseline up, so the baseline
+# follows lasting changes (e.g. longer prompts) without tracking load.
+BASELINE_DRIFT = 0.01
+
+OK = "ok"
+OVERLOAD = "overload"
+ERROR = "error"
+
+_OVERLOAD_ERRORS = (
+    api_exceptions.TooManyRequests,
+    api_exceptions.ResourceExhausted,
+    api_exceptions.ServiceUnavailable,
+    api_exceptions.DeadlineExceeded,
+    TimeoutError,
+)
+
+
+def is_overload(error: BaseException) -> bool:
+    """Return whether an error means the backend is saturated (429, 503 or a timeout)."""
+    if isinstance(error, _OVERLOAD_ERRORS):
+        return True
+    return getattr(error, "code", None) in (429, 503)
+
+
+def parse_limits(spec: str) -> Dict[str, Tuple[int, int, float]]:
+    """
+    Parse a ``backend=initial:max[:tolerance],...`` override of ``DEFAULT_LIMITS``.
+
+    Args:
+        spec: Comma-separated overrides
+
+    Returns:
+        Complete limit table with overrides applied
+    """
+    limits = dict(DEFAULT_LIMITS)
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, values = item.partition("=")
+        numbers = values.split(":")
+        if len(numbers) not in (2, 3):
+            raise ValueError(f"Expected initial:max[:tolerance] limits for {name}")
+        tolerance = float(numbers[2]) if len(numbers) == 3 else limits.get(name.strip(), (0, 0, 2.0))[2]
+        limits[name.strip()] = (int(numbers[0]), int(numbers[1]), tolerance)
+    return limits
+
+
+class SlotCall:
+    """One call holding a limiter slot; ``units`` scales its latency (e.g. MB transferred)."""
+
+    __slots__ = ("units",)
+
+    def __init__(self):
+        self.units = 1.0
+
+
+class AdaptiveLimiter:
+    """
+    Limits the calls in flight to one backend and tunes the limit from outcomes.
+
+    Additive increase, multiplicative decrease: while calls succeed with
+    latency near the no-load baseline and the limit is actually used, it
+    grows by one per limit's worth of calls (about one per round trip).
+    Overload errors (429, 503, timeouts) and latency inflated past
+    ``latency_tolerance`` x baseline cut it by ``backoff``, at most once per
+    latency window so one burst of failures counts once.
+    """
+
+    def __init__(self, name: str, initial: int = 4, max_limit: int = 32, latency_tolerance: float = 2.0,
+                 min_limit: int = 1, backoff: float = BACKOFF):
+        """
+        Initialize the limiter.
+
+        Args:
+            name: Backend name, used in metrics
+            initial: Starting limit
+            max_limit: Largest limit the controller may reach
+            latency_tolerance: Smoothed latency over baseline ratio treated as overload
+            min_limit: Smallest limit the controller may reach
+            backoff: Factor applied to the limit on overload
+        """
+        self.name = name
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.latency_tolerance = latency_tolerance
+        self.backoff = backoff
+        self._limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self.inflight = 0
+        self.waiting = 0
+        self.baseline: Optional[float] = None
+        self.latency: Optional[float] = None
+        self.stats = {"calls": 0, "overloads": 0, "errors": 0, "increases": 0, "decreases": 0}
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """Current number of calls allowed in flight."""
+        return int(self._limit)
+
+    def acquire(self) -> float:
+        """Wait for a free slot; returns the start time to pass to ``release``."""
+        with self._cond:
+            self.waiting += 1
+            while self.inflight >= int(self._limit):
+                self._cond.wait()
+            self.waiting -= 1
+            self.inflight += 1
+        return time.perf_counter()
+
+    def release(self, started: float, outcome: str = OK, latency: Optional[float] = None) -> None:
+        """
+        Free a slot and adjust the limit from the call's outcome.
+
+        Args:
+            started: Value returned by ``acquire``
+            outcome: ``OK``, ``OVERLOAD`` or ``ERROR`` (errors unrelated to load)
+            latency: Latency to learn from; defaults to the time since ``started``
+        """
+        now = time.perf_counter()
+        latency = now - started if latency is None else latency
+        with self._cond:
+            used = self.inflight >= self._limit / 2
+            self.inflight -= 1
+            self.stats["calls"] += 1
+            if outcome == OK:
+                self._observe(latency, used, now)
+            elif outcome == OVERLOAD:
+                self.stats["overloads"] += 1
+                self._decrease(now)
+            else:
+                self.stats["errors"] += 1
+            self._cond.notify_all()
+
+    def _observe(self, latency: float, used: bool, now: float) -> None:
+        if self.baseline is None or latency < self.baseline:
+            self.baseline = latency
+        else:
+            self.baseline += BASELINE_DRIFT * (latency - self.baseline)
+        self.latency = latency if self.latency is None else (
+            LATENCY_SMOOTHING * latency + (1 - LATENCY_SMOOTHING) * self.latency)
+
+        if not used:
+            # Latency at low concurrency says nothing about the limit
+            return
+        if self.latency > self.baseline * self.latency_tolerance:
+            self._decrease(now)
+        elif self._limit < self.max_limit:
+            previous = self.limit
+            self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+            if self.limit > previous:
+                self.stats["increases"] += 1
+
+    def _decrease(self, now: float) -> None:
+        if now - self._last_decrease < (self.latency or OVERLOAD_RETRY_SECONDS):
+            return
+        previous = self.limit
+        self._limit = max(self.min_limit, self._limit * self.backoff)
+        self._last_decrease = now
+        self.stats["decreases"] += 1
+        logger.info(f"Concurrency limit for {self.name} lowered from {previous} to {self.limit}")
+
+    @contextmanager
+    def slot(self) -> Iterator[SlotCall]:
+        """
+        Hold a slot for the duration of one call, classifying any error it raises.
+
+        Callers whose latency grows with the work done set ``units`` on the
+        yielded call, so the limiter learns from latency per unit.
+        """
+        started = self.acquire()
+        call = SlotCall()
+        try:
+            yield call
+        except Exception as e:
+            self.release(started, OVERLOAD if is_overload(e) else ERROR)
+            raise
+        self.release(started, OK, (time.perf_counter() - started) / max(1.0, call.units))
+
+    def wrap(self, model: Any, retries: int = OVERLOAD_RETRIES) -> "LimitedModel":
+        """Wrap a model so each of its calls holds a slot of this limiter."""
+        return LimitedModel(model, self, retries)
+
+    def describe(self) -> Dict[str, Any]:
+        """Current limit, load and latency, for metrics."""
+        return {
+            "limit": self.limit,
+            "inflight": self.inflight,
+            "waiting": self.waiting,
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "baseline_latency_s": round(self.baseline, 4) if self.baseline is not None else None,
+            "latency_s": round(self.latency, 4) if self.latency is not None else None,
+            **self.stats,
+        }
+
+
+class LimitedModel:
+    """
+    ``GenerativeModel`` wrapper that runs each ``generate_content`` call
+    under an ``AdaptiveLimiter``.
+
+    Streamed calls hold their slot until the stream ends, but report the
+    time to the first chunk, which reflects queueing at the backend rather
+    than the response length. Overloaded calls are retried before any
+    output is returned.
+    """
+
+    def __init__(self, model: Any, limiter: AdaptiveLimiter, retries: int = OVERLOAD_RETRIES):
+        """
+        Initialize the wrapper.
+
+        Args:
+            model: Model (or metered or replay stand-in) to call
+            limiter: Limiter the calls are counted against
+            retries: Times an overloaded call is retried
+        """
+        self.model = model
+        self.limiter = limiter
+        self.retries = max(0, retries)
+
+    def _retry_or_raise(self, error: Exception, attempt: int) -> None:
+        if not is_overload(error) or attempt >= self.retries:
+            raise error
+        delay = OVERLOAD_RETRY_SECONDS * 2 ** attempt
+        logger.warning(f"{self.limiter.name} overloaded ({error}); retrying in {delay:.1f}s "
+                       f"at limit {self.limiter.limit}")
+        time.sleep(delay)
+
+    def generate_content(self, contents: Any, stream: bool = False, **kwargs: Any) -> Any:
+        """Call the model once a slot is free."""
+        if stream:
+            return self._stream(contents, kwargs)
+        attempt = 0
+        while True:
+            try:
+                with self.limiter.slot():
+                    return self.model.generate_content(contents, **kwargs)
+            except Exception as e:
+                self._retry_or_raise(e, attempt)
+                attempt += 1
+
+    def _stream(self, contents: Any, kwargs: Dict[str, Any]) -> Iterator[Any]:
+        attempt = 0
+        while True:
+            started = self.limiter.acquire()
+            first_chunk: Optional[float] = None
+            outcome = ERROR
+            try:
+                for chunk in self.model.generate_content(contents, stream=True, **kwargs):
+                    if first_chunk is None:
+                        # The backend accepted the call; a reader stopping early is not an error
+                        first_chunk = time.perf_counter() - started
+                        outcome = OK
+                    yield chunk
+                outcome = OK
+                return
+            except Exception as e:
+                outcome = OVERLOAD if is_overload(e) else ERROR
+                if first_chunk is not None:
+                    raise
+                self.limiter.release(started, outcome)
+                started = None
+                self._retry_or_raise(e, attempt)
+                attempt += 1
+            finally:
+                # Also reached when the caller stops reading the stream early
+                if started is not None:
+                    self.limiter.release(started, outcome, first_chunk)
+
+
+_limiters: Dict[str, AdaptiveLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(name: str) -> AdaptiveLimiter:
+    """Return the process-wide limiter of a backend, configured by ``LVX_CONCURRENCY_LIMITS``."""
+    with _limiters_lock:
+        if name not in _limiters:
+            initial, max_limit, tolerance = parse_limits(CONCURRENCY_LIMITS).get(name, DEFAULT_LIMITS[GEMINI])
+            _limiters[name] = AdaptiveLimiter(name, initial, max_limit, tolerance)
+        return _limiters[name]
+
+
+def limiter_metrics() -> Dict[str, Dict[str, Any]]:
+    """Current state of every limiter created in this process."""
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {name: limiter.describe() for name, limiter in sorted(limiters.items())}
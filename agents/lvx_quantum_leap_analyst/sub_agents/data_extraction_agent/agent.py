@@ -17,15 +17,67 @@
 import os
 import json
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional
 from datetime import datetime
 
-from google.cloud import storage
-import vertexai
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.tools.tool_context import ToolContext
 from vertexai.generative_models import GenerativeModel
 
+from . import streaming
+from .result_store import DEFAULT_CACHE_DIR, ResultStore, company_fingerprint
+from .prompt_budget import CHARS_PER_TOKEN, DEFAULT_TOKEN_BUDGET, PromptBudgeter
+from .prompt_cache import DEFAULT_LOCATION, PromptPrefixCache, prompt_version, vertex_project
+from .prompt import ENTITY_ANALYSIS_PROMPT, COMPANY_ANALYSIS_REQUEST, FAST_ANCHORS_SECTION, SUMMARY_ANALYSIS_PROMPT
+from .routing import SUMMARY_MODEL_NAME, TIER_SUMMARY, ModelRouter
+from .cpu_stage import CpuStage, get_cpu_stage
+from .document_stream import blob_reference, digest_blob, merge_anchors
+from .fast_extractor import get_fast_extractor
+from .blob_cache import BlobCache
+from .search_index import PortfolioSearchIndex
+from .span_index import SpanIndex, count_terms
+from .storage_backend import StorageBackend, open_storage
+from .mirror import get_mirror_backend
+from .comparison import CompanyComparator
+from .scoring import ReadinessScorer
+from .tenants import TENANT_STATE_KEY, Tenant, get_tenant_registry
+from .model_replay import ModelCassette, get_model_cassette
+from .analysis_history import AnalysisHistory
+from .cost_ledger import (
+    SESSION_STATE_KEY, CostLedger, UsageScope, current_usage_scope, get_cost_ledger, usage_scope)
+from .adaptive_limiter import GEMINI, AdaptiveLimiter, get_limiter
+
 logger = logging.getLogger(__name__)
 
+MODEL_NAME = "gemini-2.0-flash-exp"
+
+# Token budget for company text in summary-tier prompts.
+SUMMARY_TOKEN_BUDGET = 4000
+
+# Read documents as chunked streams and return references instead of content.
+MEMORY_BOUNDED = os.getenv("LVX_MEMORY_BOUNDED", "0").lower() in ("1", "true", "yes")
+
+# In memory-bounded mode, characters kept per document relative to the prompt
+# budget, leaving the budgeter room to choose the most relevant passages.
+STREAM_TEXT_BUDGET_FACTOR = 2
+
+DOCUMENT_LABELS = {"pitch_deck": "PITCH DECK", "founder_checklist": "FOUNDER CHECKLIST"}
+
+# Longest evidence excerpt kept per relationship in compact results.
+EVIDENCE_EXCERPT_CHARS = 240
+
+# Default page size for lazily fetched document text.
+DOCUMENT_PAGE_CHARS = 4000
+
+# Session state key listing the companies (and fingerprints) analyze_company
+# served during the current sub-agent run.
+ANALYZED_COMPANIES_STATE_KEY = "lvx_analyzed_companies"
+
+# Analysis methods that completed with a model. When a model is configured,
+# results made any other way (a 429, an unparsable response) are not
+# persisted, so the next request retries them.
+MODEL_ANALYSIS_METHODS = ("gemini_ai", "gemini_summary")
+
 class DataExtractionAgent:
     """
     Advanced Data Extraction Agent that extracts company data from GCS
@@ -33,84 +85,441 @@ class DataExtractionAgent:
     using Gemini AI.
     """
 
-    def __init__(self, bucket_name: str = "lxvquantumleapai", project_id: Optional[str] = None):
+    def __init__(self, bucket_name: str = "lxvquantumleapai", project_id: Optional[str] = None,
+                 location: Optional[str] = None,
+                 result_store: Optional[ResultStore] = None,
+                 prompt_token_budget: int = DEFAULT_TOKEN_BUDGET,
+                 use_fast_anchors: bool = True,
+                 enable_routing: bool = True,
+                 cpu_stage: Optional[CpuStage] = None,
+                 memory_bounded: bool = MEMORY_BOUNDED,
+                 blob_cache: Optional[BlobCache] = None,
+                 span_index: Optional[SpanIndex] = None,
+                 search_index: Optional[PortfolioSearchIndex] = None,
+                 storage: Optional[StorageBackend] = None,
+                 model_cassette: Optional[ModelCassette] = None,
+                 history: Optional[AnalysisHistory] = None,
+                 cost_ledger: Optional[CostLedger] = None,
+                 gemini_limiter: Optional[AdaptiveLimiter] = None,
+                 cache_dir: str = DEFAULT_CACHE_DIR):
         """
         Initialize the Data Extraction Agent.
 
         Args:
             bucket_name: Google Cloud Storage bucket name
             project_id: Google Cloud project ID for Vertex AI
+            location: Vertex AI location; defaults to GOOGLE_CLOUD_LOCATION or us-central1
+            result_store: Optional store of precomputed results; when set,
+                analyses are served from it while the company folder is unchanged
+            prompt_token_budget: Token budget for company text in the analysis prompt
+            use_fast_anchors: Run the rule-based extractor before Gemini and pass
+                its matches as anchors in the prompt
+            enable_routing: Send incomplete, low-signal companies to a short
+                summary on a cheaper model instead of the full analysis
+            cpu_stage: Stage for CPU-heavy post-processing; defaults to the
+                shared stage configured by LVX_CPU_WORKERS
+            memory_bounded: Iterate blobs lazily, read documents in chunks and
+                return object references instead of document content
+            blob_cache: Local cache used to fetch full document text on demand
+            span_index: Inverted index used to resolve evidence to source offsets
+            search_index: Portfolio search index refreshed for each stored analysis
+            storage: Backend holding the company documents; defaults to the
+                GCS bucket, or the location set by LVX_STORAGE_URI
+            model_cassette: Cassette recording or replaying Gemini calls;
+                defaults to the one set by LVX_MODEL_CASSETTE
+            history: Versioned store receiving every new analysis, so changes
+                between document versions can be queried later
+            cost_ledger: Ledger recording tokens, latency and cost of every
+                Gemini call; defaults to the one set by LVX_USAGE_DB
+            gemini_limiter: Adaptive limit on concurrent Gemini calls; defaults
+                to the process-wide limiter shared by every agent
+            cache_dir: Root of the local caches (blob cache, span index and
+                search index unless given)
         """
         # Use environment variable if available, otherwise use provided bucket name
         self.bucket_name = os.getenv("GOOGLE_CLOUD_STORAGE_BUCKET_DATA", bucket_name)
         self.project_id = project_id or os.getenv("GOOGLE_CLOUD_PROJECT")
+        self.location = location or DEFAULT_LOCATION
 
-        # Initialize GCS client
-        self.storage_client = storage.Client()
-        self.bucket = self.storage_client.bucket(bucket_name)
+        # Initialize document storage
+        self.storage = storage or open_storage(bucket_name=self.bucket_name)
 
         # Initialize Vertex AI
         if self.project_id:
-            vertexai.init(project=self.project_id, location="us-central1")
-            self.model = GenerativeModel("gemini-2.0-flash-exp")
+            # Models keep this project and location even if another tenant re-initializes Vertex AI
+            with vertex_project(self.project_id, self.location):
+                self.model = GenerativeModel(MODEL_NAME)
+                self.summary_model = GenerativeModel(SUMMARY_MODEL_NAME)
+            # Static analysis instructions live in the model; the prompt carries only company text
+            self.analysis_prompt_cache = PromptPrefixCache(MODEL_NAME, ENTITY_ANALYSIS_PROMPT,
+                                                           project=self.project_id, location=self.location)
         else:
             logger.warning("No Google Cloud project ID provided. AI features will be limited.")
             self.model = None
-
-    def extract_company_data(self, company_name: str) -> Dict[str, Any]:
+            self.analysis_prompt_cache = None
+            self.summary_model = None
+
+        # Record Gemini calls to, or replay them from, a local cassette;
+        # replaying needs no project since no model is called
+        self.model_cassette = model_cassette or get_model_cassette()
+        if self.model_cassette is not None and (self.model is not None or self.model_cassette.replaying):
+            analysis_label = f"{MODEL_NAME}:{prompt_version(MODEL_NAME, ENTITY_ANALYSIS_PROMPT)}"
+            self.model = self.model_cassette.wrap(self.model, MODEL_NAME)
+            self.analysis_prompt_cache = self.model_cassette.wrap_prompt_cache(
+                self.analysis_prompt_cache, analysis_label)
+            self.summary_model = self.model_cassette.wrap(self.summary_model, SUMMARY_MODEL_NAME)
+
+        self.result_store = result_store
+        self.history = history
+        self.prompt_budgeter = PromptBudgeter(max_tokens=prompt_token_budget)
+        self.use_fast_anchors = use_fast_anchors
+        self.router = ModelRouter() if enable_routing else None
+        self.cost_ledger = cost_ledger or get_cost_ledger()
+        self.gemini_limiter = gemini_limiter or get_limiter(GEMINI)
+        if self.router and self.router.triage_model is not None:
+            self.router.triage_model = self.gemini_limiter.wrap(
+                self.cost_ledger.meter(self.router.triage_model, SUMMARY_MODEL_NAME, "triage"))
+        self.cpu_stage = cpu_stage or get_cpu_stage()
+        self.memory_bounded = memory_bounded
+        self.blob_cache = blob_cache or BlobCache(self.storage, cache_dir, mirror=get_mirror_backend())
+        self.span_index = span_index or SpanIndex(cache_dir)
+        self.search_index = search_index or PortfolioSearchIndex(cache_dir)
+
+    def extract_company_data(self, company_name: str, force_refresh: bool = False) -> Dict[str, Any]:
         """
         Extract and analyze company data from GCS bucket.
 
         Args:
             company_name: Name of the company to analyze
+            force_refresh: Recompute even if the result store has a current result
 
         Returns:
             Dict containing extracted data, entities, and relationships
         """
+        result = None
+        for event in self.iter_company_data(company_name, force_refresh=force_refresh):
+            if event["stage"] in (streaming.STAGE_COMPLETED, streaming.STAGE_ERROR):
+                result = event["result"]
+        return result
+
+    def iter_company_data(self, company_name: str, force_refresh: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Extract and analyze company data, yielding progress as it is produced.
+
+        Events carry a ``stage`` key: ``started``, ``documents_fetched``, then ``entity``,
+        ``relationship``, ``insight`` and ``risk`` items as the model streams
+        them, ``entities_extracted`` once the entity list is complete, and
+        finally ``completed`` (or ``error``) with the full result.
+
+        Args:
+            company_name: Name of the company to analyze
+            force_refresh: Recompute even if the result store has a current result
+
+        Yields:
+            Progress event dicts
+        """
         try:
             logger.info(f"Starting data extraction for company: {company_name}")
+            yield {"stage": streaming.STAGE_STARTED, "company_name": company_name}
+
+            if self.memory_bounded:
+                fingerprint, documents, blobs = self._scan_company_blobs(company_name)
+            else:
+                blobs = self._list_company_blobs(company_name)
+                fingerprint = company_fingerprint(blobs)
+
+            if self.result_store and not force_refresh:
+                cached = self.result_store.get(company_name, fingerprint)
+                if cached is not None and not self._is_degraded(cached):
+                    logger.info(f"Serving stored analysis for {company_name}")
+                    yield {"stage": streaming.STAGE_COMPLETED, "cached": True, "result": cached}
+                    return
 
             # Step 1: Extract raw data from GCS
-            raw_data = self._extract_raw_data_from_gcs(company_name)
+            text_content, anchors, segments = None, None, None
+            if self.memory_bounded:
+                raw_data, digests = self._stream_raw_data_from_gcs(documents, len(blobs))
+                document_texts = {kind: digest.text for kind, digest in digests.items()}
+                segments = {kind: digest.segments for kind, digest in digests.items()}
+                anchors = merge_anchors(*(digest.anchors for digest in digests.values()))
+                term_counts = {raw_data[kind]["filename"]: digest.terms.counts for kind, digest in digests.items()}
+                text_content = self._join_document_texts(document_texts)
+            else:
+                raw_data = self._extract_raw_data_from_gcs(company_name, blobs)
+                document_texts = {
+                    kind: raw_data[kind]["content"] for kind in DOCUMENT_LABELS if raw_data.get(kind)
+                }
+                term_counts = {
+                    raw_data[kind]["filename"]: count_terms([text]) for kind, text in document_texts.items()
+                }
             if "error" in raw_data:
-                return raw_data
+                yield {"stage": streaming.STAGE_ERROR, "result": raw_data}
+                return
+
+            yield {
+                "stage": streaming.STAGE_DOCUMENTS_FETCHED,
+                "documents": [
+                    raw_data[key]["filename"] for key in ("pitch_deck", "founder_checklist") if raw_data.get(key)
+                ],
+                "data_quality": raw_data["data_quality"],
+            }
 
             # Step 2: Perform advanced entity extraction and relationship inference
-            analysis_result = self._perform_entity_relationship_analysis(raw_data, company_name)
-
-            # Step 3: Structure the final output
+            analysis_result = None
+            usage = UsageScope(company=company_name, parent=current_usage_scope())
+            for event in self._iter_entity_relationship_analysis(raw_data, company_name, text_content, anchors,
+                                                                 usage):
+                if event["stage"] == streaming.STAGE_ANALYSIS_COMPLETED:
+                    analysis_result = event["analysis"]
+                else:
+                    yield event
+
+            # Step 3: Index the documents and link evidence to source offsets
+            self._link_evidence_spans(company_name, raw_data, document_texts, analysis_result, segments)
+
+            # Step 4: Attach rule-based metrics (model analyses carry none) so
+            # companies can be compared without another model call
+            if analysis_result is not None and "metrics" not in analysis_result:
+                analysis_result["metrics"] = self.cpu_stage.run(
+                    "extract_metrics", self._join_document_texts(document_texts), company_name)
+
+            # Step 5: Structure the final output
             result = {
                 "company_name": company_name,
                 "extraction_timestamp": datetime.utcnow().isoformat(),
                 "raw_data": raw_data,
                 "entity_analysis": analysis_result,
-                "processing_status": "completed"
+                "processing_status": "completed",
+                "source_fingerprint": fingerprint,
+                "usage": usage.summary()
             }
 
+            if self._is_degraded(result):
+                # Persisting would serve a transient model failure until the folder changes
+                logger.warning(f"Analysis of {company_name} fell back to "
+                               f"{(analysis_result or {}).get('analysis_method')}; not storing it")
+            else:
+                if self.result_store:
+                    self.result_store.put(company_name, fingerprint, result)
+                if self.history:
+                    try:
+                        self.history.record(company_name, fingerprint, result)
+                    except Exception as e:
+                        logger.error(f"Error recording analysis history for {company_name}: {e}")
+                try:
+                    # Reuses the listing and the text already read; only other files are read again
+                    self.search_index.update_company(self.storage, company_name, blobs, term_counts)
+                except Exception as e:
+                    logger.error(f"Error updating the search index for {company_name}: {e}")
+
             logger.info(f"Data extraction completed for {company_name}")
-            return result
+            yield {"stage": streaming.STAGE_COMPLETED, "cached": False, "result": result}
 
         except Exception as e:
             logger.error(f"Error extracting data for {company_name}: {e}")
-            return {
-                "error": f"Failed to extract company data: {str(e)}",
-                "company_name": company_name,
-                "extraction_timestamp": datetime.utcnow().isoformat()
+            yield {
+                "stage": streaming.STAGE_ERROR,
+                "result": {
+                    "error": f"Failed to extract company data: {str(e)}",
+                    "company_name": company_name,
+                    "extraction_timestamp": datetime.utcnow().isoformat()
+                },
             }
 
-    def _extract_raw_data_from_gcs(self, company_name: str) -> Dict[str, Any]:
+    def _is_degraded(self, result: Dict[str, Any]) -> bool:
+        """Whether a result fell back from the model this agent is configured with."""
+        if self.model is None:
+            return False
+        method = (result.get("entity_analysis") or {}).get("analysis_method")
+        return method not in MODEL_ANALYSIS_METHODS
+
+    def compact_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Reduce an ``extract_company_data`` result to what a calling agent needs.
+
+        Document text is replaced by references (name and generation), the
+        prompt diagnostics are dropped and relationship evidence is cut to a
+        short excerpt. Full text stays available through ``get_document_text``.
+
+        Args:
+            result: Output of ``extract_company_data``
+
+        Returns:
+            Compact result dict
+        """
+        if not result or "error" in result:
+            return result
+
+        raw_data = result.get("raw_data") or {}
+        documents = {}
+        for kind in DOCUMENT_LABELS:
+            document = raw_data.get(kind)
+            if document:
+                documents[kind] = {
+                    key: document.get(key) for key in ("filename", "generation", "size", "last_updated")
+                }
+
+        analysis = dict(result.get("entity_analysis") or {})
+        analysis.pop("prompt_budget", None)
+        analysis.pop("prompt_cache", None)
+        relationships = []
+        for relationship in analysis.get("relationships") or []:
+            properties = dict(relationship.get("properties") or {})
+            evidence = properties.get("evidence")
+            if isinstance(evidence, str) and len(evidence) > EVIDENCE_EXCERPT_CHARS:
+                properties["evidence"] = evidence[:EVIDENCE_EXCERPT_CHARS].rstrip() + "..."
+            relationships.append({**relationship, "properties": properties})
+        if "relationships" in analysis:
+            analysis["relationships"] = relationships
+
+        return {
+            "company_name": result.get("company_name"),
+            "extraction_timestamp": result.get("extraction_timestamp"),
+            "processing_status": result.get("processing_status"),
+            "source_fingerprint": result.get("source_fingerprint"),
+            "data_quality": raw_data.get("data_quality"),
+            "documents": documents,
+            "usage": result.get("usage"),
+            "entity_analysis": analysis,
+        }
+
+    def get_document_text(self, company_name: str, document: str = "pitch_deck",
+                          start: int = 0, length: int = DOCUMENT_PAGE_CHARS) -> Dict[str, Any]:
+        """
+        Fetch a page of a company document's full text on demand.
+
+        The version referenced by the stored analysis is read when available,
+        so the text matches what was analyzed; otherwise the live version is used.
+
+        Args:
+            company_name: Name of the company
+            document: ``pitch_deck``, ``founder_checklist`` or a file name in the company folder
+            start: Character offset of the page
+            length: Maximum characters returned
+
+        Returns:
+            Dict with the page ``text``, ``has_more`` and the document reference
+        """
+        try:
+            reference = None
+            stored = self.result_store.get(company_name) if self.result_store else None
+            if stored and document in DOCUMENT_LABELS:
+                reference = (stored.get("raw_data") or {}).get(document)
+
+            if reference:
+                name, generation = reference["filename"], reference.get("generation")
+            else:
+                name, generation = None, None
+                for blob in self.storage.list(prefix=f"Company Data/{company_name}/"):
+                    if self._document_kind(blob.name) == document or blob.name.split('/')[-1] == document:
+                        name, generation = blob.name, str(blob.generation)
+                        break
+                if name is None:
+                    return {"error": f"Document '{document}' not found for {company_name}"}
+
+            page = self.blob_cache.read_text(name, generation, start=start, length=length)
+            return {"company_name": company_name, "document": document, **page}
+
+        except Exception as e:
+            logger.error(f"Error fetching {document} for {company_name}: {e}")
+            return {"error": f"Failed to fetch document text: {str(e)}"}
+
+    def current_fingerprint(self, company_name: str) -> str:
+        """Fingerprint the company folder as it is now, without downloading documents."""
+        if self.memory_bounded:
+            return self._scan_company_blobs(company_name)[0]
+        return company_fingerprint(self._list_company_blobs(company_name))
+
+    def _list_company_blobs(self, company_name: str) -> List[Any]:
+        """List the blobs in a company's data folder."""
+        company_prefix = f"Company Data/{company_name}/"
+        return list(self.storage.list(prefix=company_prefix))
+
+    def _document_kind(self, blob_name: str) -> Optional[str]:
+        """Classify a blob as ``pitch_deck``, ``founder_checklist`` or neither."""
+        filename = blob_name.split('/')[-1].lower()
+        if 'pitch' in filename and ('deck' in filename or 'presentation' in filename):
+            return "pitch_deck"
+        if 'founder' in filename and 'checklist' in filename:
+            return "founder_checklist"
+        return None
+
+    def _scan_company_blobs(self, company_name: str) -> Any:
+        """
+        Fingerprint a company folder in one lazy pass over its listing.
+
+        Only the blobs of recognised documents are kept, so memory does not
+        grow with the number of files in the folder.
+
+        Returns:
+            Tuple of (fingerprint, document blobs by kind, the folder's blobs)
+        """
+        company_prefix = f"Company Data/{company_name}/"
+        versions = []
+        documents = {}
+        for blob in self.storage.list(prefix=company_prefix):
+            versions.append(blob)
+            kind = self._document_kind(blob.name)
+            if kind:
+                documents[kind] = blob
+        fingerprint = company_fingerprint(versions)
+        return fingerprint, documents, versions
+
+    def _stream_raw_data_from_gcs(self, documents: Dict[str, Any], files_found: int) -> Any:
+        """
+        Read company documents as chunked streams.
+
+        Each document keeps its most relevant passages (up to a multiple of
+        the prompt budget) for the model, ranked as the stream is read, while
+        rule-based anchors are collected from the full stream. ``raw_data`` carries object references (name plus
+        generation) instead of document content.
+
+        Args:
+            documents: Document blobs by kind from ``_scan_company_blobs``
+            files_found: Number of files in the company folder
+
+        Returns:
+            Tuple of (raw_data, ``DocumentDigest`` by document kind)
+        """
+        max_chars = self.prompt_budgeter.max_tokens * CHARS_PER_TOKEN * STREAM_TEXT_BUDGET_FACTOR
+        raw_data = {
+            "pitch_deck": None,
+            "founder_checklist": None,
+            "data_quality": {
+                "completeness_score": 0,
+                "files_found": files_found,
+                "mode": "memory_bounded"
+            }
+        }
+        digests = {}
+        for kind in DOCUMENT_LABELS:
+            blob = documents.get(kind)
+            if blob is None:
+                continue
+            digest = digest_blob(self.storage, blob, max_chars)
+            raw_data[kind] = {
+                **blob_reference(blob, self.storage),
+                "chars": digest.total_chars,
+                "truncated": digest.truncated
+            }
+            raw_data["data_quality"]["completeness_score"] += 50
+            digests[kind] = digest
+        return raw_data, digests
+
+    def _extract_raw_data_from_gcs(self, company_name: str, blobs: Optional[List[Any]] = None) -> Dict[str, Any]:
         """
         Extract raw text data from GCS bucket for the specified company.
 
         Args:
             company_name: Name of the company directory
+            blobs: Pre-listed company blobs, listed from the bucket if omitted
 
         Returns:
             Dict containing raw text data from pitch deck and founder checklist
         """
         try:
-            company_prefix = f"Company Data/{company_name}/"
-            blobs = list(self.bucket.list_blobs(prefix=company_prefix))
+            if blobs is None:
+                blobs = self._list_company_blobs(company_name)
 
             raw_data = {
                 "pitch_deck": None,
@@ -122,24 +531,26 @@ class DataExtractionAgent:
             }
 
             for blob in blobs:
-                filename = blob.name.split('/')[-1].lower()
+                kind = self._document_kind(blob.name)
 
-                if 'pitch' in filename and ('deck' in filename or 'presentation' in filename):
+                if kind == "pitch_deck":
                     # Extract pitch deck content
-                    content = blob.download_as_text()
+                    content = self.storage.read_text(blob.name, blob.generation)
                     raw_data["pitch_deck"] = {
                         "filename": blob.name,
+                        "generation": str(blob.generation),
                         "content": content,
                         "size": blob.size,
                         "last_updated": blob.updated.isoformat() if blob.updated else None
                     }
                     raw_data["data_quality"]["completeness_score"] += 50
 
-                elif 'founder' in filename and 'checklist' in filename:
+                elif kind == "founder_checklist":
                     # Extract founder checklist content
-                    content = blob.download_as_text()
+                    content = self.storage.read_text(blob.name, blob.generation)
                     raw_data["founder_checklist"] = {
                         "filename": blob.name,
+                        "generation": str(blob.generation),
                         "content": content,
                         "size": blob.size,
                         "last_updated": blob.updated.isoformat() if blob.updated else None
@@ -163,179 +574,230 @@ class DataExtractionAgent:
         Returns:
             Dict containing entities, relationships, and analysis insights
         """
+        analysis = None
+        for event in self._iter_entity_relationship_analysis(raw_data, company_name):
+            if event["stage"] == streaming.STAGE_ANALYSIS_COMPLETED:
+                analysis = event["analysis"]
+        return analysis
+
+    def _iter_entity_relationship_analysis(self, raw_data: Dict[str, Any], company_name: str,
+                                           text_content: Optional[str] = None,
+                                           anchors: Optional[Dict[str, Any]] = None,
+                                           usage: Optional[UsageScope] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream entity extraction and relationship inference from Gemini.
+
+        Entities, relationships, insights and risks are yielded as soon as each
+        item is complete in the streamed response; the final
+        ``analysis_completed`` event carries the parsed analysis.
+
+        Args:
+            raw_data: Raw text data from GCS
+            company_name: Name of the company being analyzed
+            text_content: Pre-combined text (memory-bounded mode); combined
+                from ``raw_data`` when omitted
+            anchors: Anchors already collected from the full documents
+            usage: Scope counting the model calls made for this analysis
+
+        Yields:
+            Progress event dicts
+        """
         try:
             if not self.model:
                 # Fallback analysis without AI
-                return self._fallback_entity_analysis(raw_data, company_name)
+                yield self._analysis_completed(self._fallback_entity_analysis(raw_data, company_name, text_content))
+                return
 
             # Combine all available text content
-            combined_text = self._combine_text_content(raw_data)
+            combined_text = text_content if text_content is not None else self._combine_text_content(raw_data)
 
             if not combined_text:
-                return {
+                yield self._analysis_completed({
                     "entities": [],
                     "relationships": [],
                     "insights": ["No text content available for analysis"],
                     "analysis_method": "fallback"
-                }
+                })
+                return
+
+            # Route incomplete, low-signal companies to the cheap summary tier
+            routing = self.router.route(raw_data, combined_text, company_name) if self.router else None
+            if routing and routing["tier"] == TIER_SUMMARY:
+                analysis = self._summary_analysis(combined_text, company_name, usage)
+                analysis["routing"] = routing
+                yield self._analysis_completed(analysis)
+                return
+
+            # Deduplicate boilerplate, trim to the token budget and collect
+            # rule-based anchors that give the model high-precision hints
+            prepared = self.cpu_stage.run(
+                "prepare_prompt", combined_text, company_name,
+                max_tokens=self.prompt_budgeter.max_tokens,
+                boilerplate_min_repeats=self.prompt_budgeter.boilerplate_min_repeats,
+                with_anchors=self.use_fast_anchors and anchors is None,
+            )
+            compacted = prepared["compacted"]
+            anchor_text = prepared["anchors"]
+            if self.use_fast_anchors and anchors is not None:
+                anchor_text = get_fast_extractor().format_anchors(anchors)
 
             # Create comprehensive analysis prompt
-            analysis_prompt = self._create_analysis_prompt(combined_text, company_name)
-
-            # Generate analysis using Gemini
-            response = self.model.generate_content(analysis_prompt)
+            analysis_prompt = self._create_analysis_prompt(compacted["text"], company_name, anchor_text)
+
+            # Generate analysis using Gemini with the static instructions as system instruction
+            analysis_model = self.gemini_limiter.wrap(self.cost_ledger.meter(
+                self.analysis_prompt_cache.get_model(), MODEL_NAME, "analysis", usage))
+            scanner = streaming.IncrementalArrayScanner(streaming.STREAMED_ARRAYS)
+            entity_count = 0
+
+            for chunk in analysis_model.generate_content(analysis_prompt, stream=True):
+                for key, item in scanner.feed(chunk.text or ""):
+                    if key == streaming.ARRAY_END:
+                        if item == "entities":
+                            yield {"stage": streaming.STAGE_ENTITIES_EXTRACTED, "count": entity_count}
+                        continue
+                    if key == "entities":
+                        entity_count += 1
+                    yield {"stage": streaming.STREAMED_ARRAYS[key], "item": item}
 
             # Parse and structure the response
-            return self._parse_gemini_response(response.text, company_name)
+            analysis = self._parse_gemini_response(scanner.text, company_name)
+            analysis["prompt_budget"] = compacted["report"]
+            analysis["prompt_cache"] = self.analysis_prompt_cache.describe()
+            if routing:
+                analysis["routing"] = routing
+            yield self._analysis_completed(analysis)
 
         except Exception as e:
             logger.error(f"Error in entity relationship analysis: {e}")
-            return self._fallback_entity_analysis(raw_data, company_name)
+            yield self._analysis_completed(self._fallback_entity_analysis(raw_data, company_name, text_content))
+
+    def _summary_analysis(self, text_content: str, company_name: str,
+                          usage: Optional[UsageScope] = None) -> Dict[str, Any]:
+        """
+        Produce a short summary analysis on the cheaper model.
+
+        The entity graph comes from the rule-based extractor, so summary-tier
+        companies still contribute entities and relationships.
+        """
+        compacted = self.cpu_stage.run(
+            "prepare_prompt", text_content, company_name,
+            max_tokens=SUMMARY_TOKEN_BUDGET, with_anchors=False,
+        )["compacted"]
+        prompt = SUMMARY_ANALYSIS_PROMPT.format(company_name=company_name, text_content=compacted["text"])
+        summary_model = self.gemini_limiter.wrap(
+            self.cost_ledger.meter(self.summary_model, SUMMARY_MODEL_NAME, "summary", usage))
+        response = summary_model.generate_content(prompt)
+
+        analysis = self._parse_gemini_response(response.text, company_name)
+        if analysis.get("analysis_method") == "gemini_ai":
+            analysis["analysis_method"] = "gemini_summary"
+
+        rule_based = self.cpu_stage.run("rule_based_analysis", text_content, company_name)
+        analysis["entities"] = rule_based["entities"]
+        analysis["relationships"] = rule_based["relationships"]
+        analysis["metrics"] = rule_based["metrics"]
+        analysis["prompt_budget"] = compacted["report"]
+        return analysis
+
+    def _analysis_completed(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Wrap a finished analysis as the terminal analysis event."""
+        return {"stage": streaming.STAGE_ANALYSIS_COMPLETED, "analysis": analysis}
 
     def _combine_text_content(self, raw_data: Dict[str, Any]) -> str:
         """Combine text content from pitch deck and founder checklist."""
-        texts = []
-
-        if raw_data.get("pitch_deck") and raw_data["pitch_deck"].get("content"):
-            texts.append(f"PITCH DECK:\n{raw_data['pitch_deck']['content']}")
-
-        if raw_data.get("founder_checklist") and raw_data["founder_checklist"].get("content"):
-            texts.append(f"FOUNDER CHECKLIST:\n{raw_data['founder_checklist']['content']}")
-
-        return "\n\n".join(texts)
-
-    def _create_analysis_prompt(self, text_content: str, company_name: str) -> str:
-        """Create a comprehensive analysis prompt for Gemini."""
-        return f"""
-You are an expert investment analyst and knowledge graph constructor. Analyze the following company data for {company_name} and extract sophisticated entities and relationships.
-
-COMPANY DATA:
-{text_content}
-
-TASK: Perform deep entity extraction and relationship inference analysis. Go beyond simple keyword matching - actively infer complex relationships and business insights.
-
-REQUIRED OUTPUT FORMAT (JSON):
-{{
-  "entities": [
-    {{
-      "id": "unique_identifier",
-      "type": "company|founder|investor|technology|market|metric|product|competitor|customer",
-      "name": "entity_name",
-      "properties": {{
-        "description": "detailed description",
-        "confidence": 0.0-1.0,
-        "source": "pitch_deck|founder_checklist|inferred"
-      }}
-    }}
-  ],
-  "relationships": [
-    {{
-      "id": "unique_relationship_id",
-      "type": "founded_by|invested_in|competes_with|uses_technology|operates_in|shows_metric|partnered_with|acquired|employs|serves",
-      "source_entity": "entity_id",
-      "target_entity": "entity_id",
-      "properties": {{
-        "description": "relationship description",
-        "strength": 0.0-1.0,
-        "evidence": "supporting text or inference",
-        "direction": "directed|undirected"
-      }}
-    }}
-  ],
-  "insights": [
-    "key business insight 1",
-    "key business insight 2",
-    "strategic observation"
-  ],
-  "market_analysis": {{
-    "market_size": "estimated market size if mentioned",
-    "growth_rate": "market growth indicators",
-    "competitive_position": "company's competitive position",
-    "investment_readiness": "assessment of investment readiness"
-  }},
-  "risks_and_opportunities": [
-    "identified risk or opportunity with explanation"
-  ]
-}}
-
-INSTRUCTIONS:
-1. Extract ALL relevant entities: companies, founders, investors, technologies, markets, metrics, products, competitors, customers
-2. Infer COMPLEX relationships: Don't just extract what's explicitly stated - infer business relationships, competitive dynamics, market positions
-3. Be SPECIFIC: Use exact names, metrics, and details from the text
-4. Be COMPREHENSIVE: Cover all aspects of the business mentioned
-5. Be ANALYTICAL: Provide insights that go beyond the raw data
-6. Use CONFIDENCE scores: Rate how certain you are about each entity/relationship
-7. Focus on INVESTMENT-relevant information: Growth metrics, market position, competitive advantages, risks
-
-Output ONLY valid JSON. No additional text or formatting.
-"""
+        return self._join_document_texts({
+            kind: raw_data[kind].get("content") for kind in DOCUMENT_LABELS if raw_data.get(kind)
+        })
+
+    def _join_document_texts(self, texts: Dict[str, Optional[str]]) -> str:
+        """Join document texts by kind under their section labels."""
+        return "\n\n".join(
+            f"{label}:\n{texts[kind]}" for kind, label in DOCUMENT_LABELS.items() if texts.get(kind)
+        )
+
+    def _link_evidence_spans(self, company_name: str, raw_data: Dict[str, Any],
+                             document_texts: Dict[str, str], analysis: Optional[Dict[str, Any]],
+                             segments: Optional[Dict[str, List[Any]]] = None) -> None:
+        """
+        Index a company's documents and attach ``evidence_span`` offsets to
+        entities and relationships whose evidence (or name) is found in them.
+
+        In memory-bounded mode the texts are the kept passages; ``segments``
+        maps them back, so offsets always refer to the full document.
+        """
+        try:
+            self.span_index.index_company(company_name, [
+                {"name": raw_data[kind]["filename"], "generation": raw_data[kind].get("generation"), "text": text,
+                 "segments": (segments or {}).get(kind)}
+                for kind, text in document_texts.items() if text
+            ])
+            if not analysis:
+                return
+
+            items = (analysis.get("entities") or []) + (analysis.get("relationships") or [])
+            for item in items:
+                if not isinstance(item, dict):
+                    continue
+                properties = item.get("properties")
+                if not isinstance(properties, dict):
+                    properties = item["properties"] = {}
+                # Entities without evidence are located by their name
+                evidence = properties.get("evidence") or (item.get("name") if "source_entity" not in item else None)
+                span = self.span_index.find_span(company_name, evidence)
+                if span:
+                    properties["evidence_span"] = span
+
+        except Exception as e:
+            logger.warning(f"Could not link evidence spans for {company_name}: {e}")
+
+    def _create_analysis_prompt(self, text_content: str, company_name: str, anchors: str = "") -> str:
+        """
+        Create the per-company part of the analysis prompt.
+
+        The task description and JSON schema live in ENTITY_ANALYSIS_PROMPT and
+        reach the model as its system instruction (see ``PromptPrefixCache``),
+        so this builds only the request text plus any rule-based anchors.
+        """
+        prompt = COMPANY_ANALYSIS_REQUEST.format(company_name=company_name, text_content=text_content)
+        if anchors:
+            prompt += FAST_ANCHORS_SECTION.format(anchors=anchors)
+        return prompt
 
     def _parse_gemini_response(self, response_text: str, company_name: str) -> Dict[str, Any]:
         """Parse Gemini's JSON response and structure it properly."""
-        try:
-            # Clean the response text (remove markdown formatting if present)
-            cleaned_text = response_text.strip()
-            if cleaned_text.startswith("```json"):
-                cleaned_text = cleaned_text[7:]
-            if cleaned_text.endswith("```"):
-                cleaned_text = cleaned_text[:-3]
-            cleaned_text = cleaned_text.strip()
-
-            # Parse JSON
-            analysis_data = json.loads(cleaned_text)
-
-            # Validate and enhance the response
-            analysis_data["analysis_timestamp"] = datetime.utcnow().isoformat()
-            analysis_data["analysis_method"] = "gemini_ai"
-            analysis_data["company_focus"] = company_name
-
-            return analysis_data
-
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse Gemini response as JSON: {e}")
+        # Strip markdown fences, parse and merge duplicate entities off-thread
+        analysis_data = self.cpu_stage.run("parse_response", response_text, company_name)
+
+        if "parse_error" in analysis_data:
+            logger.error(analysis_data["parse_error"])
             logger.error(f"Response text: {response_text[:500]}...")
             return self._create_fallback_analysis(company_name)
 
-    def _fallback_entity_analysis(self, raw_data: Dict[str, Any], company_name: str) -> Dict[str, Any]:
-        """Fallback analysis when AI is not available."""
-        logger.warning("Using fallback entity analysis (no AI available)")
+        # Validate and enhance the response
+        analysis_data["analysis_timestamp"] = datetime.utcnow().isoformat()
+        analysis_data["analysis_method"] = "gemini_ai"
+        analysis_data["company_focus"] = company_name
 
-        entities = []
-        relationships = []
-        insights = []
-
-        # Basic entity extraction
-        entities.append({
-            "id": f"company_{company_name.lower().replace(' ', '_')}",
-            "type": "company",
-            "name": company_name,
-            "properties": {
-                "description": f"Company named {company_name}",
-                "confidence": 1.0,
-                "source": "filename"
-            }
-        })
+        return analysis_data
+
+    def _fallback_entity_analysis(self, raw_data: Dict[str, Any], company_name: str,
+                                  text_content: Optional[str] = None) -> Dict[str, Any]:
+        """Fallback analysis when AI is not available, using the rule-based extractor."""
+        logger.warning("Using rule-based entity analysis (no AI available)")
+
+        if text_content is None:
+            text_content = self._combine_text_content(raw_data)
+        analysis = self.cpu_stage.run("rule_based_analysis", text_content, company_name)
 
         # Basic insights
         if raw_data.get("pitch_deck"):
-            insights.append("Pitch deck document available for analysis")
+            analysis["insights"].append("Pitch deck document available for analysis")
         if raw_data.get("founder_checklist"):
-            insights.append("Founder checklist available for analysis")
+            analysis["insights"].append("Founder checklist available for analysis")
+        analysis["risks_and_opportunities"].append("Rule-based extraction only; relationships beyond direct mentions not inferred")
 
-        return {
-            "entities": entities,
-            "relationships": relationships,
-            "insights": insights,
-            "market_analysis": {
-                "market_size": "Not analyzed",
-                "growth_rate": "Not analyzed",
-                "competitive_position": "Not analyzed",
-                "investment_readiness": "Basic data available"
-            },
-            "risks_and_opportunities": ["Analysis limited without AI processing"],
-            "analysis_method": "fallback",
-            "analysis_timestamp": datetime.utcnow().isoformat()
-        }
+        return analysis
 
     def _create_fallback_analysis(self, company_name: str) -> Dict[str, Any]:
         """Create a basic fallback analysis structure."""
@@ -361,4 +823,190 @@ Output ONLY valid JSON. No additional text or formatting.
             "risks_and_opportunities": ["AI analysis unavailable - using basic extraction"],
             "analysis_method": "fallback_error",
             "analysis_timestamp": datetime.utcnow().isoformat()
-        }
\ No newline at end of file
+        }
+
+def get_default_agent(tenant: Optional[str] = None) -> DataExtractionAgent:
+    """
+    Return the process-wide DataExtractionAgent of a tenant, creating it on first use.
+
+    Tools and agents share this instance so clients, the model handle and
+    the prompt cache are initialized once per process and tenant.
+
+    Args:
+        tenant: Tenant name; the default tenant (the environment's data bucket) if omitted
+    """
+    return get_tenant_registry().get(tenant).agent
+
+
+def _session_tenant(tool_context: Optional[ToolContext]) -> Tenant:
+    """Return the tenant named in the session state, or the default tenant."""
+    name = tool_context.state.get(TENANT_STATE_KEY) if tool_context is not None else None
+    return get_tenant_registry().get(name)
+
+
+def record_session_id(callback_context: CallbackContext) -> None:
+    """
+    Store the session id in state before the root agent runs.
+
+    Use as the root agent's ``before_agent_callback`` so tools called by
+    ``AgentTool`` sub-agents bill their model calls to the root session.
+
+    Args:
+        callback_context: Context of the agent about to run
+    """
+    if callback_context.state.get(SESSION_STATE_KEY) != callback_context.session.id:
+        callback_context.state[SESSION_STATE_KEY] = callback_context.session.id
+    return None
+
+
+def _session_id(tool_context: Optional[ToolContext]) -> Optional[str]:
+    """Return the id of the root session a tool call belongs to, if known."""
+    if tool_context is None:
+        return None
+    # Sub-agent sessions have their own id; the root one is carried in state
+    session = getattr(tool_context, "session", None)
+    return tool_context.state.get(SESSION_STATE_KEY) or getattr(session, "id", None)
+
+
+def analyze_company(company_name: str, tool_context: Optional[ToolContext] = None) -> Dict[str, Any]:
+    """
+    Extract entities and relationships for a company from its data room.
+
+    Returns the analysis with document references and short evidence
+    excerpts; use read_company_document for the full text.
+
+    Args:
+        company_name: Name of the company folder in the data bucket
+
+    Returns:
+        Compact analysis result
+    """
+    tenant = _session_tenant(tool_context)
+    with tenant.slot(), usage_scope(session=_session_id(tool_context), tenant=tenant.name):
+        result = tenant.agent.compact_result(tenant.agent.extract_company_data(company_name))
+    if tool_context is not None and result and "error" not in result:
+        # Lets the root agent memoize this call per company and folder version
+        analyzed = tool_context.state.get(ANALYZED_COMPANIES_STATE_KEY) or []
+        tool_context.state[ANALYZED_COMPANIES_STATE_KEY] = [*analyzed, {
+            "company_name": company_name,
+            "source_fingerprint": result.get("source_fingerprint"),
+        }]
+    return result
+
+
+def read_company_document(company_name: str, document: str = "pitch_deck",
+                          start: int = 0, length: int = DOCUMENT_PAGE_CHARS,
+                          tool_context: Optional[ToolContext] = None) -> Dict[str, Any]:
+    """
+    Read a page of a company document's full text.
+
+    Args:
+        company_name: Name of the company folder in the data bucket
+        document: "pitch_deck", "founder_checklist" or a file name in the folder
+        start: Character offset to start reading from
+        length: Maximum number of characters to return
+
+    Returns:
+        The page text and whether more text follows
+    """
+    return _session_tenant(tool_context).agent.get_document_text(company_name, document, start, length)
+
+
+def search_portfolio(query: str, limit: int = 10, tool_context: Optional[ToolContext] = None) -> Dict[str, Any]:
+    """
+    Full-text search across every company document in the portfolio.
+
+    Answers questions like "which companies mention X" from the local
+    index, without downloading documents.
+
+    Args:
+        query: Keywords or phrase to search for
+        limit: Maximum number of documents to return
+
+    Returns:
+        Ranked hits with company name, document, BM25 score and a snippet
+    """
+    try:
+        return {"query": query, "hits": _session_tenant(tool_context).search_index.search(query, limit=limit)}
+    except Exception as e:
+        logger.error(f"Error searching portfolio: {e}")
+        return {"error": f"Failed to search portfolio: {str(e)}"}
+
+
+def compare_companies(company_names: List[str], tool_context: Optional[ToolContext] = None) -> Dict[str, Any]:
+    """
+    Compare several already-analyzed companies side by side.
+
+    Reads stored analyses only (no document downloads or model calls) and
+    returns one compact table of normalized metrics plus each company's top
+    insights and risks, ready for a single comparative write-up.
+
+    Args:
+        company_names: Names of the companies to compare
+
+    Returns:
+        Comparison table, per-company highlights and any companies not yet analyzed
+    """
+    try:
+        agent = _session_tenant(tool_context).agent
+        if agent.result_store is None:
+            return {"error": "No result store configured for stored analyses"}
+        return CompanyComparator(agent.result_store).compare(company_names)
+    except Exception as e:
+        logger.error(f"Error comparing companies: {e}")
+        return {"error": f"Failed to compare companies: {str(e)}"}
+
+
+def company_changes(company_name: str, since_version: int = 0,
+                    tool_context: Optional[ToolContext] = None) -> Dict[str, Any]:
+    """
+    Report what changed in a company's analysis between document versions.
+
+    Served from the stored version history (no document downloads or model
+    calls): changed metrics with percentage change, added and removed
+    entities, relationships, insights and risks, and updated documents.
+
+    Args:
+        company_name: Name of the company
+        since_version: Version to compare the latest against (0 compares
+            with the previous version)
+
+    Returns:
+        Changes per section, the versions compared and the metric timeline
+    """
+    try:
+        agent = _session_tenant(tool_context).agent
+        if agent.history is None:
+            return {"error": "No analysis history configured"}
+        changes = agent.history.changes(company_name, since_version or None)
+        if "error" not in changes:
+            changes["timeline"] = agent.history.metric_timeline(
+                company_name, ["version", "stored_at", "arr", "mrr", "growth_pct", "burn", "runway_months"])
+        return changes
+    except Exception as e:
+        logger.error(f"Error reading analysis history: {e}")
+        return {"error": f"Failed to read analysis history: {str(e)}"}
+
+
+def rank_portfolio(limit: int = 20, tool_context: Optional[ToolContext] = None) -> Dict[str, Any]:
+    """
+    Rank every analyzed company by investment-readiness score.
+
+    Scores are computed locally from stored analyses (document completeness,
+    growth, burn multiple, runway, margin and team/investor signals), so the
+    whole pipeline is sorted without any model call.
+
+    Args:
+        limit: Maximum number of companies to return
+
+    Returns:
+        Companies ranked best first with score, tier and component scores
+    """
+    try:
+        agent = _session_tenant(tool_context).agent
+        if agent.result_store is None:
+            return {"error": "No result store configured for stored analyses"}
+        return {"ranking": ReadinessScorer().rank_portfolio(agent.result_store, limit=limit)}
+    except Exception as e:
+        logger.error(f"Error ranking portfolio: {e}")
+        return {"error": f"Failed to rank portfolio: {str(e)}"}
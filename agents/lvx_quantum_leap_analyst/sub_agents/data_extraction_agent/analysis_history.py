@@ -0,0 +1,388 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Versioned history of company analyses with delta encoding between versions"""
+
+import os
+import re
+import copy
+import json
+import logging
+import threading
+from typing import Dict, List, Any, Optional
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .comparison import COMPARISON_METRICS
+from .result_store import DEFAULT_CACHE_DIR, company_slug
+
+logger = logging.getLogger(__name__)
+
+# A full snapshot is stored every this many versions so reconstructing any
+# version applies a bounded number of deltas.
+SNAPSHOT_INTERVAL = int(os.getenv("LVX_HISTORY_SNAPSHOT_INTERVAL", "10"))
+
+# Sections of the tracked view by how they are diffed: scalar maps record
+# changed values, keyed maps record added and removed items, string lists
+# record added and removed entries.
+SCALAR_SECTIONS = ("summary", "documents", "metrics", "market_analysis")
+KEYED_SECTIONS = ("entities", "relationships")
+LIST_SECTIONS = ("insights", "risks_and_opportunities")
+
+TIMELINE_METRICS = list(COMPARISON_METRICS)
+
+TIMELINE_SCHEMA = pa.schema([
+    ("version", pa.int32()),
+    ("fingerprint", pa.string()),
+    ("stored_at", pa.string()),
+    ("analysis_method", pa.string()),
+    ("completeness_score", pa.float32()),
+    ("entity_count", pa.int32()),
+    ("relationship_count", pa.int32()),
+    ("risk_count", pa.int32()),
+    ("changed_sections", pa.list_(pa.string())),
+] + [(name, pa.float64()) for name in TIMELINE_METRICS])
+
+
+def _name_key(name: Any) -> str:
+    return " ".join(re.findall(r"[a-z0-9]+", str(name or "").lower()))
+
+
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return None
+
+
+def analysis_view(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reduce an ``extract_company_data`` result to the fields tracked across versions.
+
+    Entities and relationships are keyed by type and normalized name rather
+    than model-assigned ids, which are not stable between runs.
+
+    Args:
+        result: Output of ``extract_company_data``
+
+    Returns:
+        Dict of the sections in ``SCALAR_SECTIONS``, ``KEYED_SECTIONS`` and ``LIST_SECTIONS``
+    """
+    raw_data = result.get("raw_data") or {}
+    analysis = result.get("entity_analysis") or {}
+
+    names = {}
+    entities = {}
+    for entity in analysis.get("entities") or []:
+        names[entity.get("id")] = entity.get("name")
+        key = f"{entity.get('type')}:{_name_key(entity.get('name'))}"
+        entities[key] = {"type": entity.get("type"), "name": entity.get("name")}
+
+    relationships = {}
+    for relationship in analysis.get("relationships") or []:
+        source = names.get(relationship.get("source_entity"), relationship.get("source_entity"))
+        target = names.get(relationship.get("target_entity"), relationship.get("target_entity"))
+        key = f"{relationship.get('type')}:{_name_key(source)}>{_name_key(target)}"
+        relationships[key] = {"type": relationship.get("type"), "source": source, "target": target}
+
+    documents = {}
+    for value in raw_data.values():
+        if isinstance(value, dict) and value.get("filename"):
+            documents[value["filename"]] = value.get("generation")
+
+    market_analysis = analysis.get("market_analysis")
+    return {
+        "summary": {
+            "analysis_method": analysis.get("analysis_method"),
+            "completeness_score": (raw_data.get("data_quality") or {}).get("completeness_score"),
+        },
+        "documents": documents,
+        "metrics": dict(analysis.get("metrics") or {}),
+        "market_analysis": dict(market_analysis) if isinstance(market_analysis, dict) else {},
+        "entities": entities,
+        "relationships": relationships,
+        "insights": [str(item) for item in analysis.get("insights") or []],
+        "risks_and_opportunities": [str(item) for item in analysis.get("risks_and_opportunities") or []],
+    }
+
+
+def diff_views(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Compute the delta turning one tracked view into another.
+
+    Args:
+        old: Earlier view (empty dict for the first version)
+        new: Later view
+
+    Returns:
+        Dict with one entry per changed section; unchanged sections are omitted
+    """
+    delta: Dict[str, Any] = {}
+    for section in SCALAR_SECTIONS:
+        before, after = old.get(section) or {}, new.get(section) or {}
+        changed = {}
+        for key in sorted(set(before) | set(after)):
+            if before.get(key) != after.get(key) or (key in before) != (key in after):
+                change = {"from": before.get(key), "to": after.get(key)}
+                # Tells a dropped key apart from one whose value became None
+                if key not in after:
+                    change["removed"] = True
+                start, end = _number(before.get(key)), _number(after.get(key))
+                if start and end is not None:
+                    change["change_pct"] = round(100.0 * (end - start) / abs(start), 1)
+                changed[key] = change
+        if changed:
+            delta[section] = {"changed": changed}
+    for section in KEYED_SECTIONS:
+        before, after = old.get(section) or {}, new.get(section) or {}
+        added = {key: after[key] for key in sorted(set(after) - set(before))}
+        removed = sorted(set(before) - set(after))
+        if added or removed:
+            delta[section] = {"added": added, "removed": removed}
+    for section in LIST_SECTIONS:
+        before, after = old.get(section) or [], new.get(section) or []
+        before_set, after_set = set(before), set(after)
+        added = [item for item in after if item not in before_set]
+        removed = [item for item in before if item not in after_set]
+        if added or removed:
+            delta[section] = {"added": added, "removed": removed}
+            # Appending added items does not always reproduce the new order
+            if [item for item in before if item in after_set] + added != after:
+                delta[section]["order"] = after
+    return delta
+
+
+def apply_delta(view: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Apply a delta from ``diff_views`` to a view.
+
+    Args:
+        view: View the delta was computed against
+        delta: Delta to apply
+
+    Returns:
+        The later view (``view`` is not modified)
+    """
+    view = copy.deepcopy(view)
+    for section in SCALAR_SECTIONS:
+        values = view.setdefault(section, {})
+        for key, change in (delta.get(section) or {}).get("changed", {}).items():
+            if change.get("removed"):
+                values.pop(key, None)
+            else:
+                values[key] = change["to"]
+    for section in KEYED_SECTIONS:
+        items = view.setdefault(section, {})
+        for key in (delta.get(section) or {}).get("removed", []):
+            items.pop(key, None)
+        items.update((delta.get(section) or {}).get("added", {}))
+    for section in LIST_SECTIONS:
+        change = delta.get(section) or {}
+        if "order" in change:
+            view[section] = list(change["order"])
+            continue
+        removed = set(change.get("removed", []))
+        view[section] = [item for item in view.get(section) or [] if item not in removed] + change.get("added", [])
+    return view
+
+
+class AnalysisHistory:
+    """
+    Append-only, versioned store of company analyses.
+
+    Each company has a JSON-lines log under ``{cache_dir}/history/{slug}/``.
+    A record is added whenever an analysis is stored for a new folder
+    fingerprint (i.e. new blob generations). Records carry the delta from
+    the previous version, plus a full snapshot every ``SNAPSHOT_INTERVAL``
+    versions. "What changed" queries are answered from the stored deltas,
+    without re-analysis. A Parquet timeline next to the log holds one row
+    per version with the headline metrics for columnar time-series reads.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, snapshot_interval: int = SNAPSHOT_INTERVAL):
+        """
+        Initialize the history store.
+
+        Args:
+            cache_dir: Root directory for local caches
+            snapshot_interval: Versions between full snapshots
+        """
+        self.root = os.path.join(cache_dir, "history")
+        self.snapshot_interval = max(1, snapshot_interval)
+        os.makedirs(self.root, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _dir(self, company_name: str) -> str:
+        return os.path.join(self.root, company_slug(company_name))
+
+    def _log_path(self, company_name: str) -> str:
+        return os.path.join(self._dir(company_name), "versions.jsonl")
+
+    def _timeline_path(self, company_name: str) -> str:
+        return os.path.join(self._dir(company_name), "timeline.parquet")
+
+    def _records(self, company_name: str) -> List[Dict[str, Any]]:
+        try:
+            with open(self._log_path(company_name), "r", encoding="utf-8") as f:
+                return [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def _view_at(self, records: List[Dict[str, Any]], version: int) -> Dict[str, Any]:
+        """Rebuild a version's view from the nearest earlier snapshot."""
+        base = max(index for index, record in enumerate(records[:version]) if "view" in record)
+        view = records[base]["view"]
+        for record in records[base + 1:version]:
+            view = apply_delta(view, record["delta"])
+        return view
+
+    def record(self, company_name: str, fingerprint: str, result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Append a version for a company if its fingerprint is new.
+
+        Args:
+            company_name: Name of the company
+            fingerprint: Folder fingerprint the result was computed from
+            result: Output of ``extract_company_data``
+
+        Returns:
+            The version's metadata and delta, or None when the latest version
+            already has this fingerprint
+        """
+        with self._lock:
+            records = self._records(company_name)
+            if records and records[-1]["fingerprint"] == fingerprint:
+                return None
+            view = analysis_view(result)
+            previous = self._view_at(records, len(records)) if records else {}
+            version = len(records) + 1
+            record = {
+                "version": version,
+                "fingerprint": fingerprint,
+                "stored_at": datetime.utcnow().isoformat(),
+                "delta": diff_views(previous, view),
+            }
+            if (version - 1) % self.snapshot_interval == 0:
+                record["view"] = view
+
+            os.makedirs(self._dir(company_name), exist_ok=True)
+            with open(self._log_path(company_name), "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, default=str, ensure_ascii=False) + "\n")
+            self._append_timeline(company_name, record, view)
+
+        logger.info(f"Recorded analysis version {version} for {company_name}")
+        return {key: value for key, value in record.items() if key != "view"}
+
+    def _append_timeline(self, company_name: str, record: Dict[str, Any], view: Dict[str, Any]) -> None:
+        row = {
+            "version": record["version"],
+            "fingerprint": record["fingerprint"],
+            "stored_at": record["stored_at"],
+            "analysis_method": view["summary"].get("analysis_method"),
+            "completeness_score": _number(view["summary"].get("completeness_score")),
+            "entity_count": len(view["entities"]),
+            "relationship_count": len(view["relationships"]),
+            "risk_count": len(view["risks_and_opportunities"]),
+            "changed_sections": sorted(record["delta"]),
+            **{name: _number(view["metrics"].get(name)) for name in TIMELINE_METRICS},
+        }
+        path = self._timeline_path(company_name)
+        table = pa.Table.from_pylist([row], schema=TIMELINE_SCHEMA)
+        if os.path.exists(path):
+            table = pa.concat_tables([pq.read_table(path, schema=TIMELINE_SCHEMA), table])
+        tmp_path = f"{path}.tmp"
+        pq.write_table(table, tmp_path, compression="zstd")
+        os.replace(tmp_path, path)
+
+    def versions(self, company_name: str) -> List[Dict[str, Any]]:
+        """Return each stored version's number, fingerprint, time and changed sections."""
+        return [
+            {"version": record["version"], "fingerprint": record["fingerprint"],
+             "stored_at": record["stored_at"], "changed_sections": sorted(record["delta"])}
+            for record in self._records(company_name)
+        ]
+
+    def snapshot(self, company_name: str, version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Reconstruct the tracked view of a version.
+
+        Args:
+            company_name: Name of the company
+            version: Version number (defaults to the latest)
+
+        Returns:
+            The view, or None if the company or version is unknown
+        """
+        records = self._records(company_name)
+        version = version or len(records)
+        if not 1 <= version <= len(records):
+            return None
+        return self._view_at(records, version)
+
+    def changes(self, company_name: str, since_version: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Report what changed in a company's analysis.
+
+        The change between the latest version and the one before it is the
+        stored delta; changes over several versions are computed from the
+        reconstructed views.
+
+        Args:
+            company_name: Name of the company
+            since_version: Version to compare the latest against (defaults
+                to the previous version)
+
+        Returns:
+            Dict with ``from_version``, ``to_version``, their fingerprints and
+            the ``changes`` per section
+        """
+        records = self._records(company_name)
+        if not records:
+            return {"error": f"No analysis history for {company_name}"}
+        latest = records[-1]
+        since_version = since_version or latest["version"] - 1
+        if since_version < 0 or since_version >= latest["version"]:
+            return {"error": f"Version {since_version} is not before the latest version {latest['version']}"}
+
+        if since_version == latest["version"] - 1:
+            changes = latest["delta"]
+        else:
+            changes = diff_views(self._view_at(records, since_version) if since_version else {},
+                                 self._view_at(records, latest["version"]))
+        return {
+            "company_name": company_name,
+            "from_version": since_version or None,
+            "from_fingerprint": records[since_version - 1]["fingerprint"] if since_version else None,
+            "to_version": latest["version"],
+            "to_fingerprint": latest["fingerprint"],
+            "stored_at": latest["stored_at"],
+            "changes": changes,
+        }
+
+    def metric_timeline(self, company_name: str, columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Read a company's per-version metrics from the columnar timeline.
+
+        Args:
+            company_name: Name of the company
+            columns: Columns to read (defaults to all)
+
+        Returns:
+            One row dict per version, oldest first
+        """
+        path = self._timeline_path(company_name)
+        if not os.path.exists(path):
+            return []
+        return pq.read_table(path, columns=columns).to_pylist()
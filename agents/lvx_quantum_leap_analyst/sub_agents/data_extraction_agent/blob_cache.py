@@ -0,0 +1,161 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Local cache of document blobs keyed by object name and generation"""
+
+import os
+import hashlib
+import logging
+import threading
+from typing import Dict, Any, Optional
+
+from .result_store import DEFAULT_CACHE_DIR
+from .storage_backend import StorageBackend
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on cached blob bytes; least recently used files are evicted.
+DEFAULT_BLOB_CACHE_MAX_BYTES = int(os.getenv("LVX_BLOB_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# Characters skipped per read when paging into a cached document.
+SKIP_CHUNK_CHARS = 1024 * 1024
+
+
+class BlobCache:
+    """
+    Keeps downloaded documents on local disk so full text can be fetched
+    lazily, page by page, instead of travelling inside every result.
+
+    A generation is immutable in GCS, so a cached ``name@generation`` file
+    never needs revalidation; a new upload simply gets a new entry. Files
+    that the backend or a local bucket mirror already hold are read in
+    place, without a copy.
+    """
+
+    def __init__(self, storage: Optional[StorageBackend], cache_dir: str = DEFAULT_CACHE_DIR,
+                 max_bytes: int = DEFAULT_BLOB_CACHE_MAX_BYTES, mirror: Optional[StorageBackend] = None):
+        """
+        Initialize the blob cache.
+
+        Args:
+            storage: Backend documents are read from; None serves only cached files
+            cache_dir: Root directory for local caches
+            max_bytes: Upper bound on cached bytes
+            mirror: Local mirror of the storage checked before downloading
+        """
+        self.storage = storage
+        self.mirror = mirror
+        self.root = os.path.join(cache_dir, "blobs")
+        self.max_bytes = max_bytes
+        os.makedirs(self.root, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def path_for(self, name: str, generation: str) -> str:
+        """Return the local path of a blob version."""
+        digest = hashlib.sha256(name.encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.root, f"{digest}-{generation}")
+
+    def fetch(self, name: str, generation: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Ensure a blob version is cached locally.
+
+        Args:
+            name: Object name
+            generation: Object generation; the live version is used if omitted
+
+        Returns:
+            Dict with ``name``, ``generation``, ``path`` and ``cached`` (True
+            when no download was needed)
+        """
+        if generation is None:
+            info = self.storage.stat(name)
+            if info is None:
+                raise FileNotFoundError(f"No such object: {name}")
+            generation = str(info.generation)
+
+        path = self.path_for(name, generation)
+        if os.path.exists(path):
+            os.utime(path)
+            return {"name": name, "generation": generation, "path": path, "cached": True}
+
+        for backend in (self.storage, self.mirror):
+            local_path = backend.local_path(name, generation) if backend else None
+            if local_path:
+                return {"name": name, "generation": generation, "path": local_path, "cached": True}
+
+        if self.storage is None:
+            raise FileNotFoundError(f"{name}#{generation} is not cached")
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        self.storage.download_to_filename(name, tmp_path, generation)
+        os.replace(tmp_path, path)
+        self._evict(keep=path)
+        return {"name": name, "generation": generation, "path": path, "cached": False}
+
+    def read_text(self, name: str, generation: Optional[str] = None,
+                  start: int = 0, length: int = 4000) -> Dict[str, Any]:
+        """
+        Read a page of a document's text.
+
+        Args:
+            name: Object name
+            generation: Object generation; the live version is used if omitted
+            start: Character offset of the page
+            length: Maximum characters returned
+
+        Returns:
+            Dict with ``name``, ``generation``, ``start``, ``text`` and ``has_more``
+        """
+        entry = self.fetch(name, generation)
+        # No newline translation, so offsets match evidence spans
+        with open(entry["path"], "r", encoding="utf-8", errors="replace", newline="") as f:
+            remaining = start
+            while remaining > 0:
+                skipped = f.read(min(remaining, SKIP_CHUNK_CHARS))
+                if not skipped:
+                    break
+                remaining -= len(skipped)
+            text = f.read(length)
+            has_more = bool(f.read(1))
+        return {
+            "name": name,
+            "generation": entry["generation"],
+            "start": start,
+            "text": text,
+            "has_more": has_more,
+        }
+
+    def _evict(self, keep: str) -> None:
+        with self._lock:
+            files = []
+            for filename in os.listdir(self.root):
+                if filename.endswith(".tmp"):
+                    continue
+                path = os.path.join(self.root, filename)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in files)
+            for _, size, path in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                    total -= size
+                except FileNotFoundError:
+                    pass
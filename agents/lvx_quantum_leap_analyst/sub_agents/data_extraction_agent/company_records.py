@@ -0,0 +1,563 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Typed company records for the dashboard's ``companies`` table"""
+
+import os
+import re
+import json
+import math
+import logging
+import argparse
+from typing import Dict, Iterable, List, Any, Optional, Tuple
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .fast_extractor import parse_money
+from .result_store import DEFAULT_CACHE_DIR, ResultStore, company_slug
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RECORDS_DIR = os.path.join(DEFAULT_CACHE_DIR, "warehouse")
+
+# Columns of the frontend ``Company`` type (frontend/types/company.ts), in
+# table order, followed by the lineage columns used to deduplicate loads.
+COMPANY_SCHEMA = pa.schema([
+    ("CompanyName", pa.string()),
+    ("WhatCompanyDoes", pa.string()),
+    ("Industry", pa.string()),
+    ("Region", pa.string()),
+    ("TeamSize", pa.int64()),
+    ("NumberOfFounders", pa.int64()),
+    ("FoundersQualification", pa.string()),
+    ("FundingStage", pa.string()),
+    ("Ask", pa.float64()),
+    ("Valuation", pa.float64()),
+    ("PreviousRounds", pa.string()),
+    ("Traction", pa.string()),
+    ("Revenue", pa.float64()),
+    ("MRR", pa.float64()),
+    ("ARR", pa.float64()),
+    ("ProjectedARRYear", pa.float64()),
+    ("GrossMargin", pa.float64()),
+    ("UnitEconomics", pa.string()),
+    ("BurnRate", pa.float64()),
+    ("Runway", pa.float64()),
+    ("GrowthRate", pa.float64()),
+    ("TAM", pa.float64()),
+    ("SAM", pa.float64()),
+    ("SOM", pa.float64()),
+    ("MarketSize", pa.float64()),
+    ("TargetGeographies", pa.string()),
+    ("Competitors", pa.string()),
+    ("Founders", pa.string()),
+    ("LogoURL", pa.string()),
+    ("Risk1", pa.string()),
+    ("Risk2", pa.string()),
+    ("DealNotes", pa.string()),
+    ("InvestmentRecommendation", pa.string()),
+    ("ExitStrategy", pa.string()),
+    # Bounds of amounts reported as a range ("$3M-5M"); equal for a single amount
+    ("AskLow", pa.float64()),
+    ("AskHigh", pa.float64()),
+    ("ValuationLow", pa.float64()),
+    ("ValuationHigh", pa.float64()),
+    ("SourceFingerprint", pa.string()),
+    ("AnalysisMethod", pa.string()),
+    ("ExtractedAt", pa.string()),
+    ("ValidationIssues", pa.list_(pa.string())),
+])
+
+COMPANY_COLUMNS = COMPANY_SCHEMA.names
+
+# Valid range of numeric columns; values outside are dropped with an issue.
+# Currency amounts only need to be non-negative.
+VALUE_RANGES = {
+    "TeamSize": (1, 1_000_000),
+    "NumberOfFounders": (1, 20),
+    "GrossMargin": (-100.0, 100.0),
+    "Runway": (0.0, 240.0),
+    "GrowthRate": (-100.0, 10_000.0),
+}
+CURRENCY_COLUMNS = ("Ask", "Valuation", "Revenue", "MRR", "ARR", "ProjectedARRYear", "BurnRate",
+                    "TAM", "SAM", "SOM", "MarketSize", "AskLow", "AskHigh", "ValuationLow", "ValuationHigh")
+# Amounts that may be reported as a range, with their low and high columns.
+RANGE_COLUMNS = {"Ask": ("AskLow", "AskHigh"), "Valuation": ("ValuationLow", "ValuationHigh")}
+
+_SCALES = {
+    "k": 1e3, "thousand": 1e3, "m": 1e6, "mm": 1e6, "mn": 1e6, "million": 1e6,
+    "b": 1e9, "bn": 1e9, "billion": 1e9, "t": 1e12, "tn": 1e12, "trillion": 1e12,
+    "l": 1e5, "lakh": 1e5, "lakhs": 1e5, "lac": 1e5, "cr": 1e7, "crore": 1e7, "crores": 1e7,
+}
+AMOUNT_RE = re.compile(
+    r"(?P<num>\d{1,3}(?:,\d{2,3})+(?:\.\d+)?|\d+(?:\.\d+)?)\s?"
+    r"(?P<scale>k|thousand|mm|mn|m|million|bn|b|billion|tn|t|trillion|lakhs?|lac|l|crores?|cr)?\b",
+    re.IGNORECASE,
+)
+_SCALE_WORDS = r"k|thousand|mm|mn|m|million|bn|b|billion|tn|t|trillion|lakhs?|lac|l|crores?|cr"
+_CURRENCY = r"US\$|\$|₹|€|£|(?:USD|INR|EUR|GBP|Rs\.?)\s?"
+AMOUNT_RANGE_RE = re.compile(
+    rf"(?P<low_cur>{_CURRENCY})?\s?(?P<low>\d[\d,]*(?:\.\d+)?)\s?(?P<low_scale>{_SCALE_WORDS})?\b\s?"
+    rf"(?:-|–|—|to)\s?"
+    rf"(?P<high_cur>{_CURRENCY})?\s?(?P<high>\d[\d,]*(?:\.\d+)?)\s?(?P<high_scale>{_SCALE_WORDS})?\b",
+    re.IGNORECASE,
+)
+PERCENT_SUFFIX_RE = re.compile(r"\s?(?:%|percent\b)", re.IGNORECASE)
+PERCENT_RE = re.compile(r"(?P<num>[-+]?\d+(?:\.\d+)?)\s?(?:%|percent\b)", re.IGNORECASE)
+NUMBER_RE = re.compile(r"(?P<num>[-+]?\d+(?:\.\d+)?)")
+TEAM_SIZE_RE = re.compile(r"(?P<num>\d{1,6})\+?\s?(?:full[- ]time\s)?(?:employees|team members|people|FTEs?|staff)\b",
+                          re.IGNORECASE)
+MARKET_TIER_RE = re.compile(r"\b(?P<tier>TAM|SAM|SOM)\b[^.\n\d$₹€£]{0,20}(?P<amount>(?:US\$|\$|₹|€|£)?\s?\d[\d,.]*\s?"
+                            r"(?:k|thousand|mm|mn|m|million|bn|b|billion|tn|t|trillion|lakhs?|lac|crores?|cr)?\b)",
+                            re.IGNORECASE)
+UNIT_ECONOMICS_RE = re.compile(r"\b(?:CAC|LTV|payback|contribution margin|unit economics|AOV)\b", re.IGNORECASE)
+
+# Separator of multi-valued text columns (founders, competitors, investors).
+LIST_SEPARATOR = ", "
+
+
+def _amount(num: str, scale: Optional[str]) -> float:
+    return float(num.replace(",", "")) * _SCALES.get((scale or "").lower(), 1.0)
+
+
+def parse_amount_range(value: Any) -> Optional[Tuple[float, float]]:
+    """
+    Parse a currency amount or range such as ``"$4.2M"``, ``"$3-5M"`` or ``"3M to 5M"``.
+
+    A scale given only on the upper bound applies to both (``$3-5M`` is
+    3M to 5M). Percentages are not amounts and are rejected. Text only
+    counts as an amount when a currency or scale word marks it, or when it
+    is a bare number on its own, so years (``"2024-2025 plan"``) and
+    durations (``"12 months"``) are not read as money.
+
+    Args:
+        value: Number or text
+
+    Returns:
+        ``(low, high)`` in currency units, equal for a single amount, or
+        None if no amount is found
+    """
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return (float(value), float(value)) if math.isfinite(value) else None
+    text = str(value)
+    for match in AMOUNT_RANGE_RE.finditer(text):
+        if PERCENT_SUFFIX_RE.match(text, match.end()):
+            return None
+        if not any(match.group(name) for name in ("low_cur", "low_scale", "high_cur", "high_scale")):
+            continue
+        high_scale = match.group("high_scale")
+        low = _amount(match.group("low"), match.group("low_scale") or high_scale)
+        high = _amount(match.group("high"), high_scale)
+        return low, high
+    money = parse_money(text)
+    if money is not None:
+        return money["value"], money["value"]
+    for match in AMOUNT_RE.finditer(text):
+        if PERCENT_SUFFIX_RE.match(text, match.end()):
+            continue
+        if match.group("scale") or match.group(0).strip() == text.strip():
+            amount = _amount(match.group("num"), match.group("scale"))
+            return amount, amount
+    return None
+
+
+def parse_amount(value: Any) -> Optional[float]:
+    """
+    Parse a single currency amount such as ``4200000``, ``"$4.2M"``, ``"₹5 Cr"`` or ``"38B"``.
+
+    Args:
+        value: Number or text
+
+    Returns:
+        Amount in currency units, or None if no amount is found or the value
+        is a range or a percentage
+    """
+    bounds = parse_amount_range(value)
+    if bounds is None or bounds[0] != bounds[1]:
+        return None
+    return bounds[0]
+
+
+def parse_percent(value: Any) -> Optional[float]:
+    """
+    Parse a percentage such as ``72``, ``"72%"`` or ``"18 percent"``.
+
+    Args:
+        value: Number or text
+
+    Returns:
+        Percentage, or None if no number is found
+    """
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if math.isfinite(value) else None
+    match = PERCENT_RE.search(str(value)) or NUMBER_RE.search(str(value))
+    return float(match.group("num")) if match else None
+
+
+def parse_number(value: Any) -> Optional[float]:
+    """
+    Parse a plain quantity such as ``14``, ``"14 months"`` or ``"18.5"``.
+
+    Args:
+        value: Number or text
+
+    Returns:
+        The first number in the value, or None if there is none
+    """
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if math.isfinite(value) else None
+    match = NUMBER_RE.search(str(value))
+    return float(match.group("num")) if match else None
+
+
+def _entities(analysis: Dict[str, Any], kind: str) -> List[Dict[str, Any]]:
+    return [entity for entity in analysis.get("entities") or []
+            if isinstance(entity, dict) and entity.get("type") == kind and entity.get("name")]
+
+
+def _names(entities: List[Dict[str, Any]]) -> Optional[str]:
+    names = list(dict.fromkeys(str(entity["name"]).strip() for entity in entities))
+    return LIST_SEPARATOR.join(names) or None
+
+
+def _description(entity: Dict[str, Any]) -> Optional[str]:
+    description = (entity.get("properties") or {}).get("description")
+    return description.strip() if isinstance(description, str) and description.strip() else None
+
+
+def _text_fields(analysis: Dict[str, Any]) -> List[str]:
+    """Entity names and descriptions, insights and market notes to scan for figures."""
+    texts = []
+    for entity in analysis.get("entities") or []:
+        if isinstance(entity, dict):
+            texts += [str(entity.get("name") or ""), _description(entity) or ""]
+    texts += [str(item) for item in analysis.get("insights") or []]
+    texts += [str(value) for value in (analysis.get("market_analysis") or {}).values()]
+    return [text for text in texts if text]
+
+
+def _what_company_does(company_name: str, analysis: Dict[str, Any]) -> Optional[str]:
+    if isinstance(analysis.get("summary"), str) and analysis["summary"].strip():
+        return analysis["summary"].strip()
+    for entity in _entities(analysis, "company"):
+        if str(entity["name"]).strip().lower() == company_name.strip().lower() and _description(entity):
+            return _description(entity)
+    return None
+
+
+def validate_record(record: Dict[str, Any]) -> List[str]:
+    """
+    Check a record against the column types and value ranges, in place.
+
+    Values of the wrong type or out of range are set to None and reported;
+    the record is kept so one bad figure does not hide the company.
+
+    Args:
+        record: Record keyed by ``COMPANY_COLUMNS``
+
+    Returns:
+        Issues found, empty if the record is clean
+    """
+    issues = []
+    if not isinstance(record.get("CompanyName"), str) or not record["CompanyName"].strip():
+        issues.append("CompanyName is required")
+
+    for field in COMPANY_SCHEMA:
+        value = record.get(field.name)
+        if value is None or field.name == "ValidationIssues":
+            continue
+        if pa.types.is_string(field.type) and not isinstance(value, str):
+            record[field.name] = str(value)
+        elif pa.types.is_integer(field.type) or pa.types.is_floating(field.type):
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+                issues.append(f"{field.name} is not a number: {value!r}")
+                record[field.name] = None
+                continue
+            record[field.name] = int(round(value)) if pa.types.is_integer(field.type) else float(value)
+
+    for name in CURRENCY_COLUMNS:
+        if record.get(name) is not None and record[name] < 0:
+            issues.append(f"{name} is negative: {record[name]}")
+            record[name] = None
+    for name, (low, high) in VALUE_RANGES.items():
+        if record.get(name) is not None and not low <= record[name] <= high:
+            issues.append(f"{name} out of range [{low}, {high}]: {record[name]}")
+            record[name] = None
+    for low_name, high_name in RANGE_COLUMNS.values():
+        low, high = record.get(low_name), record.get(high_name)
+        if low is not None and high is not None and low > high:
+            issues.append(f"{low_name} exceeds {high_name}: {low} > {high}")
+            record[low_name] = record[high_name] = None
+    return issues
+
+
+def company_record(result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Map an ``extract_company_data`` result to a ``Company`` record.
+
+    Figures come from the rule-based ``metrics`` first, then from the
+    model's market analysis and metric entities; amounts and percentages
+    are parsed to numbers. ARR and MRR fill each other in when only one is
+    reported, and revenue falls back to ARR. An ask or valuation given as a
+    range fills its low and high columns and leaves the single value empty.
+
+    Args:
+        result: Output of ``extract_company_data`` (or a stored result)
+
+    Returns:
+        Validated record keyed by ``COMPANY_COLUMNS``, or None for failed results
+    """
+    if not result or "error" in result or not result.get("entity_analysis"):
+        return None
+    company_name = result.get("company_name") or ""
+    analysis = result["entity_analysis"]
+    metrics = analysis.get("metrics") or {}
+    market = analysis.get("market_analysis") or {}
+    texts = _text_fields(analysis)
+
+    arr, mrr = parse_amount(metrics.get("arr")), parse_amount(metrics.get("mrr"))
+    if arr is None and mrr is not None:
+        arr = mrr * 12
+    elif mrr is None and arr is not None:
+        mrr = arr / 12
+
+    tiers: Dict[str, float] = {}
+    for text in texts:
+        for match in MARKET_TIER_RE.finditer(text):
+            amount = parse_amount(match.group("amount"))
+            if amount is not None:
+                tiers.setdefault(match.group("tier").upper(), amount)
+    tam = parse_amount(metrics.get("tam")) or tiers.get("TAM")
+    market_size = parse_amount(market.get("market_size")) if market.get("market_size") else None
+
+    team_size = None
+    for text in texts:
+        match = TEAM_SIZE_RE.search(text)
+        if match:
+            team_size = int(match.group("num"))
+            break
+
+    founders = _entities(analysis, "founder")
+    markets = _entities(analysis, "market")
+    risks = [str(item) for item in analysis.get("risks_and_opportunities") or []]
+    traction = [str(entity["name"]) for entity in _entities(analysis, "metric")]
+    unit_economics = [text for text in traction + [str(item) for item in analysis.get("insights") or []]
+                      if UNIT_ECONOMICS_RE.search(text)]
+
+    ask, valuation = parse_amount_range(metrics.get("ask")), parse_amount_range(metrics.get("valuation"))
+
+    record: Dict[str, Any] = {name: None for name in COMPANY_COLUMNS}
+    record.update({
+        "CompanyName": company_name,
+        "WhatCompanyDoes": _what_company_does(company_name, analysis),
+        "Industry": str(markets[0]["name"]) if markets else None,
+        "TeamSize": team_size,
+        "NumberOfFounders": len({str(entity["name"]).lower() for entity in founders}) or None,
+        "FoundersQualification": "; ".join(
+            f"{entity['name']}: {_description(entity)}" for entity in founders if _description(entity)) or None,
+        "FundingStage": metrics.get("funding_round") or None,
+        "Ask": ask[0] if ask and ask[0] == ask[1] else None,
+        "Valuation": valuation[0] if valuation and valuation[0] == valuation[1] else None,
+        "PreviousRounds": _names(_entities(analysis, "investor")),
+        "Traction": "; ".join(traction) or None,
+        "Revenue": parse_amount(metrics.get("revenue")) or arr,
+        "MRR": mrr,
+        "ARR": arr,
+        "GrossMargin": parse_percent(metrics.get("gross_margin_pct")),
+        "UnitEconomics": "; ".join(unit_economics) or None,
+        "BurnRate": parse_amount(metrics.get("burn")),
+        "Runway": parse_number(metrics.get("runway_months")),
+        "GrowthRate": parse_percent(metrics.get("growth_pct")),
+        "TAM": tam,
+        "SAM": tiers.get("SAM"),
+        "SOM": tiers.get("SOM"),
+        "MarketSize": market_size or tam,
+        "TargetGeographies": _names(_entities(analysis, "geography") + _entities(analysis, "region")),
+        "Competitors": _names(_entities(analysis, "competitor")),
+        "Founders": _names(founders),
+        "Risk1": risks[0] if risks else None,
+        "Risk2": risks[1] if len(risks) > 1 else None,
+        "AskLow": ask[0] if ask else None,
+        "AskHigh": ask[1] if ask else None,
+        "ValuationLow": valuation[0] if valuation else None,
+        "ValuationHigh": valuation[1] if valuation else None,
+        "SourceFingerprint": result.get("source_fingerprint"),
+        "AnalysisMethod": analysis.get("analysis_method"),
+        "ExtractedAt": result.get("extraction_timestamp"),
+    })
+    record["ValidationIssues"] = validate_record(record)
+    return record
+
+
+class CompanyRecordSink:
+    """
+    Writes company records in bulk batches as a stand-in for the warehouse load.
+
+    Each batch becomes one Parquet or NDJSON file under ``batches/`` (one
+    bulk load), holding only records whose company and source fingerprint
+    have not been loaded before. ``companies.<format>`` is rewritten with
+    the latest record per company, ready for a full-table replace.
+    """
+
+    def __init__(self, output_dir: str = DEFAULT_RECORDS_DIR, table_format: str = "parquet"):
+        """
+        Initialize the sink.
+
+        Args:
+            output_dir: Directory receiving the batch files and snapshot
+            table_format: ``parquet`` or ``ndjson``
+        """
+        if table_format not in ("parquet", "ndjson"):
+            raise ValueError(f"Unsupported table format: {table_format}")
+        self.output_dir = output_dir
+        self.table_format = table_format
+        self.manifest_path = os.path.join(output_dir, "manifest.json")
+        os.makedirs(os.path.join(output_dir, "batches"), exist_ok=True)
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("table_format") == self.table_format:
+                return manifest
+        except (OSError, ValueError):
+            pass
+        return {"table_format": self.table_format, "companies": {}, "batches": []}
+
+    def _save_manifest(self) -> None:
+        self.manifest["updated_at"] = datetime.utcnow().isoformat()
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _write(self, rows: List[Dict[str, Any]], path: str) -> None:
+        tmp_path = f"{path}.tmp"
+        if self.table_format == "parquet":
+            pq.write_table(pa.Table.from_pylist(rows, schema=COMPANY_SCHEMA), tmp_path, compression="zstd")
+        else:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for row in rows:
+                    f.write(json.dumps(row, ensure_ascii=False, separators=(",", ":")) + "\n")
+        os.replace(tmp_path, path)
+
+    def _read(self, path: str) -> List[Dict[str, Any]]:
+        if not os.path.exists(path):
+            return []
+        if self.table_format == "parquet":
+            return pq.read_table(path).to_pylist()
+        with open(path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    @property
+    def snapshot_path(self) -> str:
+        """Path of the table holding the latest record per company."""
+        return os.path.join(self.output_dir, f"companies.{self.table_format}")
+
+    def write_batch(self, records: Iterable[Optional[Dict[str, Any]]],
+                    batch_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Write new records as one batch and refresh the snapshot.
+
+        Records are deduplicated by company and source fingerprint, within
+        the batch and against every earlier batch.
+
+        Args:
+            records: Outputs of ``company_record`` (None entries are skipped)
+            batch_id: Name of the batch file (a timestamp if omitted)
+
+        Returns:
+            Dict with the batch ``path`` (None if nothing new), counts of
+            ``written``, ``unchanged`` and ``rejected`` records and the
+            number of records with validation ``issues``
+        """
+        latest: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        rejected = 0
+        for record in records:
+            if record is None:
+                continue
+            if not (record.get("CompanyName") or "").strip():
+                rejected += 1
+                continue
+            key = (company_slug(record["CompanyName"]), record.get("SourceFingerprint") or "")
+            if key not in latest or (record.get("ExtractedAt") or "") >= (latest[key].get("ExtractedAt") or ""):
+                latest[key] = record
+
+        loaded = self.manifest["companies"]
+        new_rows = [record for (slug, fingerprint), record in sorted(latest.items())
+                    if loaded.get(slug, {}).get("fingerprint") != fingerprint]
+        summary = {"path": None, "written": len(new_rows), "unchanged": len(latest) - len(new_rows),
+                   "rejected": rejected, "issues": sum(bool(row.get("ValidationIssues")) for row in new_rows)}
+        if not new_rows:
+            return summary
+
+        batch_id = batch_id or datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        path = os.path.join(self.output_dir, "batches", f"{company_slug(batch_id)}.{self.table_format}")
+        self._write(new_rows, path)
+
+        snapshot = {company_slug(row["CompanyName"]): row for row in self._read(self.snapshot_path)}
+        for row in new_rows:
+            slug = company_slug(row["CompanyName"])
+            snapshot[slug] = row
+            loaded[slug] = {"company_name": row["CompanyName"], "fingerprint": row.get("SourceFingerprint"),
+                            "batch": os.path.basename(path)}
+        self._write([snapshot[slug] for slug in sorted(snapshot)], self.snapshot_path)
+        self.manifest["batches"].append({"file": os.path.basename(path), "records": len(new_rows),
+                                         "written_at": datetime.utcnow().isoformat()})
+        self._save_manifest()
+
+        summary["path"] = path
+        logger.info(f"Company records: {summary['written']} written to {path}, {summary['unchanged']} unchanged, "
+                    f"{summary['rejected']} rejected, {summary['issues']} with validation issues")
+        return summary
+
+    def export_from_store(self, result_store: ResultStore, batch_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Write every stored analysis not loaded yet as one batch.
+
+        Args:
+            result_store: Store holding ``extract_company_data`` results
+            batch_id: Name of the batch file
+
+        Returns:
+            Batch summary from ``write_batch``
+        """
+        return self.write_batch((company_record(entry.get("result") or {})
+                                 for entry in result_store.iter_entries()), batch_id)
+
+
+def main() -> None:
+    """Normalize stored analyses into company records for the warehouse load."""
+    parser = argparse.ArgumentParser(description="Write typed company records for the dashboard table.")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Result store cache directory.")
+    parser.add_argument("--output-dir", default=DEFAULT_RECORDS_DIR, help="Batch and snapshot directory.")
+    parser.add_argument("--format", choices=["parquet", "ndjson"], default="parquet")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    sink = CompanyRecordSink(args.output_dir, table_format=args.format)
+    print(json.dumps(sink.export_from_store(ResultStore(args.cache_dir)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Side-by-side comparison of stored company analyses"""
+
+import logging
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+from scipy.stats import rankdata
+
+from .result_store import ResultStore
+from .scoring import ReadinessScorer, metric_matrix
+
+logger = logging.getLogger(__name__)
+
+# Metric columns compared, with +1 where higher is better and -1 where lower is.
+COMPARISON_METRICS = {
+    "arr": 1,
+    "mrr": 1,
+    "growth_pct": 1,
+    "gross_margin_pct": 1,
+    "runway_months": 1,
+    "burn": -1,
+    "ask": 0,
+    "valuation": 0,
+    "tam": 1,
+}
+
+# Currency amounts span orders of magnitude and are compared on a log scale.
+LOG_SCALED_METRICS = {"arr", "mrr", "burn", "ask", "valuation", "tam"}
+
+# Insights and risks carried per company into the comparison.
+MAX_INSIGHTS_PER_COMPANY = 3
+MAX_RISKS_PER_COMPANY = 2
+
+
+def normalize_metrics(matrix: np.ndarray, columns: List[str]) -> Dict[str, np.ndarray]:
+    """
+    Normalize metric columns across companies.
+
+    Currency columns are log-scaled first. Each column gets a z-score and a
+    0-1 percentile rank computed over the companies that reported it; tied
+    values share their average rank and missing values stay NaN.
+
+    Args:
+        matrix: Output of ``metric_matrix``
+        columns: Metric names of the matrix columns
+
+    Returns:
+        Dict with ``zscore`` and ``percentile`` matrices
+    """
+    scaled = matrix.copy()
+    log_cols = [i for i, name in enumerate(columns) if name in LOG_SCALED_METRICS]
+    scaled[:, log_cols] = np.log1p(np.clip(scaled[:, log_cols], 0, None))
+
+    present = ~np.isnan(scaled)
+    counts = present.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.nansum(scaled, axis=0) / np.where(counts, counts, 1)
+        centered = np.where(present, scaled - mean, 0.0)
+        std = np.sqrt((centered ** 2).sum(axis=0) / np.where(counts, counts, 1))
+        zscore = np.where(present, centered / np.where(std > 0, std, 1.0), np.nan)
+
+        # 1-based average ranks within each column; missing values rank as NaN
+        ranks = rankdata(scaled, method="average", axis=0, nan_policy="omit")
+        percentile = np.where(present, (ranks - 1) / np.where(counts > 1, counts - 1, 1), np.nan)
+    return {"zscore": zscore, "percentile": percentile}
+
+
+def _rounded(value: float, digits: int = 2) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), digits)
+
+
+class CompanyComparator:
+    """
+    Compares already-extracted companies from the result store in one pass.
+
+    No extraction or model call happens here: stored analyses are reduced
+    to a metric matrix, normalized with vectorized NumPy operations and
+    rendered as one compact table for a single synthesis call.
+    """
+
+    def __init__(self, result_store: ResultStore, columns: Optional[List[str]] = None,
+                 scorer: Optional[ReadinessScorer] = None):
+        """
+        Initialize the comparator.
+
+        Args:
+            result_store: Store holding ``extract_company_data`` results
+            columns: Metric columns to compare (defaults to ``COMPARISON_METRICS``)
+            scorer: Readiness scorer for the score column
+        """
+        self.result_store = result_store
+        self.columns = list(columns or COMPARISON_METRICS)
+        self.scorer = scorer or ReadinessScorer()
+
+    def compare(self, company_names: List[str]) -> Dict[str, Any]:
+        """
+        Compare a set of companies.
+
+        Args:
+            company_names: Companies to compare
+
+        Returns:
+            Dict with ``companies`` (including their readiness score and
+            tier), metric ``columns``, raw ``values``,
+            ``percentile`` ranks (1.0 is the favourable end, or the highest
+            value for direction-neutral metrics), per-company
+            ``highlights``, the rendered ``table`` and companies ``missing``
+            from the store
+        """
+        companies, results, analyses, missing = [], [], [], []
+        for company_name in company_names:
+            result = self.result_store.get(company_name)
+            analysis = (result or {}).get("entity_analysis")
+            if not analysis:
+                missing.append(company_name)
+                continue
+            companies.append({
+                "company_name": result.get("company_name", company_name),
+                "analysis_method": analysis.get("analysis_method"),
+                "funding_round": (analysis.get("metrics") or {}).get("funding_round"),
+                "completeness_score": ((result.get("raw_data") or {}).get("data_quality") or {}).get(
+                    "completeness_score"),
+                "source_fingerprint": result.get("source_fingerprint"),
+            })
+            results.append(result)
+            analyses.append(analysis)
+
+        for company, scored in zip(companies, self.scorer.score_results(results)):
+            company["readiness_score"] = scored["readiness_score"]
+            company["tier"] = scored["tier"]
+
+        matrix = metric_matrix(analyses, self.columns)
+        normalized = normalize_metrics(matrix, self.columns)
+        directions = np.array([COMPARISON_METRICS.get(name, 0) for name in self.columns])
+        # Flip lower-is-better columns so 1.0 is always the favourable end
+        percentile = np.where(directions < 0, 1 - normalized["percentile"], normalized["percentile"])
+
+        highlights = {
+            company["company_name"]: {
+                "insights": (analysis.get("insights") or [])[:MAX_INSIGHTS_PER_COMPANY],
+                "risks": (analysis.get("risks_and_opportunities") or [])[:MAX_RISKS_PER_COMPANY],
+            }
+            for company, analysis in zip(companies, analyses)
+        }
+
+        comparison = {
+            "companies": companies,
+            "columns": self.columns,
+            "values": [[_rounded(v) for v in row] for row in matrix],
+            "percentile": [[_rounded(v) for v in row] for row in percentile],
+            "highlights": highlights,
+            "missing": missing,
+        }
+        comparison["table"] = self.format_table(comparison)
+        return comparison
+
+    def format_table(self, comparison: Dict[str, Any]) -> str:
+        """
+        Render a comparison as a compact pipe table.
+
+        Cells show the reported value with its direction-adjusted percentile
+        in brackets; ``-`` marks metrics a company did not report.
+        """
+        columns = comparison["columns"]
+        lines = ["| company | stage | score | " + " | ".join(columns) + " |",
+                 "|" + "---|" * (len(columns) + 3)]
+        for company, values, ranks in zip(comparison["companies"], comparison["values"], comparison["percentile"]):
+            cells = []
+            for value, rank in zip(values, ranks):
+                if value is None:
+                    cells.append("-")
+                else:
+                    shown = f"{value:,.0f}" if abs(value) >= 1000 else f"{value:g}"
+                    cells.append(f"{shown} [{rank:.2f}]" if rank is not None else shown)
+            lines.append(f"| {company['company_name']} | {company['funding_round'] or '-'} | "
+                         f"{company['readiness_score']:g} | " + " | ".join(cells) + " |")
+        return "\n".join(lines)
@@ -0,0 +1,433 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Token, latency and cost accounting for Gemini calls"""
+
+import os
+import json
+import time
+import atexit
+import sqlite3
+import logging
+import argparse
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+
+from .prompt_budget import CHARS_PER_TOKEN
+from .result_store import DEFAULT_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+# USD per million tokens: (input, output, cached input).
+MODEL_PRICES = {
+    "gemini-2.0-flash-exp": (0.10, 0.40, 0.025),
+    "gemini-2.0-flash": (0.10, 0.40, 0.025),
+    "gemini-2.0-flash-lite": (0.075, 0.30, 0.01875),
+}
+
+# Ledger location: a SQLite database, a .jsonl file, or "off" to keep
+# aggregates in memory only.
+USAGE_DB = os.getenv("LVX_USAGE_DB", os.path.join(DEFAULT_CACHE_DIR, "usage.sqlite"))
+
+# Buffered calls are written out after this many seconds or records.
+USAGE_FLUSH_SECONDS = float(os.getenv("LVX_USAGE_FLUSH_SECONDS", "30"))
+USAGE_FLUSH_RECORDS = 200
+
+CALL_COLUMNS = [
+    "ts", "model", "label", "tenant", "company", "session", "batch", "prompt_chars",
+    "prompt_tokens", "cached_tokens", "output_tokens", "latency_s", "cost_usd", "estimated",
+]
+
+# Session state key holding the root session's id. AgentTool runs sub-agents
+# in a new session that copies the caller's state, so calls made there are
+# still billed to the session the user is talking to.
+SESSION_STATE_KEY = "lvx_session"
+
+GROUP_COLUMNS = ("model", "label", "tenant", "company", "session", "batch")
+
+_SUMMED_FIELDS = ("prompt_tokens", "cached_tokens", "output_tokens", "latency_s", "cost_usd")
+
+
+def _empty_totals() -> Dict[str, Any]:
+    return {"calls": 0, "estimated_calls": 0, "prompt_tokens": 0, "cached_tokens": 0, "output_tokens": 0,
+            "latency_s": 0.0, "cost_usd": 0.0}
+
+
+def _add_call(totals: Dict[str, Any], call: Dict[str, Any]) -> None:
+    totals["calls"] += 1
+    totals["estimated_calls"] += int(call["estimated"])
+    for field in _SUMMED_FIELDS:
+        totals[field] += call[field]
+
+
+def _rounded(totals: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: round(value, 6) if isinstance(value, float) else value for key, value in totals.items()}
+
+
+def parse_prices(spec: str) -> Dict[str, Tuple[float, float, float]]:
+    """
+    Parse a ``model=input:output[:cached],...`` override of ``MODEL_PRICES``.
+
+    Args:
+        spec: Comma-separated overrides in USD per million tokens
+
+    Returns:
+        Complete price table with overrides applied
+    """
+    prices = dict(MODEL_PRICES)
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        model, _, values = item.partition("=")
+        numbers = [float(value) for value in values.split(":")]
+        if len(numbers) not in (2, 3):
+            raise ValueError(f"Expected input:output[:cached] prices for {model}")
+        prices[model.strip()] = (numbers[0], numbers[1], numbers[2] if len(numbers) == 3 else numbers[0])
+    return prices
+
+
+class UsageScope:
+    """
+    Running totals for one unit of work: an extraction, a session or a batch.
+
+    Scopes nest; a call counted in a scope is also counted in its parents,
+    and a scope inherits the tenant, session and batch of its parent.
+    """
+
+    def __init__(self, company: Optional[str] = None, session: Optional[str] = None,
+                 batch: Optional[str] = None, tenant: Optional[str] = None,
+                 parent: Optional["UsageScope"] = None):
+        """
+        Initialize the scope.
+
+        Args:
+            company: Company the work is for
+            session: Agent session the work belongs to
+            batch: Batch (e.g. a pre-warm run) the work belongs to
+            tenant: Tenant the work is billed to
+            parent: Enclosing scope
+        """
+        self.parent = parent
+        self.company = company or (parent.company if parent else None)
+        self.session = session or (parent.session if parent else None)
+        self.batch = batch or (parent.batch if parent else None)
+        self.tenant = tenant or (parent.tenant if parent else None)
+        self.totals = _empty_totals()
+        self.by_label: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, call: Dict[str, Any]) -> None:
+        """Count a call in this scope and its parents."""
+        scope = self
+        while scope is not None:
+            with scope._lock:
+                _add_call(scope.totals, call)
+                _add_call(scope.by_label.setdefault(call["label"], _empty_totals()), call)
+            scope = scope.parent
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the scope's totals, overall and per call label."""
+        with self._lock:
+            return {
+                **_rounded(self.totals),
+                "by_label": {label: _rounded(totals) for label, totals in self.by_label.items()},
+            }
+
+
+_current_scope: ContextVar[Optional[UsageScope]] = ContextVar("lvx_usage_scope", default=None)
+
+
+def current_usage_scope() -> Optional[UsageScope]:
+    """Return the innermost active usage scope, if any."""
+    return _current_scope.get()
+
+
+@contextmanager
+def usage_scope(**attributes: Any) -> Iterator[UsageScope]:
+    """
+    Activate a usage scope for the calls made inside the block.
+
+    Use in plain (non-generator) code such as tool functions and worker
+    tasks; generators should create a ``UsageScope`` and pass it explicitly.
+
+    Args:
+        **attributes: ``company``, ``session``, ``batch`` and/or ``tenant``
+    """
+    scope = UsageScope(parent=_current_scope.get(), **attributes)
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_scope.reset(token)
+
+
+def _usage_counts(usage: Any) -> Optional[Tuple[int, int, int]]:
+    """Read (prompt, cached, output) token counts from a response's ``usage_metadata``."""
+    prompt_tokens = getattr(usage, "prompt_token_count", None) if usage is not None else None
+    if not prompt_tokens:
+        return None
+    return (int(prompt_tokens), int(getattr(usage, "cached_content_token_count", 0) or 0),
+            int(getattr(usage, "candidates_token_count", 0) or 0))
+
+
+class CostLedger:
+    """
+    Records every model call with its tokens, latency and estimated cost.
+
+    Calls are aggregated in memory (per model, label, tenant and company)
+    and buffered; the buffer is written to SQLite (or appended to a JSON-lines
+    file) once ``flush_seconds`` have passed or ``flush_records`` calls are
+    pending, and at interpreter exit. Token counts come from the response's
+    ``usage_metadata``; when a response carries none (replayed or fake
+    models) they are estimated from character counts and flagged.
+    """
+
+    def __init__(self, path: Optional[str] = USAGE_DB, prices: Optional[Dict[str, Tuple[float, float, float]]] = None,
+                 flush_seconds: float = USAGE_FLUSH_SECONDS, flush_records: int = USAGE_FLUSH_RECORDS):
+        """
+        Initialize the ledger.
+
+        Args:
+            path: SQLite database or ``.jsonl`` file; None or ``off`` keeps
+                aggregates in memory only
+            prices: Price table (defaults to ``LVX_MODEL_PRICES`` applied over ``MODEL_PRICES``)
+            flush_seconds: Maximum age of buffered calls
+            flush_records: Maximum number of buffered calls
+        """
+        self.path = None if path in (None, "", "off") else path
+        self.prices = prices or parse_prices(os.getenv("LVX_MODEL_PRICES", ""))
+        self.flush_seconds = flush_seconds
+        self.flush_records = max(1, flush_records)
+        self.totals: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+        self._buffer: List[Dict[str, Any]] = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def cost(self, model: str, prompt_tokens: int, output_tokens: int, cached_tokens: int = 0) -> float:
+        """Estimate the USD cost of a call; unknown models are priced at zero."""
+        input_price, output_price, cached_price = self.prices.get(model, (0.0, 0.0, 0.0))
+        uncached = max(prompt_tokens - cached_tokens, 0)
+        return (uncached * input_price + cached_tokens * cached_price + output_tokens * output_price) / 1e6
+
+    def record(self, model: str, label: str, prompt_chars: int, output_chars: int, latency_s: float,
+               usage: Any = None, scope: Optional[UsageScope] = None) -> Dict[str, Any]:
+        """
+        Record one model call.
+
+        Args:
+            model: Model name used for pricing
+            label: Kind of call, e.g. ``analysis`` or ``summary``
+            prompt_chars: Characters sent in the request
+            output_chars: Characters received
+            latency_s: Wall time of the call, including streaming
+            usage: The response's ``usage_metadata``, if any
+            scope: Scope to count the call in (defaults to the active scope)
+
+        Returns:
+            The recorded call
+        """
+        scope = scope or _current_scope.get()
+        counts = _usage_counts(usage)
+        estimated = counts is None
+        if estimated:
+            counts = (-(-prompt_chars // CHARS_PER_TOKEN), 0, -(-output_chars // CHARS_PER_TOKEN))
+        prompt_tokens, cached_tokens, output_tokens = counts
+        call = {
+            "ts": time.time(),
+            "model": model,
+            "label": label,
+            "tenant": scope.tenant if scope else None,
+            "company": scope.company if scope else None,
+            "session": scope.session if scope else None,
+            "batch": scope.batch if scope else None,
+            "prompt_chars": prompt_chars,
+            "prompt_tokens": prompt_tokens,
+            "cached_tokens": cached_tokens,
+            "output_tokens": output_tokens,
+            "latency_s": round(latency_s, 4),
+            "cost_usd": self.cost(model, prompt_tokens, output_tokens, cached_tokens),
+            "estimated": estimated,
+        }
+        if scope:
+            scope.add(call)
+
+        with self._lock:
+            key = (model, label, call["tenant"] or "", call["company"] or "")
+            _add_call(self.totals.setdefault(key, _empty_totals()), call)
+            if self.path:
+                self._buffer.append(call)
+            due = len(self._buffer) >= self.flush_records or (
+                self._buffer and time.monotonic() - self._last_flush >= self.flush_seconds)
+        if due:
+            self.flush()
+        return call
+
+    def flush(self) -> int:
+        """
+        Write buffered calls to the ledger file.
+
+        Returns:
+            Number of calls written
+        """
+        with self._flush_lock:
+            with self._lock:
+                calls, self._buffer = self._buffer, []
+                self._last_flush = time.monotonic()
+            if not calls or not self.path:
+                return 0
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                if self.path.endswith(".jsonl"):
+                    with open(self.path, "a", encoding="utf-8") as f:
+                        f.writelines(json.dumps(call) + "\n" for call in calls)
+                else:
+                    with self._connect() as connection:
+                        connection.executemany(
+                            f"INSERT INTO model_calls ({', '.join(CALL_COLUMNS)}) "
+                            f"VALUES ({', '.join('?' * len(CALL_COLUMNS))})",
+                            [tuple(call[column] for column in CALL_COLUMNS) for call in calls])
+                    connection.close()
+            except (OSError, sqlite3.Error) as e:
+                logger.error(f"Error writing usage ledger {self.path}: {e}")
+                with self._lock:
+                    self._buffer[:0] = calls
+                return 0
+            return len(calls)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS model_calls (ts REAL, model TEXT, label TEXT, tenant TEXT, company TEXT, "
+            "session TEXT, batch TEXT, prompt_chars INTEGER, prompt_tokens INTEGER, cached_tokens INTEGER, "
+            "output_tokens INTEGER, latency_s REAL, cost_usd REAL, estimated INTEGER)")
+        connection.execute("CREATE INDEX IF NOT EXISTS model_calls_company ON model_calls (company, ts)")
+        return connection
+
+    def report(self, group_by: str = "company", since: Optional[float] = None,
+               limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Aggregate recorded calls from the SQLite ledger, most expensive first.
+
+        Args:
+            group_by: One of ``model``, ``label``, ``tenant``, ``company``, ``session`` or ``batch``
+            since: Only count calls after this Unix time
+            limit: Maximum number of groups returned
+
+        Returns:
+            One dict per group with calls, token totals, mean latency and cost
+        """
+        if group_by not in GROUP_COLUMNS:
+            raise ValueError(f"Cannot group usage by {group_by}")
+        if not self.path or self.path.endswith(".jsonl"):
+            raise ValueError("Usage reports need a SQLite ledger")
+        self.flush()
+        with self._connect() as connection:
+            rows = connection.execute(
+                f"SELECT {group_by}, COUNT(*), SUM(prompt_tokens), SUM(cached_tokens), SUM(output_tokens), "
+                f"AVG(latency_s), SUM(cost_usd), SUM(estimated) FROM model_calls WHERE ts >= ? "
+                f"GROUP BY {group_by} ORDER BY SUM(cost_usd) DESC LIMIT ?",
+                (since or 0, limit or -1)).fetchall()
+        connection.close()
+        return [
+            {group_by: row[0], "calls": row[1], "prompt_tokens": row[2], "cached_tokens": row[3],
+             "output_tokens": row[4], "mean_latency_s": round(row[5], 3), "cost_usd": round(row[6], 6),
+             "estimated_calls": row[7]}
+            for row in rows
+        ]
+
+    def meter(self, model: Any, model_name: str, label: str, scope: Optional[UsageScope] = None) -> "MeteredModel":
+        """Wrap a model so each of its calls is recorded in this ledger."""
+        return MeteredModel(model, self, model_name, label, scope)
+
+
+class MeteredModel:
+    """``GenerativeModel`` wrapper that records each ``generate_content`` call in a ledger."""
+
+    def __init__(self, model: Any, ledger: CostLedger, model_name: str, label: str,
+                 scope: Optional[UsageScope] = None):
+        """
+        Initialize the wrapper.
+
+        Args:
+            model: Model (or replay stand-in) to call
+            ledger: Ledger receiving the calls
+            model_name: Model name used for pricing
+            label: Kind of call, e.g. ``analysis`` or ``summary``
+            scope: Scope to count calls in (defaults to the active scope at call time)
+        """
+        self.model = model
+        self.ledger = ledger
+        self.model_name = model_name
+        self.label = label
+        self.scope = scope
+
+    def generate_content(self, contents: Any, stream: bool = False, **kwargs: Any) -> Any:
+        """Call the model and record tokens, latency and cost."""
+        prompt_chars = len(contents) if isinstance(contents, str) else len(json.dumps(contents, default=str))
+        started = time.perf_counter()
+        if stream:
+            return self._stream(contents, prompt_chars, started, kwargs)
+        response = self.model.generate_content(contents, **kwargs)
+        self.ledger.record(self.model_name, self.label, prompt_chars, len(response.text or ""),
+                           time.perf_counter() - started, getattr(response, "usage_metadata", None), self.scope)
+        return response
+
+    def _stream(self, contents: Any, prompt_chars: int, started: float, kwargs: Dict[str, Any]) -> Iterator[Any]:
+        output_chars, usage = 0, None
+        try:
+            for chunk in self.model.generate_content(contents, stream=True, **kwargs):
+                output_chars += len(chunk.text or "")
+                # The final chunk carries the totals for the whole response
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                yield chunk
+        finally:
+            self.ledger.record(self.model_name, self.label, prompt_chars, output_chars,
+                               time.perf_counter() - started, usage, self.scope)
+
+
+_default_ledger: Optional[CostLedger] = None
+_default_ledger_lock = threading.Lock()
+
+
+def get_cost_ledger() -> CostLedger:
+    """Return the process-wide ledger configured by ``LVX_USAGE_DB``, flushed at exit."""
+    global _default_ledger
+    with _default_ledger_lock:
+        if _default_ledger is None:
+            _default_ledger = CostLedger()
+            atexit.register(_default_ledger.flush)
+        return _default_ledger
+
+
+def main() -> None:
+    """Print model usage and cost grouped by company, session, batch or model."""
+    parser = argparse.ArgumentParser(description="Report Gemini token usage and cost.")
+    parser.add_argument("--db", default=USAGE_DB, help="SQLite usage ledger (defaults to LVX_USAGE_DB).")
+    parser.add_argument("--group-by", choices=GROUP_COLUMNS, default="company")
+    parser.add_argument("--days", type=float, help="Only count calls from the last N days.")
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    since = time.time() - args.days * 86400 if args.days else None
+    rows = CostLedger(args.db).report(args.group_by, since=since, limit=args.limit)
+    print(f"{args.group_by[:28]:<28} {'calls':>6} {'prompt':>10} {'cached':>9} {'output':>9} {'latency':>8} {'usd':>10}")
+    for row in rows:
+        print(f"{str(row[args.group_by])[:28]:<28} {row['calls']:>6} {row['prompt_tokens']:>10} "
+              f"{row['cached_tokens']:>9} {row['output_tokens']:>9} {row['mean_latency_s']:>8.2f} "
+              f"{row['cost_usd']:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Process-pool stage for CPU-bound post-processing"""
+
+import os
+import json
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Any, Optional, Tuple
+
+from .prompt_budget import PromptBudgeter
+from .fast_extractor import get_fast_extractor
+
+logger = logging.getLogger(__name__)
+
+# Number of worker processes; 0 runs every task inline in the calling thread.
+DEFAULT_CPU_WORKERS = int(os.getenv("LVX_CPU_WORKERS", "0"))
+
+# Texts at least this large are handed to workers through shared memory.
+SHARED_MEMORY_MIN_BYTES = 64 * 1024
+
+
+def merge_entities(entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Merge entities that share an id, keeping the first occurrence and
+    filling in properties it is missing from later duplicates.
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    for entity in entities:
+        if not isinstance(entity, dict):
+            continue
+        key = str(entity.get("id") or entity.get("name") or "")
+        if key not in merged:
+            merged[key] = entity
+            continue
+        properties = merged[key].setdefault("properties", {})
+        for name, value in (entity.get("properties") or {}).items():
+            properties.setdefault(name, value)
+    return list(merged.values())
+
+
+def _parse_response(text: str, company_name: str) -> Dict[str, Any]:
+    cleaned_text = text.strip()
+    if cleaned_text.startswith("```json"):
+        cleaned_text = cleaned_text[7:]
+    if cleaned_text.endswith("```"):
+        cleaned_text = cleaned_text[:-3]
+    try:
+        analysis = json.loads(cleaned_text.strip())
+    except json.JSONDecodeError as e:
+        return {"parse_error": f"Failed to parse response as JSON: {e}"}
+    if not isinstance(analysis, dict):
+        return {"parse_error": "Response JSON is not an object"}
+    if isinstance(analysis.get("entities"), list):
+        analysis["entities"] = merge_entities(analysis["entities"])
+    return analysis
+
+
+def _prepare_prompt(text: str, company_name: str, max_tokens: int,
+                    boilerplate_min_repeats: int = 3, with_anchors: bool = True) -> Dict[str, Any]:
+    compacted = PromptBudgeter(max_tokens, boilerplate_min_repeats).compact(text)
+    anchors = ""
+    if with_anchors:
+        extractor = get_fast_extractor()
+        anchors = extractor.format_anchors(extractor.extract_anchors(text))
+    return {"compacted": compacted, "anchors": anchors}
+
+
+def _rule_based_analysis(text: str, company_name: str) -> Dict[str, Any]:
+    return get_fast_extractor().analyze(text, company_name)
+
+
+def _extract_metrics(text: str, company_name: str) -> Dict[str, Any]:
+    return get_fast_extractor().extract(text, company_name)["metrics"]
+
+
+# Tasks the stage can run; each takes the text and company name first.
+TASKS = {
+    "parse_response": _parse_response,
+    "prepare_prompt": _prepare_prompt,
+    "rule_based_analysis": _rule_based_analysis,
+    "extract_metrics": _extract_metrics,
+}
+
+
+def _encode(result: Dict[str, Any]) -> bytes:
+    """Serialize a task result to the compact JSON both execution modes return."""
+    return json.dumps(result, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _run_in_worker(task: str, text_ref: Tuple[str, Any, int], company_name: str,
+                   kwargs: Dict[str, Any]) -> bytes:
+    """Worker entry point: read the input text, run the task, return compact JSON."""
+    kind, value, size = text_ref
+    if kind == "shm":
+        block = shared_memory.SharedMemory(name=value)
+        try:
+            text = bytes(block.buf[:size]).decode("utf-8")
+        finally:
+            block.close()
+    else:
+        text = value
+    return _encode(TASKS[task](text, company_name, **kwargs))
+
+
+class CpuStage:
+    """
+    Runs CPU-heavy parsing, compaction and rule-based extraction in a
+    process pool, so concurrent analyses use every core instead of
+    contending on the GIL.
+
+    Large input texts are written once into shared memory and read by the
+    worker in place; results come back as a single compact JSON buffer
+    rather than a pickled object graph. With ``workers=0`` tasks run
+    inline, which is the default for interactive use; their results go
+    through the same JSON round trip, so both modes return the same shape.
+
+    ``run`` blocks the calling thread until the task finishes. The
+    extraction pipeline is synchronous and already runs off the event loop
+    (tool threads, ``asyncio.to_thread`` in the streaming agent).
+    """
+
+    def __init__(self, workers: int = DEFAULT_CPU_WORKERS):
+        """
+        Initialize the stage.
+
+        Args:
+            workers: Number of worker processes; 0 runs tasks inline
+        """
+        self.workers = max(0, workers)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # Spawn rather than fork: forking a process with live gRPC
+                # channels from the storage and Vertex AI clients is unsafe.
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                logger.info(f"Started CPU stage with {self.workers} worker processes")
+            return self._pool
+
+    def run(self, task: str, text: str, company_name: str = "", **kwargs: Any) -> Dict[str, Any]:
+        """
+        Run a task on a text, in a worker process when the pool is enabled.
+
+        Args:
+            task: Name of a task in ``TASKS``
+            text: Input text (company text or model response)
+            company_name: Name of the company the text belongs to
+            **kwargs: Extra task arguments
+
+        Returns:
+            The task's result, as JSON-compatible values
+        """
+        if task not in TASKS:
+            raise ValueError(f"Unknown CPU task: {task}")
+        if not self.workers:
+            return json.loads(_encode(TASKS[task](text, company_name, **kwargs)))
+
+        data = text.encode("utf-8")
+        block = None
+        if len(data) >= SHARED_MEMORY_MIN_BYTES:
+            block = shared_memory.SharedMemory(create=True, size=len(data))
+            block.buf[:len(data)] = data
+            text_ref = ("shm", block.name, len(data))
+        else:
+            text_ref = ("inline", text, len(data))
+
+        try:
+            payload = self._get_pool().submit(_run_in_worker, task, text_ref, company_name, kwargs).result()
+        finally:
+            if block is not None:
+                block.close()
+                block.unlink()
+        return json.loads(payload)
+
+    def warm(self) -> None:
+        """Start the worker processes now, so the first request does not pay for spawning them."""
+        if not self.workers:
+            return
+        pool = self._get_pool()
+        # One small task per worker makes every process import the extractors
+        for future in [pool.submit(_run_in_worker, "rule_based_analysis", ("inline", "", 0), "", {})
+                       for _ in range(self.workers)]:
+            future.result()
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+
+_default_stage: Optional[CpuStage] = None
+_default_stage_lock = threading.Lock()
+
+
+def get_cpu_stage() -> CpuStage:
+    """Return the shared CPU stage configured from ``LVX_CPU_WORKERS``."""
+    global _default_stage
+    with _default_stage_lock:
+        if _default_stage is None:
+            _default_stage = CpuStage()
+        return _default_stage
@@ -0,0 +1,230 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Chunked, memory-bounded reading of company documents"""
+
+import os
+import heapq
+import codecs
+import logging
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+
+from .fast_extractor import FastExtractor, get_fast_extractor
+from .prompt_budget import MAX_PASSAGE_CHARS, _split_passages, score_passage
+from .span_index import TermCounter
+from .storage_backend import ObjectInfo, StorageBackend
+
+logger = logging.getLogger(__name__)
+
+# Bytes fetched per ranged download.
+STREAM_CHUNK_BYTES = int(os.getenv("LVX_STREAM_CHUNK_BYTES", str(1024 * 1024)))
+
+# Distinct anchors kept per kind while scanning a document.
+MAX_ANCHORS_PER_KIND = 50
+
+# Joins the kept passages of a digest.
+PASSAGE_SEPARATOR = "\n\n"
+
+
+def blob_reference(blob: ObjectInfo, storage: StorageBackend) -> Dict[str, Any]:
+    """
+    Describe a blob by name and generation instead of its content.
+
+    Args:
+        blob: Object metadata from the storage backend
+        storage: Backend the blob lives in
+
+    Returns:
+        Dict with ``filename``, ``generation``, ``uri``, ``size`` and ``last_updated``
+    """
+    generation = str(blob.generation) if blob.generation is not None else None
+    uri = storage.uri(blob.name)
+    return {
+        "filename": blob.name,
+        "generation": generation,
+        "uri": f"{uri}#{generation}" if generation else uri,
+        "size": blob.size,
+        "last_updated": blob.updated.isoformat() if blob.updated else None,
+    }
+
+
+def iter_text_chunks(storage: StorageBackend, blob: ObjectInfo,
+                     chunk_bytes: int = STREAM_CHUNK_BYTES) -> Iterator[str]:
+    """
+    Read a blob in byte ranges and yield decoded text chunks.
+
+    Each range is pinned to the blob's generation so a concurrent overwrite
+    cannot splice two versions together. Chunks end on a line break where
+    possible, so line-oriented patterns never see a line split in two; text
+    without line breaks is cut once it reaches ``chunk_bytes`` characters,
+    so memory stays bounded.
+
+    Args:
+        storage: Backend the blob lives in
+        blob: Object metadata of the blob to read
+        chunk_bytes: Bytes fetched per request
+
+    Yields:
+        Text chunks in document order
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    carry = ""
+    for data in storage.stream(blob.name, chunk_bytes, generation=blob.generation):
+        text = carry + decoder.decode(data)
+        cut = text.rfind("\n") + 1
+        if cut:
+            carry = text[cut:]
+            yield text[:cut]
+        elif len(text) >= chunk_bytes:
+            carry = ""
+            yield text
+        else:
+            carry = text
+    tail = carry + decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+class DocumentDigest:
+    """
+    Bounded summary of a document read as a stream: the most relevant
+    passages kept for the model prompt, plus rule-based anchors from the
+    whole document.
+
+    Passages are ranked with the prompt budgeter's relevance score as they
+    arrive. The opening passage is always kept; once
+    the kept text exceeds ``max_chars``, the lowest-ranked passage is
+    evicted, so relevant text late in a long document still reaches the
+    prompt. Each kept passage remembers where it starts in the document, so
+    positions in ``text`` can be mapped back to the source (``segments``).
+    Term counts of the whole document are kept for the search index.
+    """
+
+    def __init__(self, max_chars: int, extractor: Optional[FastExtractor] = None):
+        """
+        Initialize the digest.
+
+        Args:
+            max_chars: Characters of text kept for the prompt
+            extractor: Rule-based extractor used for anchors
+        """
+        self.max_chars = max_chars
+        self.extractor = extractor or get_fast_extractor()
+        self.total_chars = 0
+        self.dropped_chars = 0
+        self.anchors: Dict[str, List[Dict[str, Any]]] = {}
+        self.terms = TermCounter()
+        self._passages: Dict[int, Tuple[int, str]] = {}
+        self._ranked: List[Tuple[float, int]] = []
+        self._kept = 0
+        self._next_seq = 0
+        self._pending = ""
+        self._seen = set()
+
+    def feed(self, chunk: str) -> None:
+        """Consume the next text chunk."""
+        offset = self.total_chars
+        for kind, matches in self.extractor.extract_anchors(chunk).items():
+            kept = self.anchors.setdefault(kind, [])
+            for match in matches:
+                key = (kind, match["text"])
+                if key in self._seen or len(kept) >= MAX_ANCHORS_PER_KIND:
+                    continue
+                self._seen.add(key)
+                kept.append({**match, "start": match["start"] + offset, "end": match["end"] + offset})
+        self.total_chars += len(chunk)
+        self.terms.feed(chunk)
+
+        # The trailing paragraph may continue in the next chunk
+        text = self._pending + chunk
+        cut = text.rfind("\n\n") + 2
+        if cut < 2 and len(text) < MAX_PASSAGE_CHARS:
+            self._pending = text
+            return
+        if cut < 2:
+            cut = len(text)
+        self._pending = text[cut:]
+        self._add_passages(text[:cut], self.total_chars - len(text))
+
+    def _add_passages(self, text: str, offset: int) -> None:
+        for start, end, _ in _split_passages(text):
+            # A single line longer than a passage (text without line breaks) is cut into pieces
+            for piece in range(start, end, MAX_PASSAGE_CHARS):
+                raw = text[piece:min(piece + MAX_PASSAGE_CHARS, end)]
+                body = raw.strip()
+                self._add_passage(body, offset + piece + len(raw) - len(raw.lstrip()))
+
+    def _add_passage(self, body: str, source_start: int) -> None:
+        if not body:
+            return
+        seq = self._next_seq
+        self._next_seq += 1
+        self._passages[seq] = (source_start, body)
+        self._kept += len(body)
+        if seq:
+            heapq.heappush(self._ranked, (score_passage(body), seq))
+        while self._kept > self.max_chars and self._ranked:
+            _, evicted = heapq.heappop(self._ranked)
+            _, removed = self._passages.pop(evicted)
+            self._kept -= len(removed)
+            self.dropped_chars += len(removed)
+
+    def close(self) -> None:
+        """Rank the trailing passage once the stream has ended."""
+        pending, self._pending = self._pending, ""
+        self._add_passages(pending, self.total_chars - len(pending))
+        self.terms.close()
+
+    @property
+    def text(self) -> str:
+        """Kept passages in their original order."""
+        return PASSAGE_SEPARATOR.join(self._passages[seq][1] for seq in sorted(self._passages))
+
+    @property
+    def segments(self) -> List[Tuple[int, int]]:
+        """``(offset in text, offset in the document)`` where each kept passage starts."""
+        segments, position = [], 0
+        for seq in sorted(self._passages):
+            source_start, body = self._passages[seq]
+            segments.append((position, source_start))
+            position += len(body) + len(PASSAGE_SEPARATOR)
+        return segments
+
+    @property
+    def truncated(self) -> bool:
+        """Whether passages were dropped to fit ``max_chars``."""
+        return self.dropped_chars > 0
+
+
+def digest_blob(storage: StorageBackend, blob: ObjectInfo, max_chars: int,
+                chunk_bytes: int = STREAM_CHUNK_BYTES) -> DocumentDigest:
+    """Stream a blob through a ``DocumentDigest``."""
+    digest = DocumentDigest(max_chars)
+    for chunk in iter_text_chunks(storage, blob, chunk_bytes):
+        digest.feed(chunk)
+    digest.close()
+    if digest.truncated:
+        logger.info(
+            f"Kept the most relevant {len(digest.text)} of {digest.total_chars} characters of {blob.name}"
+        )
+    return digest
+
+
+def merge_anchors(*anchor_sets: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Concatenate anchor dicts from several documents, kind by kind."""
+    merged: Dict[str, List[Dict[str, Any]]] = {}
+    for anchors in anchor_sets:
+        for kind, matches in anchors.items():
+            merged.setdefault(kind, []).extend(matches)
+    return merged
@@ -0,0 +1,616 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Deterministic rule-based entity extraction"""
+
+import os
+import re
+import json
+import bisect
+import logging
+from collections import deque
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Built-in gazetteer; extend or override with a JSON file at LVX_GAZETTEER_PATH
+# shaped like {"investor": [...], "technology": [...], "market": [...]}.
+DEFAULT_GAZETTEER = {
+    "investor": [
+        "Sequoia", "Sequoia Capital", "Peak XV", "Accel", "Andreessen Horowitz", "a16z", "Tiger Global",
+        "SoftBank", "Lightspeed", "Matrix Partners", "Nexus Venture Partners", "Blume Ventures",
+        "Elevation Capital", "Kalaari Capital", "Chiratae Ventures", "Stellaris Venture Partners",
+        "3one4 Capital", "Y Combinator", "Techstars", "500 Global", "General Catalyst", "Index Ventures",
+        "Benchmark", "Greylock", "Kleiner Perkins", "Khosla Ventures", "Insight Partners", "Bessemer",
+        "Founders Fund", "GV", "Google Ventures", "Temasek", "Prosus", "Naspers", "Omidyar Network",
+        "Better Capital", "Antler", "Venture Catalysts", "Indian Angel Network", "LetsVenture",
+    ],
+    "technology": [
+        "artificial intelligence", "AI", "machine learning", "deep learning", "computer vision",
+        "natural language processing", "NLP", "generative AI", "LLM", "large language model",
+        "blockchain", "IoT", "internet of things", "cloud", "SaaS", "API", "robotics", "AR", "VR",
+        "edge computing", "5G", "quantum computing", "data analytics", "big data", "microservices",
+        "Kubernetes", "UPI", "account aggregator", "RPA", "drones", "lidar", "battery", "EV",
+    ],
+    "market": [
+        "fintech", "wealthtech", "insurtech", "healthtech", "edtech", "agritech", "proptech",
+        "legaltech", "HR tech", "martech", "adtech", "logistics", "supply chain", "e-commerce",
+        "D2C", "B2B", "B2C", "SaaS", "marketplace", "gaming", "mobility", "electric vehicles",
+        "clean energy", "climate tech", "cybersecurity", "biotech", "medtech", "retail",
+        "mutual funds", "payments", "lending", "insurance", "real estate", "manufacturing",
+        "warehouse", "food delivery", "travel", "media", "enterprise software", "SME", "MSME",
+    ],
+}
+
+# Gazetteer names that are also common words ("Benchmark results"). They
+# count only when capitalised as listed and within CONTEXT_WINDOW characters
+# of a context word for their kind, in the same sentence.
+CONTEXT_REQUIRED = {
+    "investor": {"Benchmark", "Antler", "Lightspeed"},
+}
+CONTEXT_RE = {
+    "investor": re.compile(
+        r"\b(?:invest\w*|backed|led by|co-led|participation|raised?|raising|funding|funded|round|seed|"
+        r"series [a-h]|venture|vc|capital|portfolio|cap table)\b", re.IGNORECASE),
+}
+CONTEXT_WINDOW = 60
+
+# Longest sentence excerpt kept as evidence for dates.
+EVIDENCE_CHARS = 160
+
+_SCALE_WORDS = {
+    "k": 1e3, "thousand": 1e3,
+    "m": 1e6, "mm": 1e6, "mn": 1e6, "million": 1e6,
+    "b": 1e9, "bn": 1e9, "billion": 1e9,
+    "l": 1e5, "lakh": 1e5, "lakhs": 1e5, "lac": 1e5,
+    "cr": 1e7, "crore": 1e7, "crores": 1e7,
+}
+_CURRENCY_CODES = {"$": "USD", "usd": "USD", "us$": "USD", "₹": "INR", "inr": "INR", "rs": "INR", "rs.": "INR",
+                   "€": "EUR", "eur": "EUR", "£": "GBP", "gbp": "GBP"}
+
+_SCALE = r"(?:k|thousand|mm|mn|m|million|bn|b|billion|lakhs?|lac|l|crores?|cr)\b"
+_AMOUNT = r"\d{1,3}(?:,\d{2,3})+(?:\.\d+)?|\d+(?:\.\d+)?"
+
+MONEY_RE = re.compile(
+    rf"(?P<cur>US\$|\$|₹|€|£|\b(?:USD|INR|EUR|GBP|Rs\.?)\s?)\s?(?P<num>{_AMOUNT})\s?(?P<scale>{_SCALE})?"
+    rf"|(?P<num2>{_AMOUNT})\s?(?P<scale2>{_SCALE})\s?(?P<cur2>USD|INR|EUR|GBP|dollars|rupees)\b",
+    re.IGNORECASE,
+)
+PERCENT_RE = re.compile(r"(?P<num>[-+]?\d+(?:\.\d+)?)\s?(?:%|percent\b)", re.IGNORECASE)
+RECURRING_REVENUE_RE = re.compile(
+    r"\b(?P<kind>ARR|MRR)\b[^.\n$₹€£\d]{0,30}(?P<money>(?:US\$|\$|₹|€|£|\b(?:USD|INR|Rs\.?)\s?)\s?"
+    rf"(?:{_AMOUNT})\s?(?:{_SCALE})?)"
+    r"|(?P<money2>(?:US\$|\$|₹|€|£|\b(?:USD|INR|Rs\.?)\s?)\s?"
+    rf"(?:{_AMOUNT})\s?(?:{_SCALE})?)\s?(?:in\s)?(?P<kind2>ARR|MRR)\b",
+    re.IGNORECASE,
+)
+ROUND_RE = re.compile(
+    r"\b(?P<round>pre-?seed|seed|angel|pre-series\s[a-e]|series\s[a-h]|bridge|ipo)\b(?:\s(?:round|funding))?",
+    re.IGNORECASE,
+)
+_MONTHS = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+DATE_RE = re.compile(
+    rf"\b(?:\d{{4}}-\d{{2}}-\d{{2}}|\d{{1,2}}\s{_MONTHS}\s\d{{4}}|{_MONTHS}\s\d{{4}}|"
+    r"Q[1-4]\s?(?:FY)?'?\d{2,4}|FY\s?'?\d{2,4})\b",
+    re.IGNORECASE,
+)
+_NAME = r"(?:Dr\.? )?[A-Z][a-z]+(?: [A-Z]\.)?(?: [A-Z][a-z]+){1,2}"
+_ROLE = r"(?i:co-?founder|founder|ceo|cto|coo|cfo|cpo|chief [a-z]+ officer)"
+# Names are matched case-sensitively so the scan can reject most positions on
+# their first character; only the role vocabulary is case-insensitive.
+FOUNDER_RE = re.compile(
+    rf"(?P<name>{_NAME}) ?(?:,|\(|-|–|—|\bis\b|\bas\b) ?(?:the |our )?(?P<role>{_ROLE}(?: ?(?:&|and|/) ?{_ROLE})?)"
+    rf"|(?P<role2>{_ROLE}) ?(?::|-|–) ?(?P<name2>{_NAME})"
+)
+
+METRIC_KEYWORDS = {
+    "burn": re.compile(r"\bburn(?:\srate)?\b", re.IGNORECASE),
+    "runway": re.compile(r"\brunway\b", re.IGNORECASE),
+    "gross_margin": re.compile(r"\bgross\smargins?\b", re.IGNORECASE),
+    "growth": re.compile(r"\b(?:growth|growing|mom|yoy|m-o-m|y-o-y)\b", re.IGNORECASE),
+    "valuation": re.compile(r"\bvaluation\b|\bvalued\b", re.IGNORECASE),
+    "tam": re.compile(r"\bTAM\b|\bmarket size\b|\baddressable market\b", re.IGNORECASE),
+    "ask": re.compile(r"\braising\b|\bthe ask\b|\bask\b|\braise\b", re.IGNORECASE),
+}
+# All metric keywords in one pass; the named group that matched is the label.
+METRIC_KEYWORD_RE = re.compile(
+    "|".join(f"(?P<{label}>{pattern.pattern})" for label, pattern in METRIC_KEYWORDS.items()), re.IGNORECASE)
+RUNWAY_RE = re.compile(r"(?P<num>\d+(?:\.\d+)?)\s?(?:months?|mos?)\b(?:\sof)?\srunway|runway[^.\n\d]{0,20}(?P<num2>\d+(?:\.\d+)?)\s?months?", re.IGNORECASE)
+
+
+# Case-sensitive triggers run over the lowercased text; each pattern then
+# only scans the lines where its trigger occurs, since case-insensitive
+# alternations are an order of magnitude slower to scan than these.
+TRIGGERS = {
+    "money": re.compile(r"[$₹€£]|usd|inr|eur|gbp|rs|dollars|rupees"),
+    "percentage": re.compile(r"%|percent"),
+    "recurring_revenue": re.compile(r"arr|mrr"),
+    "date": re.compile(r"\d{4}-|jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec|q[1-4]|fy"),
+    "funding_round": re.compile(r"seed|angel|series|bridge|ipo"),
+    "runway": re.compile(r"runway"),
+    "founder": re.compile(r"founder|ceo|cto|coo|cfo|cpo|officer"),
+}
+
+
+def _line_segments(text: str, lowered: str, trigger: "re.Pattern[str]") -> List[Tuple[int, int]]:
+    """Return (start, end) ranges of consecutive lines in which ``trigger`` matches the lowercased text."""
+    if len(lowered) != len(text):
+        # Lowercasing changed offsets (rare non-ASCII letters); scan everything
+        return [(0, len(text))]
+    segments: List[Tuple[int, int]] = []
+    pos = 0
+    while True:
+        match = trigger.search(lowered, pos)
+        if not match:
+            break
+        line_start = text.rfind("\n", 0, match.start()) + 1
+        line_end = text.find("\n", match.start())
+        line_end = len(text) if line_end == -1 else line_end
+        if segments and segments[-1][1] + 1 >= line_start:
+            segments[-1] = (segments[-1][0], line_end)
+        else:
+            segments.append((line_start, line_end))
+        pos = line_end + 1
+    return segments
+
+
+def _finditer(pattern: "re.Pattern[str]", text: str, segments: List[Tuple[int, int]]) -> Iterator["re.Match[str]"]:
+    for start, end in segments:
+        yield from pattern.finditer(text, start, end)
+
+
+def parse_money(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse a money expression such as ``$4.2M``, ``₹5 Cr`` or ``250k USD``.
+
+    Returns:
+        Dict with ``value`` (float, in currency units) and ``currency``, or None
+    """
+    match = MONEY_RE.search(text)
+    if not match:
+        return None
+    num = match.group("num") or match.group("num2")
+    scale = (match.group("scale") or match.group("scale2") or "").lower()
+    currency = (match.group("cur") or match.group("cur2") or "").strip().lower()
+    value = float(num.replace(",", "")) * _SCALE_WORDS.get(scale, 1.0)
+    code = _CURRENCY_CODES.get(currency, {"dollars": "USD", "rupees": "INR"}.get(currency, currency.upper() or None))
+    return {"value": value, "currency": code}
+
+
+def _trie_pattern(node: Dict[str, Any]) -> str:
+    """Render a character trie as a regex; optional suffixes are greedy, so longer terms win."""
+    branches = [re.escape(ch) + _trie_pattern(child) for ch, child in sorted(node.items()) if ch]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    return f"(?:{body})?" if "" in node else body
+
+
+class GazetteerMatcher:
+    """
+    Case-insensitive multi-pattern matcher for gazetteer terms.
+
+    Terms are compiled into one trie-shaped regular expression, so the scan
+    runs inside the regex engine in a single pass regardless of the number
+    of terms. Each hit is the longest whole-word term starting at the
+    leftmost position ("Sequoia Capital" over "Sequoia"); hits do not overlap.
+    """
+
+    def __init__(self):
+        self._trie: Dict[str, Any] = {}
+        self._payloads: Dict[str, Any] = {}
+        self._pattern: Optional["re.Pattern[str]"] = None
+
+    def add(self, pattern: str, payload: Any) -> None:
+        """Add a pattern with an associated payload; the first payload of a repeated pattern is kept."""
+        key = pattern.lower()
+        if not key or key in self._payloads:
+            return
+        node = self._trie
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+        self._payloads[key] = payload
+        self._pattern = None
+
+    def build(self) -> None:
+        """Compile the trie into the matching expression."""
+        body = _trie_pattern(self._trie) or "(?!)"
+        # Whole words only: no letter or digit on either side
+        self._pattern = re.compile(rf"(?<![^\W_])(?:{body})(?![^\W_])", re.IGNORECASE)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        """
+        Yield ``(start, end, payload)`` for every whole-word pattern occurrence.
+
+        Args:
+            text: Text to scan
+        """
+        if self._pattern is None:
+            self.build()
+        payloads = self._payloads
+        for match in self._pattern.finditer(text):
+            yield match.start(), match.end(), payloads[match.group(0).lower()]
+
+
+def load_gazetteer(path: Optional[str] = None) -> Dict[str, List[str]]:
+    """Load the gazetteer, merging a JSON override file over the defaults."""
+    gazetteer = {kind: list(terms) for kind, terms in DEFAULT_GAZETTEER.items()}
+    path = path or os.getenv("LVX_GAZETTEER_PATH")
+    if path:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for kind, terms in json.load(f).items():
+                    gazetteer.setdefault(kind, []).extend(terms)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load gazetteer from {path}: {e}")
+    return gazetteer
+
+
+def _entity_id(kind: str, name: str) -> str:
+    return f"{kind}_{re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_')}"
+
+
+def _metric_name(label: str, value: Optional[float], unit: Optional[str], text: str) -> str:
+    """Name a metric entity by its label and parsed value, e.g. ``MRR 210,000 USD`` or ``growth 18%``."""
+    label = label.replace("_", " ")
+    if value is None:
+        return f"{label} {text}"
+    number = f"{value:,.2f}".rstrip("0").rstrip(".")
+    if unit == "%":
+        return f"{label} {number}%"
+    return f"{label} {number} {unit}" if unit else f"{label} {number}"
+
+
+def _sentence(text: str, start: int, end: int) -> Tuple[int, int]:
+    """Return the bounds of the sentence (or line) around a span."""
+    sentence_start = max(text.rfind(". ", 0, start) + 2, text.rfind("\n", 0, start) + 1, 0)
+    ends = [i for i in (text.find(". ", end), text.find("\n", end)) if i != -1]
+    return sentence_start, min(ends) if ends else len(text)
+
+
+class FastExtractor:
+    """
+    Deterministic extractor built on compiled regular expressions and a
+    gazetteer matcher.
+
+    It recovers money amounts, percentages, ARR/MRR, dates, funding rounds,
+    founder names and known investors, technologies and markets, each with
+    its character span. Output uses the same entity/relationship schema as
+    the Gemini analysis, so it can stand in for it or seed it with anchors.
+    """
+
+    def __init__(self, gazetteer: Optional[Dict[str, List[str]]] = None):
+        """
+        Initialize the extractor.
+
+        Args:
+            gazetteer: Mapping of entity type to known names; defaults to
+                ``load_gazetteer()``
+        """
+        self.matcher = GazetteerMatcher()
+        for kind, terms in (gazetteer or load_gazetteer()).items():
+            for term in terms:
+                self.matcher.add(term, (kind, term))
+        self.matcher.build()
+
+    def _gazetteer_hits(self, text: str) -> List[Dict[str, Any]]:
+        hits = []
+        for start, end, (kind, canonical) in self.matcher.iter_matches(text):
+            if canonical in CONTEXT_REQUIRED.get(kind, ()) and not self._in_context(text, start, end, canonical, kind):
+                continue
+            hits.append({"type": kind, "name": canonical, "start": start, "end": end})
+        return hits
+
+    def _in_context(self, text: str, start: int, end: int, canonical: str, kind: str) -> bool:
+        """Accept an ambiguous term only as written and next to a word of its kind's context."""
+        if text[start:end] != canonical:
+            return False
+        sentence_start, sentence_end = _sentence(text, start, end)
+        window = text[max(sentence_start, start - CONTEXT_WINDOW):min(sentence_end, end + CONTEXT_WINDOW)]
+        return bool(CONTEXT_RE[kind].search(window))
+
+    def extract_anchors(self, text: str) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Find all anchors in a text.
+
+        Args:
+            text: Document text
+
+        Returns:
+            Dict of anchor kind to list of matches with ``text``, ``start``
+            and ``end`` (plus parsed values where applicable)
+        """
+        anchors: Dict[str, List[Dict[str, Any]]] = {
+            "money": [], "percentage": [], "recurring_revenue": [], "date": [],
+            "funding_round": [], "founder": [], "runway": [],
+            "investor": [], "technology": [], "market": [],
+        }
+        lowered = text.lower()
+
+        def scan(kind: str, pattern: "re.Pattern[str]") -> Iterator["re.Match[str]"]:
+            return _finditer(pattern, text, _line_segments(text, lowered, TRIGGERS[kind]))
+
+        for m in scan("money", MONEY_RE):
+            parsed = parse_money(m.group(0))
+            anchors["money"].append({"text": m.group(0).strip(), "start": m.start(), "end": m.end(), **(parsed or {})})
+        for m in scan("percentage", PERCENT_RE):
+            anchors["percentage"].append({"text": m.group(0), "start": m.start(), "end": m.end(),
+                                          "value": float(m.group("num"))})
+        for m in scan("recurring_revenue", RECURRING_REVENUE_RE):
+            kind = (m.group("kind") or m.group("kind2")).upper()
+            money = parse_money(m.group("money") or m.group("money2"))
+            anchors["recurring_revenue"].append({"text": m.group(0).strip(), "start": m.start(), "end": m.end(),
+                                                 "metric": kind, **(money or {})})
+        for m in scan("date", DATE_RE):
+            anchors["date"].append({"text": m.group(0), "start": m.start(), "end": m.end()})
+        for m in scan("funding_round", ROUND_RE):
+            label = re.sub(r"\s+", " ", m.group("round")).title().replace("Pre-Seed", "Pre-seed")
+            anchors["funding_round"].append({"text": m.group(0), "start": m.start(), "end": m.end(), "round": label})
+        for m in scan("runway", RUNWAY_RE):
+            anchors["runway"].append({"text": m.group(0), "start": m.start(), "end": m.end(),
+                                      "months": float(m.group("num") or m.group("num2"))})
+        for m in scan("founder", FOUNDER_RE):
+            name = (m.group("name") or m.group("name2")).strip()
+            role = re.sub(r"\s+", " ", (m.group("role") or m.group("role2"))).strip()
+            anchors["founder"].append({"text": m.group(0), "start": m.start(), "end": m.end(),
+                                       "name": name, "role": role})
+        for hit in self._gazetteer_hits(text):
+            anchors.setdefault(hit["type"], []).append(
+                {"text": text[hit["start"]:hit["end"]], "start": hit["start"], "end": hit["end"], "name": hit["name"]})
+        return anchors
+
+    def _metric_label(self, text: str, start: int, end: int) -> Optional[str]:
+        """Label an amount by the closest metric keyword within its sentence."""
+        sentence_start = max(text.rfind(". ", 0, start), text.rfind("\n", 0, start)) + 1
+        before = text[max(sentence_start, start - 60):start]
+        after = re.split(r"\. |\n", text[end:end + 30], maxsplit=1)[0]
+
+        best, best_distance = None, None
+        last = None
+        for last in METRIC_KEYWORD_RE.finditer(before):
+            pass
+        if last is not None:
+            best, best_distance = last.lastgroup, len(before) - last.end()
+        match = METRIC_KEYWORD_RE.search(after)
+        # Ties go to the keyword before the amount ("burn of $85k").
+        if match and (best_distance is None or match.start() < best_distance):
+            best = match.lastgroup
+        return best
+
+    def extract(self, text: str, company_name: str, source: str = "document") -> Dict[str, Any]:
+        """
+        Extract entities and relationships from text.
+
+        Args:
+            text: Combined document text
+            company_name: Name of the company being analyzed
+            source: Source label recorded on each entity
+
+        Returns:
+            Dict with ``entities``, ``relationships``, ``anchors`` and ``metrics``
+        """
+        anchors = self.extract_anchors(text)
+        company_id = _entity_id("company", company_name)
+        entities: Dict[str, Dict[str, Any]] = {
+            company_id: {
+                "id": company_id,
+                "type": "company",
+                "name": company_name,
+                "properties": {"description": f"Company named {company_name}", "confidence": 1.0,
+                               "source": "filename"},
+            }
+        }
+        relationships: Dict[str, Dict[str, Any]] = {}
+        entity_ids: Dict[Tuple[str, str], str] = {}
+
+        def add_entity(kind: str, name: str, match: Dict[str, Any], confidence: float,
+                       description: str, **extra: Any) -> str:
+            entity_id = entity_ids.get((kind, name))
+            if entity_id is None:
+                entity_id = entity_ids[(kind, name)] = _entity_id(kind, name)
+            if entity_id not in entities:
+                entities[entity_id] = {
+                    "id": entity_id,
+                    "type": kind,
+                    "name": name,
+                    "properties": {"description": description, "confidence": confidence, "source": source,
+                                   "span": [match["start"], match["end"]], **extra},
+                }
+            return entity_id
+
+        def relate(rel_type: str, source_id: str, target_id: str, strength: float, evidence: str) -> None:
+            # Repeated mentions keep the first occurrence's evidence
+            relationship_id = f"{rel_type}_{source_id}_{target_id}"
+            if relationship_id in relationships:
+                return
+            relationships[relationship_id] = {
+                "id": relationship_id,
+                "type": rel_type,
+                "source_entity": source_id,
+                "target_entity": target_id,
+                "properties": {"description": rel_type.replace("_", " "), "strength": strength,
+                               "evidence": evidence, "direction": "directed"},
+            }
+
+        for match in anchors["founder"]:
+            founder_id = add_entity("founder", match["name"], match, 0.85, f"{match['role']} of {company_name}",
+                                    role=match["role"])
+            relate("founded_by", company_id, founder_id, 0.85, match["text"])
+
+        for kind, rel_type in (("investor", "invested_in"), ("technology", "uses_technology"),
+                               ("market", "operates_in")):
+            for match in anchors.get(kind, []):
+                entity_id = add_entity(kind, match["name"], match, 0.9, f"Known {kind} mentioned in documents")
+                if rel_type == "invested_in":
+                    relate(rel_type, entity_id, company_id, 0.6, match["text"])
+                else:
+                    relate(rel_type, company_id, entity_id, 0.7, match["text"])
+
+        rounds = anchors["funding_round"]
+        round_starts = [r["start"] for r in rounds]
+        for match in anchors["date"]:
+            name = re.sub(r"\s+", " ", match["text"])
+            if ("date", name) in entity_ids:
+                continue
+            sentence = _sentence(text, match["start"], match["end"])
+            # A round named in the same sentence is the dated event ("Series A closed in Mar 2024")
+            i = bisect.bisect_left(round_starts, sentence[0])
+            event = rounds[i]["round"] if i < len(rounds) and round_starts[i] < sentence[1] else None
+            date_id = add_entity("date", name, match, 0.8,
+                                 f"Date of {event}" if event else "Date mentioned in documents",
+                                 event=event, context=text[sentence[0]:sentence[1]].strip()[:EVIDENCE_CHARS])
+            relate("has_milestone", company_id, date_id, 0.6, text[sentence[0]:sentence[1]].strip()[:EVIDENCE_CHARS])
+
+        metrics: Dict[str, Any] = {}
+        for match in anchors["recurring_revenue"]:
+            metric = match["metric"]
+            metrics.setdefault(metric.lower(), match.get("value"))
+            metric_id = add_entity("metric", _metric_name(metric, match.get("value"), match.get("currency"),
+                                                          match["text"]),
+                                   match, 0.9, f"Reported {metric}",
+                                   value=match.get("value"), currency=match.get("currency"))
+            relate("shows_metric", company_id, metric_id, 0.9, match["text"])
+        for match in anchors["runway"]:
+            metrics.setdefault("runway_months", match["months"])
+        recurring_ends = {m["end"] for m in anchors["recurring_revenue"]}
+        recurring_ends |= {m["start"] for m in anchors["recurring_revenue"]}
+        unlabelled = set(METRIC_KEYWORDS)
+        for match in anchors["money"]:
+            if not unlabelled:
+                # Only the first amount per label is kept
+                break
+            # Amounts already captured as ARR/MRR are not re-labelled.
+            if match["end"] in recurring_ends or match["start"] in recurring_ends:
+                continue
+            label = self._metric_label(text, match["start"], match["end"])
+            if label in unlabelled:
+                unlabelled.discard(label)
+                metrics[label] = match.get("value")
+                metric_id = add_entity("metric", _metric_name(label, match.get("value"), match.get("currency"),
+                                                              match["text"]),
+                                       match, 0.75, f"Amount reported near '{label}'", value=match.get("value"),
+                                       currency=match.get("currency"))
+                relate("shows_metric", company_id, metric_id, 0.75, text[max(0, match["start"] - 40):match["end"]])
+        unlabelled = set(METRIC_KEYWORDS)
+        for match in anchors["percentage"]:
+            if not unlabelled:
+                break
+            label = self._metric_label(text, match["start"], match["end"])
+            if label in unlabelled:
+                unlabelled.discard(label)
+                metrics[f"{label}_pct"] = match["value"]
+                metric_id = add_entity("metric", _metric_name(label, match["value"], "%", match["text"]), match,
+                                       0.75, f"Percentage reported near '{label}'", value=match["value"])
+                relate("shows_metric", company_id, metric_id, 0.75, text[max(0, match["start"] - 40):match["end"]])
+        if rounds:
+            metrics.setdefault("funding_round", rounds[0]["round"])
+
+        return {
+            "entities": list(entities.values()),
+            "relationships": list(relationships.values()),
+            "anchors": anchors,
+            "metrics": metrics,
+        }
+
+    def analyze(self, text: str, company_name: str) -> Dict[str, Any]:
+        """
+        Produce a full analysis dict in the Gemini response schema.
+
+        Args:
+            text: Combined document text
+            company_name: Name of the company being analyzed
+
+        Returns:
+            Analysis dict with ``analysis_method`` set to ``rule_based``
+        """
+        extraction = self.extract(text, company_name)
+        metrics = extraction["metrics"]
+        anchors = extraction["anchors"]
+
+        insights = []
+        if "arr" in metrics:
+            insights.append(f"Reported ARR of {metrics['arr']:,.0f}")
+        if "mrr" in metrics:
+            insights.append(f"Reported MRR of {metrics['mrr']:,.0f}")
+        if "growth_pct" in metrics:
+            insights.append(f"Growth indicator of {metrics['growth_pct']}%")
+        if "funding_round" in metrics:
+            insights.append(f"Funding stage referenced: {metrics['funding_round']}")
+        if anchors["investor"]:
+            insights.append("Known investors mentioned: " + ", ".join(sorted({a["name"] for a in anchors["investor"]})))
+        founders = [e["name"] for e in extraction["entities"] if e["type"] == "founder"]
+        if founders:
+            insights.append("Founding team identified: " + ", ".join(founders))
+
+        risks = []
+        if "runway_months" in metrics and metrics["runway_months"] < 12:
+            risks.append(f"Short runway of {metrics['runway_months']:.0f} months")
+        if not founders:
+            risks.append("Founding team not identified in documents")
+
+        return {
+            "entities": extraction["entities"],
+            "relationships": extraction["relationships"],
+            "insights": insights,
+            "market_analysis": {
+                "market_size": next((a["text"] for a in anchors["money"]
+                                     if self._metric_label(text, a["start"], a["end"]) == "tam"), "Not stated"),
+                "growth_rate": f"{metrics['growth_pct']}%" if "growth_pct" in metrics else "Not stated",
+                "competitive_position": "Not analyzed",
+                "investment_readiness": metrics.get("funding_round", "Not stated"),
+            },
+            "risks_and_opportunities": risks,
+            "metrics": metrics,
+            "analysis_method": "rule_based",
+            "analysis_timestamp": datetime.utcnow().isoformat(),
+        }
+
+    def format_anchors(self, anchors: Dict[str, List[Dict[str, Any]]], max_per_kind: int = 15) -> str:
+        """
+        Render anchors as a compact bullet list for inclusion in a prompt.
+
+        Args:
+            anchors: Output of ``extract_anchors``
+            max_per_kind: Maximum distinct values listed per anchor kind
+
+        Returns:
+            Prompt text, or an empty string when nothing was found
+        """
+        lines = []
+        for kind, matches in anchors.items():
+            values = []
+            for match in matches:
+                value = match.get("name") if kind in ("founder", "investor", "technology", "market") else match["text"]
+                if kind == "founder":
+                    value = f"{match['name']} ({match['role']})"
+                if value not in values:
+                    values.append(value)
+                if len(values) >= max_per_kind:
+                    break
+            if values:
+                lines.append(f"- {kind}: " + "; ".join(values))
+        return "\n".join(lines)
+
+
+_default_extractor: Optional[FastExtractor] = None
+
+
+def get_fast_extractor() -> FastExtractor:
+    """Return a shared FastExtractor (the automaton is built once per process)."""
+    global _default_extractor
+    if _default_extractor is None:
+        _default_extractor = FastExtractor()
+    return _default_extractor
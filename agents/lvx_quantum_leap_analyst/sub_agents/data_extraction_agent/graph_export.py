@@ -0,0 +1,282 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Bulk export of company knowledge graphs for the frontend"""
+
+import os
+import json
+import shutil
+import logging
+import argparse
+from typing import Dict, List, Any, Optional
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+from .result_store import DEFAULT_CACHE_DIR, ResultStore, company_slug
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXPORT_DIR = os.path.join(DEFAULT_CACHE_DIR, "graph_export")
+
+NODE_SCHEMA = pa.schema([
+    ("company", pa.string()),
+    ("node_id", pa.string()),
+    ("type", pa.dictionary(pa.int8(), pa.string())),
+    ("name", pa.string()),
+    ("description", pa.string()),
+    ("confidence", pa.float32()),
+    ("source", pa.dictionary(pa.int8(), pa.string())),
+])
+
+EDGE_SCHEMA = pa.schema([
+    ("company", pa.string()),
+    ("edge_id", pa.string()),
+    ("type", pa.dictionary(pa.int8(), pa.string())),
+    ("source_node", pa.string()),
+    ("target_node", pa.string()),
+    ("description", pa.string()),
+    ("strength", pa.float32()),
+    ("evidence", pa.string()),
+    ("directed", pa.bool_()),
+])
+
+# Column order of the row arrays in JSON shards.
+SHARD_NODE_COLUMNS = ["id", "type", "name", "confidence", "source", "description"]
+SHARD_EDGE_COLUMNS = ["id", "type", "source", "target", "strength", "evidence", "description"]
+
+
+def _as_float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def graph_tables(company_name: str, entity_analysis: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Flatten an ``entity_analysis`` graph into node and edge rows.
+
+    Args:
+        company_name: Name of the company the graph belongs to
+        entity_analysis: Output of ``_parse_gemini_response`` (or a fallback)
+
+    Returns:
+        Dict with ``nodes`` and ``edges`` row lists
+    """
+    nodes = []
+    for entity in entity_analysis.get("entities") or []:
+        props = entity.get("properties") or {}
+        nodes.append({
+            "company": company_name,
+            "node_id": str(entity.get("id") or entity.get("name")),
+            "type": entity.get("type") or "unknown",
+            "name": entity.get("name") or "",
+            "description": props.get("description"),
+            "confidence": _as_float(props.get("confidence")),
+            "source": props.get("source"),
+        })
+
+    edges = []
+    for relationship in entity_analysis.get("relationships") or []:
+        props = relationship.get("properties") or {}
+        edges.append({
+            "company": company_name,
+            "edge_id": str(relationship.get("id") or ""),
+            "type": relationship.get("type") or "related_to",
+            "source_node": str(relationship.get("source_entity") or ""),
+            "target_node": str(relationship.get("target_entity") or ""),
+            "description": props.get("description"),
+            "strength": _as_float(props.get("strength")),
+            "evidence": props.get("evidence"),
+            "directed": props.get("direction", "directed") != "undirected",
+        })
+    return {"nodes": nodes, "edges": edges}
+
+
+class GraphExporter:
+    """
+    Writes the portfolio knowledge graph as columnar node/edge tables plus
+    one compact JSON shard per company.
+
+    Columnar tables are partitioned by company (``nodes/company_slug=<slug>/``), so
+    an incremental export rewrites only the partitions and shards of
+    companies whose source fingerprint changed. A ``manifest.json`` records
+    the fingerprint each shard was built from.
+    """
+
+    def __init__(self, output_dir: str = DEFAULT_EXPORT_DIR, table_format: str = "parquet"):
+        """
+        Initialize the exporter.
+
+        Args:
+            output_dir: Export root directory
+            table_format: ``parquet`` or ``arrow`` (Arrow IPC / Feather v2)
+        """
+        if table_format not in ("parquet", "arrow"):
+            raise ValueError(f"Unsupported table format: {table_format}")
+        self.output_dir = output_dir
+        self.table_format = table_format
+        self.manifest_path = os.path.join(output_dir, "manifest.json")
+        for sub_dir in ("nodes", "edges", "shards"):
+            os.makedirs(os.path.join(output_dir, sub_dir), exist_ok=True)
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("table_format") == self.table_format:
+                return manifest
+        except (OSError, ValueError):
+            pass
+        return {"table_format": self.table_format, "companies": {}}
+
+    def _save_manifest(self) -> None:
+        self.manifest["updated_at"] = datetime.utcnow().isoformat()
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _write_table(self, kind: str, slug: str, rows: List[Dict[str, Any]], schema: pa.Schema) -> None:
+        partition_dir = os.path.join(self.output_dir, kind, f"company_slug={slug}")
+        os.makedirs(partition_dir, exist_ok=True)
+        table = pa.Table.from_pylist(rows, schema=schema)
+        if self.table_format == "parquet":
+            pq.write_table(table, os.path.join(partition_dir, "part-0.parquet"), compression="zstd")
+        else:
+            feather.write_feather(table, os.path.join(partition_dir, "part-0.arrow"), compression="zstd")
+
+    def _write_shard(self, slug: str, company_name: str, fingerprint: str, tables: Dict[str, Any]) -> str:
+        shard = {
+            "company": company_name,
+            "fingerprint": fingerprint,
+            "node_columns": SHARD_NODE_COLUMNS,
+            "nodes": [
+                [n["node_id"], n["type"], n["name"], n["confidence"], n["source"], n["description"]]
+                for n in tables["nodes"]
+            ],
+            "edge_columns": SHARD_EDGE_COLUMNS,
+            "edges": [
+                [e["edge_id"], e["type"], e["source_node"], e["target_node"], e["strength"],
+                 e["evidence"], e["description"]]
+                for e in tables["edges"]
+            ],
+        }
+        path = os.path.join(self.output_dir, "shards", f"{slug}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(shard, f, separators=(",", ":"), ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return f"shards/{slug}.json"
+
+    def _remove_company(self, slug: str) -> None:
+        for kind in ("nodes", "edges"):
+            shutil.rmtree(os.path.join(self.output_dir, kind, f"company_slug={slug}"), ignore_errors=True)
+        try:
+            os.remove(os.path.join(self.output_dir, "shards", f"{slug}.json"))
+        except FileNotFoundError:
+            pass
+
+    def export_company(self, company_name: str, fingerprint: str, entity_analysis: Dict[str, Any],
+                       force: bool = False) -> bool:
+        """
+        Export one company's graph if its fingerprint changed.
+
+        Args:
+            company_name: Name of the company
+            fingerprint: Source fingerprint of the analysis
+            entity_analysis: The company's ``entity_analysis`` dict
+            force: Rewrite even if the fingerprint is unchanged
+
+        Returns:
+            True if files were written
+        """
+        slug = company_slug(company_name)
+        previous = self.manifest["companies"].get(slug)
+        if previous and previous.get("fingerprint") == fingerprint and not force:
+            return False
+
+        tables = graph_tables(company_name, entity_analysis)
+        self._write_table("nodes", slug, tables["nodes"], NODE_SCHEMA)
+        self._write_table("edges", slug, tables["edges"], EDGE_SCHEMA)
+        shard_path = self._write_shard(slug, company_name, fingerprint, tables)
+
+        self.manifest["companies"][slug] = {
+            "company_name": company_name,
+            "fingerprint": fingerprint,
+            "shard": shard_path,
+            "node_count": len(tables["nodes"]),
+            "edge_count": len(tables["edges"]),
+            "exported_at": datetime.utcnow().isoformat(),
+        }
+        return True
+
+    def export_from_store(self, result_store: ResultStore, force: bool = False) -> Dict[str, Any]:
+        """
+        Incrementally export every company in the result store.
+
+        Companies no longer in the store are removed from the export.
+
+        Args:
+            result_store: Store holding ``extract_company_data`` results
+            force: Rewrite every company regardless of fingerprint
+
+        Returns:
+            Dict with counts of written, unchanged and removed companies
+        """
+        written, unchanged = [], 0
+        seen = set()
+        for entry in result_store.iter_entries():
+            result = entry.get("result") or {}
+            analysis = result.get("entity_analysis")
+            if not analysis:
+                continue
+            company_name = entry["company_name"]
+            seen.add(company_slug(company_name))
+            if self.export_company(company_name, entry["fingerprint"], analysis, force=force):
+                written.append(company_name)
+            else:
+                unchanged += 1
+
+        removed = sorted(set(self.manifest["companies"]) - seen)
+        for slug in removed:
+            self._remove_company(slug)
+            del self.manifest["companies"][slug]
+
+        self._save_manifest()
+        logger.info(f"Graph export: {len(written)} written, {unchanged} unchanged, {len(removed)} removed")
+        return {"written": written, "unchanged": unchanged, "removed": removed}
+
+
+def main() -> None:
+    """Export stored analyses as graph tables and shards."""
+    parser = argparse.ArgumentParser(description="Export company knowledge graphs for the frontend.")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Result store cache directory.")
+    parser.add_argument("--output-dir", default=DEFAULT_EXPORT_DIR, help="Export root directory.")
+    parser.add_argument("--format", choices=["parquet", "arrow"], default="parquet")
+    parser.add_argument("--force", action="store_true", help="Rewrite every company.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    exporter = GraphExporter(args.output_dir, table_format=args.format)
+    summary = exporter.export_from_store(ResultStore(args.cache_dir), force=args.force)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Cross-company relationship inference over the stored portfolio graph"""
+
+import os
+import re
+import json
+import time
+import logging
+import argparse
+from typing import Callable, Dict, List, Any, Sequence, Set
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import scipy.sparse as sp
+
+from .graph_export import DEFAULT_EXPORT_DIR
+from .result_store import DEFAULT_CACHE_DIR, ResultStore
+
+logger = logging.getLogger(__name__)
+
+# Inferred edge types.
+SHARES_INVESTOR = "shares_investor"
+SHARES_MARKET = "shares_market"
+COMPETES_WITH = "competes_with"
+SIMILAR_TECHNOLOGY = "similar_technology"
+
+# Edges scoring below this are not materialized.
+DEFAULT_MIN_SCORE = 0.2
+
+# Strongest edges kept per company and edge type.
+DEFAULT_TOP_K = 10
+
+# Score of a competitor link reached through one intermediate portfolio
+# company; every further path halves the remaining distance to this value.
+TRANSITIVE_COMPETITOR_SCORE = 0.8
+
+# Shared entity names listed as evidence per edge.
+MAX_SHARED_NAMES = 5
+
+INFERRED_EDGE_SCHEMA = pa.schema([
+    ("type", pa.dictionary(pa.int8(), pa.string())),
+    ("source_company", pa.string()),
+    ("target_company", pa.string()),
+    ("score", pa.float32()),
+    ("basis", pa.dictionary(pa.int8(), pa.string())),
+    ("shared", pa.list_(pa.string())),
+])
+
+_ENTITY_KINDS = ("investor", "market", "technology", "competitor")
+
+
+def entity_key(name: str) -> str:
+    """Normalize an entity name so spellings across analyses match."""
+    return " ".join(re.findall(r"[a-z0-9]+", (name or "").lower()))
+
+
+def _company_entities(analysis: Dict[str, Any]) -> Dict[str, Set[str]]:
+    """Collect a company's investor, market, technology and competitor names."""
+    found: Dict[str, Set[str]] = {kind: set() for kind in _ENTITY_KINDS}
+    names = {}
+    for entity in analysis.get("entities") or []:
+        names[entity.get("id")] = entity.get("name") or ""
+        if entity.get("type") in found:
+            found[entity["type"]].add(entity.get("name") or "")
+    # Competitors are also named only through competes_with relationships
+    for relationship in analysis.get("relationships") or []:
+        if relationship.get("type") == "competes_with":
+            found["competitor"].add(names.get(relationship.get("target_entity"), ""))
+    return {kind: {name for name in values if entity_key(name)} for kind, values in found.items()}
+
+
+class _Vocabulary:
+    """Entity names of one kind mapped to matrix columns, keeping a display name."""
+
+    def __init__(self):
+        self.columns: Dict[str, int] = {}
+        self.names: List[str] = []
+
+    def add(self, name: str) -> int:
+        key = entity_key(name)
+        if key not in self.columns:
+            self.columns[key] = len(self.names)
+            self.names.append(name)
+        return self.columns[key]
+
+
+def _incidence(rows: List[List[int]], n_columns: int) -> sp.csr_matrix:
+    """Binary companies-by-entities matrix from per-company column lists."""
+    indptr = np.cumsum([0] + [len(columns) for columns in rows])
+    indices = np.fromiter((column for columns in rows for column in columns), dtype=np.int32, count=indptr[-1])
+    matrix = sp.csr_matrix((np.ones(len(indices), dtype=np.float32), indices, indptr),
+                           shape=(len(rows), n_columns))
+    matrix.sum_duplicates()
+    matrix.data[:] = 1
+    return matrix
+
+
+def _idf_cosine(incidence: sp.csr_matrix) -> sp.csr_matrix:
+    """
+    Pairwise cosine similarity of IDF-weighted rows, diagonal removed.
+
+    Sharing a rarely seen investor or market counts for more than sharing
+    one that half the portfolio lists.
+    """
+    n_rows = incidence.shape[0]
+    df = np.asarray(incidence.sum(axis=0)).ravel()
+    idf = np.log((n_rows + 1) / (df + 1)) + 1e-3
+    weighted = incidence @ sp.diags(idf.astype(np.float32))
+    norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+    inverse = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+    normalized = sp.diags(inverse.astype(np.float32)) @ weighted
+    similarity = (normalized @ normalized.T).tocsr()
+    similarity.setdiag(0)
+    similarity.eliminate_zeros()
+    return similarity
+
+
+def _jaccard(incidence: sp.csr_matrix) -> sp.csr_matrix:
+    """Pairwise Jaccard similarity of binary rows, diagonal removed."""
+    overlap = (incidence @ incidence.T).tocoo()
+    sizes = np.asarray(incidence.sum(axis=1)).ravel()
+    union = sizes[overlap.row] + sizes[overlap.col] - overlap.data
+    similarity = sp.csr_matrix((overlap.data / np.maximum(union, 1), (overlap.row, overlap.col)),
+                               shape=overlap.shape)
+    similarity.setdiag(0)
+    similarity.eliminate_zeros()
+    return similarity
+
+
+def _top_k(scores: sp.csr_matrix, k: int, min_score: float) -> sp.coo_matrix:
+    """
+    Keep each row's ``k`` strongest entries at or above ``min_score``.
+
+    ``scores`` is symmetric; a pair kept for either company is returned once,
+    in the upper triangle.
+    """
+    rows, cols = [], []
+    for row in range(scores.shape[0]):
+        start, end = scores.indptr[row], scores.indptr[row + 1]
+        values = scores.data[start:end]
+        keep = np.flatnonzero(values >= min_score)
+        if len(keep) > k:
+            keep = keep[np.argpartition(-values[keep], k - 1)[:k]]
+        rows.append(np.full(len(keep), row))
+        cols.append(scores.indices[start:end][keep])
+    row_index = np.concatenate(rows) if rows else np.array([], dtype=int)
+    col_index = np.concatenate(cols) if cols else np.array([], dtype=int)
+    low, high = np.minimum(row_index, col_index), np.maximum(row_index, col_index)
+    pairs = sp.csr_matrix((np.ones(len(low), dtype=np.float32), (low, high)), shape=scores.shape)
+    return scores.multiply(pairs > 0).tocoo()
+
+
+class RelationshipInference:
+    """
+    Infers cross-company relationships from the stored analyses.
+
+    Each company's investors, markets, technologies and competitors form
+    sparse companies-by-entities incidence matrices; one sparse product per
+    matrix yields every co-occurring pair at once, so the portfolio is
+    processed in a handful of matrix operations without any model calls:
+
+    - ``shares_investor`` / ``shares_market``: cosine similarity of
+      IDF-weighted investor or market sets
+    - ``similar_technology``: Jaccard similarity of technology sets
+    - ``competes_with``: a company naming another portfolio company as a
+      competitor (``direct``), both naming the same competitors
+      (``shared``), or a two-hop competitor chain (``transitive``)
+    """
+
+    def __init__(self, min_score: float = DEFAULT_MIN_SCORE, top_k: int = DEFAULT_TOP_K):
+        """
+        Initialize the engine.
+
+        Args:
+            min_score: Lowest score materialized
+            top_k: Strongest edges kept per company and edge type
+        """
+        self.min_score = min_score
+        self.top_k = max(1, top_k)
+
+    def infer(self, analyses: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Infer relationships between companies.
+
+        Args:
+            analyses: ``entity_analysis`` dicts by company name
+
+        Returns:
+            Dict with ``edges`` (type, source and target company, score,
+            basis and shared entity names), per-type ``counts``, the number
+            of ``companies`` and elapsed ``seconds``
+        """
+        started = time.perf_counter()
+        companies = sorted(analyses)
+        if len(companies) < 2:
+            return {"edges": [], "counts": {}, "companies": len(companies), "seconds": 0.0}
+        vocabularies = {kind: _Vocabulary() for kind in _ENTITY_KINDS}
+        rows: Dict[str, List[List[int]]] = {kind: [] for kind in _ENTITY_KINDS}
+        for company_name in companies:
+            entities = _company_entities(analyses[company_name])
+            for kind in _ENTITY_KINDS:
+                rows[kind].append([vocabularies[kind].add(name) for name in sorted(entities[kind])])
+        incidence = {kind: _incidence(rows[kind], len(vocabularies[kind].names)) for kind in _ENTITY_KINDS}
+
+        edges: List[Dict[str, Any]] = []
+        for edge_type, kind, scores in (
+            (SHARES_INVESTOR, "investor", _idf_cosine(incidence["investor"])),
+            (SHARES_MARKET, "market", _idf_cosine(incidence["market"])),
+            (SIMILAR_TECHNOLOGY, "technology", _jaccard(incidence["technology"])),
+        ):
+            kept = _top_k(scores, self.top_k, self.min_score)
+            edges.extend(self._materialize(edge_type, kept, ["shared"] * kept.nnz, companies,
+                                           self._shared_names(rows[kind], vocabularies[kind].names)))
+        edges.extend(self._competitor_edges(companies, incidence["competitor"], rows["competitor"],
+                                            vocabularies["competitor"]))
+
+        counts: Dict[str, int] = {}
+        for edge in edges:
+            counts[edge["type"]] = counts.get(edge["type"], 0) + 1
+        seconds = round(time.perf_counter() - started, 3)
+        logger.info(f"Inferred {len(edges)} relationships over {len(companies)} companies in {seconds}s")
+        return {"edges": edges, "counts": counts, "companies": len(companies), "seconds": seconds}
+
+    def _competitor_edges(self, companies: List[str], incidence: sp.csr_matrix,
+                          rows: List[List[int]], vocabulary: _Vocabulary) -> List[Dict[str, Any]]:
+        n_companies = len(companies)
+        # Competitor names that are themselves portfolio companies
+        named = [(vocabulary.columns[entity_key(name)], index) for index, name in enumerate(companies)
+                 if entity_key(name) in vocabulary.columns]
+        link = sp.csr_matrix((np.ones(len(named), dtype=np.float32),
+                              ([column for column, _ in named], [index for _, index in named])),
+                             shape=(incidence.shape[1], n_companies))
+        direct = incidence @ link
+        direct = ((direct + direct.T) > 0).astype(np.float32).tocsr()
+        direct.setdiag(0)
+        direct.eliminate_zeros()
+
+        # Two-hop chains between companies not already linked directly
+        paths = (direct @ direct).tocsr()
+        paths.setdiag(0)
+        paths = paths - paths.multiply(direct > 0)
+        paths.eliminate_zeros()
+        transitive = paths.copy()
+        transitive.data = TRANSITIVE_COMPETITOR_SCORE * (1 - 0.5 ** transitive.data)
+
+        shared = _idf_cosine(incidence)
+        kept = _top_k(direct.maximum(shared).maximum(transitive).tocsr(), self.top_k, self.min_score)
+        if not kept.nnz:
+            return []
+
+        pairs = (kept.row, kept.col)
+        is_direct = np.asarray(direct[pairs]).ravel() > 0
+        is_shared = np.asarray(shared[pairs]).ravel() >= np.asarray(transitive[pairs]).ravel()
+        bases = np.where(is_direct, "direct", np.where(is_shared, "shared", "transitive"))
+
+        neighbors = [set(direct.indices[direct.indptr[i]:direct.indptr[i + 1]]) for i in range(n_companies)]
+        shared_names = self._shared_names(rows, vocabulary.names)
+
+        def evidence(i: int, j: int, basis: str) -> List[str]:
+            if basis == "transitive":
+                return [companies[k] for k in sorted(neighbors[i] & neighbors[j])[:MAX_SHARED_NAMES]]
+            return shared_names(i, j, basis)
+
+        return self._materialize(COMPETES_WITH, kept, bases, companies, evidence)
+
+    @staticmethod
+    def _shared_names(rows: List[List[int]], names: List[str]) -> Callable[[int, int, str], List[str]]:
+        """Return a function listing the entity names two companies have in common."""
+        def shared(i: int, j: int, basis: str) -> List[str]:
+            return [names[column] for column in sorted(set(rows[i]).intersection(rows[j]))[:MAX_SHARED_NAMES]]
+        return shared
+
+    def _materialize(self, edge_type: str, kept: sp.coo_matrix, bases: Sequence[str], companies: List[str],
+                     evidence: Callable[[int, int, str], List[str]]) -> List[Dict[str, Any]]:
+        edges = []
+        for index in np.argsort(-kept.data, kind="stable"):
+            i, j, basis = int(kept.row[index]), int(kept.col[index]), str(bases[index])
+            edges.append({
+                "type": edge_type,
+                "source_company": companies[i],
+                "target_company": companies[j],
+                "score": round(float(min(kept.data[index], 1.0)), 4),
+                "basis": basis,
+                "shared": evidence(i, j, basis),
+            })
+        return edges
+
+    def infer_from_store(self, result_store: ResultStore) -> Dict[str, Any]:
+        """Infer relationships over every analysis in a result store."""
+        analyses = {}
+        for entry in result_store.iter_entries():
+            analysis = (entry.get("result") or {}).get("entity_analysis")
+            if analysis:
+                analyses[entry["company_name"]] = analysis
+        return self.infer(analyses)
+
+
+def write_inferred_edges(edges: List[Dict[str, Any]], output_dir: str = DEFAULT_EXPORT_DIR) -> str:
+    """
+    Write inferred edges as a Parquet table next to the graph export.
+
+    Args:
+        edges: Edges returned by ``RelationshipInference.infer``
+        output_dir: Graph export root directory
+
+    Returns:
+        Path of the written table
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, "inferred_edges.parquet")
+    tmp_path = f"{path}.tmp"
+    pq.write_table(pa.Table.from_pylist(edges, schema=INFERRED_EDGE_SCHEMA), tmp_path, compression="zstd")
+    os.replace(tmp_path, path)
+    return path
+
+
+def main() -> None:
+    """Infer cross-company relationships from stored analyses and write them out."""
+    parser = argparse.ArgumentParser(description="Infer relationships across the portfolio.")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Result store cache directory.")
+    parser.add_argument("--output-dir", default=DEFAULT_EXPORT_DIR, help="Graph export root directory.")
+    parser.add_argument("--min-score", type=float, default=DEFAULT_MIN_SCORE)
+    parser.add_argument("--top-k", type=int, default=DEFAULT_TOP_K)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    inference = RelationshipInference(min_score=args.min_score, top_k=args.top_k)
+    inferred = inference.infer_from_store(ResultStore(args.cache_dir))
+    path = write_inferred_edges(inferred["edges"], args.output_dir)
+    print(json.dumps({"path": path, "companies": inferred["companies"], "counts": inferred["counts"],
+                      "seconds": inferred["seconds"]}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Mirror of the company documents bucket on local disk"""
+
+import os
+import json
+import time
+import base64
+import hashlib
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional
+
+from .storage_backend import MIRROR_MANIFEST_NAME, LocalBackend, ObjectInfo, StorageBackend, open_storage
+
+logger = logging.getLogger(__name__)
+
+COMPANY_DATA_PREFIX = "Company Data/"
+
+# Parallel downloads per sync.
+DEFAULT_MIRROR_WORKERS = int(os.getenv("LVX_MIRROR_WORKERS", "16"))
+
+# Local mirror consulted by the blob cache before downloading from GCS.
+MIRROR_DIR = os.getenv("LVX_MIRROR_DIR")
+
+
+def file_md5(path: str) -> str:
+    """Return a file's MD5 in the base64 form GCS reports as ``md5_hash``."""
+    digest = hashlib.md5()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return base64.b64encode(digest.digest()).decode("ascii")
+
+
+class BucketMirror:
+    """
+    Keeps a local directory in step with a prefix of the document storage.
+
+    Objects are downloaded in parallel and written atomically. The manifest
+    at ``{root}/.lvx_mirror.json`` records each object's source generation,
+    MD5 and the mtime of its local copy. Unchanged objects are skipped by
+    generation, or by MD5 when an identical file was re-uploaded or copied in
+    by other means. The same manifest lets ``LocalBackend`` report source
+    generations, so stored analyses stay valid when the pipeline switches
+    between the bucket and the mirror.
+    """
+
+    def __init__(self, source: StorageBackend, root: str, workers: int = DEFAULT_MIRROR_WORKERS):
+        """
+        Initialize the mirror.
+
+        Args:
+            source: Backend to mirror (normally the GCS bucket)
+            root: Local directory receiving the mirror
+            workers: Parallel downloads
+        """
+        self.source = source
+        self.root = os.path.abspath(root)
+        self.workers = max(1, workers)
+        self.local = LocalBackend(self.root)
+        os.makedirs(self.root, exist_ok=True)
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.root, MIRROR_MANIFEST_NAME)
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"objects": {}}
+
+    def _save_manifest(self, manifest: Dict[str, Any]) -> None:
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _entry(self, info: ObjectInfo, path: str, md5_hash: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            "generation": info.generation,
+            "md5_hash": info.md5_hash or md5_hash,
+            "size": info.size,
+            "content_type": info.content_type,
+            "mtime_ns": os.stat(path).st_mtime_ns,
+        }
+
+    def _is_current(self, info: ObjectInfo, path: str, known: Optional[Dict[str, Any]]) -> Optional[str]:
+        """Return why the local copy can be kept, or None when it must be downloaded."""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        untouched = known is not None and known.get("mtime_ns") == stat.st_mtime_ns
+        if untouched and known.get("generation") == info.generation:
+            return "generation"
+        if info.md5_hash and info.size == stat.st_size:
+            if (untouched and known.get("md5_hash") == info.md5_hash) or file_md5(path) == info.md5_hash:
+                return "md5"
+        return None
+
+    def _download(self, info: ObjectInfo) -> Dict[str, Any]:
+        path = self.local.file_path(info.name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            self.source.download_to_filename(info.name, tmp_path, info.generation)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return self._entry(info, path)
+
+    def sync(self, prefix: str = COMPANY_DATA_PREFIX, delete: bool = True) -> Dict[str, Any]:
+        """
+        Bring the mirror up to date with the source.
+
+        Args:
+            prefix: Object prefix to mirror
+            delete: Remove local copies of objects deleted from the source
+
+        Returns:
+            Dict with counts of ``downloaded``, ``unchanged``, ``removed`` and
+            ``failed`` objects, bytes downloaded and elapsed seconds
+        """
+        started = time.perf_counter()
+        manifest = self._load_manifest()
+        previous = manifest.get("objects", {})
+        current: Dict[str, Dict[str, Any]] = {}
+        pending: List[ObjectInfo] = []
+        unchanged = 0
+
+        for info in self.source.list(prefix=prefix):
+            if info.name.endswith("/"):
+                continue
+            path = self.local.file_path(info.name)
+            known = previous.get(info.name)
+            reason = self._is_current(info, path, known)
+            if reason is None:
+                pending.append(info)
+                continue
+            current[info.name] = known if reason == "generation" else self._entry(info, path, info.md5_hash)
+            unchanged += 1
+
+        downloaded_bytes = 0
+        failed: List[str] = []
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="lvx-mirror") as pool:
+            for info, future in [(info, pool.submit(self._download, info)) for info in pending]:
+                try:
+                    current[info.name] = future.result()
+                    downloaded_bytes += info.size or 0
+                except Exception as e:
+                    logger.warning(f"Could not mirror {info.name}: {e}")
+                    failed.append(info.name)
+                    if info.name in previous:
+                        current[info.name] = previous[info.name]
+
+        removed = 0
+        if delete:
+            for name in previous:
+                if name in current or not name.startswith(prefix):
+                    continue
+                try:
+                    os.remove(self.local.file_path(name))
+                except FileNotFoundError:
+                    pass
+                removed += 1
+        # Entries outside the synced prefix (and kept deletions) stay as they were
+        current.update({name: entry for name, entry in previous.items()
+                        if name not in current and not (delete and name.startswith(prefix))})
+
+        self._save_manifest({
+            "source": self.source.uri(prefix),
+            "synced_at": time.time(),
+            "objects": current,
+        })
+        summary = {
+            "downloaded": len(pending) - len(failed),
+            "unchanged": unchanged,
+            "removed": removed,
+            "failed": len(failed),
+            "downloaded_bytes": downloaded_bytes,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+        logger.info(f"Mirror sync: {summary}")
+        return summary
+
+
+def get_mirror_backend() -> Optional[LocalBackend]:
+    """Return a backend over ``LVX_MIRROR_DIR`` when a synced mirror exists there."""
+    if MIRROR_DIR and os.path.exists(os.path.join(MIRROR_DIR, MIRROR_MANIFEST_NAME)):
+        return LocalBackend(MIRROR_DIR)
+    return None
+
+
+def main() -> None:
+    """Mirror the company documents bucket to a local directory."""
+    parser = argparse.ArgumentParser(description="Mirror the Company Data/ prefix to local disk.")
+    parser.add_argument("--dest", default=MIRROR_DIR, required=MIRROR_DIR is None,
+                        help="Local mirror directory (defaults to LVX_MIRROR_DIR).")
+    parser.add_argument("--source", default=None,
+                        help="Source storage URI (defaults to gs://$GOOGLE_CLOUD_STORAGE_BUCKET_DATA).")
+    parser.add_argument("--prefix", default=COMPANY_DATA_PREFIX, help="Object prefix to mirror.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MIRROR_WORKERS, help="Parallel downloads.")
+    parser.add_argument("--keep-deleted", action="store_true",
+                        help="Keep local copies of objects deleted from the source.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    source = open_storage(args.source or f"gs://{os.getenv('GOOGLE_CLOUD_STORAGE_BUCKET_DATA', 'lxvquantumleapai')}")
+    mirror = BucketMirror(source, args.dest, workers=args.workers)
+    print(json.dumps(mirror.sync(args.prefix, delete=not args.keep_deleted), indent=2))
+
+
+if __name__ == "__main__":
+    main()
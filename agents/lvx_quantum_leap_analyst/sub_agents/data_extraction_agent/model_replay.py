@@ -0,0 +1,255 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Record and replay of Gemini calls for deterministic offline runs"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, List, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Cassette file; model calls are recorded to or replayed from it when set.
+CASSETTE_PATH = os.getenv("LVX_MODEL_CASSETTE")
+
+# "record" calls the model and appends to the cassette, "replay" answers from
+# it without any model, "replay_timed" also reproduces the recorded latency.
+CASSETTE_MODE = os.getenv("LVX_MODEL_CASSETTE_MODE", "replay")
+
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+MODE_REPLAY_TIMED = "replay_timed"
+
+
+class CassetteMiss(KeyError):
+    """Raised in replay mode when a prompt was never recorded."""
+
+
+class ReplayResponse:
+    """Response or stream chunk reproduced from a cassette (exposes ``text``)."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+def _prompt_text(contents: Any) -> str:
+    return contents if isinstance(contents, str) else json.dumps(contents, default=str, sort_keys=True)
+
+
+class ModelCassette:
+    """
+    Append-only JSON-lines file of model interactions keyed by prompt hash.
+
+    The key covers the call label (model and static instruction version),
+    the prompt and whether the call streamed. A prompt recorded several
+    times is replayed in recording order, the last recording repeating.
+    Each record keeps the response text, the streamed chunks and their
+    arrival offsets, so replays reproduce the chunking the parser sees.
+    """
+
+    def __init__(self, path: str, mode: str = MODE_REPLAY):
+        """
+        Initialize the cassette.
+
+        Args:
+            path: Cassette file
+            mode: ``record``, ``replay`` or ``replay_timed``
+        """
+        if mode not in (MODE_RECORD, MODE_REPLAY, MODE_REPLAY_TIMED):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self._records: Dict[str, List[Dict[str, Any]]] = {}
+        self._served: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "recorded": 0}
+        self._load()
+
+    @property
+    def replaying(self) -> bool:
+        """Whether calls are answered from the cassette."""
+        return self.mode != MODE_RECORD
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self._records.setdefault(record["key"], []).append(record)
+        except FileNotFoundError:
+            if self.replaying:
+                logger.warning(f"Cassette {self.path} does not exist; every replayed call will miss")
+
+    @staticmethod
+    def key(label: str, contents: Any, stream: bool) -> str:
+        """Return the cassette key of a call."""
+        digest = hashlib.sha256()
+        digest.update(f"{label}\0{int(stream)}\0".encode("utf-8"))
+        digest.update(_prompt_text(contents).encode("utf-8"))
+        return digest.hexdigest()
+
+    def lookup(self, key: str) -> Dict[str, Any]:
+        """Return the next recording for a key, raising ``CassetteMiss`` if there is none."""
+        with self._lock:
+            records = self._records.get(key)
+            if not records:
+                self.stats["misses"] += 1
+                raise CassetteMiss(key)
+            index = self._served.get(key, 0)
+            self._served[key] = index + 1
+            self.stats["hits"] += 1
+            return records[min(index, len(records) - 1)]
+
+    def record(self, record: Dict[str, Any]) -> None:
+        """Append a recording to the cassette file."""
+        with self._lock:
+            self._records.setdefault(record["key"], []).append(record)
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.stats["recorded"] += 1
+
+    def wrap(self, model: Optional[Any], label: str) -> "ReplayModel":
+        """Wrap a model so its calls go through this cassette."""
+        return ReplayModel(model, self, label)
+
+    def wrap_prompt_cache(self, prompt_cache: Optional[Any], label: str) -> "ReplayPromptCache":
+        """Wrap a ``PromptPrefixCache`` so the models it serves go through this cassette."""
+        return ReplayPromptCache(prompt_cache, self, label)
+
+
+class ReplayModel:
+    """
+    ``GenerativeModel`` stand-in that records to or replays from a cassette.
+
+    Only ``generate_content`` is intercepted; in replay mode no underlying
+    model is needed at all.
+    """
+
+    def __init__(self, model: Optional[Any], cassette: ModelCassette, label: str):
+        """
+        Initialize the wrapper.
+
+        Args:
+            model: Model called while recording (may be None when replaying)
+            cassette: Cassette holding the interactions
+            label: Identifies the model and static instruction in cassette keys
+        """
+        self.model = model
+        self.cassette = cassette
+        self.label = label
+
+    def generate_content(self, contents: Any, stream: bool = False, **kwargs: Any) -> Any:
+        """Answer a call from the cassette, or call the model and record it."""
+        key = ModelCassette.key(self.label, contents, stream)
+        if self.cassette.replaying:
+            record = self.cassette.lookup(key)
+            if stream:
+                return self._replay_stream(record)
+            if self.cassette.mode == MODE_REPLAY_TIMED:
+                time.sleep(record["latency_s"])
+            return ReplayResponse(record["text"])
+
+        if self.model is None:
+            raise RuntimeError("No model available to record from")
+        if stream:
+            return self._record_stream(key, contents, kwargs)
+
+        started = time.perf_counter()
+        response = self.model.generate_content(contents, **kwargs)
+        text = response.text or ""
+        self._save(key, contents, False, text, [text], [time.perf_counter() - started])
+        return response
+
+    def _replay_stream(self, record: Dict[str, Any]) -> Iterator[ReplayResponse]:
+        started = time.perf_counter()
+        for text, offset in zip(record["chunks"], record["chunk_offsets_s"]):
+            if self.cassette.mode == MODE_REPLAY_TIMED:
+                delay = offset - (time.perf_counter() - started)
+                if delay > 0:
+                    time.sleep(delay)
+            yield ReplayResponse(text)
+
+    def _record_stream(self, key: str, contents: Any, kwargs: Dict[str, Any]) -> Iterator[Any]:
+        started = time.perf_counter()
+        chunks, offsets = [], []
+        for chunk in self.model.generate_content(contents, stream=True, **kwargs):
+            chunks.append(chunk.text or "")
+            offsets.append(time.perf_counter() - started)
+            yield chunk
+        self._save(key, contents, True, "".join(chunks), chunks, offsets)
+
+    def _save(self, key: str, contents: Any, stream: bool, text: str,
+              chunks: List[str], offsets: List[float]) -> None:
+        self.cassette.record({
+            "key": key,
+            "label": self.label,
+            "stream": stream,
+            "prompt_sha256": hashlib.sha256(_prompt_text(contents).encode("utf-8")).hexdigest(),
+            "prompt_chars": len(_prompt_text(contents)),
+            "text": text,
+            "chunks": chunks,
+            "chunk_offsets_s": [round(offset, 4) for offset in offsets],
+            "latency_s": round(offsets[-1] if offsets else 0.0, 4),
+            "recorded_at": datetime.utcnow().isoformat(),
+        })
+
+
+class ReplayPromptCache:
+    """``PromptPrefixCache`` stand-in whose models go through a cassette."""
+
+    def __init__(self, prompt_cache: Optional[Any], cassette: ModelCassette, label: str):
+        """
+        Initialize the wrapper.
+
+        Args:
+            prompt_cache: Prefix cache used while recording (may be None when replaying)
+            cassette: Cassette holding the interactions
+            label: Identifies the model and static instruction in cassette keys
+        """
+        self.prompt_cache = prompt_cache
+        self.cassette = cassette
+        self.label = label
+
+    def get_model(self) -> ReplayModel:
+        """Return the cached-instruction model wrapped for the cassette."""
+        model = None if self.cassette.replaying or self.prompt_cache is None else self.prompt_cache.get_model()
+        return ReplayModel(model, self.cassette, self.label)
+
+    def describe(self) -> Dict[str, Any]:
+        """Describe the prefix cache, noting the cassette mode."""
+        described = self.prompt_cache.describe() if self.prompt_cache is not None else {}
+        return {**described, "cassette": self.cassette.mode}
+
+
+_default_cassette: Optional[ModelCassette] = None
+_default_cassette_lock = threading.Lock()
+
+
+def get_model_cassette() -> Optional[ModelCassette]:
+    """Return the cassette configured by ``LVX_MODEL_CASSETTE``, if any."""
+    global _default_cassette
+    if not CASSETTE_PATH:
+        return None
+    with _default_cassette_lock:
+        if _default_cassette is None:
+            _default_cassette = ModelCassette(CASSETTE_PATH, CASSETTE_MODE)
+            logger.info(f"Model calls use cassette {CASSETTE_PATH} in {CASSETTE_MODE} mode")
+        return _default_cassette
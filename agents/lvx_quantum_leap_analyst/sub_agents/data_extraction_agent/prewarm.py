@@ -0,0 +1,460 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Company change feed and background pre-warm worker"""
+
+import os
+import json
+import queue
+import heapq
+import logging
+import argparse
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional
+from datetime import datetime
+
+from .adaptive_limiter import limiter_metrics
+from .company_records import company_record
+from .cost_ledger import usage_scope
+from .result_store import DEFAULT_CACHE_DIR, ResultStore, company_fingerprint
+from .storage_backend import StorageBackend
+
+logger = logging.getLogger(__name__)
+
+COMPANY_DATA_PREFIX = "Company Data/"
+
+# Lower values are processed first.
+PRIORITY_NEW = 0
+PRIORITY_CHANGED = 1
+PRIORITY_BACKFILL = 2
+
+
+class CompanyChangeFeed:
+    """
+    Detects new or changed companies under the ``Company Data/`` prefix.
+
+    The feed keeps, per company, the fingerprint, blob count and newest
+    ``updated`` time of the last folder version that was pre-warmed, plus a
+    global ``updated`` high-watermark. A folder with nothing updated past its
+    recorded time and the same number of blobs is skipped without
+    fingerprinting; anything else is fingerprinted and compared. Companies
+    are recorded through ``commit`` once their result is stored, so a crash
+    mid-batch re-announces them on restart. State is persisted so a
+    restarted worker does not re-announce the whole bucket.
+    """
+
+    def __init__(self, storage: StorageBackend, cache_dir: str = DEFAULT_CACHE_DIR):
+        """
+        Initialize the change feed.
+
+        Args:
+            storage: Backend holding ``Company Data/``
+            cache_dir: Directory where the feed state is persisted
+        """
+        self.storage = storage
+        self.state_path = os.path.join(cache_dir, "prewarm_state.json")
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self.state = self._load_state()
+
+    def _load_state(self) -> Dict[str, Any]:
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"watermark": None, "companies": {}}
+
+    def _save_state(self) -> None:
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.state_path)
+
+    @property
+    def watermark(self) -> Optional[str]:
+        """ISO timestamp of the most recent blob update pre-warmed so far."""
+        return self.state.get("watermark")
+
+    def poll(self) -> List[Dict[str, Any]]:
+        """
+        List the prefix once and report companies whose folder changed.
+
+        Returns:
+            List of change records with company name, fingerprint, blob
+            count, latest ``updated`` timestamp and a priority (new
+            companies first)
+        """
+        folders: Dict[str, List[Any]] = {}
+        for blob in self.storage.list(prefix=COMPANY_DATA_PREFIX):
+            parts = blob.name.split("/")
+            if len(parts) < 3 or not parts[1] or not parts[2]:
+                continue
+            folders.setdefault(parts[1], []).append(blob)
+
+        changes = []
+        with self._lock:
+            known = self.state["companies"]
+            for company_name, blobs in folders.items():
+                updated = max((blob.updated.isoformat() for blob in blobs if blob.updated), default=None)
+                previous = known.get(company_name)
+                if previous and updated and previous.get("updated") and updated <= previous["updated"] \
+                        and previous.get("blobs") == len(blobs):
+                    # Nothing uploaded or overwritten since it was pre-warmed, and nothing deleted
+                    continue
+
+                fingerprint = company_fingerprint(blobs)
+                if previous and previous.get("fingerprint") == fingerprint:
+                    continue
+
+                changes.append({
+                    "company_name": company_name,
+                    "fingerprint": fingerprint,
+                    "blobs": len(blobs),
+                    "updated": updated,
+                    "priority": PRIORITY_CHANGED if previous else PRIORITY_NEW,
+                })
+
+            # Folders that disappeared entirely are forgotten so a re-upload counts as new.
+            removed = set(known) - set(folders)
+            for company_name in removed:
+                del known[company_name]
+            if removed:
+                self._save_state()
+
+        if changes:
+            logger.info(f"Change feed detected {len(changes)} new or changed companies")
+        return changes
+
+    def commit(self, change: Dict[str, Any]) -> None:
+        """
+        Record a change as pre-warmed, so later polls skip that folder version.
+
+        Args:
+            change: Change record returned by ``poll`` whose result is stored
+        """
+        with self._lock:
+            self.state["companies"][change["company_name"]] = {
+                "fingerprint": change["fingerprint"],
+                "blobs": change.get("blobs"),
+                "updated": change.get("updated"),
+            }
+            updated = change.get("updated")
+            if updated and (self.watermark is None or updated > self.watermark):
+                self.state["watermark"] = updated
+            self._save_state()
+
+    def reset(self, company_name: str) -> None:
+        """Forget a company so the next poll reports it again (e.g. to force a new pre-warm)."""
+        with self._lock:
+            if self.state["companies"].pop(company_name, None) is not None:
+                self._save_state()
+
+
+class LocalNotificationQueue:
+    """
+    In-process stand-in for GCS object-change notifications (Pub/Sub).
+
+    Publishers push object notifications; ``poll`` folds them into one change
+    record per company, mirroring what ``CompanyChangeFeed.poll`` returns.
+    Notifications only say which folders changed: each one is re-listed so
+    the fingerprint covers the whole folder, as ``company_fingerprint`` of
+    the stored result does.
+    """
+
+    def __init__(self, storage: StorageBackend):
+        """
+        Initialize the queue.
+
+        Args:
+            storage: Backend holding ``Company Data/``, listed to fingerprint changed folders
+        """
+        self.storage = storage
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+
+    def publish(self, object_name: str, generation: Any = None, updated: Optional[str] = None,
+                priority: int = PRIORITY_CHANGED) -> None:
+        """
+        Publish an object-change notification.
+
+        Args:
+            object_name: Full object name, e.g. ``Company Data/Acme/pitch_deck.txt``
+            generation: Object generation after the change
+            updated: ISO timestamp of the change
+            priority: Processing priority (lower runs first)
+        """
+        self._queue.put({
+            "name": object_name,
+            "generation": generation,
+            "updated": updated,
+            "priority": priority,
+        })
+
+    def poll(self) -> List[Dict[str, Any]]:
+        """Drain pending notifications into per-company change records."""
+        grouped: Dict[str, Dict[str, Any]] = {}
+        while True:
+            try:
+                event = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            parts = event["name"].split("/")
+            if len(parts) < 3 or parts[0] + "/" != COMPANY_DATA_PREFIX or not parts[1]:
+                continue
+            record = grouped.setdefault(parts[1], {
+                "company_name": parts[1],
+                "changed": set(),
+                "updated": None,
+                "priority": event["priority"],
+            })
+            record["changed"].add(event["name"])
+            record["priority"] = min(record["priority"], event["priority"])
+            if event["updated"] and (record["updated"] is None or event["updated"] > record["updated"]):
+                record["updated"] = event["updated"]
+
+        changes = []
+        for record in grouped.values():
+            blobs = list(self.storage.list(prefix=f"{COMPANY_DATA_PREFIX}{record['company_name']}/"))
+            if not blobs:
+                # The whole folder was deleted; there is nothing to pre-warm
+                continue
+            record["fingerprint"] = company_fingerprint(blobs)
+            record["blobs"] = len(blobs)
+            record["changed"] = sorted(record["changed"])
+            changes.append(record)
+        return changes
+
+
+class PrewarmWorker:
+    """
+    Background worker that pre-computes ``extract_company_data`` for new or
+    changed companies so interactive requests are served from the result store.
+
+    Work is ordered by priority (new companies before changed ones), then by
+    most recent update, and executed with bounded concurrency.
+    """
+
+    def __init__(self, agent: Any, feed: Any, max_concurrency: int = 4, poll_interval: float = 60.0,
+                 record_sink: Optional[Any] = None, graph_exporter: Optional[Any] = None):
+        """
+        Initialize the pre-warm worker.
+
+        Args:
+            agent: DataExtractionAgent configured with a ResultStore
+            feed: CompanyChangeFeed or LocalNotificationQueue
+            max_concurrency: Maximum analyses in flight at once
+            poll_interval: Seconds between feed polls
+            record_sink: CompanyRecordSink receiving one bulk batch of
+                company records per poll
+            graph_exporter: GraphExporter refreshed from the result store
+                after each batch
+        """
+        if agent.result_store is None:
+            raise ValueError("PrewarmWorker requires a DataExtractionAgent with a result_store")
+        self.agent = agent
+        self.feed = feed
+        self.max_concurrency = max_concurrency
+        self.poll_interval = poll_interval
+        self.record_sink = record_sink
+        self.graph_exporter = graph_exporter
+
+        self._heap: List[Any] = []
+        self._queued: Dict[str, Dict[str, Any]] = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"polls": 0, "enqueued": 0, "completed": 0, "failed": 0}
+
+    def enqueue(self, change: Dict[str, Any]) -> None:
+        """Queue a change record, collapsing duplicates for the same company."""
+        company_name = change["company_name"]
+        with self._lock:
+            existing = self._queued.get(company_name)
+            if existing:
+                # The newer record describes the current folder; changed objects accumulate
+                merged = sorted(set(existing.get("changed") or []) | set(change.get("changed") or []))
+                if existing["priority"] <= change["priority"]:
+                    existing.update(fingerprint=change.get("fingerprint"), blobs=change.get("blobs"),
+                                    updated=max(filter(None, (existing.get("updated"), change.get("updated"))),
+                                                default=None))
+                    if merged:
+                        existing["changed"] = merged
+                    return
+                if merged:
+                    change = {**change, "changed": merged}
+            self._queued[company_name] = change
+            # Newer updates sort first within a priority band.
+            recency = -datetime.fromisoformat(change["updated"]).timestamp() if change.get("updated") else 0.0
+            heapq.heappush(self._heap, (change["priority"], recency, next(self._counter), change))
+            self.stats["enqueued"] += 1
+
+    def _pop_batch(self) -> List[Dict[str, Any]]:
+        batch = []
+        with self._lock:
+            while self._heap:
+                _, _, _, change = heapq.heappop(self._heap)
+                # Skip entries superseded by a higher-priority duplicate.
+                if self._queued.get(change["company_name"]) is change:
+                    del self._queued[change["company_name"]]
+                    batch.append(change)
+        return batch
+
+    def _process(self, change: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        company_name = change["company_name"]
+        try:
+            with usage_scope(batch=change.get("batch")):
+                result = self.agent.extract_company_data(company_name)
+            if "error" in result:
+                raise RuntimeError(result["error"])
+            stored = self.agent.result_store.get_fingerprint(company_name)
+            if stored != result.get("source_fingerprint"):
+                # Degraded analyses are not stored; leave the change uncommitted to retry it
+                raise RuntimeError("analysis was not stored")
+            commit = getattr(self.feed, "commit", None)
+            if commit and stored == change.get("fingerprint"):
+                commit(change)
+            with self._lock:
+                self.stats["completed"] += 1
+            logger.info(f"Pre-warmed analysis for {company_name}")
+            return result
+        except Exception as e:
+            with self._lock:
+                self.stats["failed"] += 1
+            logger.error(f"Pre-warm failed for {company_name}: {e}")
+            return None
+
+    def run_once(self) -> int:
+        """
+        Poll the feed once and process everything queued.
+
+        Returns:
+            Number of companies processed
+        """
+        for change in self.feed.poll():
+            self.enqueue(change)
+        self.stats["polls"] += 1
+
+        batch = self._pop_batch()
+        if batch:
+            # Model usage of this run is reported under one batch id
+            batch_id = f"prewarm-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-{self.stats['polls']}"
+            for change in batch:
+                change["batch"] = batch_id
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+                # Submission order follows priority; the pool bounds concurrency.
+                results = list(pool.map(self._process, batch))
+            self.agent.cost_ledger.flush()
+            try:
+                # One postings rebuild per batch; also drops deleted documents
+                self.agent.search_index.update(self.agent.storage)
+            except Exception as e:
+                logger.error(f"Failed to update the search index for {batch_id}: {e}")
+            if self.record_sink is not None:
+                # One bulk load per batch instead of a write per company
+                try:
+                    self.record_sink.write_batch([company_record(result) for result in results if result],
+                                                 batch_id)
+                except Exception as e:
+                    logger.error(f"Failed to write company records for {batch_id}: {e}")
+            if self.graph_exporter is not None:
+                # Incremental: only companies whose fingerprint changed are rewritten
+                try:
+                    self.graph_exporter.export_from_store(self.agent.result_store)
+                except Exception as e:
+                    logger.error(f"Failed to export knowledge graphs for {batch_id}: {e}")
+            logger.info("Concurrency limits after batch: " + ", ".join(
+                f"{name}={metrics['limit']} ({metrics['overloads']} overloads)"
+                for name, metrics in limiter_metrics().items()))
+        return len(batch)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Pre-warm poll failed: {e}")
+            self._stop.wait(self.poll_interval)
+
+    def start(self) -> None:
+        """Start polling in a background thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="lvx-prewarm", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop polling after the current batch completes."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+
+def main() -> None:
+    """Run the pre-warm worker against the configured data bucket."""
+    from .agent import DataExtractionAgent
+    from .analysis_history import AnalysisHistory
+    from .company_records import CompanyRecordSink
+    from .cpu_stage import DEFAULT_CPU_WORKERS, CpuStage
+    from .graph_export import GraphExporter
+
+    parser = argparse.ArgumentParser(description="Pre-compute company analyses into the result store.")
+    parser.add_argument("--once", action="store_true", help="Poll once and exit.")
+    parser.add_argument("--concurrency", type=int, default=16,
+                        help="Maximum analyses in flight; GCS and Gemini calls are further "
+                             "limited adaptively (LVX_CONCURRENCY_LIMITS).")
+    parser.add_argument("--interval", type=float, default=60.0, help="Seconds between polls.")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Local cache directory.")
+    parser.add_argument("--cpu-workers", type=int, default=DEFAULT_CPU_WORKERS or os.cpu_count(),
+                        help="Worker processes for parsing and rule-based extraction (0 runs inline).")
+    parser.add_argument("--company-records", choices=["parquet", "ndjson", "off"], default="parquet",
+                        help="Format of the company record batches written under <cache-dir>/warehouse.")
+    parser.add_argument("--graph-export", choices=["parquet", "arrow", "off"], default="parquet",
+                        help="Format of the knowledge graph tables written under <cache-dir>/graph_export.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    cpu_stage = CpuStage(args.cpu_workers)
+    agent = DataExtractionAgent(result_store=ResultStore(args.cache_dir), cpu_stage=cpu_stage,
+                                history=AnalysisHistory(args.cache_dir), cache_dir=args.cache_dir)
+    worker = PrewarmWorker(
+        agent,
+        CompanyChangeFeed(agent.storage, args.cache_dir),
+        max_concurrency=args.concurrency,
+        poll_interval=args.interval,
+        record_sink=None if args.company_records == "off" else CompanyRecordSink(
+            os.path.join(args.cache_dir, "warehouse"), table_format=args.company_records),
+        graph_exporter=None if args.graph_export == "off" else GraphExporter(
+            os.path.join(args.cache_dir, "graph_export"), table_format=args.graph_export),
+    )
+
+    try:
+        if args.once:
+            worker.run_once()
+            return
+
+        worker.start()
+        try:
+            while True:
+                worker._thread.join(1.0)
+        except KeyboardInterrupt:
+            worker.stop()
+    finally:
+        cpu_stage.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Prompt compaction and token budgeting for company analysis prompts"""
+
+import os
+import re
+import math
+import logging
+from collections import Counter
+from typing import Dict, List, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOKEN_BUDGET = int(os.getenv("LVX_PROMPT_TOKEN_BUDGET", "24000"))
+
+# Rough characters-per-token ratio for Gemini tokenizers on English prose.
+CHARS_PER_TOKEN = 4
+
+# Passages up to this size are kept whole; longer paragraphs are split on lines.
+MAX_PASSAGE_CHARS = 1200
+
+SECTION_HEADER_RE = re.compile(r"^(PITCH DECK|FOUNDER CHECKLIST):$")
+PAGE_MARKER_RE = re.compile(r"^(page|slide)?\s*\d+(\s*(/|of)\s*\d+)?$", re.IGNORECASE)
+NUMBER_RE = re.compile(r"[$€£₹]\s?\d|\d+(\.\d+)?\s?(%|x\b|k\b|m\b|mm\b|bn?\b|million|billion)", re.IGNORECASE)
+
+# Investment-relevance signals and their weights.
+RELEVANCE_TERMS = {
+    "metrics": (3.0, re.compile(
+        r"\b(arr|mrr|revenue|growth|burn|runway|margin|cac|ltv|churn|retention|gmv|ebitda|"
+        r"users|customers|traction|unit economics|cohort)\b", re.IGNORECASE)),
+    "founders": (2.5, re.compile(
+        r"\b(founder|co-founder|cofounder|ceo|cto|coo|cfo|team|ex-|previously|phd)\b", re.IGNORECASE)),
+    "funding": (3.0, re.compile(
+        r"\b(seed|pre-seed|series [a-e]|raise|raising|round|valuation|investors?|led by|"
+        r"funding|ask|equity|safe|convertible)\b", re.IGNORECASE)),
+    "competitors": (2.0, re.compile(
+        r"\b(competitors?|competition|compete|alternatives?|versus|vs\.?|incumbents?|"
+        r"differentiat\w*|moat)\b", re.IGNORECASE)),
+    "market": (1.5, re.compile(r"\b(tam|sam|som|market size|market|segment|industry)\b", re.IGNORECASE)),
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a text without a tokenizer round trip."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def _normalize_line(line: str) -> str:
+    return re.sub(r"\s+", " ", line).strip()
+
+
+def _split_passages(text: str) -> List[Tuple[int, int, str]]:
+    """Split text into (start, end, section) passages on blank lines and section headers."""
+    passages = []
+    section = "document"
+    for block in re.finditer(r"(?:[^\n]*\S[^\n]*(?:\n|$))+", text):
+        start, end = block.start(), block.end()
+        first_line = text[start:end].split("\n", 1)[0].strip()
+        header = SECTION_HEADER_RE.match(first_line)
+        if header:
+            section = header.group(1).lower().replace(" ", "_")
+
+        if end - start <= MAX_PASSAGE_CHARS:
+            passages.append((start, end, section))
+            continue
+
+        # Split oversized paragraphs into line groups so budgeting stays fine-grained.
+        chunk_start = start
+        for line in re.finditer(r"[^\n]*(?:\n|$)", text[start:end]):
+            line_end = start + line.end()
+            if line_end - chunk_start >= MAX_PASSAGE_CHARS:
+                passages.append((chunk_start, line_end, section))
+                chunk_start = line_end
+        if chunk_start < end:
+            passages.append((chunk_start, end, section))
+    return passages
+
+
+def score_passage(text: str) -> float:
+    """Score a passage by investment relevance per token."""
+    tokens = max(estimate_tokens(text), 1)
+    score = 0.0
+    for weight, pattern in RELEVANCE_TERMS.values():
+        # Distinct terms only, so prose repeating "team" or "customers" does not outrank facts
+        score += weight * len({match.group(0).lower() for match in pattern.finditer(text)})
+    score += 1.5 * len(NUMBER_RE.findall(text))
+    # Density keeps long low-signal passages from outranking dense ones.
+    return score / math.sqrt(tokens)
+
+
+class PromptBudgeter:
+    """
+    Compacts combined company text and trims it to a token budget.
+
+    Compaction collapses whitespace, removes boilerplate lines that repeat
+    across slides (headers, footers, page markers) and duplicate passages.
+    If the result still exceeds the budget, passages are ranked by
+    investment relevance and the lowest-ranked ones are dropped; the kept
+    passages are emitted in their original order.
+    """
+
+    def __init__(self, max_tokens: int = DEFAULT_TOKEN_BUDGET, boilerplate_min_repeats: int = 3):
+        """
+        Initialize the budgeter.
+
+        Args:
+            max_tokens: Token budget for the company text portion of the prompt
+            boilerplate_min_repeats: Occurrences after which a short line is
+                treated as boilerplate and kept only once
+        """
+        self.max_tokens = max_tokens
+        self.boilerplate_min_repeats = boilerplate_min_repeats
+
+    def _deduplicate_lines(self, text: str) -> Tuple[str, int]:
+        lines = [_normalize_line(line) for line in text.split("\n")]
+        counts = Counter(line.lower() for line in lines if line and len(line) <= 80)
+
+        kept = []
+        seen_boilerplate = set()
+        removed = 0
+        previous_blank = True
+        for line in lines:
+            key = line.lower()
+            if not line:
+                if not previous_blank:
+                    kept.append("")
+                previous_blank = True
+                continue
+            if PAGE_MARKER_RE.match(line):
+                removed += 1
+                continue
+            if counts.get(key, 0) >= self.boilerplate_min_repeats and not SECTION_HEADER_RE.match(line):
+                if key in seen_boilerplate:
+                    removed += 1
+                    continue
+                seen_boilerplate.add(key)
+            kept.append(line)
+            previous_blank = False
+        return "\n".join(kept).strip(), removed
+
+    def compact(self, text: str) -> Dict[str, Any]:
+        """
+        Compact text and fit it into the token budget.
+
+        Args:
+            text: Combined company text (see ``_combine_text_content``)
+
+        Returns:
+            Dict with the compacted ``text`` and a ``report`` describing token
+            counts before and after, removed lines and dropped spans. Span
+            offsets refer to the deduplicated text.
+        """
+        original_tokens = estimate_tokens(text)
+        deduped, removed_lines = self._deduplicate_lines(text)
+
+        passages = []
+        seen_passages = set()
+        duplicate_passages = 0
+        for start, end, section in _split_passages(deduped):
+            body = deduped[start:end].strip()
+            key = body.lower()
+            if key in seen_passages and not SECTION_HEADER_RE.match(body):
+                duplicate_passages += 1
+                continue
+            seen_passages.add(key)
+            passages.append({
+                "start": start,
+                "end": end,
+                "section": section,
+                "text": body,
+                "tokens": estimate_tokens(body + "\n\n"),
+                # Section headers and the opening passage anchor the document.
+                "pinned": bool(SECTION_HEADER_RE.match(body.split("\n", 1)[0])) or not passages,
+            })
+
+        kept_ids = set(range(len(passages)))
+        dropped = []
+        total_tokens = sum(p["tokens"] for p in passages)
+
+        if total_tokens > self.max_tokens:
+            ranked = sorted(
+                (i for i, p in enumerate(passages) if not p["pinned"]),
+                key=lambda i: score_passage(passages[i]["text"]),
+            )
+            for i in ranked:
+                if total_tokens <= self.max_tokens:
+                    break
+                passage = passages[i]
+                kept_ids.discard(i)
+                total_tokens -= passage["tokens"]
+                dropped.append({
+                    "section": passage["section"],
+                    "start": passage["start"],
+                    "end": passage["end"],
+                    "tokens": passage["tokens"],
+                    "relevance": round(score_passage(passage["text"]), 3),
+                    "preview": passage["text"][:80],
+                })
+
+        compacted = "\n\n".join(p["text"] for i, p in enumerate(passages) if i in kept_ids)
+        compacted_tokens = estimate_tokens(compacted)
+
+        report = {
+            "token_budget": self.max_tokens,
+            "original_tokens": original_tokens,
+            "compacted_tokens": compacted_tokens,
+            "tokens_saved": original_tokens - compacted_tokens,
+            "boilerplate_lines_removed": removed_lines,
+            "duplicate_passages_removed": duplicate_passages,
+            "dropped_spans": sorted(dropped, key=lambda span: span["start"]),
+            "within_budget": compacted_tokens <= self.max_tokens,
+        }
+        if dropped:
+            logger.info(
+                f"Prompt budget trimmed {len(dropped)} passages "
+                f"({original_tokens} -> {compacted_tokens} tokens)"
+            )
+        return {"text": compacted, "report": report}
@@ -0,0 +1,123 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Reuse of models primed with a static prompt prefix"""
+
+import os
+import hashlib
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, Optional
+
+import vertexai
+from vertexai.generative_models import GenerativeModel
+
+from .prompt_budget import estimate_tokens
+
+# Vertex AI location used when neither the caller nor GOOGLE_CLOUD_LOCATION names one.
+DEFAULT_LOCATION = os.getenv("GOOGLE_CLOUD_LOCATION", "us-central1")
+
+# vertexai.init sets process-wide defaults that models and clients
+# read when they are created; tenants in different projects take turns.
+_vertex_lock = threading.RLock()
+
+
+@contextmanager
+def vertex_project(project: Optional[str], location: Optional[str] = None) -> Iterator[None]:
+    """
+    Point Vertex AI at a project and location while creating models or caches.
+
+    Models keep the project and location they were created with, so they
+    can be used outside the block. Without a project the defaults are left
+    as they are.
+
+    Args:
+        project: Google Cloud project ID
+        location: Vertex AI location; defaults to ``DEFAULT_LOCATION``
+    """
+    with _vertex_lock:
+        if project:
+            vertexai.init(project=project, location=location or DEFAULT_LOCATION)
+        yield
+
+
+def prompt_version(model_name: str, system_instruction: str) -> str:
+    """Return a short version id for a model and static instruction pair."""
+    digest = hashlib.sha256(f"{model_name}\0{system_instruction}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class PromptPrefixCache:
+    """
+    Serves a GenerativeModel primed with a static instruction.
+
+    The model is built once with the instruction as its
+    ``system_instruction`` and reused, which keeps the prefix out of the
+    per-company prompt code. The prefix is still sent and billed as input on
+    every call. Vertex AI context caching is not used: it requires a prefix
+    of at least 2048 tokens, and the analysis instruction is about 600.
+    """
+
+    def __init__(self, model_name: str, system_instruction: str,
+                 project: Optional[str] = None, location: Optional[str] = None):
+        """
+        Initialize the prefix cache.
+
+        Args:
+            model_name: Gemini model name
+            system_instruction: Static prompt prefix shared by every call
+            project: Google Cloud project owning the model; the current
+                Vertex AI default if omitted
+            location: Vertex AI location; defaults to ``DEFAULT_LOCATION``
+        """
+        self.model_name = model_name
+        self.system_instruction = system_instruction
+        self.version = prompt_version(model_name, system_instruction)
+        self.project = project
+        self.location = location
+
+        self._lock = threading.Lock()
+        self._model: Optional[GenerativeModel] = None
+        self.prefix_tokens = estimate_tokens(system_instruction)
+        self.stats = {"requests": 0, "creates": 0}
+
+    def get_model(self) -> GenerativeModel:
+        """
+        Return a model primed with the static instruction.
+
+        Returns:
+            GenerativeModel carrying the instruction as its system instruction
+        """
+        with self._lock:
+            self.stats["requests"] += 1
+            if self._model is None:
+                with vertex_project(self.project, self.location):
+                    self._model = GenerativeModel(self.model_name, system_instruction=self.system_instruction)
+                self.stats["creates"] += 1
+            return self._model
+
+    def invalidate(self) -> None:
+        """Forget the current model so the next call rebuilds it."""
+        with self._lock:
+            self._model = None
+
+    def describe(self) -> Dict[str, Any]:
+        """Return the prompt version, prefix tokens sent with every call and counters."""
+        return {
+            "prompt_version": self.version,
+            "mode": "system_instruction",
+            "prefix_tokens": self.prefix_tokens,
+            "cached_tokens": 0,
+            **self.stats,
+        }
@@ -0,0 +1,152 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Result Store for precomputed company analyses"""
+
+import os
+import re
+import json
+import hashlib
+import logging
+import threading
+from typing import Dict, Iterable, Iterator, Any, Optional
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.getenv("LVX_CACHE_DIR", ".lvx_cache")
+
+
+def company_slug(company_name: str) -> str:
+    """Return a filesystem-safe identifier for a company name."""
+    slug = re.sub(r"[^a-z0-9]+", "_", company_name.lower()).strip("_")
+    return slug or "company"
+
+
+def company_fingerprint(blobs: Iterable[Any]) -> str:
+    """
+    Fingerprint a company folder from its blob names and generations.
+
+    Any upload, overwrite or deletion changes the generation set, so the
+    fingerprint changes whenever the underlying documents do.
+
+    Args:
+        blobs: Blob-like objects exposing ``name`` and ``generation``
+
+    Returns:
+        Hex digest identifying this exact version of the folder
+    """
+    digest = hashlib.sha256()
+    for name, generation in sorted((blob.name, str(blob.generation)) for blob in blobs):
+        digest.update(f"{name}\0{generation}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ResultStore:
+    """
+    File-backed store of ``extract_company_data`` results keyed by company
+    and folder fingerprint, shared by interactive requests and the
+    background pre-warm worker.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        """
+        Initialize the result store.
+
+        Args:
+            cache_dir: Root directory for local caches
+        """
+        self.root = os.path.join(cache_dir, "results")
+        os.makedirs(self.root, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _path(self, company_name: str) -> str:
+        return os.path.join(self.root, f"{company_slug(company_name)}.json")
+
+    def _load(self, company_name: str) -> Optional[Dict[str, Any]]:
+        path = self._path(company_name)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable result for {company_name}: {e}")
+            return None
+
+    def get(self, company_name: str, fingerprint: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Fetch a stored result.
+
+        Args:
+            company_name: Name of the company
+            fingerprint: Required folder fingerprint; ``None`` accepts any version
+
+        Returns:
+            The stored result, or None when missing or stale
+        """
+        entry = self._load(company_name)
+        if not entry:
+            return None
+        if fingerprint is not None and entry.get("fingerprint") != fingerprint:
+            return None
+        return entry.get("result")
+
+    def get_fingerprint(self, company_name: str) -> Optional[str]:
+        """Return the fingerprint of the stored result for a company, if any."""
+        entry = self._load(company_name)
+        return entry.get("fingerprint") if entry else None
+
+    def put(self, company_name: str, fingerprint: str, result: Dict[str, Any]) -> None:
+        """
+        Store a result, atomically replacing any previous version.
+
+        Args:
+            company_name: Name of the company
+            fingerprint: Folder fingerprint the result was computed from
+            result: Output of ``extract_company_data``
+        """
+        entry = {
+            "company_name": company_name,
+            "fingerprint": fingerprint,
+            "stored_at": datetime.utcnow().isoformat(),
+            "result": result,
+        }
+        path = self._path(company_name)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with self._lock:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, default=str)
+            os.replace(tmp_path, path)
+
+    def iter_entries(self) -> Iterator[Dict[str, Any]]:
+        """Yield every stored entry (company name, fingerprint, result)."""
+        for filename in sorted(os.listdir(self.root)):
+            if not filename.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.root, filename), "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable result {filename}: {e}")
+                continue
+            yield entry
+
+    def invalidate(self, company_name: str) -> None:
+        """Remove the stored result for a company."""
+        with self._lock:
+            try:
+                os.remove(self._path(company_name))
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,130 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Two-tier model routing for company analyses"""
+
+import os
+import logging
+from typing import Dict, Any, Optional
+
+from .fast_extractor import get_fast_extractor
+from .prompt import TRIAGE_PROMPT
+
+logger = logging.getLogger(__name__)
+
+TIER_FULL = "full"
+TIER_SUMMARY = "summary"
+
+SUMMARY_MODEL_NAME = os.getenv("LVX_SUMMARY_MODEL", "gemini-2.0-flash-lite")
+
+# Completeness score above which a company always gets the full analysis.
+DEFAULT_QUALITY_THRESHOLD = int(os.getenv("LVX_ROUTING_QUALITY_THRESHOLD", "50"))
+
+# Minimum rule-based signal score that promotes an incomplete company to the full tier.
+DEFAULT_SIGNAL_THRESHOLD = float(os.getenv("LVX_ROUTING_SIGNAL_THRESHOLD", "4"))
+
+# Weight of each anchor kind in the signal score (capped per kind).
+SIGNAL_WEIGHTS = {
+    "recurring_revenue": 3.0,
+    "funding_round": 1.5,
+    "founder": 1.5,
+    "investor": 2.0,
+    "money": 0.5,
+    "percentage": 0.5,
+}
+SIGNAL_CAP_PER_KIND = 2
+
+# Characters of company text shown to the triage model.
+TRIAGE_EXCERPT_CHARS = 4000
+
+
+class ModelRouter:
+    """
+    Decides whether a company gets the full entity/relationship analysis or
+    a short summary on a cheaper model.
+
+    Complete data rooms (quality score above the threshold) always take the
+    full path. Incomplete ones are promoted only if they look promising: by
+    default this is judged locally from rule-based anchors (reported
+    revenue, funding, founders, known investors), or optionally by a small
+    triage call on the cheap model.
+    """
+
+    def __init__(self, quality_threshold: int = DEFAULT_QUALITY_THRESHOLD,
+                 signal_threshold: float = DEFAULT_SIGNAL_THRESHOLD,
+                 triage_model: Optional[Any] = None):
+        """
+        Initialize the router.
+
+        Args:
+            quality_threshold: Completeness score above which the full tier is used
+            signal_threshold: Rule-based signal score that promotes incomplete companies
+            triage_model: Optional cheap GenerativeModel used for LLM triage
+                instead of the local signal score
+        """
+        self.quality_threshold = quality_threshold
+        self.signal_threshold = signal_threshold
+        self.triage_model = triage_model
+
+    def signal_score(self, text: str) -> float:
+        """Score investment signals found by the rule-based extractor."""
+        anchors = get_fast_extractor().extract_anchors(text)
+        return sum(
+            weight * min(len(anchors.get(kind, [])), SIGNAL_CAP_PER_KIND)
+            for kind, weight in SIGNAL_WEIGHTS.items()
+        )
+
+    def _llm_triage(self, text: str, company_name: str) -> bool:
+        prompt = TRIAGE_PROMPT.format(company_name=company_name, excerpt=text[:TRIAGE_EXCERPT_CHARS])
+        response = self.triage_model.generate_content(prompt)
+        # Only a leading PROMISING counts; "NOT PROMISING" or anything else is a skip
+        words = (response.text or "").strip().upper().split()
+        return bool(words) and words[0].strip(".,:;!*\"'") == "PROMISING"
+
+    def route(self, raw_data: Dict[str, Any], text: str, company_name: str) -> Dict[str, Any]:
+        """
+        Choose the analysis tier for a company.
+
+        Args:
+            raw_data: Raw data dict from ``_extract_raw_data_from_gcs``
+            text: Combined company text
+            company_name: Name of the company
+
+        Returns:
+            Dict with ``tier``, ``reason``, ``quality_score`` and ``signal_score``
+        """
+        quality_score = raw_data.get("data_quality", {}).get("completeness_score", 0)
+        decision = {"tier": TIER_FULL, "quality_score": quality_score, "signal_score": None}
+
+        if quality_score > self.quality_threshold:
+            decision["reason"] = "complete data room"
+            return decision
+
+        if self.triage_model is not None:
+            try:
+                promising = self._llm_triage(text, company_name)
+                decision["tier"] = TIER_FULL if promising else TIER_SUMMARY
+                decision["reason"] = "llm triage: " + ("promising" if promising else "not promising")
+                return decision
+            except Exception as e:
+                logger.warning(f"Triage call failed for {company_name}, using local signal score: {e}")
+
+        signal = self.signal_score(text)
+        decision["signal_score"] = signal
+        if signal >= self.signal_threshold:
+            decision["reason"] = "incomplete but promising signals"
+        else:
+            decision["tier"] = TIER_SUMMARY
+            decision["reason"] = "incomplete data with weak signals"
+        return decision
@@ -0,0 +1,253 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Deterministic investment-readiness scoring over stored analyses"""
+
+import os
+import logging
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+from .result_store import ResultStore
+
+logger = logging.getLogger(__name__)
+
+# Relative weight of each score component; renormalized to sum to 1.
+DEFAULT_WEIGHTS = {
+    "completeness": 0.15,
+    "growth": 0.25,
+    "burn_multiple": 0.20,
+    "runway": 0.15,
+    "margin": 0.10,
+    "signals": 0.15,
+}
+
+# Component score used when a company does not report the underlying metric,
+# so withholding a number never ranks above reporting a weak one.
+MISSING_COMPONENT_SCORE = 0.2
+
+# Calibration points of the component curves.
+GROWTH_SCALE_PCT = 20.0
+BURN_MULTIPLE_BEST = 1.0
+BURN_MULTIPLE_WORST = 3.0
+RUNWAY_TARGET_MONTHS = 24.0
+MARGIN_FLOOR_PCT = 20.0
+MARGIN_TARGET_PCT = 80.0
+
+# Expected documents with their share of the completeness score, and the
+# size below which a document counts as a stub.
+DOCUMENT_WEIGHTS = {"pitch_deck": 60, "founder_checklist": 40}
+MIN_DOCUMENT_BYTES = 1024
+
+# Lower bound of each readiness tier, highest first.
+READINESS_TIERS = [(75, "Investment ready"), (55, "Promising"), (35, "Early"), (0, "Not ready")]
+
+_METRIC_COLUMNS = ["arr", "mrr", "growth_pct", "burn", "runway_months", "gross_margin_pct"]
+
+
+def metric_matrix(analyses: List[Dict[str, Any]], columns: List[str]) -> np.ndarray:
+    """
+    Build a companies-by-metrics matrix from analysis ``metrics`` dicts.
+
+    Args:
+        analyses: ``entity_analysis`` dicts, one per company
+        columns: Metric names to extract
+
+    Returns:
+        Float matrix with NaN for metrics a company did not report
+    """
+    matrix = np.full((len(analyses), len(columns)), np.nan)
+    for row, analysis in enumerate(analyses):
+        metrics = analysis.get("metrics") or {}
+        for col, name in enumerate(columns):
+            value = metrics.get(name)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                matrix[row, col] = value
+    return matrix
+
+
+def parse_weights(spec: str) -> Dict[str, float]:
+    """
+    Parse a ``name=weight,...`` override of the default weights.
+
+    Args:
+        spec: Comma-separated overrides, e.g. ``"growth=0.4,margin=0"``
+
+    Returns:
+        Complete weight dict with overrides applied
+    """
+    weights = dict(DEFAULT_WEIGHTS)
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, value = item.partition("=")
+        name = name.strip()
+        if name not in weights:
+            raise ValueError(f"Unknown score component: {name}")
+        weights[name] = float(value)
+    return weights
+
+
+def document_completeness(has_documents: Dict[str, bool], sizes: Optional[Dict[str, int]] = None) -> int:
+    """
+    Grade document completeness on a 0-100 scale.
+
+    Each expected document contributes its ``DOCUMENT_WEIGHTS`` share; a
+    document smaller than ``MIN_DOCUMENT_BYTES`` counts for half.
+
+    Args:
+        has_documents: Whether each expected document kind is present
+        sizes: Byte size of each present document kind
+
+    Returns:
+        Completeness score from 0 to 100
+    """
+    sizes = sizes or {}
+    score = 0.0
+    for kind, weight in DOCUMENT_WEIGHTS.items():
+        if has_documents.get(kind):
+            size = sizes.get(kind)
+            score += weight if size is None or size >= MIN_DOCUMENT_BYTES else weight / 2
+    return int(round(score))
+
+
+def readiness_tier(score: float) -> str:
+    """Return the readiness tier label for a 0-100 score."""
+    return next(label for floor, label in READINESS_TIERS if score >= floor)
+
+
+def _signal_counts(analysis: Dict[str, Any]) -> List[int]:
+    types = [entity.get("type") for entity in analysis.get("entities") or []]
+    return [types.count("founder"), types.count("investor"),
+            sum(t in ("market", "technology", "customer", "partner") for t in types)]
+
+
+class ReadinessScorer:
+    """
+    Scores investment readiness from stored analyses without model calls.
+
+    Each company is reduced to a feature row (document completeness,
+    reported metrics and entity counts); the component curves and the
+    weighted sum are evaluated with NumPy over the whole portfolio at once.
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None):
+        """
+        Initialize the scorer.
+
+        Args:
+            weights: Component weights (defaults to ``LVX_READINESS_WEIGHTS``
+                applied over ``DEFAULT_WEIGHTS``)
+        """
+        if weights is None:
+            weights = parse_weights(os.getenv("LVX_READINESS_WEIGHTS", ""))
+        unknown = set(weights) - set(DEFAULT_WEIGHTS)
+        if unknown:
+            raise ValueError(f"Unknown score components: {sorted(unknown)}")
+        self.components = list(DEFAULT_WEIGHTS)
+        vector = np.array([weights.get(name, 0.0) for name in self.components], dtype=float)
+        if vector.sum() <= 0 or (vector < 0).any():
+            raise ValueError("Score weights must be non-negative and not all zero")
+        self.weights = vector / vector.sum()
+
+    def component_scores(self, results: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Compute 0-1 component scores for a batch of results.
+
+        Burn multiple is burn divided by the ARR added at the reported growth
+        rate, taking burn and growth over the same period. ARR falls back to
+        12x MRR.
+
+        Args:
+            results: ``extract_company_data`` results
+
+        Returns:
+            Companies-by-components matrix with NaN for unreported metrics
+        """
+        analyses = [result.get("entity_analysis") or {} for result in results]
+        metrics = metric_matrix(analyses, _METRIC_COLUMNS)
+        arr, mrr, growth, burn, runway, margin = metrics.T
+        completeness = np.array([
+            ((result.get("raw_data") or {}).get("data_quality") or {}).get("completeness_score", 0)
+            for result in results
+        ], dtype=float)
+        signals = np.array([_signal_counts(analysis) for analysis in analyses], dtype=float).reshape(-1, 3)
+
+        # np.clip keeps NaN, so unreported metrics stay NaN through the curves
+        arr = np.where(np.isnan(arr), mrr * 12, arr)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            added = arr * np.clip(growth, 0, None) / 100
+            burn_multiple = np.where(added > 0, burn / added, np.inf)
+            burn_multiple = np.where(np.isnan(burn) | np.isnan(arr) | np.isnan(growth), np.nan, burn_multiple)
+
+            scores = np.column_stack([
+                np.clip(completeness / 100, 0, 1),
+                1 - np.exp(-np.clip(growth, 0, None) / GROWTH_SCALE_PCT),
+                np.clip((BURN_MULTIPLE_WORST - burn_multiple) / (BURN_MULTIPLE_WORST - BURN_MULTIPLE_BEST), 0, 1),
+                np.clip(runway / RUNWAY_TARGET_MONTHS, 0, 1),
+                np.clip((margin - MARGIN_FLOOR_PCT) / (MARGIN_TARGET_PCT - MARGIN_FLOOR_PCT), 0, 1),
+                0.5 * np.minimum(signals[:, 0], 2) / 2 + 0.3 * np.minimum(signals[:, 1], 1)
+                + 0.2 * np.minimum(signals[:, 2], 1),
+            ])
+        return scores
+
+    def score_results(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Score a batch of results.
+
+        Args:
+            results: ``extract_company_data`` results
+
+        Returns:
+            One dict per result with ``company_name``, ``readiness_score``
+            (0-100), ``tier``, per-component ``components`` (None when
+            unreported) and ``coverage`` (weight share backed by reported data)
+        """
+        if not results:
+            return []
+        scores = self.component_scores(results)
+        reported = ~np.isnan(scores)
+        totals = np.where(reported, scores, MISSING_COMPONENT_SCORE) @ self.weights * 100
+        coverage = reported @ self.weights
+
+        scored = []
+        for result, row, total, share in zip(results, scores, totals, coverage):
+            scored.append({
+                "company_name": result.get("company_name"),
+                "readiness_score": round(float(total), 1),
+                "tier": readiness_tier(total),
+                "components": {
+                    name: None if np.isnan(value) else round(float(value), 3)
+                    for name, value in zip(self.components, row)
+                },
+                "coverage": round(float(share), 3),
+            })
+        return scored
+
+    def rank_portfolio(self, result_store: ResultStore, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Score every stored analysis and rank companies best first.
+
+        Args:
+            result_store: Store holding ``extract_company_data`` results
+            limit: Maximum number of companies returned
+
+        Returns:
+            Scored companies sorted by ``readiness_score``
+        """
+        results = [
+            entry["result"] for entry in result_store.iter_entries()
+            if (entry.get("result") or {}).get("entity_analysis")
+        ]
+        ranked = sorted(self.score_results(results), key=lambda item: -item["readiness_score"])
+        return ranked[:limit] if limit else ranked
@@ -0,0 +1,468 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""BM25 full-text search over every company document in the portfolio"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+import argparse
+import threading
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Any, Optional
+
+import numpy as np
+
+from .blob_cache import BlobCache
+from .document_stream import iter_text_chunks
+from .result_store import DEFAULT_CACHE_DIR
+from .mirror import get_mirror_backend
+from .span_index import count_terms, tokenize
+from .storage_backend import ObjectInfo, StorageBackend
+
+logger = logging.getLogger(__name__)
+
+COMPANY_DATA_PREFIX = "Company Data/"
+
+# BM25 parameters.
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Characters of context on each side of a snippet match.
+SNIPPET_CONTEXT_CHARS = 80
+
+# Characters read per step when tokenizing a local file.
+LOCAL_READ_CHARS = 1024 * 1024
+
+# Content types indexed besides text/*.
+TEXT_CONTENT_TYPES = ("application/json", "application/xml", "application/csv")
+
+
+def _company_of(blob_name: str) -> Optional[str]:
+    parts = blob_name[len(COMPANY_DATA_PREFIX):].split("/", 1)
+    return parts[0] if len(parts) == 2 and parts[0] else None
+
+
+def _is_text(blob: Any) -> bool:
+    content_type = getattr(blob, "content_type", None)
+    return not content_type or content_type.startswith("text/") or content_type.startswith(TEXT_CONTENT_TYPES)
+
+
+class PortfolioSearchIndex:
+    """
+    BM25 index over all documents under ``Company Data/``.
+
+    ``update`` re-tokenizes only blobs whose generation changed and keeps
+    per-document term counts, then rebuilds the global postings as flat
+    NumPy arrays. Queries memory-map those arrays, so they read only the
+    postings of the query terms and never contact GCS.
+
+    ``update_company`` re-tokenizes one company after its analysis is
+    stored and marks the postings stale; they are rebuilt once by the next
+    ``update`` or query rather than after every company. The extraction
+    passes the listing and the term counts of the documents it already
+    read, so only the folder's other files are read again.
+
+    Documents are tokenized in chunks: from a local copy when there is one
+    (blob cache, local storage or bucket mirror), otherwise as a ranged
+    stream. Nothing is downloaded for the index itself.
+
+    Each build is written to its own directory and published by atomically
+    replacing the ``CURRENT`` pointer, so readers never see a partial index.
+    The previous build is kept until the next swap, so a reader that has
+    just read the old pointer can still open it.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        """
+        Initialize the search index.
+
+        Args:
+            cache_dir: Root directory for local caches; documents in the
+                blob cache under the same root supply snippets
+        """
+        self.cache_dir = cache_dir
+        self.root = os.path.join(cache_dir, "search_index")
+        self.terms_dir = os.path.join(self.root, "terms")
+        os.makedirs(self.terms_dir, exist_ok=True)
+        self._local_blobs = BlobCache(None, cache_dir)
+        # Backend of the last update; its local files (if any) also supply snippets
+        self._storage: Optional[StorageBackend] = None
+        self._loaded_build: Optional[str] = None
+        self._index: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self._update_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Building
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.root, "manifest.json")
+
+    def _stale_path(self) -> str:
+        return os.path.join(self.root, "STALE")
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        try:
+            with open(self._manifest_path(), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"documents": {}}
+
+    def _terms_path(self, name: str, generation: str) -> str:
+        digest = hashlib.sha256(name.encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.terms_dir, f"{digest}-{generation}.json")
+
+    def _local_path(self, name: str, generation: str) -> Optional[str]:
+        path = self._local_blobs.path_for(name, generation)
+        if os.path.exists(path):
+            return path
+        for backend in (self._storage, get_mirror_backend()):
+            path = backend.local_path(name, generation) if backend else None
+            if path:
+                return path
+        return None
+
+    def _iter_text(self, storage: StorageBackend, blob: ObjectInfo, generation: str) -> Iterator[str]:
+        path = self._local_path(blob.name, generation)
+        if path is None:
+            yield from iter_text_chunks(storage, blob)
+            return
+        with open(path, "r", encoding="utf-8", errors="replace", newline="") as f:
+            yield from iter(lambda: f.read(LOCAL_READ_CHARS), "")
+
+    def _index_blob(self, storage: StorageBackend, blob: ObjectInfo, generation: str,
+                    counts: Optional[Counter] = None) -> Dict[str, Any]:
+        if counts is None:
+            counts = count_terms(self._iter_text(storage, blob, generation))
+        document = {"length": sum(counts.values()), "tf": dict(counts)}
+        path = self._terms_path(blob.name, generation)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(document, f, separators=(",", ":"), ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return document
+
+    def update(self, storage: StorageBackend) -> Dict[str, Any]:
+        """
+        Bring the index up to date with the document storage.
+
+        Args:
+            storage: Backend holding ``Company Data/``
+
+        Returns:
+            Dict with counts of ``indexed``, ``unchanged`` and ``removed`` documents
+        """
+        with self._update_lock:
+            counts = self._sync(storage, COMPANY_DATA_PREFIX)
+            self._publish()
+        return counts
+
+    def update_company(self, storage: StorageBackend, company_name: str,
+                       blobs: Optional[Iterable[ObjectInfo]] = None,
+                       term_counts: Optional[Dict[str, Counter]] = None) -> Dict[str, Any]:
+        """
+        Re-tokenize one company's documents and mark the postings stale.
+
+        Args:
+            storage: Backend holding ``Company Data/``
+            company_name: Name of the company folder
+            blobs: The folder's listing, if the caller already has it
+            term_counts: Term counts by object name of documents the caller
+                already tokenized, for the generations in ``blobs``
+
+        Returns:
+            Dict with counts of ``indexed``, ``unchanged`` and ``removed`` documents
+        """
+        with self._update_lock:
+            return self._sync(storage, f"{COMPANY_DATA_PREFIX}{company_name}/", blobs, term_counts)
+
+    def publish(self) -> None:
+        """Rebuild the postings if documents changed since the last build."""
+        with self._update_lock:
+            self._publish()
+
+    def _sync(self, storage: StorageBackend, prefix: str, blobs: Optional[Iterable[ObjectInfo]] = None,
+              term_counts: Optional[Dict[str, Counter]] = None) -> Dict[str, Any]:
+        self._storage = storage
+        term_counts = term_counts or {}
+        manifest = self._load_manifest()
+        previous = manifest["documents"]
+        current = {name: known for name, known in previous.items() if not name.startswith(prefix)}
+        indexed = unchanged = 0
+
+        for blob in (storage.list(prefix=prefix) if blobs is None else blobs):
+            company_name = _company_of(blob.name)
+            if not company_name or blob.name.endswith("/") or not _is_text(blob):
+                continue
+            generation = str(blob.generation)
+            known = previous.get(blob.name)
+            if known and known["generation"] == generation and os.path.exists(
+                    self._terms_path(blob.name, generation)):
+                current[blob.name] = known
+                unchanged += 1
+                continue
+            try:
+                self._index_blob(storage, blob, generation, term_counts.get(blob.name))
+            except Exception as e:
+                logger.warning(f"Could not index {blob.name}: {e}")
+                continue
+            current[blob.name] = {"company_name": company_name, "generation": generation}
+            indexed += 1
+
+        removed = [name for name in previous if name not in current]
+        for name, old in previous.items():
+            if name not in current or current[name]["generation"] != old["generation"]:
+                try:
+                    os.remove(self._terms_path(name, old["generation"]))
+                except FileNotFoundError:
+                    pass
+
+        if indexed or removed:
+            # Marked before the manifest is replaced, so a crash in between still triggers a rebuild
+            with open(self._stale_path(), "w", encoding="utf-8"):
+                pass
+        manifest = {"documents": current, "updated_at": time.time()}
+        tmp_path = f"{self._manifest_path()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self._manifest_path())
+
+        logger.info(f"Search index ({prefix}): {indexed} indexed, {unchanged} unchanged, {len(removed)} removed")
+        return {"indexed": indexed, "unchanged": unchanged, "removed": len(removed)}
+
+    def _publish(self) -> None:
+        if os.path.exists(self._stale_path()) or not os.path.exists(os.path.join(self.root, "CURRENT")):
+            self._build(self._load_manifest()["documents"])
+            try:
+                os.remove(self._stale_path())
+            except FileNotFoundError:
+                pass
+
+    def _build(self, documents: Dict[str, Dict[str, Any]]) -> None:
+        names = sorted(documents)
+        postings: Dict[str, List[Any]] = {}
+        lengths = np.zeros(len(names), dtype=np.int32)
+        for doc_id, name in enumerate(names):
+            with open(self._terms_path(name, documents[name]["generation"]), "r", encoding="utf-8") as f:
+                document = json.load(f)
+            lengths[doc_id] = document["length"]
+            for term, tf in document["tf"].items():
+                postings.setdefault(term, []).append((doc_id, tf))
+
+        vocab = {}
+        doc_ids, tfs = [], []
+        offset = 0
+        for term in sorted(postings):
+            entries = postings[term]
+            vocab[term] = [offset, len(entries)]
+            doc_ids.extend(doc_id for doc_id, _ in entries)
+            tfs.extend(tf for _, tf in entries)
+            offset += len(entries)
+
+        build_id = f"build-{time.time_ns()}"
+        build_dir = os.path.join(self.root, build_id)
+        os.makedirs(build_dir)
+        np.save(os.path.join(build_dir, "doc_ids.npy"), np.asarray(doc_ids, dtype=np.int32))
+        np.save(os.path.join(build_dir, "tfs.npy"), np.asarray(tfs, dtype=np.int32))
+        np.save(os.path.join(build_dir, "lengths.npy"), lengths)
+        with open(os.path.join(build_dir, "vocab.json"), "w", encoding="utf-8") as f:
+            json.dump(vocab, f, separators=(",", ":"), ensure_ascii=False)
+        with open(os.path.join(build_dir, "documents.json"), "w", encoding="utf-8") as f:
+            json.dump([{"name": name, **documents[name]} for name in names], f)
+
+        pointer = os.path.join(self.root, "CURRENT")
+        try:
+            with open(pointer, "r", encoding="utf-8") as f:
+                previous_build = f.read().strip()
+        except FileNotFoundError:
+            previous_build = None
+        with open(f"{pointer}.tmp", "w", encoding="utf-8") as f:
+            f.write(build_id)
+        os.replace(f"{pointer}.tmp", pointer)
+
+        # Readers may have read the old pointer but not yet opened its files,
+        # so the previous build stays until the next swap
+        for entry in os.listdir(self.root):
+            if entry.startswith("build-") and entry not in (build_id, previous_build):
+                shutil.rmtree(os.path.join(self.root, entry), ignore_errors=True)
+
+    # ------------------------------------------------------------------
+    # Querying
+
+    def _load(self) -> Optional[Dict[str, Any]]:
+        if os.path.exists(self._stale_path()):
+            self.publish()
+        for attempt in range(2):
+            try:
+                with open(os.path.join(self.root, "CURRENT"), "r", encoding="utf-8") as f:
+                    build_id = f.read().strip()
+            except FileNotFoundError:
+                return None
+            try:
+                return self._open_build(build_id)
+            except FileNotFoundError:
+                # Another process swapped twice while we read the pointer
+                if attempt:
+                    raise
+        return None
+
+    def _open_build(self, build_id: str) -> Dict[str, Any]:
+        with self._lock:
+            if build_id == self._loaded_build:
+                return self._index
+            build_dir = os.path.join(self.root, build_id)
+            with open(os.path.join(build_dir, "vocab.json"), "r", encoding="utf-8") as f:
+                vocab = json.load(f)
+            with open(os.path.join(build_dir, "documents.json"), "r", encoding="utf-8") as f:
+                documents = json.load(f)
+            lengths = np.load(os.path.join(build_dir, "lengths.npy"))
+            self._index = {
+                "vocab": vocab,
+                "documents": documents,
+                "lengths": lengths,
+                "avg_length": float(lengths.mean()) if len(lengths) else 0.0,
+                "doc_ids": np.load(os.path.join(build_dir, "doc_ids.npy"), mmap_mode="r"),
+                "tfs": np.load(os.path.join(build_dir, "tfs.npy"), mmap_mode="r"),
+            }
+            self._loaded_build = build_id
+            return self._index
+
+    def _snippet(self, document: Dict[str, Any], terms: List[str]) -> Optional[str]:
+        path = self._local_path(document["name"], document["generation"])
+        if path is None:
+            return None
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            text = f.read()
+        wanted = set(terms)
+        for term, start, end in tokenize(text):
+            if term in wanted:
+                left = max(0, start - SNIPPET_CONTEXT_CHARS)
+                snippet = " ".join(text[left:end + SNIPPET_CONTEXT_CHARS].split())
+                return ("..." if left else "") + snippet + "..."
+        return None
+
+    def search(self, query: str, limit: int = 10, company_name: Optional[str] = None,
+               snippets: bool = True) -> List[Dict[str, Any]]:
+        """
+        Rank documents against a query with BM25.
+
+        Args:
+            query: Free-text query
+            limit: Maximum number of hits
+            company_name: Restrict results to one company
+            snippets: Add a text snippet when the document is cached locally
+
+        Returns:
+            Hits with ``company_name``, ``document``, ``generation`` and ``score``,
+            best first
+        """
+        index = self._load()
+        terms = list(dict.fromkeys(term for term, _, _ in tokenize(query)))
+        if index is None or not terms or not index["documents"]:
+            return []
+
+        lengths = index["lengths"]
+        doc_count = len(lengths)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / max(index["avg_length"], 1.0))
+        scores = np.zeros(doc_count, dtype=np.float64)
+        for term in terms:
+            entry = index["vocab"].get(term)
+            if not entry:
+                continue
+            offset, df = entry
+            doc_ids = np.asarray(index["doc_ids"][offset:offset + df])
+            tfs = np.asarray(index["tfs"][offset:offset + df], dtype=np.float64)
+            idf = np.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+            scores[doc_ids] += idf * tfs * (BM25_K1 + 1) / (tfs + norm[doc_ids])
+
+        if company_name is not None:
+            mask = np.array([d["company_name"] == company_name for d in index["documents"]])
+            scores[~mask] = 0.0
+
+        candidates = np.flatnonzero(scores)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        hits = []
+        for doc_id in ranked:
+            document = index["documents"][int(doc_id)]
+            hit = {
+                "company_name": document["company_name"],
+                "document": document["name"],
+                "generation": document["generation"],
+                "score": round(float(scores[doc_id]), 4),
+            }
+            if snippets:
+                snippet = self._snippet(document, terms)
+                if snippet:
+                    hit["snippet"] = snippet
+            hits.append(hit)
+        return hits
+
+    def search_companies(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Rank companies by their best-matching document.
+
+        Args:
+            query: Free-text query
+            limit: Maximum number of companies
+
+        Returns:
+            One hit per company, best first
+        """
+        best: Dict[str, Dict[str, Any]] = {}
+        for hit in self.search(query, limit=max(limit * 5, 50), snippets=False):
+            best.setdefault(hit["company_name"], hit)
+        return list(best.values())[:limit]
+
+
+_default_index: Optional[PortfolioSearchIndex] = None
+_default_index_lock = threading.Lock()
+
+
+def get_search_index() -> PortfolioSearchIndex:
+    """Return the shared portfolio search index under ``LVX_CACHE_DIR``."""
+    global _default_index
+    with _default_index_lock:
+        if _default_index is None:
+            _default_index = PortfolioSearchIndex()
+        return _default_index
+
+
+def main() -> None:
+    """Update the portfolio search index and optionally run a query."""
+    parser = argparse.ArgumentParser(description="Build and query the portfolio full-text search index.")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Local cache directory.")
+    parser.add_argument("--no-update", action="store_true", help="Query the existing index without syncing.")
+    parser.add_argument("--query", help="Query to run after the update.")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    index = PortfolioSearchIndex(args.cache_dir)
+    if not args.no_update:
+        from .agent import DataExtractionAgent
+
+        print(json.dumps(index.update(DataExtractionAgent().storage), indent=2))
+    if args.query:
+        print(json.dumps(index.search(args.query, limit=args.limit), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Positional inverted index over company documents for evidence spans"""
+
+import os
+import re
+import json
+import bisect
+import logging
+import threading
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Any, Optional, Tuple
+
+from .result_store import DEFAULT_CACHE_DIR, company_slug
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"\w+(?:[.'’]\w+)*")
+
+# Fraction of evidence terms that must fall in one window to count as a match.
+MIN_SPAN_SCORE = 0.6
+
+# Evidence terms considered per lookup; long quotes are matched on their start.
+MAX_EVIDENCE_TERMS = 32
+
+
+def tokenize(text: str) -> Iterator[Tuple[str, int, int]]:
+    """Yield ``(term, start, end)`` for each word in a text, terms lowercased."""
+    for m in TOKEN_RE.finditer(text):
+        yield m.group(0).lower(), m.start(), m.end()
+
+
+class TermCounter:
+    """Counts the terms of a text fed in chunks, without splitting words at chunk boundaries."""
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+        self._carry = ""
+
+    def feed(self, chunk: str) -> None:
+        """Count the next chunk; a trailing partial word waits for the following one."""
+        text = self._carry + chunk
+        if not text or text[-1].isspace():
+            cut = len(text)
+        else:
+            cut = len(text) - len(text.rsplit(None, 1)[-1])
+        self._carry = text[cut:]
+        self.counts.update(term for term, _, _ in tokenize(text[:cut]))
+
+    def close(self) -> Counter:
+        """Count the trailing word and return the totals."""
+        carry, self._carry = self._carry, ""
+        self.counts.update(term for term, _, _ in tokenize(carry))
+        return self.counts
+
+
+def count_terms(chunks: Iterable[str]) -> Counter:
+    """Count the terms of a text given as consecutive chunks."""
+    counter = TermCounter()
+    for chunk in chunks:
+        counter.feed(chunk)
+    return counter.close()
+
+
+class _CompanyShard:
+    """Loaded index of one company's documents."""
+
+    def __init__(self, data: Dict[str, Any]):
+        self.company_name = data["company_name"]
+        self.documents = data["documents"]
+        vocab = data["vocab"]
+        self.terms: List[List[str]] = []
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        for doc_idx, document in enumerate(self.documents):
+            doc_terms = [vocab[term_id] for term_id in document["terms"]]
+            self.terms.append(doc_terms)
+            for position, term in enumerate(doc_terms):
+                self.postings.setdefault(term, []).append((doc_idx, position))
+
+    def span(self, doc_idx: int, first: int, last: int) -> Dict[str, Any]:
+        document = self.documents[doc_idx]
+        return {
+            "document": document["name"],
+            "generation": document["generation"],
+            "start": document["starts"][first],
+            "end": document["ends"][last],
+        }
+
+
+class SpanIndex:
+    """
+    Positional inverted index (term to document and token postings, with
+    character offsets) over every analyzed company's documents.
+
+    The index is partitioned by company: re-analyzing a company rewrites only
+    its shard under ``{cache_dir}/span_index/``. Evidence strings from the
+    model are resolved to exact character spans by index lookups. Keyword
+    search across the portfolio is served by ``PortfolioSearchIndex``.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        """
+        Initialize the span index.
+
+        Args:
+            cache_dir: Root directory for local caches
+        """
+        self.root = os.path.join(cache_dir, "span_index")
+        os.makedirs(self.root, exist_ok=True)
+        self._shards: Dict[str, Tuple[float, _CompanyShard]] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, company_name: str) -> str:
+        return os.path.join(self.root, f"{company_slug(company_name)}.json")
+
+    def index_company(self, company_name: str, documents: List[Dict[str, Any]]) -> None:
+        """
+        Index (or re-index) a company's documents.
+
+        Args:
+            company_name: Name of the company
+            documents: Dicts with ``name``, ``generation`` and ``text``; when
+                ``text`` holds excerpts of the document, ``segments`` lists
+                ``(offset in text, offset in the document)`` where each
+                excerpt starts, so spans point into the document itself
+        """
+        vocab: Dict[str, int] = {}
+        entries = []
+        for document in documents:
+            segments = document.get("segments") or [(0, 0)]
+            segment_starts = [text_start for text_start, _ in segments]
+            terms, starts, ends = [], [], []
+            for term, start, end in tokenize(document["text"]):
+                text_start, source_start = segments[bisect.bisect_right(segment_starts, start) - 1]
+                shift = source_start - text_start
+                terms.append(vocab.setdefault(term, len(vocab)))
+                starts.append(start + shift)
+                ends.append(end + shift)
+            entries.append({
+                "name": document["name"],
+                "generation": document.get("generation"),
+                "length": len(document["text"]),
+                "terms": terms,
+                "starts": starts,
+                "ends": ends,
+            })
+
+        data = {"company_name": company_name, "vocab": list(vocab), "documents": entries}
+        path = self._path(company_name)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"), ensure_ascii=False)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._shards[company_slug(company_name)] = (os.path.getmtime(path), _CompanyShard(data))
+
+    def _shard(self, company_name: str) -> Optional[_CompanyShard]:
+        path = self._path(company_name)
+        try:
+            mtime = os.path.getmtime(path)
+        except FileNotFoundError:
+            return None
+        slug = company_slug(company_name)
+        with self._lock:
+            cached = self._shards.get(slug)
+            if cached and cached[0] == mtime:
+                return cached[1]
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                shard = _CompanyShard(json.load(f))
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Skipping unreadable span index for {company_name}: {e}")
+            return None
+        with self._lock:
+            self._shards[slug] = (mtime, shard)
+        return shard
+
+    def find_span(self, company_name: str, evidence: str) -> Optional[Dict[str, Any]]:
+        """
+        Resolve an evidence string to the best matching span in a company's documents.
+
+        Candidate windows are anchored on the evidence term with the fewest
+        postings, so a lookup touches only a handful of positions. Paraphrased
+        evidence still matches when most of its terms occur close together.
+
+        Args:
+            company_name: Name of the company
+            evidence: Quote or paraphrase produced by the model
+
+        Returns:
+            Dict with ``document``, ``generation``, ``start``, ``end`` and
+            ``score``, or None when nothing matches well enough
+        """
+        shard = self._shard(company_name)
+        terms = [term for term, _, _ in tokenize(evidence or "")][:MAX_EVIDENCE_TERMS]
+        if shard is None or not terms:
+            return None
+
+        known = [(len(shard.postings[t]), i, t) for i, t in enumerate(terms) if t in shard.postings]
+        if not known:
+            return None
+        _, anchor_index, anchor_term = min(known)
+
+        wanted = set(terms)
+        slack = max(2, len(terms) // 4)
+        best = None
+        for doc_idx, position in shard.postings[anchor_term]:
+            doc_terms = shard.terms[doc_idx]
+            window_start = max(0, position - anchor_index - slack)
+            window_end = min(len(doc_terms), position - anchor_index + len(terms) + slack)
+            matched_positions = [p for p in range(window_start, window_end) if doc_terms[p] in wanted]
+            matched_terms = {doc_terms[p] for p in matched_positions}
+            score = len(matched_terms) / len(wanted)
+            if best is None or score > best[0]:
+                best = (score, doc_idx, matched_positions[0], matched_positions[-1])
+                if score == 1.0:
+                    break
+
+        if best is None or best[0] < MIN_SPAN_SCORE:
+            return None
+        score, doc_idx, first, last = best
+        return {**shard.span(doc_idx, first, last), "score": round(score, 3)}
+
+    def invalidate(self, company_name: str) -> None:
+        """Remove a company's shard."""
+        with self._lock:
+            self._shards.pop(company_slug(company_name), None)
+            try:
+                os.remove(self._path(company_name))
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,467 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Storage backends for company documents: GCS, local filesystem and in-memory"""
+
+import os
+import json
+import mmap
+import base64
+import hashlib
+import shutil
+import logging
+import mimetypes
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Any, Optional, Union
+
+from google.cloud import storage
+from google.api_core.exceptions import NotFound
+
+from .adaptive_limiter import GCS, AdaptiveLimiter, get_limiter
+
+logger = logging.getLogger(__name__)
+
+# Storage location of the company documents: gs://bucket, a local directory
+# (or file:// URI) mirroring the bucket layout, or memory:// for tests.
+STORAGE_URI = os.getenv("LVX_STORAGE_URI")
+
+# Bytes per chunk yielded by ``StorageBackend.stream``.
+DEFAULT_STREAM_CHUNK_BYTES = 1024 * 1024
+
+# Manifest written at the root of a bucket mirror, mapping each mirrored
+# file to the source object generation it holds.
+MIRROR_MANIFEST_NAME = ".lvx_mirror.json"
+
+
+class ObjectChanged(Exception):
+    """Raised when a pinned generation of an object is no longer readable."""
+
+
+class ObjectInfo:
+    """
+    Metadata of a stored object.
+
+    Attribute names follow ``google.cloud.storage.Blob`` so listings from any
+    backend can be fingerprinted and referenced the same way.
+    """
+
+    __slots__ = ("name", "generation", "size", "updated", "md5_hash", "content_type")
+
+    def __init__(self, name: str, generation: Optional[str], size: Optional[int],
+                 updated: Optional[datetime] = None, md5_hash: Optional[str] = None,
+                 content_type: Optional[str] = None):
+        self.name = name
+        self.generation = generation
+        self.size = size
+        self.updated = updated
+        self.md5_hash = md5_hash
+        self.content_type = content_type
+
+    def __repr__(self) -> str:
+        return f"ObjectInfo({self.name!r}, generation={self.generation!r}, size={self.size!r})"
+
+
+class StorageBackend:
+    """
+    Read-only object storage interface used by the extraction pipeline.
+
+    Objects are addressed by bucket-style names (``Company Data/{company}/{file}``)
+    and versioned by an opaque ``generation`` string; reads pinned to a
+    generation raise ``ObjectChanged`` rather than mixing two versions.
+    """
+
+    scheme = ""
+
+    def uri(self, name: str) -> str:
+        """Return a URI identifying an object."""
+        raise NotImplementedError
+
+    def list(self, prefix: str = "") -> Iterator[ObjectInfo]:
+        """Yield the objects under a prefix in name order."""
+        raise NotImplementedError
+
+    def list_folders(self, prefix: str) -> List[str]:
+        """
+        Return the names of the folders directly under a prefix.
+
+        Args:
+            prefix: Folder prefix ending in ``/``, e.g. ``Company Data/``
+
+        Returns:
+            Sorted folder names without the prefix or trailing slash
+        """
+        return sorted({info.name[len(prefix):].split("/", 1)[0] for info in self.list(prefix)
+                       if "/" in info.name[len(prefix):]} - {""})
+
+    def stat(self, name: str) -> Optional[ObjectInfo]:
+        """Return an object's metadata, or None if it does not exist."""
+        raise NotImplementedError
+
+    def read(self, name: str, start: int = 0, end: Optional[int] = None,
+             generation: Optional[str] = None) -> bytes:
+        """
+        Read a byte range of an object.
+
+        Args:
+            name: Object name
+            start: First byte offset
+            end: Offset one past the last byte, or None for the end of the object
+            generation: Generation the read is pinned to
+
+        Returns:
+            The bytes in ``[start, end)``, shorter at the end of the object
+        """
+        raise NotImplementedError
+
+    def read_text(self, name: str, generation: Optional[str] = None) -> str:
+        """Read a whole object decoded as UTF-8."""
+        return self.read(name, generation=generation).decode("utf-8", errors="replace")
+
+    def stream(self, name: str, chunk_bytes: int = DEFAULT_STREAM_CHUNK_BYTES,
+               generation: Optional[str] = None) -> Iterator[bytes]:
+        """Yield an object's bytes in chunks of at most ``chunk_bytes``."""
+        start = 0
+        while True:
+            data = self.read(name, start, start + chunk_bytes, generation=generation)
+            if not data:
+                return
+            yield data
+            if len(data) < chunk_bytes:
+                return
+            start += len(data)
+
+    def download_to_filename(self, name: str, path: str, generation: Optional[str] = None) -> None:
+        """Copy an object to a local file."""
+        with open(path, "wb") as f:
+            for chunk in self.stream(name, generation=generation):
+                f.write(chunk)
+
+    def local_path(self, name: str, generation: Optional[str] = None) -> Optional[str]:
+        """Return a local file holding the object version, if the backend has one."""
+        return None
+
+
+class GcsBackend(StorageBackend):
+    """Objects in a Google Cloud Storage bucket."""
+
+    scheme = "gs"
+
+    def __init__(self, bucket_name: str, client: Optional[storage.Client] = None,
+                 limiter: Optional[AdaptiveLimiter] = None):
+        """
+        Initialize the GCS backend.
+
+        Args:
+            bucket_name: Google Cloud Storage bucket name
+            client: Storage client to use (a new one is created if omitted)
+            limiter: Adaptive limit on concurrent downloads; defaults to the
+                process-wide GCS limiter shared by every bucket
+        """
+        self.bucket_name = bucket_name
+        self.client = client or storage.Client()
+        self.bucket = self.client.bucket(bucket_name)
+        self.limiter = limiter or get_limiter(GCS)
+
+    @staticmethod
+    def _info(blob: Any) -> ObjectInfo:
+        return ObjectInfo(
+            blob.name,
+            str(blob.generation) if blob.generation is not None else None,
+            blob.size,
+            blob.updated,
+            blob.md5_hash,
+            blob.content_type,
+        )
+
+    def _blob(self, name: str, generation: Optional[str]) -> Any:
+        return self.bucket.blob(name, generation=int(generation) if generation else None)
+
+    def uri(self, name: str) -> str:
+        return f"gs://{self.bucket_name}/{name}"
+
+    def list(self, prefix: str = "") -> Iterator[ObjectInfo]:
+        for blob in self.bucket.list_blobs(prefix=prefix):
+            yield self._info(blob)
+
+    def list_folders(self, prefix: str) -> List[str]:
+        # A delimiter listing returns the folder prefixes without their objects
+        iterator = self.bucket.list_blobs(prefix=prefix, delimiter="/")
+        for _ in iterator:
+            pass
+        return sorted(folder[len(prefix):].rstrip("/") for folder in iterator.prefixes
+                      if folder[len(prefix):].rstrip("/"))
+
+    def stat(self, name: str) -> Optional[ObjectInfo]:
+        with self.limiter.slot():
+            blob = self.bucket.get_blob(name)
+        return self._info(blob) if blob is not None else None
+
+    def read(self, name: str, start: int = 0, end: Optional[int] = None,
+             generation: Optional[str] = None) -> bytes:
+        if end is not None and end <= start:
+            return b""
+        try:
+            # GCS ranges are inclusive; reading a pinned generation never splices versions
+            with self.limiter.slot() as call:
+                data = self._blob(name, generation).download_as_bytes(
+                    start=start, end=end - 1 if end is not None else None)
+                # Large reads take longer without the bucket being any busier
+                call.units = 1 + len(data) / DEFAULT_STREAM_CHUNK_BYTES
+                return data
+        except NotFound as e:
+            if generation:
+                raise ObjectChanged(f"{name}#{generation} is no longer available") from e
+            raise
+
+    def download_to_filename(self, name: str, path: str, generation: Optional[str] = None) -> None:
+        with self.limiter.slot() as call:
+            self._blob(name, generation).download_to_filename(path)
+            call.units = 1 + os.path.getsize(path) / DEFAULT_STREAM_CHUNK_BYTES
+
+
+class LocalBackend(StorageBackend):
+    """
+    Objects in a local directory laid out like the bucket (``{root}/Company Data/...``).
+
+    Files written by the bucket mirror keep the source object's generation
+    and MD5 (from ``MIRROR_MANIFEST_NAME``), so fingerprints and stored
+    results carry over between GCS and the mirror. Any other file, or a
+    mirrored file modified since, is versioned by its modification time in
+    nanoseconds. Reads go through ``mmap`` so ranged and streamed reads cost
+    no extra copies beyond the returned bytes.
+    """
+
+    scheme = "file"
+
+    def __init__(self, root: str):
+        """
+        Initialize the local backend.
+
+        Args:
+            root: Directory mirroring the bucket
+        """
+        self.root = os.path.abspath(root)
+        self._manifest: Dict[str, Dict[str, Any]] = {}
+        self._manifest_mtime: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _mirrored(self) -> Dict[str, Dict[str, Any]]:
+        path = os.path.join(self.root, MIRROR_MANIFEST_NAME)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return {}
+        with self._lock:
+            if mtime != self._manifest_mtime:
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        self._manifest = json.load(f).get("objects", {})
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Ignoring unreadable mirror manifest {path}: {e}")
+                    self._manifest = {}
+                self._manifest_mtime = mtime
+            return self._manifest
+
+    def _generation(self, name: str, stat: os.stat_result) -> str:
+        entry = self._mirrored().get(name)
+        if entry and entry.get("mtime_ns") == stat.st_mtime_ns:
+            return str(entry["generation"])
+        return str(stat.st_mtime_ns)
+
+    def file_path(self, name: str) -> str:
+        """Return the local file path of an object name."""
+        path = os.path.normpath(os.path.join(self.root, *name.split("/")))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"Object name escapes the storage root: {name}")
+        return path
+
+    def _info(self, name: str, stat: os.stat_result) -> ObjectInfo:
+        entry = self._mirrored().get(name)
+        mirrored = entry is not None and entry.get("mtime_ns") == stat.st_mtime_ns
+        return ObjectInfo(
+            name,
+            str(entry["generation"]) if mirrored else str(stat.st_mtime_ns),
+            stat.st_size,
+            datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
+            entry.get("md5_hash") if mirrored else None,
+            (entry.get("content_type") if mirrored else None) or mimetypes.guess_type(name)[0],
+        )
+
+    def _check_generation(self, name: str, stat: os.stat_result, generation: Optional[str]) -> None:
+        if generation and self._generation(name, stat) != str(generation):
+            raise ObjectChanged(f"{name}#{generation} is no longer available")
+
+    def uri(self, name: str) -> str:
+        return f"file://{self.file_path(name)}"
+
+    def list(self, prefix: str = "") -> Iterator[ObjectInfo]:
+        # Walk only the deepest directory the prefix pins down
+        directory = prefix.rsplit("/", 1)[0] if "/" in prefix else ""
+        top = self.file_path(directory) if directory else self.root
+        names = []
+        for dirpath, _, filenames in os.walk(top):
+            relative = os.path.relpath(dirpath, self.root)
+            for filename in filenames:
+                name = filename if relative == "." else f"{relative.replace(os.sep, '/')}/{filename}"
+                if name.startswith(prefix) and not filename.endswith(".tmp") and name != MIRROR_MANIFEST_NAME:
+                    names.append(name)
+        for name in sorted(names):
+            try:
+                yield self._info(name, os.stat(self.file_path(name)))
+            except FileNotFoundError:
+                continue
+
+    def stat(self, name: str) -> Optional[ObjectInfo]:
+        try:
+            return self._info(name, os.stat(self.file_path(name)))
+        except FileNotFoundError:
+            return None
+
+    def list_folders(self, prefix: str) -> List[str]:
+        try:
+            with os.scandir(self.file_path(prefix.rstrip("/"))) as entries:
+                return sorted(entry.name for entry in entries if entry.is_dir())
+        except (FileNotFoundError, NotADirectoryError):
+            return []
+
+    def read(self, name: str, start: int = 0, end: Optional[int] = None,
+             generation: Optional[str] = None) -> bytes:
+        with open(self.file_path(name), "rb") as f:
+            stat = os.fstat(f.fileno())
+            self._check_generation(name, stat, generation)
+            end = stat.st_size if end is None else min(end, stat.st_size)
+            if end <= start:
+                return b""
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return mapped[start:end]
+
+    def stream(self, name: str, chunk_bytes: int = DEFAULT_STREAM_CHUNK_BYTES,
+               generation: Optional[str] = None) -> Iterator[bytes]:
+        with open(self.file_path(name), "rb") as f:
+            stat = os.fstat(f.fileno())
+            self._check_generation(name, stat, generation)
+            if not stat.st_size:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for start in range(0, stat.st_size, chunk_bytes):
+                    yield mapped[start:start + chunk_bytes]
+
+    def download_to_filename(self, name: str, path: str, generation: Optional[str] = None) -> None:
+        source = self.local_path(name, generation)
+        if source is None:
+            raise ObjectChanged(f"{name}#{generation} is no longer available")
+        shutil.copyfile(source, path)
+
+    def local_path(self, name: str, generation: Optional[str] = None) -> Optional[str]:
+        path = self.file_path(name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        if generation and self._generation(name, stat) != str(generation):
+            return None
+        return path
+
+
+class MemoryBackend(StorageBackend):
+    """
+    Objects held in process memory, for offline tests and benchmarks.
+
+    Every ``put`` bumps the object's generation, as an upload does in GCS.
+    """
+
+    scheme = "memory"
+
+    def __init__(self, objects: Optional[Dict[str, Union[str, bytes]]] = None):
+        """
+        Initialize the in-memory backend.
+
+        Args:
+            objects: Initial object contents by name
+        """
+        self._objects: Dict[str, Any] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        for name, data in (objects or {}).items():
+            self.put(name, data)
+
+    def put(self, name: str, data: Union[str, bytes], content_type: Optional[str] = None) -> ObjectInfo:
+        """Store an object, replacing any previous version."""
+        payload = data.encode("utf-8") if isinstance(data, str) else bytes(data)
+        md5_hash = base64.b64encode(hashlib.md5(payload).digest()).decode("ascii")
+        with self._lock:
+            self._generation += 1
+            info = ObjectInfo(name, str(self._generation), len(payload), datetime.now(timezone.utc),
+                              md5_hash, content_type or mimetypes.guess_type(name)[0])
+            self._objects[name] = (info, payload)
+        return info
+
+    def delete(self, name: str) -> None:
+        """Remove an object."""
+        with self._lock:
+            self._objects.pop(name, None)
+
+    def uri(self, name: str) -> str:
+        return f"memory://{name}"
+
+    def list(self, prefix: str = "") -> Iterator[ObjectInfo]:
+        with self._lock:
+            infos = [info for name, (info, _) in self._objects.items() if name.startswith(prefix)]
+        return iter(sorted(infos, key=lambda info: info.name))
+
+    def stat(self, name: str) -> Optional[ObjectInfo]:
+        with self._lock:
+            entry = self._objects.get(name)
+        return entry[0] if entry else None
+
+    def read(self, name: str, start: int = 0, end: Optional[int] = None,
+             generation: Optional[str] = None) -> bytes:
+        with self._lock:
+            entry = self._objects.get(name)
+        if entry is None:
+            if generation:
+                raise ObjectChanged(f"{name}#{generation} is no longer available")
+            raise FileNotFoundError(f"No such object: {name}")
+        info, payload = entry
+        if generation and info.generation != str(generation):
+            raise ObjectChanged(f"{name}#{generation} is no longer available")
+        return payload[start:end]
+
+
+def open_storage(uri: Optional[str] = None, bucket_name: str = "lxvquantumleapai") -> StorageBackend:
+    """
+    Open the storage backend for a location.
+
+    Args:
+        uri: ``gs://bucket``, ``memory://``, ``file:///path`` or a local
+            directory; defaults to ``LVX_STORAGE_URI``, then the GCS bucket
+        bucket_name: Bucket used when no URI is configured
+
+    Returns:
+        Storage backend for the location
+    """
+    uri = uri or STORAGE_URI
+    if not uri:
+        return GcsBackend(bucket_name)
+    if uri.startswith("gs://"):
+        return GcsBackend(uri[len("gs://"):].strip("/"))
+    if uri.startswith("memory://"):
+        return MemoryBackend()
+    if uri.startswith("file://"):
+        uri = uri[len("file://"):]
+    if not os.path.isdir(uri):
+        raise ValueError(f"Local storage root does not exist: {uri}")
+    logger.info(f"Reading company documents from local directory {uri}")
+    return LocalBackend(uri)
@@ -0,0 +1,138 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Incremental parsing of streamed analysis responses"""
+
+import json
+import logging
+from typing import Iterable, List, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Marker emitted by the scanner when a watched array is closed.
+ARRAY_END = "__array_end__"
+
+# Progress stage names emitted by DataExtractionAgent.iter_company_data.
+STAGE_STARTED = "started"
+STAGE_DOCUMENTS_FETCHED = "documents_fetched"
+STAGE_ENTITY = "entity"
+STAGE_ENTITIES_EXTRACTED = "entities_extracted"
+STAGE_RELATIONSHIP = "relationship"
+STAGE_INSIGHT = "insight"
+STAGE_RISK = "risk"
+STAGE_ANALYSIS_COMPLETED = "analysis_completed"
+STAGE_COMPLETED = "completed"
+STAGE_ERROR = "error"
+
+# Top-level response arrays and the stage each item is reported as.
+STREAMED_ARRAYS = {
+    "entities": STAGE_ENTITY,
+    "relationships": STAGE_RELATIONSHIP,
+    "insights": STAGE_INSIGHT,
+    "risks_and_opportunities": STAGE_RISK,
+}
+
+
+class IncrementalArrayScanner:
+    """
+    Extracts completed items of selected top-level JSON arrays from a
+    response that arrives in chunks.
+
+    The scanner tracks string and nesting state across ``feed`` calls, so
+    each chunk is scanned once. Items are decoded as soon as their closing
+    brace or quote arrives, long before the whole document is valid JSON.
+    """
+
+    def __init__(self, keys: Iterable[str]):
+        """
+        Initialize the scanner.
+
+        Args:
+            keys: Top-level keys whose array items should be emitted
+        """
+        self.keys = set(keys)
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_key: Optional[str] = None
+        self._array_key: Optional[str] = None
+        self._item_start: Optional[int] = None
+
+    @property
+    def text(self) -> str:
+        """All text received so far."""
+        return self._buffer
+
+    def _decode(self, fragment: str) -> Any:
+        try:
+            return json.loads(fragment)
+        except ValueError:
+            logger.debug(f"Skipping undecodable streamed item: {fragment[:80]}")
+            return None
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """
+        Consume a chunk of response text.
+
+        Args:
+            chunk: Next piece of the streamed response
+
+        Returns:
+            List of ``(key, item)`` pairs completed by this chunk, plus
+            ``(ARRAY_END, key)`` when a watched array closes
+        """
+        self._buffer += chunk
+        buffer = self._buffer
+        completed = []
+
+        for i in range(self._pos, len(buffer)):
+            c = buffer[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_key = self._decode(buffer[self._string_start:i + 1])
+                    elif self._depth == 2 and self._array_key and self._item_start is None:
+                        item = self._decode(buffer[self._string_start:i + 1])
+                        if item is not None:
+                            completed.append((self._array_key, item))
+            elif c == '"':
+                self._in_string = True
+                self._string_start = i
+            elif c in "{[":
+                self._depth += 1
+                if self._depth == 2 and c == "[" and self._last_key in self.keys:
+                    self._array_key = self._last_key
+                elif self._depth == 3 and self._array_key and c == "{":
+                    self._item_start = i
+            elif c in "}]":
+                if self._depth == 3 and self._item_start is not None and c == "}":
+                    item = self._decode(buffer[self._item_start:i + 1])
+                    if item is not None:
+                        completed.append((self._array_key, item))
+                    self._item_start = None
+                self._depth -= 1
+                if self._depth == 1 and self._array_key:
+                    completed.append((ARRAY_END, self._array_key))
+                    self._array_key = None
+
+        self._pos = len(buffer)
+        return completed
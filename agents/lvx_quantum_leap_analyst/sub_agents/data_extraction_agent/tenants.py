@@ -0,0 +1,221 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Registry of data buckets (tenants) served by one worker process"""
+
+import os
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Any, Optional
+
+from google.cloud import storage
+
+from .analysis_history import AnalysisHistory
+from .blob_cache import BlobCache
+from .mirror import get_mirror_backend
+from .result_store import DEFAULT_CACHE_DIR, ResultStore, company_slug
+from .search_index import PortfolioSearchIndex
+from .span_index import SpanIndex
+from .storage_backend import GcsBackend, StorageBackend, open_storage
+
+logger = logging.getLogger(__name__)
+
+# Tenant used when a request does not name one.
+DEFAULT_TENANT = "default"
+
+# Session state key naming the tenant a session belongs to.
+TENANT_STATE_KEY = "lvx_tenant"
+
+# JSON file describing the tenants, e.g.
+# {"fund-a": {"bucket": "fund-a-data", "project": "fund-a", "location": "asia-south1", "max_concurrency": 4}}
+TENANTS_CONFIG = os.getenv("LVX_TENANTS_CONFIG")
+
+# Concurrent analyses allowed per tenant unless configured otherwise.
+DEFAULT_TENANT_CONCURRENCY = int(os.getenv("LVX_TENANT_CONCURRENCY", "4"))
+
+
+class Tenant:
+    """
+    One data bucket with its own storage client, Google Cloud project,
+    cache namespace and concurrency limit.
+
+    Stores, indexes and the extraction agent are created on first use and
+    then reused by every request for the tenant.
+    """
+
+    def __init__(self, name: str, storage_backend: StorageBackend, cache_dir: str,
+                 max_concurrency: int = DEFAULT_TENANT_CONCURRENCY,
+                 project: Optional[str] = None, location: Optional[str] = None):
+        """
+        Initialize the tenant.
+
+        Args:
+            name: Tenant name
+            storage_backend: Backend holding the tenant's ``Company Data/``
+            cache_dir: Root of the tenant's local caches
+            max_concurrency: Analyses allowed to run at once for this tenant
+            project: Google Cloud project for the tenant's Gemini calls and
+                context caches; GOOGLE_CLOUD_PROJECT if omitted
+            location: Vertex AI location; GOOGLE_CLOUD_LOCATION if omitted
+        """
+        self.name = name
+        self.storage = storage_backend
+        self.cache_dir = cache_dir
+        self.project = project
+        self.location = location
+        self.max_concurrency = max(1, max_concurrency)
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._agent = None
+        self._search_index = PortfolioSearchIndex(cache_dir)
+        self._lock = threading.Lock()
+
+    @property
+    def agent(self) -> Any:
+        """The tenant's ``DataExtractionAgent``."""
+        with self._lock:
+            if self._agent is None:
+                from .agent import DataExtractionAgent
+
+                self._agent = DataExtractionAgent(
+                    project_id=self.project,
+                    location=self.location,
+                    storage=self.storage,
+                    result_store=ResultStore(self.cache_dir),
+                    blob_cache=BlobCache(self.storage, self.cache_dir, mirror=get_mirror_backend()),
+                    span_index=SpanIndex(self.cache_dir),
+                    search_index=self._search_index,
+                    history=AnalysisHistory(self.cache_dir),
+                    cache_dir=self.cache_dir,
+                )
+            return self._agent
+
+    @property
+    def search_index(self) -> PortfolioSearchIndex:
+        """The tenant's portfolio search index, shared with its agent."""
+        return self._search_index
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Hold one of the tenant's analysis slots, waiting for a free one."""
+        with self._slots:
+            yield
+
+
+class TenantRegistry:
+    """
+    Tenants known to this process, keyed by name.
+
+    GCS clients are pooled per project, so tenants in the same project share
+    one client (and its connection pool) instead of creating one per request.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Dict[str, Any]]] = None,
+                 cache_dir: str = DEFAULT_CACHE_DIR):
+        """
+        Initialize the registry.
+
+        Args:
+            config: Tenant settings by name (``bucket`` or ``storage_uri``,
+                optional ``project``, ``location`` and ``max_concurrency``); the default
+                tenant is added from the environment if not configured
+            cache_dir: Root directory for local caches
+        """
+        self.cache_dir = cache_dir
+        self._config = dict(config or {})
+        self._tenants: Dict[str, Tenant] = {}
+        self._clients: Dict[Optional[str], storage.Client] = {}
+        self._lock = threading.Lock()
+
+    def _client(self, project: Optional[str]) -> storage.Client:
+        if project not in self._clients:
+            self._clients[project] = storage.Client(project=project)
+        return self._clients[project]
+
+    def _cache_dir(self, name: str) -> str:
+        # The default tenant keeps the top-level cache so existing caches stay valid
+        if name == DEFAULT_TENANT:
+            return self.cache_dir
+        return os.path.join(self.cache_dir, "tenants", company_slug(name))
+
+    def _create(self, name: str) -> Tenant:
+        settings = self._config.get(name)
+        if settings is None:
+            if name != DEFAULT_TENANT:
+                raise KeyError(f"Unknown tenant: {name}")
+            # Unconfigured default tenant: the environment's data bucket (or LVX_STORAGE_URI)
+            settings = {}
+            storage_backend = open_storage(
+                bucket_name=os.getenv("GOOGLE_CLOUD_STORAGE_BUCKET_DATA", "lxvquantumleapai"))
+        elif settings.get("storage_uri"):
+            storage_backend = open_storage(settings["storage_uri"])
+        else:
+            storage_backend = GcsBackend(settings["bucket"], client=self._client(settings.get("project")))
+
+        logger.info(f"Registered tenant {name} on {storage_backend.uri('Company Data/')}")
+        return Tenant(name, storage_backend, self._cache_dir(name),
+                      settings.get("max_concurrency", DEFAULT_TENANT_CONCURRENCY),
+                      project=settings.get("project"), location=settings.get("location"))
+
+    def register(self, name: str, **settings: Any) -> Tenant:
+        """
+        Add or replace a tenant.
+
+        Args:
+            name: Tenant name
+            **settings: ``bucket`` or ``storage_uri``, optional ``project``, ``location``
+                and ``max_concurrency``
+
+        Returns:
+            The new tenant
+        """
+        with self._lock:
+            self._config[name] = settings
+            self._tenants.pop(name, None)
+            tenant = self._tenants[name] = self._create(name)
+            return tenant
+
+    def get(self, name: Optional[str] = None) -> Tenant:
+        """Return a tenant by name (the default tenant if omitted), creating it on first use."""
+        name = name or DEFAULT_TENANT
+        with self._lock:
+            if name not in self._tenants:
+                self._tenants[name] = self._create(name)
+            return self._tenants[name]
+
+    def names(self) -> List[str]:
+        """Return the configured tenant names."""
+        return sorted(set(self._config) | {DEFAULT_TENANT})
+
+
+def load_tenant_config(path: Optional[str] = TENANTS_CONFIG) -> Dict[str, Dict[str, Any]]:
+    """Read tenant settings from a JSON file, or return none if no file is configured."""
+    if not path:
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+_default_registry: Optional[TenantRegistry] = None
+_default_registry_lock = threading.Lock()
+
+
+def get_tenant_registry() -> TenantRegistry:
+    """Return the process-wide tenant registry configured by ``LVX_TENANTS_CONFIG``."""
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = TenantRegistry(load_tenant_config())
+        return _default_registry
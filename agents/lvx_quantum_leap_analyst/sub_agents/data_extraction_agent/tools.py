@@ -20,25 +20,28 @@ import logging
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
-from google.cloud import storage
 from google.api_core.exceptions import GoogleAPICallError
 
+from .scoring import document_completeness
+from .storage_backend import StorageBackend, open_storage
+
 logger = logging.getLogger(__name__)
 
 class DataExtractionTools:
     """Utility tools for data extraction and processing."""
 
-    def __init__(self, bucket_name: str = "lxvquantumleapai"):
+    def __init__(self, bucket_name: str = "lxvquantumleapai", storage: Optional[StorageBackend] = None):
         """
         Initialize data extraction tools.
 
         Args:
             bucket_name: Google Cloud Storage bucket name
+            storage: Backend holding the company documents; defaults to the
+                GCS bucket, or the location set by LVX_STORAGE_URI
         """
         # Use environment variable if available, otherwise use provided bucket name
         self.bucket_name = os.getenv("GOOGLE_CLOUD_STORAGE_BUCKET_DATA", bucket_name)
-        self.storage_client = storage.Client()
-        self.bucket = self.storage_client.bucket(self.bucket_name)
+        self.storage = storage or open_storage(bucket_name=self.bucket_name)
 
     def list_available_companies(self) -> Dict[str, Any]:
         """
@@ -52,7 +55,7 @@ class DataExtractionTools:
             total_files = 0
 
             # List all company directories
-            blobs = self.storage_client.list_blobs(self.bucket_name, prefix="Company Data/")
+            blobs = self.storage.list(prefix="Company Data/")
 
             company_dirs = set()
             for blob in blobs:
@@ -65,7 +68,7 @@ class DataExtractionTools:
             # Get details for each company
             for company_name in sorted(company_dirs):
                 company_prefix = f"Company Data/{company_name}/"
-                company_blobs = list(self.bucket.list_blobs(prefix=company_prefix))
+                company_blobs = list(self.storage.list(prefix=company_prefix))
 
                 # Get last updated timestamp
                 last_updated = None
@@ -103,7 +106,7 @@ class DataExtractionTools:
         """
         try:
             company_prefix = f"Company Data/{company_name}/"
-            blobs = list(self.bucket.list_blobs(prefix=company_prefix))
+            blobs = list(self.storage.list(prefix=company_prefix))
 
             validation = {
                 "company_name": company_name,
@@ -115,17 +118,24 @@ class DataExtractionTools:
                 "validation_timestamp": datetime.utcnow().isoformat()
             }
 
+            document_sizes = {}
             for blob in blobs:
                 filename = blob.name.split('/')[-1].lower()
                 validation["file_sizes"][blob.name] = blob.size
 
                 if 'pitch' in filename and ('deck' in filename or 'presentation' in filename):
                     validation["has_pitch_deck"] = True
-                    validation["data_quality_score"] += 50
+                    document_sizes["pitch_deck"] = blob.size
                 elif 'founder' in filename and 'checklist' in filename:
                     validation["has_founder_checklist"] = True
-                    validation["data_quality_score"] += 50
-
+                    document_sizes["founder_checklist"] = blob.size
+
+            # Graded by document weight, with stub-sized documents counting for half
+            validation["data_quality_score"] = document_completeness(
+                {"pitch_deck": validation["has_pitch_deck"],
+                 "founder_checklist": validation["has_founder_checklist"]},
+                document_sizes
+            )
             # Additional quality checks
             validation["is_complete"] = validation["has_pitch_deck"] and validation["has_founder_checklist"]
             validation["quality_assessment"] = self._assess_data_quality(validation)
@@ -142,7 +152,9 @@ class DataExtractionTools:
 
         if score == 100:
             return "Excellent - Complete dataset with both pitch deck and founder checklist"
-        elif score >= 50:
+        elif validation["is_complete"]:
+            return "Good - Both documents present, but at least one is very short"
+        elif score >= 40:
             return "Good - Partial dataset available"
         else:
             return "Limited - Minimal data available for analysis"
@@ -156,11 +168,11 @@ class DataExtractionTools:
             max_length: Maximum length of preview text
 
         Returns:
-            Dict containing text previews
+            Dict containing text previews, each with the document's size in bytes
         """
         try:
             company_prefix = f"Company Data/{company_name}/"
-            blobs = list(self.bucket.list_blobs(prefix=company_prefix))
+            blobs = self.storage.list(prefix=company_prefix)
 
             previews = {
                 "company_name": company_name,
@@ -172,13 +184,17 @@ class DataExtractionTools:
                 filename = blob.name.split('/')[-1]
 
                 try:
-                    content = blob.download_as_text()
-                    preview = content[:max_length] + "..." if len(content) > max_length else content
+                    # Fetch only the leading bytes; UTF-8 needs at most 4 per character
+                    head = self.storage.read(blob.name, 0, max_length * 4, generation=blob.generation)
+                    content = head.decode("utf-8", errors="ignore")
+                    truncated = len(content) > max_length or (blob.size or 0) > len(head)
+                    preview = content[:max_length] + "..." if truncated else content
 
                     previews["documents"][filename] = {
                         "preview": preview,
-                        "full_length": len(content),
-                        "truncated": len(content) > max_length
+                        # Object size; counting characters would mean downloading the whole file
+                        "full_bytes": blob.size,
+                        "truncated": truncated
                     }
                 except Exception as e:
                     logger.warning(f"Could not extract text from {filename}: {e}")
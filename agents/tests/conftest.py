@@ -0,0 +1,111 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Shared fixtures: an offline DataExtractionAgent over in-memory documents"""
+
+import json
+from typing import Dict, Any
+
+import pytest
+
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.agent import DataExtractionAgent
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.adaptive_limiter import AdaptiveLimiter
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.cost_ledger import CostLedger
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.cpu_stage import CpuStage
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.result_store import ResultStore
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.storage_backend import MemoryBackend
+
+DOCUMENTS = {
+    "Company Data/Acme/pitch_deck.txt": (
+        "Acme Robotics\n"
+        "Founders: Priya Raman (CEO) and Daniel Okafor (CTO).\n"
+        "We have $1.1M ARR growing 18% MoM. Raising $4.2M Series A led by Sequoia Capital.\n"
+    ),
+    "Company Data/Acme/founder_checklist.txt": "Runway: 14 months. Burn $85k/month. Gross margin 72%.\n",
+}
+
+ANALYSIS = {
+    "entities": [
+        {"id": "acme", "type": "company", "name": "Acme", "properties": {"confidence": 0.9}},
+        {"id": "priya", "type": "founder", "name": "Priya Raman", "properties": {}},
+    ],
+    "relationships": [
+        {"id": "r1", "type": "founded_by", "source_entity": "acme", "target_entity": "priya",
+         "properties": {"evidence": "Founders: Priya Raman (CEO)"}},
+    ],
+    "insights": ["Strong growth"],
+    "market_analysis": {"market_size": "$38B"},
+    "risks_and_opportunities": ["Competition"],
+}
+
+
+class FakeResponse:
+    """Response or streamed chunk carrying text."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeModel:
+    """Model returning a fixed JSON analysis, or raising ``error`` when set."""
+
+    def __init__(self, response: Dict[str, Any] = ANALYSIS):
+        self.text = json.dumps(response)
+        self.error = None
+        self.calls = 0
+
+    def generate_content(self, contents: Any, stream: bool = False, **kwargs: Any) -> Any:
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        if stream:
+            return iter([FakeResponse(self.text[i:i + 64]) for i in range(0, len(self.text), 64)])
+        return FakeResponse(self.text)
+
+
+class FakePromptCache:
+    """Prompt cache handing out one model."""
+
+    def __init__(self, model: FakeModel):
+        self.model = model
+
+    def get_model(self) -> FakeModel:
+        return self.model
+
+    def describe(self) -> Dict[str, Any]:
+        return {"mode": "fake"}
+
+
+@pytest.fixture
+def storage() -> MemoryBackend:
+    return MemoryBackend(DOCUMENTS)
+
+
+@pytest.fixture
+def make_agent(tmp_path, storage, monkeypatch):
+    """Build agents over ``storage`` with local caches under ``tmp_path``; ``model`` attaches a FakeModel."""
+    monkeypatch.delenv("GOOGLE_CLOUD_PROJECT", raising=False)
+    monkeypatch.delenv("GOOGLE_CLOUD_STORAGE_BUCKET_DATA", raising=False)
+
+    def make(model: bool = True, **kwargs: Any) -> DataExtractionAgent:
+        kwargs.setdefault("result_store", ResultStore(str(tmp_path)))
+        kwargs.setdefault("enable_routing", False)
+        agent = DataExtractionAgent(storage=storage, cpu_stage=CpuStage(0), cost_ledger=CostLedger(None),
+                                    gemini_limiter=AdaptiveLimiter("test"), cache_dir=str(tmp_path), **kwargs)
+        if model:
+            agent.model = agent.summary_model = FakeModel()
+            agent.analysis_prompt_cache = FakePromptCache(agent.model)
+        return agent
+
+    return make
@@ -0,0 +1,84 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from google.api_core.exceptions import TooManyRequests
+
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent import adaptive_limiter
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.adaptive_limiter import (
+    OK,
+    OVERLOAD,
+    AdaptiveLimiter,
+)
+
+from conftest import FakeModel
+
+
+def run_round(limiter, latency, outcome=OK):
+    """Fill every slot, then release them all with the same outcome."""
+    started = [limiter.acquire() for _ in range(limiter.limit)]
+    for start in started:
+        limiter.release(start, outcome, latency)
+
+
+def test_limit_grows_while_fully_used_and_fast():
+    limiter = AdaptiveLimiter("test", initial=4, max_limit=6)
+    for _ in range(20):
+        run_round(limiter, 0.1)
+    assert limiter.limit == 6
+    assert limiter.stats["increases"] == 2
+    assert limiter.stats["decreases"] == 0
+
+
+def test_low_concurrency_does_not_raise_the_limit():
+    limiter = AdaptiveLimiter("test", initial=4, max_limit=8)
+    for _ in range(50):
+        limiter.release(limiter.acquire(), OK, 0.1)
+    assert limiter.limit == 4
+
+
+def test_overload_cuts_the_limit_once_per_window():
+    limiter = AdaptiveLimiter("test", initial=10, max_limit=32)
+    run_round(limiter, None, OVERLOAD)
+    assert limiter.limit == 7
+    assert limiter.stats["overloads"] == 10
+    assert limiter.stats["decreases"] == 1
+
+
+def test_inflated_latency_cuts_the_limit():
+    limiter = AdaptiveLimiter("test", initial=8, max_limit=32, latency_tolerance=2.0)
+    run_round(limiter, 0.1)
+    for _ in range(3):
+        run_round(limiter, 1.0)
+    assert limiter.limit < 8
+    assert limiter.stats["decreases"] >= 1
+
+
+def test_limited_model_retries_overloads(monkeypatch):
+    monkeypatch.setattr(adaptive_limiter, "OVERLOAD_RETRY_SECONDS", 0)
+    model = FakeModel()
+    limiter = AdaptiveLimiter("test", initial=4)
+    limited = limiter.wrap(model, retries=1)
+
+    calls = iter([TooManyRequests("quota"), None])
+    original = model.generate_content
+
+    def flaky(contents, **kwargs):
+        model.error = next(calls)
+        return original(contents, **kwargs)
+
+    model.generate_content = flaky
+    assert limited.generate_content("prompt").text == model.text
+    assert model.calls == 2
+    assert limiter.stats["overloads"] == 1
+    assert limiter.inflight == 0
@@ -0,0 +1,99 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.analysis_history import (
+    AnalysisHistory, analysis_view, apply_delta, diff_views)
+
+
+def result(version):
+    """An analysis whose metrics, entities and list order shift from version to version."""
+    insights = [f"insight {i}" for i in range(version % 4 + 1)]
+    if version % 3 == 0:
+        insights.reverse()
+    entities = [{"id": "acme", "type": "company", "name": "Acme"}]
+    entities += [{"id": f"f{i}", "type": "founder", "name": f"Founder {i}"} for i in range(version % 3)]
+    return {
+        "raw_data": {
+            "pitch_deck": {"filename": "pitch_deck.txt", "generation": str(version)},
+            "founder_checklist": {"filename": "founder_checklist.txt", "generation": "1"} if version % 2 else None,
+            "data_quality": {"completeness_score": 50 + version},
+        },
+        "entity_analysis": {
+            "analysis_method": "gemini" if version % 5 else None,
+            "metrics": {"arr": 1_000_000 * version, **({"runway_months": 12} if version < 4 else {})},
+            "market_analysis": {"market_size": f"${version}B"},
+            "entities": entities,
+            "relationships": [{"type": "founded_by", "source_entity": "acme", "target_entity": entity["id"]}
+                              for entity in entities[1:]],
+            "insights": insights,
+            "risks_and_opportunities": ["Competition"] if version % 2 else [],
+        },
+    }
+
+
+VIEWS = [analysis_view(result(version)) for version in range(1, 9)]
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = AnalysisHistory(str(tmp_path), snapshot_interval=3)
+    for version in range(1, 9):
+        history.record("Acme", f"fp{version}", result(version))
+    return history
+
+
+def test_delta_round_trips_between_versions():
+    for old, new in zip([{}] + VIEWS, VIEWS):
+        assert apply_delta(old, diff_views(old, new)) == new
+    # Deltas also span several versions at once
+    assert apply_delta(VIEWS[0], diff_views(VIEWS[0], VIEWS[-1])) == VIEWS[-1]
+    # Values that are None are kept apart from missing keys
+    assert apply_delta({}, diff_views({}, VIEWS[4])) == VIEWS[4]
+    emptied = {section: type(value)() for section, value in VIEWS[4].items()}
+    assert apply_delta(VIEWS[4], diff_views(VIEWS[4], emptied)) == emptied
+    assert diff_views(VIEWS[2], VIEWS[2]) == {}
+
+
+def test_snapshots_rebuild_every_version_across_snapshot_boundaries(history):
+    assert [v["version"] for v in history.versions("Acme")] == list(range(1, 9))
+    for version, view in enumerate(VIEWS, start=1):
+        assert history.snapshot("Acme", version) == view
+    assert history.snapshot("Acme") == VIEWS[-1]
+    assert history.snapshot("Acme", 9) is None
+
+
+def test_same_fingerprint_is_not_recorded_twice(history):
+    assert history.record("Acme", "fp8", result(8)) is None
+    assert len(history.versions("Acme")) == 8
+
+
+def test_changes_since_a_version(history):
+    latest = history.changes("Acme")
+    assert (latest["from_version"], latest["to_version"]) == (7, 8)
+    assert latest["changes"] == diff_views(VIEWS[6], VIEWS[7])
+
+    since = history.changes("Acme", since_version=2)
+    assert (since["from_version"], since["from_fingerprint"], since["to_fingerprint"]) == (2, "fp2", "fp8")
+    assert since["changes"] == diff_views(VIEWS[1], VIEWS[7])
+    assert since["changes"]["metrics"]["changed"]["arr"] == {"from": 2_000_000, "to": 8_000_000, "change_pct": 300.0}
+
+    assert "error" in history.changes("Acme", since_version=8)
+    assert "error" in history.changes("Zeta")
+
+
+def test_timeline_has_one_row_per_version(history):
+    rows = history.metric_timeline("Acme", columns=["version", "arr", "completeness_score"])
+    assert [(row["version"], row["arr"]) for row in rows] == [(v, 1_000_000.0 * v) for v in range(1, 9)]
@@ -0,0 +1,59 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+from conftest import ANALYSIS, DOCUMENTS, FakeModel
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.agent import EVIDENCE_EXCERPT_CHARS
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.blob_cache import BlobCache
+
+DECK = DOCUMENTS["Company Data/Acme/pitch_deck.txt"]
+
+
+def test_compact_result_keeps_references_instead_of_text(make_agent):
+    agent = make_agent()
+    long_evidence = dict(ANALYSIS, relationships=[
+        dict(ANALYSIS["relationships"][0], properties={"evidence": "x" * 1000})])
+    agent.model = agent.summary_model = agent.analysis_prompt_cache.model = FakeModel(long_evidence)
+
+    compact = agent.compact_result(agent.extract_company_data("Acme"))
+    assert compact["documents"]["pitch_deck"]["filename"] == "Company Data/Acme/pitch_deck.txt"
+    assert compact["documents"]["pitch_deck"]["generation"]
+    assert DECK not in json.dumps(compact)
+    assert "prompt_budget" not in compact["entity_analysis"]
+    evidence = compact["entity_analysis"]["relationships"][0]["properties"]["evidence"]
+    assert evidence == "x" * EVIDENCE_EXCERPT_CHARS + "..."
+
+
+def test_document_text_is_paged_from_the_analyzed_version(make_agent, storage):
+    agent = make_agent()
+    result = agent.extract_company_data("Acme")
+    first = agent.get_document_text("Acme", "pitch_deck", start=0, length=20)
+    assert first["generation"] == result["raw_data"]["pitch_deck"]["generation"]
+
+    # The cached generation keeps serving pages after the live document changes
+    storage.put("Company Data/Acme/pitch_deck.txt", "Replaced deck")
+    rest = agent.get_document_text("Acme", "pitch_deck", start=20, length=len(DECK))
+    assert (first["text"], first["has_more"]) == (DECK[:20], True)
+    assert (rest["text"], rest["has_more"]) == (DECK[20:], False)
+    assert "error" in agent.get_document_text("Acme", "term_sheet")
+
+
+def test_blob_cache_evicts_least_recently_used_files(storage, tmp_path):
+    cache = BlobCache(storage, str(tmp_path), max_bytes=len(DECK.encode("utf-8")))
+    checklist = cache.fetch("Company Data/Acme/founder_checklist.txt")
+    deck = cache.fetch("Company Data/Acme/pitch_deck.txt")
+    assert not deck["cached"]
+    assert cache.fetch("Company Data/Acme/pitch_deck.txt")["cached"]
+    assert not (tmp_path / "blobs" / checklist["path"].rsplit("/", 1)[-1]).exists()
@@ -0,0 +1,75 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.company_records import (
+    company_record,
+    parse_amount,
+    parse_amount_range,
+    parse_number,
+)
+
+
+@pytest.mark.parametrize("value, amount", [
+    ("$4.2M", 4_200_000.0),
+    ("₹5 Cr", 50_000_000.0),
+    ("38B", 38e9),
+    ("4,200,000", 4_200_000.0),
+    (2_500_000, 2_500_000.0),
+    ("$4.2M for 10% equity", 4_200_000.0),
+    ("10%", None),
+    ("10.5 percent", None),
+    ("$3M-$5M", None),
+    ("12 months", None),
+    ("FY2025", None),
+    (None, None),
+])
+def test_parse_amount(value, amount):
+    assert parse_amount(value) == amount
+
+
+@pytest.mark.parametrize("value, bounds", [
+    ("3M-5M", (3e6, 5e6)),
+    ("$3-5M", (3e6, 5e6)),
+    ("$500K – $1.5M", (5e5, 1.5e6)),
+    ("3 to 5 million", (3e6, 5e6)),
+    ("$4.2M", (4.2e6, 4.2e6)),
+    ("10-20%", None),
+    ("2024-2025 plan", None),
+    ("Series A in 2024-2025, raising $4M", (4e6, 4e6)),
+    ("12-18 months", None),
+    ("4200000", (4.2e6, 4.2e6)),
+])
+def test_parse_amount_range(value, bounds):
+    assert parse_amount_range(value) == bounds
+
+
+def test_ranges_fill_low_and_high_columns():
+    record = company_record({
+        "company_name": "Acme",
+        "entity_analysis": {"metrics": {"ask": "$3-5M", "valuation": "$20M"}},
+    })
+    assert (record["Ask"], record["AskLow"], record["AskHigh"]) == (None, 3e6, 5e6)
+    assert (record["Valuation"], record["ValuationLow"], record["ValuationHigh"]) == (20e6, 20e6, 20e6)
+    assert record["ValidationIssues"] == []
+
+
+def test_runway_is_read_as_months():
+    record = company_record({
+        "company_name": "Acme",
+        "entity_analysis": {"metrics": {"runway_months": "14 months", "burn": "12 months"}},
+    })
+    assert (record["Runway"], record["BurnRate"]) == (14.0, None)
+    assert parse_number("18.5 months") == 18.5 and parse_number("none") is None
@@ -0,0 +1,32 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.comparison import normalize_metrics
+
+NAN = np.nan
+
+
+def test_ties_share_their_average_percentile():
+    matrix = np.array([[10.0], [10.0], [30.0], [20.0]])
+    percentile = normalize_metrics(matrix, ["growth_pct"])["percentile"][:, 0]
+    np.testing.assert_allclose(percentile, [1 / 6, 1 / 6, 1.0, 2 / 3])
+
+
+def test_missing_values_are_not_ranked():
+    matrix = np.array([[10.0, NAN], [10.0, 5.0], [NAN, NAN]])
+    normalized = normalize_metrics(matrix, ["growth_pct", "runway_months"])
+    np.testing.assert_allclose(normalized["percentile"], [[0.5, NAN], [0.5, 0.0], [NAN, NAN]])
+    np.testing.assert_allclose(normalized["zscore"], [[0.0, NAN], [0.0, 0.0], [NAN, NAN]])
@@ -0,0 +1,110 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.agent import _session_id, record_session_id
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.cost_ledger import (
+    SESSION_STATE_KEY, CostLedger, UsageScope, current_usage_scope, usage_scope)
+
+from conftest import FakeModel
+
+MODEL = "gemini-2.0-flash"
+PRICES = {MODEL: (0.10, 0.40, 0.025)}
+
+
+def usage(prompt, output, cached=0):
+    return SimpleNamespace(prompt_token_count=prompt, candidates_token_count=output,
+                           cached_content_token_count=cached)
+
+
+def test_nested_scopes_inherit_attribution_and_roll_up():
+    ledger = CostLedger(None, PRICES)
+    with usage_scope(session="s1", tenant="fund-a") as session:
+        with usage_scope(company="Acme") as extraction:
+            call = ledger.record(MODEL, "analysis", 400, 100, 0.5, usage(1000, 100, cached=400))
+        ledger.record(MODEL, "summary", 40, 8, 0.1)
+    assert current_usage_scope() is None
+
+    assert (call["session"], call["tenant"], call["company"]) == ("s1", "fund-a", "Acme")
+    assert call["cost_usd"] == pytest.approx((600 * 0.10 + 400 * 0.025 + 100 * 0.40) / 1e6)
+    assert extraction.summary()["calls"] == 1
+    summary = session.summary()
+    assert (summary["calls"], summary["estimated_calls"]) == (2, 1)
+    assert summary["prompt_tokens"] == 1000 + 10 and summary["output_tokens"] == 100 + 2
+    assert set(summary["by_label"]) == {"analysis", "summary"}
+    assert ledger.totals[(MODEL, "analysis", "fund-a", "Acme")]["calls"] == 1
+    assert ledger.totals[(MODEL, "summary", "fund-a", "")]["calls"] == 1
+
+
+def test_explicit_scopes_are_used_by_metered_models():
+    ledger = CostLedger(None, PRICES)
+    batch = UsageScope(batch="prewarm-1")
+    scope = UsageScope(company="Acme", parent=batch)
+    model = ledger.meter(FakeModel(), MODEL, "analysis", scope)
+
+    model.generate_content("Analyze Acme")
+    assert "".join(chunk.text for chunk in model.generate_content("Analyze Acme", stream=True)) == model.model.text
+    assert scope.summary()["calls"] == batch.summary()["calls"] == 2
+    assert ledger.totals[(MODEL, "analysis", "", "Acme")]["calls"] == 2
+
+
+def test_sqlite_ledger_flushes_and_reports_rollups(tmp_path):
+    ledger = CostLedger(str(tmp_path / "usage.sqlite"), PRICES, flush_seconds=3600, flush_records=3)
+    with usage_scope(company="Acme", session="s1"):
+        ledger.record(MODEL, "analysis", 0, 0, 0.2, usage(2000, 200))
+        ledger.record(MODEL, "summary", 0, 0, 0.4, usage(500, 50))
+    assert ledger.report("company") == [{
+        "company": "Acme", "calls": 2, "prompt_tokens": 2500, "cached_tokens": 0, "output_tokens": 250,
+        "mean_latency_s": 0.3, "cost_usd": round((2500 * 0.10 + 250 * 0.40) / 1e6, 6), "estimated_calls": 0}]
+
+    # Reaching flush_records writes the buffer without an explicit flush
+    with usage_scope(company="Zeta", session="s2"):
+        for _ in range(3):
+            ledger.record(MODEL, "analysis", 0, 0, 0.1, usage(100_000, 1000))
+    assert ledger.flush() == 0
+    ranked = ledger.report("company")
+    assert [row["company"] for row in ranked] == ["Zeta", "Acme"]
+    assert [row["calls"] for row in ledger.report("session")] == [3, 2]
+    assert len(ledger.report("company", limit=1)) == 1
+    with pytest.raises(ValueError):
+        ledger.report("prompt")
+
+
+def test_jsonl_ledger_appends_calls(tmp_path):
+    path = tmp_path / "usage.jsonl"
+    ledger = CostLedger(str(path), PRICES, flush_seconds=3600)
+    with usage_scope(tenant="fund-a"):
+        ledger.record(MODEL, "analysis", 80, 40, 0.2)
+    assert not path.exists()
+    assert ledger.flush() == 1
+    call, = [json.loads(line) for line in path.read_text().splitlines()]
+    assert (call["tenant"], call["prompt_tokens"], call["output_tokens"], call["estimated"]) == ("fund-a", 20, 10, True)
+    with pytest.raises(ValueError):
+        ledger.report()
+
+
+def test_tool_calls_are_billed_to_the_root_session():
+    root = SimpleNamespace(state={}, session=SimpleNamespace(id="root-session"))
+    record_session_id(root)
+    assert root.state[SESSION_STATE_KEY] == "root-session"
+
+    # AgentTool copies the root state into a sub-agent session with its own id
+    sub_agent = SimpleNamespace(state=dict(root.state), session=SimpleNamespace(id="agent-tool-session"))
+    assert _session_id(sub_agent) == "root-session"
+    assert _session_id(SimpleNamespace(state={}, session=SimpleNamespace(id="direct"))) == "direct"
+    assert _session_id(None) is None
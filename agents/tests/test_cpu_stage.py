@@ -0,0 +1,35 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.cpu_stage import SHARED_MEMORY_MIN_BYTES, CpuStage
+
+TEXT = "Traction: $1.1M ARR growing 18% MoM. The seed round was led by Sequoia Capital in March 2024.\n"
+
+
+def test_inline_and_pool_results_match():
+    inline, pool = CpuStage(0), CpuStage(1)
+    try:
+        for task, text, kwargs in [
+            ("rule_based_analysis", TEXT, {}),
+            ("prepare_prompt", TEXT * 20, {"max_tokens": 50}),
+            # Large enough to reach the worker through shared memory
+            ("extract_metrics", TEXT * (SHARED_MEMORY_MIN_BYTES // len(TEXT) + 1), {}),
+            ("parse_response", '```json\n{"entities": [{"id": "a"}, {"id": "a", "properties": {"x": 1}}]}\n```', {}),
+        ]:
+            inline_result, pool_result = (stage.run(task, text, "Acme", **kwargs) for stage in (inline, pool))
+            for result in (inline_result, pool_result):
+                result.pop("analysis_timestamp", None)
+            assert inline_result == pool_result, task
+    finally:
+        pool.shutdown()
@@ -0,0 +1,44 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.document_stream import digest_blob, iter_text_chunks
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.storage_backend import MemoryBackend
+
+FACT = "Traction: $1.1M ARR growing 18% MoM; raising a $4.2M Series A led by Sequoia Capital."
+
+
+def test_text_without_line_breaks_is_chunked():
+    text = "word " * 10000
+    storage = MemoryBackend({"doc.txt": text})
+    chunks = list(iter_text_chunks(storage, storage.stat("doc.txt"), chunk_bytes=1024))
+    assert "".join(chunks) == text
+    assert max(len(chunk) for chunk in chunks) < 2 * 1024
+
+
+def test_relevant_passages_late_in_a_document_are_kept():
+    filler = [f"Paragraph {i}: our culture and values inspire a seamless journey." for i in range(200)]
+    text = "Acme Robotics\n\n" + "\n\n".join(filler[:150] + [FACT] + filler[150:])
+    storage = MemoryBackend({"deck.txt": text})
+
+    digest = digest_blob(storage, storage.stat("deck.txt"), max_chars=500, chunk_bytes=256)
+    assert digest.truncated
+    assert digest.text.startswith("Acme Robotics")
+    assert FACT in digest.text
+    assert len(digest.text) <= 600
+    assert digest.total_chars == len(text)
+
+    # Every kept passage maps back to where it starts in the document
+    for text_start, source_start in digest.segments:
+        passage = digest.text[text_start:].split("\n\n", 1)[0]
+        assert text[source_start:source_start + len(passage)] == passage
@@ -0,0 +1,52 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.fast_extractor import FastExtractor
+
+LINE = "Traction: $1.1M ARR growing 18% MoM with 72% gross margin. Backed by Sequoia Capital.\n"
+
+
+def names(result, kind):
+    return [e["name"] for e in result["entities"] if e["type"] == kind]
+
+
+def test_repeated_lines_yield_unique_relationships():
+    result = FastExtractor().extract(LINE * 500, "Acme")
+    ids = [r["id"] for r in result["relationships"]]
+    assert len(ids) == len(set(ids)) == 4
+
+
+def test_metrics_are_named_by_label_and_value():
+    result = FastExtractor().extract(LINE + "MRR is $210K.", "Acme")
+    assert set(names(result, "metric")) == {"MRR 210,000 USD", "ARR 1,100,000 USD", "growth 18%", "gross margin 72%"}
+
+
+def test_gazetteer_prefers_the_longest_name():
+    assert names(FastExtractor().extract(LINE, "Acme"), "investor") == ["Sequoia Capital"]
+
+
+def test_ambiguous_investors_need_context():
+    extractor = FastExtractor()
+    assert names(extractor.extract("Benchmark results show 40% gains. We raised a seed round.", "Acme"), "investor") == []
+    assert names(extractor.extract("benchmark investments", "Acme"), "investor") == []
+    assert names(extractor.extract("The seed round was led by Benchmark.", "Acme"), "investor") == ["Benchmark"]
+
+
+def test_dates_are_emitted_with_their_event():
+    result = FastExtractor().extract("We closed a seed round in March 2024. Launch in Q3 FY25.", "Acme")
+    dates = {e["name"]: e["properties"] for e in result["entities"] if e["type"] == "date"}
+    assert dates["March 2024"]["event"] == "Seed"
+    assert "Q3 FY25" in dates
+    assert {r["target_entity"] for r in result["relationships"] if r["type"] == "has_milestone"} == {
+        "date_march_2024", "date_q3_fy25"}
@@ -0,0 +1,61 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+
+import pyarrow.parquet as pq
+
+from conftest import ANALYSIS
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.graph_export import GraphExporter
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.result_store import ResultStore
+
+
+def export(tmp_path, fingerprint="f1"):
+    store = ResultStore(str(tmp_path / "results"))
+    store.put("Acme", fingerprint, {"entity_analysis": ANALYSIS})
+    exporter = GraphExporter(str(tmp_path / "export"))
+    return exporter, exporter.export_from_store(store), store
+
+
+def test_tables_and_shards_round_trip(tmp_path):
+    _, summary, _ = export(tmp_path)
+    assert summary["written"] == ["Acme"]
+
+    nodes = pq.read_table(tmp_path / "export" / "nodes").to_pylist()
+    assert [(n["node_id"], n["type"], n["name"], n["company_slug"]) for n in nodes] == [
+        ("acme", "company", "Acme", "acme"), ("priya", "founder", "Priya Raman", "acme")]
+    assert abs(nodes[0]["confidence"] - 0.9) < 1e-6
+    edge, = pq.read_table(tmp_path / "export" / "edges").to_pylist()
+    assert (edge["source_node"], edge["target_node"], edge["directed"]) == ("acme", "priya", True)
+
+    with open(tmp_path / "export" / "shards" / "acme.json", encoding="utf-8") as f:
+        shard = json.load(f)
+    assert shard["fingerprint"] == "f1"
+    rows = [dict(zip(shard["node_columns"], row)) for row in shard["nodes"]]
+    assert [(r["id"], r["name"]) for r in rows] == [("acme", "Acme"), ("priya", "Priya Raman")]
+    edge = dict(zip(shard["edge_columns"], shard["edges"][0]))
+    assert (edge["source"], edge["target"], edge["evidence"]) == ("acme", "priya", "Founders: Priya Raman (CEO)")
+
+
+def test_export_is_incremental_and_drops_removed_companies(tmp_path):
+    exporter, _, store = export(tmp_path)
+    assert exporter.export_from_store(store)["unchanged"] == 1
+
+    store.put("Acme", "f2", {"entity_analysis": ANALYSIS})
+    assert exporter.export_from_store(store)["written"] == ["Acme"]
+
+    store.invalidate("Acme")
+    assert exporter.export_from_store(store)["removed"] == ["acme"]
+    assert not os.path.exists(tmp_path / "export" / "shards" / "acme.json")
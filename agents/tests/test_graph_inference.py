@@ -0,0 +1,110 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pyarrow.parquet as pq
+
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.graph_inference import (
+    COMPETES_WITH, SHARES_INVESTOR, SHARES_MARKET, SIMILAR_TECHNOLOGY, RelationshipInference,
+    write_inferred_edges)
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.result_store import ResultStore
+
+
+def analysis(name, investors=(), markets=(), technologies=(), competitors=()):
+    entities = [{"id": "company", "type": "company", "name": name}]
+    relationships = []
+    for kind, names in (("investor", investors), ("market", markets), ("technology", technologies)):
+        entities.extend({"id": f"{kind}{i}", "type": kind, "name": value} for i, value in enumerate(names))
+    for i, value in enumerate(competitors):
+        # Competitors named only through a relationship still count
+        entities.append({"id": f"rival{i}", "type": "company", "name": value})
+        relationships.append({"type": "competes_with", "source_entity": "company", "target_entity": f"rival{i}"})
+    return {"entities": entities, "relationships": relationships}
+
+
+PORTFOLIO = {
+    "Acme": analysis("Acme", investors=["Sequoia Capital"], markets=["Warehouse Robotics"],
+                     technologies=["Lidar", "SLAM"], competitors=["Zeta"]),
+    "Beta": analysis("Beta", investors=["sequoia capital"], technologies=["Lidar", "SLAM"],
+                     competitors=["RoboCorp"]),
+    "Gamma": analysis("Gamma", markets=["Warehouse robotics"], competitors=["RoboCorp"]),
+    "Zeta": analysis("Zeta", competitors=["Delta"]),
+    "Delta": analysis("Delta"),
+}
+
+
+def edges_of(inferred, edge_type):
+    return {(edge["source_company"], edge["target_company"]): edge
+            for edge in inferred["edges"] if edge["type"] == edge_type}
+
+
+def test_each_edge_type_is_inferred():
+    inferred = RelationshipInference().infer(PORTFOLIO)
+    assert inferred["companies"] == 5
+
+    investor = edges_of(inferred, SHARES_INVESTOR)[("Acme", "Beta")]
+    assert investor["score"] == 1 and investor["shared"] == ["Sequoia Capital"]
+    assert list(edges_of(inferred, SHARES_MARKET)) == [("Acme", "Gamma")]
+    assert edges_of(inferred, SIMILAR_TECHNOLOGY)[("Acme", "Beta")]["shared"] == ["Lidar", "SLAM"]
+
+    competitors = {pair: (edge["basis"], edge["shared"]) for pair, edge in edges_of(inferred, COMPETES_WITH).items()}
+    assert competitors == {
+        ("Acme", "Zeta"): ("direct", []),
+        ("Delta", "Zeta"): ("direct", []),
+        ("Beta", "Gamma"): ("shared", ["RoboCorp"]),
+        ("Acme", "Delta"): ("transitive", ["Zeta"]),
+    }
+    assert inferred["counts"] == {SHARES_INVESTOR: 1, SHARES_MARKET: 1, SIMILAR_TECHNOLOGY: 1, COMPETES_WITH: 4}
+
+
+def test_top_k_keeps_each_company_strongest_edges():
+    # Jaccard scores: c0-c1 match exactly, c2 is 2/3 of either, c3 is closest to c2 (1/2)
+    portfolio = {
+        "c0": analysis("c0", technologies=["a", "b", "c"]),
+        "c1": analysis("c1", technologies=["a", "b", "c"]),
+        "c2": analysis("c2", technologies=["a", "b"]),
+        "c3": analysis("c3", technologies=["a"]),
+    }
+    everything = edges_of(RelationshipInference(min_score=0).infer(portfolio), SIMILAR_TECHNOLOGY)
+    assert len(everything) == 6
+
+    kept = edges_of(RelationshipInference(min_score=0, top_k=1).infer(portfolio), SIMILAR_TECHNOLOGY)
+    assert ("c0", "c1") in kept and ("c2", "c3") in kept
+    assert len(kept) == 3
+    assert all(edge["score"] == everything[pair]["score"] for pair, edge in kept.items())
+
+
+def test_min_score_drops_weak_edges():
+    strong = edges_of(RelationshipInference(min_score=0.6).infer({
+        "c0": analysis("c0", technologies=["a", "b", "c"]),
+        "c1": analysis("c1", technologies=["a", "b", "c"]),
+        "c2": analysis("c2", technologies=["a"]),
+    }), SIMILAR_TECHNOLOGY)
+    assert list(strong) == [("c0", "c1")]
+
+
+def test_inference_reads_the_store_and_writes_parquet(tmp_path):
+    store = ResultStore(str(tmp_path / "results"))
+    for name in ("Acme", "Beta"):
+        store.put(name, "fp", {"company_name": name, "entity_analysis": PORTFOLIO[name]})
+    inferred = RelationshipInference().infer_from_store(store)
+    assert inferred["companies"] == 2
+
+    path = write_inferred_edges(inferred["edges"], str(tmp_path / "export"))
+    rows = pq.read_table(path).to_pylist()
+    assert {(row["type"], row["source_company"], row["target_company"]) for row in rows} == {
+        (SHARES_INVESTOR, "Acme", "Beta"), (SIMILAR_TECHNOLOGY, "Acme", "Beta")}
+
+
+def test_single_company_has_no_edges():
+    assert RelationshipInference().infer({"Acme": PORTFOLIO["Acme"]})["edges"] == []
@@ -0,0 +1,90 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from types import SimpleNamespace
+
+import pytest
+
+from lvx_quantum_leap_analyst import memo as memo_module
+from lvx_quantum_leap_analyst.memo import MEMO_STATE_KEY, SubAgentMemo
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.agent import ANALYZED_COMPANIES_STATE_KEY
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.tenants import TENANT_STATE_KEY
+
+TOOL = SimpleNamespace(name="data_extraction_agent")
+
+
+@pytest.fixture
+def memo(monkeypatch):
+    fingerprints = {}
+    monkeypatch.setattr(memo_module, "get_default_agent", lambda tenant: SimpleNamespace(
+        current_fingerprint=lambda company_name: fingerprints[(tenant, company_name)]))
+    memo = SubAgentMemo()
+    memo.fingerprints = fingerprints
+    return memo
+
+
+def remember(memo, state, company_name, output, *others):
+    tenant = state.get(TENANT_STATE_KEY) or "default"
+    for name in (company_name, *others):
+        memo.fingerprints[(tenant, name)] = "fp"
+    state[ANALYZED_COMPANIES_STATE_KEY] = [
+        {"company_name": name, "source_fingerprint": "fp"} for name in (company_name, *others)]
+    state["data_extraction_output"] = output
+    memo.after_tool(TOOL, {}, SimpleNamespace(state=state), {})
+
+
+def ask(memo, state, request):
+    return memo.before_tool(TOOL, {"request": request}, SimpleNamespace(state=state))
+
+
+def test_single_company_request_is_memoized(memo):
+    state = {}
+    remember(memo, state, "Acme", "acme analysis")
+    assert ask(memo, state, "Analyze Acme again")["result"] == "acme analysis"
+    assert ask(memo, state, "What are the risks for acme?")["result"] == "acme analysis"
+
+
+def test_requests_naming_another_company_run_fresh(memo):
+    state = {}
+    remember(memo, state, "Acme", "acme analysis")
+    assert ask(memo, state, "Compare Acme with NewCo") is None
+    assert ask(memo, state, "Acme versus Zeta Labs") is None
+
+
+def test_memo_is_keyed_by_tenant(memo):
+    state = {TENANT_STATE_KEY: "fund-a"}
+    remember(memo, state, "Acme", "fund-a analysis")
+    assert list(state[MEMO_STATE_KEY]) == ["fund-a/acme"]
+
+    state[TENANT_STATE_KEY] = "fund-b"
+    assert ask(memo, state, "Analyze Acme") is None
+    remember(memo, state, "Acme", "fund-b analysis")
+    assert ask(memo, state, "Analyze Acme")["result"] == "fund-b analysis"
+
+    state[TENANT_STATE_KEY] = "fund-a"
+    assert ask(memo, state, "Analyze Acme")["result"] == "fund-a analysis"
+
+
+def test_runs_analyzing_several_companies_are_not_memoized(memo):
+    state = {}
+    remember(memo, state, "Acme", "fintech comparison", "Zeta")
+    assert not state.get(MEMO_STATE_KEY)
+    assert state[ANALYZED_COMPANIES_STATE_KEY] == []
+    assert ask(memo, state, "Analyze Zeta") is None
+
+
+def test_fresh_runs_start_with_no_analyses(memo):
+    state = {ANALYZED_COMPANIES_STATE_KEY: [{"company_name": "Stale", "source_fingerprint": "fp"}]}
+    assert ask(memo, state, "Compare our fintech deals") is None
+    assert state[ANALYZED_COMPANIES_STATE_KEY] == []
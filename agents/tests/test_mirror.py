@@ -0,0 +1,85 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import sys
+
+import pytest
+
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent import mirror as mirror_module
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.mirror import BucketMirror
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.storage_backend import LocalBackend, MemoryBackend
+
+from conftest import DOCUMENTS
+
+DECK = "Company Data/Acme/pitch_deck.txt"
+CHECKLIST = "Company Data/Acme/founder_checklist.txt"
+
+
+@pytest.fixture
+def source():
+    return MemoryBackend(DOCUMENTS)
+
+
+def test_second_sync_skips_unchanged_files(source, tmp_path):
+    mirror = BucketMirror(source, str(tmp_path), workers=2)
+    first = mirror.sync()
+    assert (first["downloaded"], first["unchanged"]) == (2, 0)
+    assert first["downloaded_bytes"] == sum(len(text.encode()) for text in DOCUMENTS.values())
+
+    again = mirror.sync()
+    assert (again["downloaded"], again["unchanged"], again["removed"]) == (0, 2, 0)
+    local = LocalBackend(str(tmp_path))
+    assert local.read_text(DECK) == DOCUMENTS[DECK]
+    assert local.stat(DECK).generation == source.stat(DECK).generation
+
+
+def test_reuploaded_identical_files_are_matched_by_md5(source, tmp_path):
+    mirror = BucketMirror(source, str(tmp_path))
+    mirror.sync()
+    source.put(DECK, DOCUMENTS[DECK])
+    source.put(CHECKLIST, "Runway: 20 months.\n")
+
+    summary = mirror.sync()
+    assert (summary["downloaded"], summary["unchanged"]) == (1, 1)
+    # The kept copy now reports the new source generation
+    assert LocalBackend(str(tmp_path)).stat(DECK).generation == source.stat(DECK).generation
+    assert LocalBackend(str(tmp_path)).read_text(CHECKLIST) == "Runway: 20 months.\n"
+
+
+def test_deleted_objects_are_removed_unless_kept(source, tmp_path):
+    mirror = BucketMirror(source, str(tmp_path))
+    mirror.sync()
+    source.delete(CHECKLIST)
+    path = mirror.local.file_path(CHECKLIST)
+
+    kept = mirror.sync(delete=False)
+    assert kept["removed"] == 0 and os.path.exists(path)
+    assert CHECKLIST in json.loads(open(mirror.manifest_path).read())["objects"]
+
+    removed = mirror.sync()
+    assert removed["removed"] == 1 and not os.path.exists(path)
+    assert CHECKLIST not in json.loads(open(mirror.manifest_path).read())["objects"]
+
+
+def test_cli_keep_deleted_keeps_local_copies(source, tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(mirror_module, "open_storage", lambda uri: source)
+    BucketMirror(source, str(tmp_path)).sync()
+    source.delete(CHECKLIST)
+
+    monkeypatch.setattr(sys, "argv", ["mirror", "--dest", str(tmp_path), "--keep-deleted"])
+    mirror_module.main()
+    assert json.loads(capsys.readouterr().out)["removed"] == 0
+    assert os.path.exists(os.path.join(tmp_path, "Company Data", "Acme", "founder_checklist.txt"))
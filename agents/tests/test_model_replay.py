@@ -0,0 +1,94 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.model_replay import (
+    MODE_RECORD, MODE_REPLAY, CassetteMiss, ModelCassette)
+
+from conftest import FakeModel, FakePromptCache
+
+LABEL = "gemini-test/v1"
+
+
+def record(path, model, *prompts, stream=False):
+    recorder = ModelCassette(str(path), MODE_RECORD).wrap(model, LABEL)
+    for prompt in prompts:
+        response = recorder.generate_content(prompt, stream=stream)
+        if stream:
+            list(response)
+
+
+def test_replayed_stream_matches_the_recorded_chunks(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    model = FakeModel()
+    recorder = ModelCassette(str(path), MODE_RECORD).wrap(model, LABEL)
+    recorded = [chunk.text for chunk in recorder.generate_content("Analyze Acme", stream=True)]
+    assert len(recorded) > 1
+
+    replayer = ModelCassette(str(path), MODE_REPLAY).wrap(None, LABEL)
+    assert [chunk.text for chunk in replayer.generate_content("Analyze Acme", stream=True)] == recorded
+    assert model.calls == 1
+
+
+def test_unary_calls_replay_the_recorded_text(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    model = FakeModel()
+    record(path, model, "Analyze Acme")
+
+    cassette = ModelCassette(str(path), MODE_REPLAY)
+    assert cassette.wrap(None, LABEL).generate_content("Analyze Acme").text == model.text
+    assert cassette.stats == {"hits": 1, "misses": 0, "recorded": 0}
+
+
+def test_unrecorded_calls_miss(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    record(path, FakeModel(), "Analyze Acme")
+    replayer = ModelCassette(str(path), MODE_REPLAY).wrap(None, LABEL)
+
+    with pytest.raises(CassetteMiss):
+        replayer.generate_content("Analyze Zeta")
+    # Streaming, the label and the prompt are all part of the key
+    with pytest.raises(CassetteMiss):
+        replayer.generate_content("Analyze Acme", stream=True)
+    with pytest.raises(CassetteMiss):
+        ModelCassette(str(path), MODE_REPLAY).wrap(None, "gemini-test/v2").generate_content("Analyze Acme")
+
+
+def test_repeated_prompts_replay_in_recording_order(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    model = FakeModel()
+    record(path, model, "Analyze Acme")
+    model.text = '{"insights": ["second"]}'
+    record(path, model, "Analyze Acme")
+
+    replayer = ModelCassette(str(path), MODE_REPLAY).wrap(None, LABEL)
+    first, second, third = (replayer.generate_content("Analyze Acme").text for _ in range(3))
+    assert first != second == third == model.text
+
+
+def test_prompt_cache_wrapper_records_and_replays(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    model = FakeModel()
+    recording = ModelCassette(str(path), MODE_RECORD).wrap_prompt_cache(FakePromptCache(model), LABEL)
+    assert recording.get_model().generate_content("Analyze Acme").text == model.text
+
+    replaying = ModelCassette(str(path), MODE_REPLAY).wrap_prompt_cache(None, LABEL)
+    assert replaying.get_model().generate_content("Analyze Acme").text == model.text
+    assert replaying.describe() == {"cassette": MODE_REPLAY}
+
+
+def test_unknown_modes_are_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        ModelCassette(str(tmp_path / "cassette.jsonl"), "rewind")
@@ -0,0 +1,126 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from google.api_core.exceptions import TooManyRequests
+
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.graph_export import GraphExporter
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.prewarm import (
+    PRIORITY_CHANGED,
+    PRIORITY_NEW,
+    CompanyChangeFeed,
+    LocalNotificationQueue,
+    PrewarmWorker,
+)
+
+
+def test_degraded_analysis_is_not_stored_and_is_retried(make_agent):
+    agent = make_agent()
+    agent.model.error = TooManyRequests("quota")
+
+    result = agent.extract_company_data("Acme")
+    assert result["entity_analysis"]["analysis_method"] == "rule_based"
+    assert agent.result_store.get("Acme") is None
+
+    agent.model.error = None
+    result = agent.extract_company_data("Acme")
+    assert result["entity_analysis"]["analysis_method"] == "gemini_ai"
+    assert agent.result_store.get("Acme") is not None
+
+    calls = agent.model.calls
+    agent.extract_company_data("Acme")
+    assert agent.model.calls == calls
+
+
+def test_rule_based_analysis_is_stored_without_a_model(make_agent):
+    agent = make_agent(model=False)
+    agent.extract_company_data("Acme")
+    assert agent.result_store.get("Acme")["entity_analysis"]["analysis_method"] == "rule_based"
+
+
+def test_feed_reannounces_until_committed(storage, tmp_path):
+    feed = CompanyChangeFeed(storage, str(tmp_path))
+    change, = feed.poll()
+    assert change["priority"] == PRIORITY_NEW
+    assert [c["company_name"] for c in feed.poll()] == ["Acme"]
+
+    feed.commit(change)
+    assert feed.poll() == []
+    assert feed.watermark == change["updated"]
+    # State survives a restart
+    assert CompanyChangeFeed(storage, str(tmp_path)).poll() == []
+
+
+def test_feed_detects_overwrites_and_deletions(storage, tmp_path):
+    feed = CompanyChangeFeed(storage, str(tmp_path))
+    feed.commit(feed.poll()[0])
+
+    storage.put("Company Data/Acme/pitch_deck.txt", "New deck")
+    change, = feed.poll()
+    assert change["priority"] == PRIORITY_CHANGED
+    feed.commit(change)
+
+    storage.delete("Company Data/Acme/founder_checklist.txt")
+    assert [c["company_name"] for c in feed.poll()] == ["Acme"]
+
+
+def test_worker_commits_only_stored_results(make_agent, storage, tmp_path):
+    agent = make_agent()
+    feed = CompanyChangeFeed(storage, str(tmp_path))
+    worker = PrewarmWorker(agent, feed)
+
+    agent.model.error = TooManyRequests("quota")
+    assert worker.run_once() == 1
+    assert worker.stats["failed"] == 1
+    assert [c["company_name"] for c in feed.poll()] == ["Acme"]
+
+    agent.model.error = None
+    assert worker.run_once() == 1
+    assert worker.stats["completed"] == 1
+    assert feed.poll() == []
+
+
+def test_notifications_fingerprint_the_whole_folder(make_agent, storage, tmp_path):
+    agent = make_agent()
+    agent.extract_company_data("Acme")
+    notifications = LocalNotificationQueue(storage)
+
+    storage.put("Company Data/Acme/pitch_deck.txt", "New deck")
+    notifications.publish("Company Data/Acme/pitch_deck.txt", updated="2025-01-02T00:00:00+00:00")
+    change, = notifications.poll()
+    assert change["fingerprint"] == CompanyChangeFeed(storage, str(tmp_path)).poll()[0]["fingerprint"]
+    assert change["blobs"] == 2
+    assert change["changed"] == ["Company Data/Acme/pitch_deck.txt"]
+
+    worker = PrewarmWorker(agent, notifications)
+    worker.enqueue(change)
+    assert worker.run_once() == 1
+    assert agent.result_store.get_fingerprint("Acme") == change["fingerprint"]
+
+
+def test_duplicate_changes_are_merged(make_agent, storage):
+    worker = PrewarmWorker(make_agent(), LocalNotificationQueue(storage))
+    worker.enqueue({"company_name": "Acme", "fingerprint": "a", "blobs": 2, "priority": PRIORITY_NEW,
+                    "updated": "2025-01-01T00:00:00+00:00", "changed": ["Company Data/Acme/pitch_deck.txt"]})
+    worker.enqueue({"company_name": "Acme", "fingerprint": "b", "blobs": 3, "priority": PRIORITY_CHANGED,
+                    "updated": "2025-01-02T00:00:00+00:00", "changed": ["Company Data/Acme/memo.txt"]})
+    queued = worker._queued["Acme"]
+    assert (queued["fingerprint"], queued["blobs"], queued["updated"]) == ("b", 3, "2025-01-02T00:00:00+00:00")
+    assert queued["changed"] == ["Company Data/Acme/memo.txt", "Company Data/Acme/pitch_deck.txt"]
+
+
+def test_worker_refreshes_the_graph_export(make_agent, storage, tmp_path):
+    exporter = GraphExporter(str(tmp_path / "graph_export"))
+    worker = PrewarmWorker(make_agent(), CompanyChangeFeed(storage, str(tmp_path)), graph_exporter=exporter)
+    assert worker.run_once() == 1
+    assert (tmp_path / "graph_export" / "shards" / "acme.json").exists()
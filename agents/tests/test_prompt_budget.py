@@ -0,0 +1,40 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.prompt_budget import PromptBudgeter, score_passage
+
+FACT = "Competitors: UiPath and Automation Anywhere; we differentiate with computer vision."
+PROSE = "Our customers love working with us, and happy customers tell other customers about us. " * 2
+
+
+def test_repeated_terms_do_not_outrank_facts():
+    assert score_passage(FACT) > score_passage(PROSE)
+
+
+def test_budget_drops_prose_before_facts():
+    slides = [f"Slide {i}: {PROSE} Edition {i}." for i in range(20)]
+    slides.insert(10, FACT)
+    text = "PITCH DECK:\n\n" + "\n\n".join(slides)
+
+    compacted = PromptBudgeter(max_tokens=300).compact(text)
+    assert FACT in compacted["text"]
+    assert compacted["report"]["within_budget"]
+    assert compacted["report"]["dropped_spans"]
+
+
+def test_boilerplate_lines_are_kept_once():
+    text = "\n".join(f"ACME | Confidential\nSlide {i} of 5\nPoint {i}\n" for i in range(5))
+    compacted = PromptBudgeter().compact(text)
+    assert compacted["text"].count("ACME | Confidential") == 1
+    assert "Slide 3 of 5" not in compacted["text"]
@@ -0,0 +1,41 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent import prompt_cache
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.prompt import ENTITY_ANALYSIS_PROMPT
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.prompt_cache import PromptPrefixCache
+
+
+def test_model_is_built_once_and_reported_uncached(monkeypatch):
+    built = []
+    monkeypatch.setattr(prompt_cache, "GenerativeModel",
+                        lambda name, system_instruction: built.append(system_instruction) or object())
+    cache = PromptPrefixCache("gemini-2.0-flash-exp", ENTITY_ANALYSIS_PROMPT)
+
+    model = cache.get_model()
+    assert cache.get_model() is model
+    assert built == [ENTITY_ANALYSIS_PROMPT]
+    described = cache.describe()
+    assert described["mode"] == "system_instruction"
+    assert described["cached_tokens"] == 0
+    assert (described["requests"], described["creates"]) == (2, 1)
+
+
+def test_invalidate_rebuilds_the_model(monkeypatch):
+    monkeypatch.setattr(prompt_cache, "GenerativeModel", lambda name, system_instruction: object())
+    cache = PromptPrefixCache("gemini-2.0-flash-exp", ENTITY_ANALYSIS_PROMPT)
+
+    model = cache.get_model()
+    cache.invalidate()
+    assert cache.get_model() is not model
@@ -0,0 +1,34 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from types import SimpleNamespace
+
+import pytest
+
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.routing import TIER_FULL, TIER_SUMMARY, ModelRouter
+
+
+@pytest.mark.parametrize("reply, tier", [
+    ("PROMISING", TIER_FULL),
+    ("Promising. Strong founders.", TIER_FULL),
+    ("**PROMISING**", TIER_FULL),
+    ("NOT PROMISING", TIER_SUMMARY),
+    ("SKIP - not promising", TIER_SUMMARY),
+    ("", TIER_SUMMARY),
+])
+def test_triage_reads_the_first_token(reply, tier):
+    model = SimpleNamespace(generate_content=lambda prompt: SimpleNamespace(text=reply))
+    router = ModelRouter(triage_model=model)
+    decision = router.route({"data_quality": {"completeness_score": 0}}, "Acme builds robots.", "Acme")
+    assert decision["tier"] == tier
@@ -0,0 +1,100 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import math
+
+import pytest
+
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.result_store import ResultStore
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.scoring import (
+    DEFAULT_WEIGHTS, MISSING_COMPONENT_SCORE, ReadinessScorer, document_completeness, parse_weights,
+    readiness_tier)
+
+
+def result(company_name, completeness=100, entities=(), **metrics):
+    return {
+        "company_name": company_name,
+        "raw_data": {"data_quality": {"completeness_score": completeness}},
+        "entity_analysis": {"metrics": metrics, "entities": [{"type": kind} for kind in entities]},
+    }
+
+
+def test_weight_overrides_are_applied_and_normalized():
+    weights = parse_weights("growth=0.5, margin=0")
+    assert weights["growth"] == 0.5 and weights["margin"] == 0
+    assert weights["runway"] == DEFAULT_WEIGHTS["runway"]
+
+    scorer = ReadinessScorer(weights)
+    assert math.isclose(scorer.weights.sum(), 1)
+    assert scorer.weights[scorer.components.index("margin")] == 0
+
+
+def test_invalid_weights_are_rejected():
+    with pytest.raises(ValueError):
+        parse_weights("hype=1")
+    with pytest.raises(ValueError):
+        ReadinessScorer({name: 0 for name in DEFAULT_WEIGHTS})
+    with pytest.raises(ValueError):
+        ReadinessScorer({"growth": -1, "margin": 2})
+
+
+def test_tiers_start_at_their_floor():
+    assert readiness_tier(75) == "Investment ready"
+    assert readiness_tier(74.9) == "Promising"
+    assert readiness_tier(35) == "Early"
+    assert readiness_tier(0) == "Not ready"
+
+
+def test_stub_documents_count_for_half():
+    assert document_completeness({"pitch_deck": True, "founder_checklist": True}) == 100
+    assert document_completeness({"pitch_deck": True, "founder_checklist": True},
+                                 {"pitch_deck": 100, "founder_checklist": 4096}) == 70
+    assert document_completeness({"founder_checklist": True}) == 40
+
+
+def test_reported_metrics_follow_the_component_curves():
+    scored, = ReadinessScorer(DEFAULT_WEIGHTS).score_results([
+        result("Acme", entities=("founder", "founder", "investor", "market"),
+               mrr=100_000, growth_pct=10, burn=120_000, runway_months=12, gross_margin_pct=50)])
+    components = scored["components"]
+    assert components["completeness"] == 1
+    assert components["growth"] == round(1 - math.exp(-0.5), 3)
+    # ARR falls back to 12x MRR: 1.2M growing 10% adds 120k against 120k burn
+    assert components["burn_multiple"] == 1
+    assert components["runway"] == components["margin"] == 0.5
+    assert components["signals"] == 1
+    assert scored["coverage"] == 1
+
+
+def test_missing_metrics_score_as_weak_and_reduce_coverage():
+    scored, = ReadinessScorer(DEFAULT_WEIGHTS).score_results([result("Quiet", completeness=0)])
+    reported = DEFAULT_WEIGHTS["completeness"] + DEFAULT_WEIGHTS["signals"]
+    missing = 1 - reported
+    assert scored["components"]["growth"] is None and scored["components"]["burn_multiple"] is None
+    assert scored["coverage"] == round(reported, 3)
+    assert scored["readiness_score"] == round(MISSING_COMPONENT_SCORE * missing * 100, 1)
+    assert scored["tier"] == "Not ready"
+
+
+def test_rank_portfolio_orders_stored_analyses(tmp_path):
+    store = ResultStore(str(tmp_path))
+    store.put("Quiet", "fp1", result("Quiet", completeness=40))
+    store.put("Acme", "fp2", result("Acme", entities=("founder", "investor"),
+                                    arr=1_200_000, growth_pct=15, burn=90_000, runway_months=24))
+    store.put("Empty", "fp3", {"company_name": "Empty"})
+
+    ranked = ReadinessScorer(DEFAULT_WEIGHTS).rank_portfolio(store)
+    assert [item["company_name"] for item in ranked] == ["Acme", "Quiet"]
+    assert ranked[0]["readiness_score"] > ranked[1]["readiness_score"]
+    assert len(ReadinessScorer(DEFAULT_WEIGHTS).rank_portfolio(store, limit=1)) == 1
@@ -0,0 +1,82 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.prewarm import CompanyChangeFeed, PrewarmWorker
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.search_index import PortfolioSearchIndex
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.span_index import count_terms
+
+
+def builds(index):
+    return sorted(entry for entry in os.listdir(index.root) if entry.startswith("build-"))
+
+
+def test_stored_analysis_is_searchable(make_agent):
+    agent = make_agent()
+    assert agent.search_index.search("okafor") == []
+
+    agent.extract_company_data("Acme")
+    hits = agent.search_index.search("okafor")
+    assert [hit["document"] for hit in hits] == ["Company Data/Acme/pitch_deck.txt"]
+
+
+def test_prewarm_batch_publishes_the_index(make_agent, storage, tmp_path):
+    agent = make_agent()
+    PrewarmWorker(agent, CompanyChangeFeed(storage, str(tmp_path))).run_once()
+    assert not os.path.exists(os.path.join(agent.search_index.root, "STALE"))
+
+    storage.delete("Company Data/Acme/pitch_deck.txt")
+    agent.search_index.update(storage)
+    assert agent.search_index.search("okafor") == []
+
+
+def test_previous_build_survives_one_swap(storage, tmp_path):
+    index = PortfolioSearchIndex(str(tmp_path))
+    index.update(storage)
+    first, = builds(index)
+
+    storage.put("Company Data/Acme/pitch_deck.txt", "New deck")
+    index.update(storage)
+    assert first in builds(index) and len(builds(index)) == 2
+
+    storage.put("Company Data/Acme/pitch_deck.txt", "Newer deck")
+    index.update(storage)
+    assert first not in builds(index) and len(builds(index)) == 2
+
+
+def test_chunked_term_counts_match_the_whole_text():
+    text = "Priya Raman founded Acme.\nAcme raised $4.2M from Sequoia Capital.\n" * 3
+    for size in (1, 5, 17):
+        assert count_terms(text[i:i + size] for i in range(0, len(text), size)) == count_terms([text])
+
+
+def test_analysis_reuses_the_listing_and_streamed_text(make_agent, storage, monkeypatch):
+    storage.put("Company Data/Acme/notes.md", "Kestrel logistics partnership")
+    calls = []
+    for method in ("list", "stream"):
+        def record(*args, _original=getattr(storage, method), _method=method, **kwargs):
+            calls.append((_method, args[0] if args else kwargs.get("prefix")))
+            return _original(*args, **kwargs)
+        monkeypatch.setattr(storage, method, record)
+    agent = make_agent(memory_bounded=True)
+
+    agent.extract_company_data("Acme")
+    assert [name for method, name in calls if method == "list"] == ["Company Data/Acme/"]
+    # Each document is read once; only the file the analysis skipped is read for the index
+    read = [name for method, name in calls if method == "stream"]
+    assert sorted(set(read)) == sorted(read)
+    assert "Company Data/Acme/notes.md" in read
+    assert [hit["document"] for hit in agent.search_index.search("okafor")] == ["Company Data/Acme/pitch_deck.txt"]
+    assert [hit["document"] for hit in agent.search_index.search("kestrel")] == ["Company Data/Acme/notes.md"]
@@ -0,0 +1,99 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from lvx_quantum_leap_analyst.server import AdmissionGate, AnalystServer, Overloaded, create_app
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.tenants import TenantRegistry
+
+
+async def hold(gate, release):
+    async with gate.admit():
+        await release.wait()
+
+
+def test_full_queue_rejects_new_requests():
+    async def scenario():
+        gate = AdmissionGate(max_inflight=1, max_queued=1)
+        release = asyncio.Event()
+        running = asyncio.create_task(hold(gate, release))
+        waiting = asyncio.create_task(hold(gate, release))
+        await asyncio.sleep(0)
+        assert (gate.inflight, gate.queued) == (1, 1)
+
+        with pytest.raises(Overloaded):
+            async with gate.admit():
+                pass
+        release.set()
+        await asyncio.gather(running, waiting)
+        return gate.describe()
+
+    described = asyncio.run(scenario())
+    assert (described["admitted"], described["rejected"]) == (2, 1)
+    assert (described["inflight"], described["queued"]) == (0, 0)
+
+
+def test_drain_waits_for_admitted_requests_and_rejects_new_ones():
+    async def scenario():
+        gate = AdmissionGate(max_inflight=2, max_queued=0)
+        release = asyncio.Event()
+        running = asyncio.create_task(hold(gate, release))
+        await asyncio.sleep(0)
+
+        assert not await gate.drain(timeout=0.01)
+        with pytest.raises(Overloaded):
+            async with gate.admit():
+                pass
+        asyncio.get_running_loop().call_later(0.01, release.set)
+        assert await gate.drain(timeout=5)
+        await running
+        return gate.describe()
+
+    described = asyncio.run(scenario())
+    assert described["draining"] and described["inflight"] == 0
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = AnalystServer(workers=2, max_queued=0)
+    server.registry = TenantRegistry({"default": {"storage_uri": "memory://"}}, cache_dir=str(tmp_path))
+    yield server
+    server.executor.shutdown(wait=False)
+
+
+def test_tool_threads_match_the_request_workers(server):
+    assert server.run_config.tool_thread_pool_config.max_workers == 2
+
+
+def test_unknown_tenants_are_rejected_before_running(server):
+    # No lifespan: the pools are not warmed and no request reaches the agent
+    client = TestClient(create_app(server))
+    response = client.post("/run", json={"message": "Analyze Acme", "tenant": "fund-z"})
+    assert response.status_code == 404
+    assert "fund-z" in response.json()["detail"]
+    assert client.get("/rank", params={"tenant": "fund-z"}).status_code == 404
+    assert server.gate.stats["admitted"] == 0
+
+
+def test_draining_server_answers_503_with_retry_after(server):
+    client = TestClient(create_app(server))
+    server.gate.draining = True
+    for response in (client.post("/run", json={"message": "Analyze Acme"}),
+                     client.post("/analyze", json={"company_name": "Acme"})):
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+    assert server.gate.stats["rejected"] == 2
@@ -0,0 +1,42 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from conftest import DOCUMENTS
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.span_index import SpanIndex
+
+TEXT = "Acme Robotics\nFounders: Priya Raman (CEO) and Daniel Okafor (CTO).\n"
+
+
+def test_evidence_resolves_to_its_offsets(tmp_path):
+    SpanIndex(str(tmp_path)).index_company("Acme", [{"name": "deck.txt", "generation": "1", "text": TEXT}])
+
+    # A fresh instance reads the shard back from disk
+    span = SpanIndex(str(tmp_path)).find_span("Acme", "priya raman (ceo)")
+    assert TEXT[span["start"]:span["end"]] == "Priya Raman (CEO"
+    assert span["document"] == "deck.txt"
+    assert SpanIndex(str(tmp_path)).find_span("Acme", "unrelated quote entirely") is None
+
+
+def test_memory_bounded_spans_point_into_the_full_document(make_agent, storage):
+    filler = "".join(f"Our customers delight in section {i} of the brochure, which is long.\n\n" for i in range(60))
+    deck = "Acme Robotics\n\n" + filler + DOCUMENTS["Company Data/Acme/pitch_deck.txt"]
+    storage.put("Company Data/Acme/pitch_deck.txt", deck)
+    agent = make_agent(memory_bounded=True, prompt_token_budget=200)
+
+    result = agent.extract_company_data("Acme")
+    assert result["raw_data"]["pitch_deck"]["truncated"]
+    founder, = [e for e in result["entity_analysis"]["entities"] if e["name"] == "Priya Raman"]
+    span = founder["properties"]["evidence_span"]
+    page = agent.get_document_text("Acme", "pitch_deck", start=span["start"], length=span["end"] - span["start"])
+    assert page["text"] == "Priya Raman"
@@ -0,0 +1,109 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+
+import pytest
+
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.storage_backend import (
+    MIRROR_MANIFEST_NAME, LocalBackend, MemoryBackend, ObjectChanged, open_storage)
+
+DECK = "Company Data/Acme/pitch_deck.txt"
+CONTENT = b"Acme Robotics raises a Series A.\n" * 8
+
+
+def write(backend, name, data):
+    if isinstance(backend, MemoryBackend):
+        backend.put(name, data)
+        return
+    path = backend.file_path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    previous = os.stat(path).st_mtime_ns if os.path.exists(path) else 0
+    with open(path, "wb") as f:
+        f.write(data)
+    # Coarse filesystem clocks could otherwise keep the old generation
+    os.utime(path, ns=(previous + 10**9, previous + 10**9))
+
+
+@pytest.fixture(params=["local", "memory"])
+def backend(request, tmp_path):
+    backend = LocalBackend(str(tmp_path)) if request.param == "local" else MemoryBackend()
+    write(backend, DECK, CONTENT)
+    write(backend, "Company Data/Acme/founder_checklist.txt", b"Runway: 14 months.\n")
+    write(backend, "Company Data/Zeta/pitch_deck.txt", b"Zeta Labs\n")
+    return backend
+
+
+def test_ranged_and_streamed_reads_match_the_object(backend):
+    assert backend.read(DECK) == CONTENT
+    assert backend.read(DECK, 6, 14) == CONTENT[6:14]
+    assert backend.read(DECK, len(CONTENT) - 4, len(CONTENT) + 100) == CONTENT[-4:]
+    assert backend.read(DECK, 10, 10) == b""
+    assert b"".join(backend.stream(DECK, chunk_bytes=7)) == CONTENT
+    assert backend.read_text(DECK) == CONTENT.decode()
+
+
+def test_stat_and_listing_agree(backend):
+    info = backend.stat(DECK)
+    assert info.name == DECK and info.size == len(CONTENT) and info.generation
+    assert backend.stat("Company Data/Acme/missing.txt") is None
+    assert [item.name for item in backend.list("Company Data/Acme/")] == [
+        "Company Data/Acme/founder_checklist.txt", DECK]
+    assert next(item for item in backend.list("Company Data/") if item.name == DECK).generation == info.generation
+    assert backend.list_folders("Company Data/") == ["Acme", "Zeta"]
+
+
+def test_pinned_reads_fail_once_the_object_changes(backend):
+    generation = backend.stat(DECK).generation
+    assert backend.read(DECK, generation=generation) == CONTENT
+
+    write(backend, DECK, b"Acme Robotics, revised deck\n")
+    updated = backend.stat(DECK).generation
+    assert updated != generation
+    with pytest.raises(ObjectChanged):
+        backend.read(DECK, generation=generation)
+    with pytest.raises(ObjectChanged):
+        list(backend.stream(DECK, generation=generation))
+    assert backend.read(DECK, generation=updated) == b"Acme Robotics, revised deck\n"
+
+
+def test_mirrored_files_keep_the_source_generation(tmp_path):
+    backend = LocalBackend(str(tmp_path))
+    write(backend, DECK, CONTENT)
+    manifest = {"objects": {DECK: {"generation": "1700000000000001", "md5_hash": "abc==",
+                                   "mtime_ns": os.stat(backend.file_path(DECK)).st_mtime_ns}}}
+    (tmp_path / MIRROR_MANIFEST_NAME).write_text(json.dumps(manifest))
+
+    info = backend.stat(DECK)
+    assert (info.generation, info.md5_hash) == ("1700000000000001", "abc==")
+    assert backend.local_path(DECK, "1700000000000001") == backend.file_path(DECK)
+    assert [item.name for item in backend.list()] == [DECK]
+
+    # Editing the mirrored file falls back to its modification time
+    write(backend, DECK, b"edited locally\n")
+    assert backend.stat(DECK).generation == str(os.stat(backend.file_path(DECK)).st_mtime_ns)
+    assert backend.local_path(DECK, "1700000000000001") is None
+
+
+def test_local_names_cannot_escape_the_root(tmp_path):
+    with pytest.raises(ValueError):
+        LocalBackend(str(tmp_path)).file_path("../outside.txt")
+
+
+def test_open_storage_picks_the_backend(tmp_path):
+    assert isinstance(open_storage("memory://"), MemoryBackend)
+    assert isinstance(open_storage(f"file://{tmp_path}"), LocalBackend)
+    with pytest.raises(ValueError):
+        open_storage(str(tmp_path / "missing"))
@@ -0,0 +1,88 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from types import SimpleNamespace
+
+from google.genai import types
+
+from lvx_quantum_leap_analyst.streaming_agent import StreamingDealNoteAgent, resolve_company_name
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.cost_ledger import current_usage_scope
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.storage_backend import GcsBackend, LocalBackend
+
+COMPANIES = ["Acme", "Acme Robotics", "Zeta Labs"]
+
+
+def test_message_resolves_to_the_named_company():
+    assert resolve_company_name("Write a deal note for zeta labs please", COMPANIES) == {"company_name": "Zeta Labs"}
+    assert resolve_company_name("How is Acme Robotics doing?", COMPANIES) == {"company_name": "Acme Robotics"}
+
+
+def test_unmatched_or_ambiguous_messages_are_errors():
+    assert "error" in resolve_company_name("Write a deal note for NewCo", COMPANIES)
+    assert "error" in resolve_company_name("Compare Acme with Zeta Labs", COMPANIES)
+    assert "error" in resolve_company_name("Acmeville", COMPANIES)
+
+
+def test_explicit_name_must_exist():
+    assert resolve_company_name("acme", COMPANIES, explicit=True) == {"company_name": "Acme"}
+    assert "error" in resolve_company_name("NewCo", COMPANIES, explicit=True)
+
+
+def test_message_is_resolved_against_the_bucket(make_agent):
+    extractor = make_agent(model=False)
+    ctx = SimpleNamespace(
+        session=SimpleNamespace(state={}),
+        user_content=types.Content(role="user", parts=[types.Part(text="Deal note for Acme")]),
+    )
+    assert StreamingDealNoteAgent._company_name(None, ctx, extractor) == {"company_name": "Acme"}
+
+    ctx.user_content = types.Content(role="user", parts=[types.Part(text="Deal note for NewCo")])
+    assert "error" in StreamingDealNoteAgent._company_name(None, ctx, extractor)
+
+
+def test_company_folders_are_listed_without_their_documents(storage, tmp_path):
+    storage.put("Company Data/Zeta Labs/deck.txt", "Deck")
+    storage.put("Company Data/readme.txt", "Not a company")
+    assert storage.list_folders("Company Data/") == ["Acme", "Zeta Labs"]
+
+    (tmp_path / "Company Data" / "Acme").mkdir(parents=True)
+    (tmp_path / "Company Data" / "Acme" / "deck.txt").write_text("Deck")
+    (tmp_path / "Company Data" / "readme.txt").write_text("Not a company")
+    assert LocalBackend(str(tmp_path)).list_folders("Company Data/") == ["Acme"]
+    assert LocalBackend(str(tmp_path)).list_folders("Missing/") == []
+
+
+def test_gcs_folders_come_from_a_delimiter_listing():
+    class Listing(list):
+        prefixes = set()
+
+        def __iter__(self):
+            # Prefixes are filled in as the pages are read
+            self.prefixes = {"Company Data/Acme/", "Company Data/Zeta Labs/"}
+            return super().__iter__()
+
+    calls = []
+    bucket = SimpleNamespace(list_blobs=lambda **kwargs: calls.append(kwargs) or Listing())
+    backend = GcsBackend("bucket", client=SimpleNamespace(bucket=lambda name: bucket))
+    assert backend.list_folders("Company Data/") == ["Acme", "Zeta Labs"]
+    assert calls == [{"prefix": "Company Data/", "delimiter": "/"}]
+
+
+def test_stream_steps_are_billed_to_the_session_and_tenant():
+    def progress():
+        scope = current_usage_scope()
+        yield {"session": scope.session, "tenant": scope.tenant}
+
+    assert StreamingDealNoteAgent._next_event(progress(), "s1", "fund-a") == {"session": "s1", "tenant": "fund-a"}
+    assert current_usage_scope() is None
@@ -0,0 +1,47 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from types import SimpleNamespace
+
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent import agent as agent_module
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent import prompt_cache
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.cost_ledger import CostLedger
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.tenants import TenantRegistry
+
+
+def test_tenant_project_and_location_reach_the_models(tmp_path, monkeypatch):
+    vertex = {}
+    monkeypatch.setattr(prompt_cache.vertexai, "init", lambda project, location: vertex.update(
+        project=project, location=location))
+
+    def fake_model(name, **kwargs):
+        return SimpleNamespace(name=name, **vertex)
+
+    monkeypatch.setattr(agent_module, "GenerativeModel", fake_model)
+    monkeypatch.setattr(prompt_cache, "GenerativeModel", fake_model)
+    monkeypatch.setattr(agent_module, "get_cost_ledger", lambda: CostLedger(None))
+    monkeypatch.delenv("GOOGLE_CLOUD_PROJECT", raising=False)
+
+    registry = TenantRegistry({
+        "fund-a": {"storage_uri": "memory://", "project": "fund-a", "location": "asia-south1"},
+        "fund-b": {"storage_uri": "memory://", "project": "fund-b", "location": "europe-west4"},
+    }, cache_dir=str(tmp_path))
+    agent_a = registry.get("fund-a").agent
+    agent_b = registry.get("fund-b").agent
+
+    assert (agent_a.model.project, agent_a.model.location) == ("fund-a", "asia-south1")
+    assert (agent_b.summary_model.project, agent_b.summary_model.location) == ("fund-b", "europe-west4")
+    # The prompt cache re-targets Vertex AI when it builds its model later
+    cached = agent_a.analysis_prompt_cache.get_model()
+    assert (cached.project, cached.location) == ("fund-a", "asia-south1")
@@ -0,0 +1,23 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from lvx_quantum_leap_analyst.sub_agents.data_extraction_agent.tools import DataExtractionTools
+
+
+def test_preview_reports_the_document_size_in_bytes(storage):
+    storage.put("Company Data/Acme/notes.txt", "₹" * 30)
+    preview = DataExtractionTools(storage=storage).extract_text_preview("Acme", max_length=10)
+    notes = preview["documents"]["notes.txt"]
+    assert notes["preview"] == "₹" * 10 + "..."
+    assert (notes["full_bytes"], notes["truncated"]) == (90, True)
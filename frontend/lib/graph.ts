@@ -0,0 +1,44 @@
+import { CompanyGraph, CompanyGraphShard, GraphEdge, GraphNode } from '../types/graph';
+
+// Base URL where the exporter's output directory is published (e.g. a public bucket path).
+const GRAPH_EXPORT_URL = process.env.NEXT_PUBLIC_GRAPH_EXPORT_URL || '/graph_export';
+
+/**
+ * Mirror of `company_slug` in the agents' result store.
+ */
+export function companySlug(companyName: string): string {
+  const slug = companyName.toLowerCase().replace(/[^a-z0-9]+/g, '_').replace(/^_+|_+$/g, '');
+  return slug || 'company';
+}
+
+function zipRows<T>(columns: string[], rows: (string | number | null)[][]): T[] {
+  return rows.map((row) => {
+    const record: Record<string, string | number | null> = {};
+    columns.forEach((column, i) => {
+      record[column] = row[i];
+    });
+    return record as unknown as T;
+  });
+}
+
+/**
+ * Load one company's knowledge graph with a single read of its JSON shard.
+ */
+export async function getCompanyGraph(companyName: string): Promise<CompanyGraph | null> {
+  try {
+    const response = await fetch(`${GRAPH_EXPORT_URL}/shards/${companySlug(companyName)}.json`);
+    if (!response.ok) {
+      return null;
+    }
+    const shard = (await response.json()) as CompanyGraphShard;
+    return {
+      company: shard.company,
+      fingerprint: shard.fingerprint,
+      nodes: zipRows<GraphNode>(shard.node_columns, shard.nodes),
+      edges: zipRows<GraphEdge>(shard.edge_columns, shard.edges),
+    };
+  } catch (error) {
+    console.error('Graph shard error:', error);
+    return null;
+  }
+}
@@ -1,6 +1,7 @@
 import { notFound } from "next/navigation";
 import Image from "next/image";
 import { getCompaniesData } from "../../../../lib/bigquery";
+import { getCompanyGraph } from "../../../../lib/graph";
 import { Company } from "../../../../types/company";
 import Header from "../../components/Header";
 import { 
@@ -14,7 +15,8 @@ import {
   LogOut,
   DollarSign,
   PieChart,
-  Users
+  Users,
+  Network
 } from "lucide-react";
 
 export const metadata = {
@@ -207,7 +209,17 @@ export default async function CompanyPage({ params }: CompanyPageProps) {
 
   if (!company) {
     notFound();
-  }  // Helper function to format currency
+  }
+
+  // Knowledge graph from the agents' export (one shard read); null if not exported yet
+  const graph = await getCompanyGraph(company.CompanyName);
+  const nodeNames = new Map(graph?.nodes.map((node) => [node.id, node.name]) ?? []);
+  const nodesByType = new Map<string, string[]>();
+  graph?.nodes.forEach((node) => {
+    nodesByType.set(node.type, [...(nodesByType.get(node.type) ?? []), node.name]);
+  });
+
+  // Helper function to format currency
   const formatCurrency = (value: number | undefined | null) => {
     if (!value || isNaN(value)) return 'N/A';
     return new Intl.NumberFormat('en-IN', {
@@ -460,6 +472,36 @@ export default async function CompanyPage({ params }: CompanyPageProps) {
           </div>
         </div>
 
+        {/* Knowledge Graph */}
+        {graph && (
+          <div className="bg-white dark:bg-gray-800 rounded-lg shadow-sm p-6">
+            <h2 className="text-xl font-bold mb-4 text-gray-900 dark:text-gray-100 flex items-center">
+              <Network className="mr-2 text-blue-600" size={24} />
+              Knowledge Graph
+            </h2>
+            <div className="space-y-4">
+              {Array.from(nodesByType.entries()).map(([type, names]) => (
+                <div key={type}>
+                  <h4 className="font-semibold mb-2 text-gray-900 dark:text-gray-100 capitalize">{type.replace(/_/g, ' ')}</h4>
+                  <p className="text-gray-900 dark:text-gray-100">{names.join(', ')}</p>
+                </div>
+              ))}
+              {graph.edges.length > 0 && (
+                <div className="border-t border-gray-200 dark:border-gray-700 pt-4">
+                  <h4 className="font-semibold mb-2 text-gray-900 dark:text-gray-100">Relationships</h4>
+                  <ul className="space-y-1 text-sm text-gray-600 dark:text-gray-400">
+                    {graph.edges.map((edge) => (
+                      <li key={edge.id || `${edge.source}-${edge.type}-${edge.target}`}>
+                        {nodeNames.get(edge.source) ?? edge.source} — {edge.type.replace(/_/g, ' ')} → {nodeNames.get(edge.target) ?? edge.target}
+                      </li>
+                    ))}
+                  </ul>
+                </div>
+              )}
+            </div>
+          </div>
+        )}
+
         {/* Exit Strategy Analysis */}
         <div className="bg-white dark:bg-gray-800 rounded-lg shadow-sm p-6">
           <h2 className="text-xl font-bold mb-4 text-gray-900 dark:text-gray-100 flex items-center">
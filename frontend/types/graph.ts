@@ -0,0 +1,40 @@
+/**
+ * Knowledge graph shard written by the agents' graph exporter
+ * (`graph_export.py`). Rows are positional arrays; the accompanying
+ * `*_columns` arrays give their field order.
+ */
+export interface CompanyGraphShard {
+  company: string;
+  /** Fingerprint of the source documents the graph was built from */
+  fingerprint: string;
+  node_columns: string[];
+  nodes: (string | number | null)[][];
+  edge_columns: string[];
+  edges: (string | number | null)[][];
+}
+
+export interface GraphNode {
+  id: string;
+  type: string;
+  name: string;
+  confidence: number | null;
+  source: string | null;
+  description: string | null;
+}
+
+export interface GraphEdge {
+  id: string;
+  type: string;
+  source: string;
+  target: string;
+  strength: number | null;
+  evidence: string | null;
+  description: string | null;
+}
+
+export interface CompanyGraph {
+  company: string;
+  fingerprint: string;
+  nodes: GraphNode[];
+  edges: GraphEdge[];
+}